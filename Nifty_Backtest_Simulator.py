@@ -1,5 +1,6 @@
 import random
 from Nifty_Strategy_Engine import NiftyStrategyEngine
+from Nifty_Scenario_Generator import NiftyScenarioGenerator
 
 class NiftyBacktestSimulator:
     """
@@ -146,6 +147,70 @@ class NiftyBacktestSimulator:
         print(f"Total P&L Points: {total_pl_points}")
         print("-------------------------------")
 
+    def run_batch_backtest(self, batch, target=30, stop=15, entry_score=40):
+        """
+        Vectorised run_backtest over a NiftyScenarioGenerator batch.
+        Same entry/exit rules, evaluated for every day at once: the minute loop
+        remains (positions are path dependent) but each step is an array op
+        across all days instead of a dict per minute.
+
+        Returns:
+            dict of (days,) arrays: trades, wins, pl_points, plus 'regime'
+        """
+        import numpy as np
+
+        gen = NiftyScenarioGenerator()
+        scores = self.engine.calculate_conviction_batch(
+            gen.history(batch), batch["pe_oi"], batch["ce_oi"],
+            batch["pivot"], batch["r1"], batch["s1"]
+        )
+        price = batch["price"]
+        n_days, minutes = price.shape
+
+        score = scores["total_score"]
+        # Mirrors: "BULLISH" in str(signals) or pe_oi > ce_oi
+        go_long = (scores["trend"] == 1) | (scores["oi_sentiment"] == 1) | (batch["pe_oi"] > batch["ce_oi"])
+
+        in_pos = np.zeros(n_days, dtype=bool)
+        is_long = np.zeros(n_days, dtype=bool)
+        entry = np.zeros(n_days)
+        trades = np.zeros(n_days, dtype=np.int64)
+        wins = np.zeros(n_days, dtype=np.int64)
+        pl_points = np.zeros(n_days)
+
+        for m in range(minutes):
+            px = price[:, m]
+
+            # Exits first for days already holding (entries on this minute don't exit)
+            move = np.where(is_long, px - entry, entry - px)
+            hit_target = in_pos & (move >= target)
+            hit_stop = in_pos & ~hit_target & (move <= -stop)
+            exited = hit_target | hit_stop
+            trades += exited
+            wins += hit_target
+            pl_points += np.where(hit_target, target, 0) - np.where(hit_stop, stop, 0)
+
+            enter = ~in_pos & (score[:, m] >= entry_score)
+            entry = np.where(enter, px, entry)
+            is_long = np.where(enter, go_long[:, m], is_long)
+            in_pos = (in_pos & ~exited) | enter
+
+        return {"trades": trades, "wins": wins, "pl_points": pl_points, "regime": batch["regime"]}
+
+    def print_batch_results(self, results):
+        import numpy as np
+
+        print(f"\nSTRESS TEST RESULTS ({len(results['trades'])} days):")
+        for regime in np.unique(results["regime"]):
+            mask = results["regime"] == regime
+            trades = results["trades"][mask].sum()
+            wins = results["wins"][mask].sum()
+            win_rate = f"{wins / trades * 100:.1f}%" if trades else "n/a"
+            print(f"  {regime:<11} days={mask.sum():>5}  trades={trades:>6}  "
+                  f"win rate={win_rate:>6}  P&L pts/day={results['pl_points'][mask].mean():+.1f}")
+        print("-------------------------------")
+
+
 if __name__ == "__main__":
     sim = NiftyBacktestSimulator()
     
@@ -161,3 +226,7 @@ if __name__ == "__main__":
     chop_data = sim.generate_scenario("CHOP")
     sim.run_backtest("Sideways/Choppy", chop_data)
 
+    # 4. Batch stress test across all regimes
+    batch = NiftyScenarioGenerator(seed=42).generate(n_days=2000, regime="MIXED")
+    sim.print_batch_results(sim.run_batch_backtest(batch))
+
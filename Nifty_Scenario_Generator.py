@@ -0,0 +1,197 @@
+import numpy as np
+
+
+class NiftyScenarioGenerator:
+    """
+    Batch synthetic market scenario generator for stress-testing the Nifty engines.
+    Produces many intraday paths at once as columnar NumPy arrays
+    (days x minutes) for price, PE/CE OI, VIX and volume — no per-minute dicts.
+
+    Regimes:
+        BULL        - upward drift, put writing builds PE OI
+        BEAR        - downward drift, call writing builds CE OI, VIX rises
+        CHOP        - no drift, noisy OI
+        GAP         - opens 0.5-1.5% away from previous close, partially fills the gap
+        TREND_DAY   - strong one-directional drift with low noise
+        EXPIRY_PIN  - price mean-reverts onto the nearest 50-pt strike as the day ages,
+                      straddle OI builds at the pin
+    """
+
+    REGIMES = ("BULL", "BEAR", "CHOP", "GAP", "TREND_DAY", "EXPIRY_PIN")
+
+    MINUTES_PER_DAY = 375       # 09:15 - 15:30
+    HISTORY_SEED = 50           # Bars of flat history before the open (matches the simulator)
+
+    def __init__(self, seed=None, minutes=375, start_price=24500.0,
+                 start_oi=1500000, start_vix=15.0):
+        self.rng = np.random.default_rng(seed)
+        self.minutes = minutes
+        self.start_price = float(start_price)
+        self.start_oi = float(start_oi)
+        self.start_vix = float(start_vix)
+
+    def _minute_sigma(self, vix):
+        """Per-minute price sigma implied by VIX (annualised %, 252 x 375 minutes)."""
+        return self.start_price * (vix / 100.0) / np.sqrt(252 * self.MINUTES_PER_DAY)
+
+    def _resolve_regimes(self, n_days, regime):
+        if regime == "MIXED":
+            return self.rng.choice(self.REGIMES, size=n_days)
+        if isinstance(regime, str):
+            if regime not in self.REGIMES:
+                raise ValueError(f"Unknown regime '{regime}'. Use one of {self.REGIMES} or 'MIXED'")
+            return np.full(n_days, regime)
+        regimes = np.asarray(regime)
+        if len(regimes) != n_days:
+            raise ValueError("Per-day regime list must have n_days entries")
+        bad = set(regimes) - set(self.REGIMES)
+        if bad:
+            raise ValueError(f"Unknown regimes {sorted(bad)}")
+        return regimes
+
+    def generate(self, n_days=1000, regime="MIXED"):
+        """
+        Generate a batch of intraday paths.
+
+        Args:
+            n_days: Number of independent trading days (paths)
+            regime: One regime name for all days, 'MIXED' for random regimes,
+                    or a sequence of n_days regime names
+
+        Returns:
+            dict of arrays:
+                price, pe_oi, ce_oi, vix, volume: float64 (n_days, minutes)
+                pivot, r1, s1, prev_close:        float64 (n_days,)
+                regime:                           str     (n_days,)
+        """
+        rng = self.rng
+        n, m = n_days, self.minutes
+        regimes = self._resolve_regimes(n, regime)
+        t = np.arange(m, dtype=np.float64)
+
+        is_bull = regimes == "BULL"
+        is_bear = regimes == "BEAR"
+        is_gap = regimes == "GAP"
+        is_trend = regimes == "TREND_DAY"
+        is_pin = regimes == "EXPIRY_PIN"
+
+        # ── VIX path ───────────────────────────────────────────
+        vix0 = self.start_vix + rng.normal(0, 1.0, size=n)
+        vix_step = np.zeros((n, m))
+        vix_step[is_bear, ::30] = 0.1          # Panic bid every 30 min
+        vix_step[is_bull, ::60] = -0.05        # Rally cools VIX
+        vix_step[is_trend, ::30] = 0.05
+        vix_step[is_pin, ::30] = -0.08         # IV crush into expiry
+        vix_step[is_gap, 0] = rng.uniform(0.5, 2.0, size=is_gap.sum())
+        vix = np.maximum(vix0[:, None] + np.cumsum(vix_step, axis=1), 8.0)
+
+        # ── Price path ─────────────────────────────────────────
+        sigma = self._minute_sigma(vix)
+        drift = np.zeros(n)
+        drift[is_bull] = 0.5
+        drift[is_bear] = -0.6
+        trend_sign = rng.choice([-1.0, 1.0], size=n)
+        drift[is_trend] = 1.2 * trend_sign[is_trend]
+        noise_scale = np.where(is_trend, 0.5, 1.0)
+
+        open_price = np.full(n, self.start_price)
+        gap_pct = rng.uniform(0.005, 0.015, size=n) * rng.choice([-1.0, 1.0], size=n)
+        open_price[is_gap] *= 1 + gap_pct[is_gap]
+        # Gap days drift back towards the previous close (partial fill)
+        drift[is_gap] = (self.start_price - open_price[is_gap]) * 0.5 / m
+
+        shocks = rng.standard_normal((n, m)) * sigma * noise_scale[:, None]
+        price = open_price[:, None] + np.cumsum(drift[:, None] + shocks, axis=1)
+
+        if is_pin.any():
+            # Ornstein-Uhlenbeck pull onto the strike, strengthening through the session
+            pin_idx = np.flatnonzero(is_pin)
+            pin_strike = np.round(open_price[pin_idx] / 50.0) * 50.0
+            pin_strike += rng.choice([-50.0, 0.0, 50.0], size=len(pin_idx))
+            kappa = 0.002 + 0.05 * (t / m) ** 2
+            x = open_price[pin_idx].copy()
+            pin_shocks = shocks[pin_idx]
+            pin_path = np.empty((len(pin_idx), m))
+            for i in range(m):
+                x = x + kappa[i] * (pin_strike - x) + pin_shocks[:, i]
+                pin_path[:, i] = x
+            price[pin_idx] = pin_path
+
+        # ── OI paths ───────────────────────────────────────────
+        pe_lo = np.select([is_bull, is_bear, is_pin, is_trend], [500, -2000, 200, 0], -1000)
+        pe_hi = np.select([is_bull, is_bear, is_pin, is_trend], [2000, 0, 1500, 1500], 1000)
+        ce_lo = np.select([is_bull, is_bear, is_pin, is_trend], [-500, 500, 200, -500], -1000)
+        ce_hi = np.select([is_bull, is_bear, is_pin, is_trend], [500, 2000, 1500, 500], 1000)
+        # Trend days: writers follow the direction of the move
+        flip = is_trend & (trend_sign < 0)
+        pe_lo[flip], pe_hi[flip], ce_lo[flip], ce_hi[flip] = -500, 500, 0, 1500
+
+        u_pe = rng.random((n, m))
+        u_ce = rng.random((n, m))
+        pe_oi = self.start_oi + np.cumsum(np.floor(pe_lo[:, None] + u_pe * (pe_hi - pe_lo + 1)[:, None]), axis=1)
+        ce_oi = self.start_oi + np.cumsum(np.floor(ce_lo[:, None] + u_ce * (ce_hi - ce_lo + 1)[:, None]), axis=1)
+
+        # ── Volume: U-shaped intraday profile with lognormal noise ─
+        profile = 1.0 + 1.5 * ((t - m / 2) / (m / 2)) ** 2
+        volume = np.round(profile[None, :] * rng.lognormal(mean=9.0, sigma=0.4, size=(n, m)))
+        volume[is_trend] *= 1.5
+
+        pivot = np.full(n, self.start_price)
+        return {
+            "price": price,
+            "pe_oi": pe_oi,
+            "ce_oi": ce_oi,
+            "vix": vix,
+            "volume": volume,
+            "pivot": pivot,
+            "r1": pivot + 100,
+            "s1": pivot - 100,
+            "prev_close": np.full(n, self.start_price),
+            "regime": regimes,
+        }
+
+    def history(self, batch):
+        """
+        Price history including the flat pre-open seed the simulator uses.
+        Returns (n_days, HISTORY_SEED + minutes) array.
+        """
+        price = batch["price"]
+        seed = np.repeat(batch["prev_close"][:, None], self.HISTORY_SEED, axis=1)
+        return np.concatenate([seed, price], axis=1)
+
+    @staticmethod
+    def ohlcv(batch, timeframe=5):
+        """
+        Roll minute paths up into OHLCV bars, still columnar.
+
+        Returns:
+            dict of (n_days, minutes // timeframe) arrays: open, high, low, close, volume
+        """
+        price = batch["price"]
+        n, m = price.shape
+        bars = m // timeframe
+        p = price[:, :bars * timeframe].reshape(n, bars, timeframe)
+        v = batch["volume"][:, :bars * timeframe].reshape(n, bars, timeframe)
+        return {
+            "open": p[:, :, 0],
+            "high": p.max(axis=2),
+            "low": p.min(axis=2),
+            "close": p[:, :, -1],
+            "volume": v.sum(axis=2),
+        }
+
+
+if __name__ == "__main__":
+    import time
+
+    gen = NiftyScenarioGenerator(seed=7)
+    start = time.perf_counter()
+    batch = gen.generate(n_days=5000, regime="MIXED")
+    elapsed = time.perf_counter() - start
+
+    print(f"Generated {batch['price'].shape[0]} days x {batch['price'].shape[1]} minutes in {elapsed*1000:.1f} ms")
+    for regime in NiftyScenarioGenerator.REGIMES:
+        mask = batch["regime"] == regime
+        if mask.any():
+            move = (batch["price"][mask, -1] - batch["price"][mask, 0]).mean()
+            print(f"  {regime:<11} days={mask.sum():>5}  avg open->close move={move:+8.1f}")
@@ -140,6 +140,62 @@ class NiftyStrategyEngine:
             "verdict": "HIGH" if self.conviction_score >= 40 else "MEDIUM" if self.conviction_score >= 20 else "LOW"
         }
 
+    def calculate_conviction_batch(self, history, pe_oi, ce_oi, pivot, r1, s1,
+                                   period_short=20, period_long=50):
+        """
+        Vectorised calculate_nifty_conviction over columnar scenario arrays.
+        Same scoring rules, evaluated for every (day, minute) at once.
+
+        Args:
+            history: (days, seed + minutes) closing prices; the first `seed` columns
+                     are pre-open history (see NiftyScenarioGenerator.history)
+            pe_oi, ce_oi: (days, minutes) total OI
+            pivot, r1, s1: (days,) pivot levels
+
+        Returns:
+            dict of (days, minutes) arrays: total_score, trend (+1/-1/0),
+            pcr, oi_sentiment (+1 bullish / -1 bearish / 0 range or neutral)
+        """
+        import numpy as np
+
+        history = np.asarray(history, dtype=np.float64)
+        pe_oi = np.asarray(pe_oi, dtype=np.float64)
+        ce_oi = np.asarray(ce_oi, dtype=np.float64)
+        minutes = pe_oi.shape[1]
+        seed = history.shape[1] - minutes
+        if seed < period_long - 1:
+            raise ValueError(f"history needs at least {period_long - 1} pre-open bars, got {seed}")
+
+        # Rolling means of the trailing window ending at each minute
+        csum = np.concatenate([np.zeros((history.shape[0], 1)), np.cumsum(history, axis=1)], axis=1)
+        end = np.arange(seed + 1, seed + minutes + 1)
+        sma_short = (csum[:, end] - csum[:, end - period_short]) / period_short
+        sma_long = (csum[:, end] - csum[:, end - period_long]) / period_long
+        price = history[:, seed:]
+
+        # 1. Technicals
+        bull = (sma_short > sma_long) & (price > sma_short)
+        bear = (sma_short < sma_long) & (price < sma_short)
+        trend = bull.astype(np.int8) - bear.astype(np.int8)
+        trend_score = np.where(trend != 0, 20, 0)
+
+        # 2. PCR
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pcr = np.where(ce_oi != 0, pe_oi / ce_oi, 0.0)
+        oi_score = np.select([ce_oi == 0, pcr > 1.2, pcr < 0.8], [0, 15, 15], 5)
+        oi_sentiment = np.select([ce_oi == 0, pcr > 1.2, pcr < 0.8], [0, 1, -1], 0).astype(np.int8)
+
+        # 3. Price action vs pivots
+        p, hi, lo = (np.asarray(x, dtype=np.float64)[:, None] for x in (pivot, r1, s1))
+        pa_score = np.select([price > hi, price > p, price < lo, price < p], [15, 10, 15, 10], 0)
+
+        return {
+            "total_score": trend_score + oi_score + pa_score,
+            "trend": trend,
+            "pcr": pcr,
+            "oi_sentiment": oi_sentiment,
+        }
+
 # Example Usage
 if __name__ == "__main__":
     engine = NiftyStrategyEngine()
@@ -1,11 +1,13 @@
 
 import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer, ScatterChart, Scatter, ZAxis } from "recharts";
-import { useState } from "react";
+import { useEffect, useState } from "react";
 
-// Nifty data from API (Jan 19 - Feb 19 2026)
+const API_BASE = "http://localhost:8000";
+
+// Fallback sample (Jan 19 - Feb 19 2026) shown until /correlation/global answers
 // S&P 500 approximate values (US market closes BEFORE India opens next day)
 // S&P lagged by 1 day to reflect impact on Nifty next morning
-const rawData = [
+const sampleData = [
   { date: "Jan 19", niftyClose: 25585.5, niftyChange: -0.26, sp500: 5930, sp500Change: 0.4 },
   { date: "Jan 20", niftyClose: 25232.5, niftyChange: -1.38, sp500: 5870, sp500Change: -0.9 },
   { date: "Jan 21", niftyClose: 25157.5, niftyChange: -0.30, sp500: 5905, sp500Change: 0.6 },
@@ -32,14 +34,29 @@ const rawData = [
   { date: "Feb 19", niftyClose: 25615.45, niftyChange: -0.79, sp500: 6150, sp500Change: 0.3 }, // Nifty ignored US green
 ];
 
+// /correlation/global rows -> chart rows (global closes are already lagged to the next Indian session)
+function fromApiRows(rows) {
+  return rows
+    .filter(r => r.change_pct.NIFTY != null && r.change_pct.SP500 != null)
+    .map(r => ({
+      date: new Date(r.date).toLocaleDateString("en-US", { month: "short", day: "2-digit" }),
+      niftyClose: r.close.NIFTY,
+      niftyChange: r.change_pct.NIFTY,
+      sp500: r.close.SP500,
+      sp500Change: r.change_pct.SP500,
+    }));
+}
+
 // Normalize both to 100 for comparison
-const base_nifty = rawData[0].niftyClose;
-const base_sp = rawData[0].sp500;
-const normalizedData = rawData.map(d => ({
-  ...d,
-  niftyNorm: ((d.niftyClose / base_nifty) * 100).toFixed(2),
-  sp500Norm: ((d.sp500 / base_sp) * 100).toFixed(2),
-}));
+function normalize(data) {
+  const base_nifty = data[0].niftyClose;
+  const base_sp = data[0].sp500;
+  return data.map(d => ({
+    ...d,
+    niftyNorm: ((d.niftyClose / base_nifty) * 100).toFixed(2),
+    sp500Norm: ((d.sp500 / base_sp) * 100).toFixed(2),
+  }));
+}
 
 // Correlation calculation
 function calcCorrelation(data) {
@@ -67,24 +84,43 @@ function divergenceDays(data) {
   return data.filter(d => Math.sign(d.sp500Change) !== Math.sign(d.niftyChange));
 }
 
-const correlation = calcCorrelation(rawData);
-const accuracy = directionAccuracy(rawData);
-const divergences = divergenceDays(rawData);
-
 export default function App() {
   const [tab, setTab] = useState("price");
+  const [rawData, setRawData] = useState(sampleData);
+  const [live, setLive] = useState(null);
+
+  useEffect(() => {
+    fetch(`${API_BASE}/correlation/global`)
+      .then(res => (res.ok ? res.json() : null))
+      .then(data => {
+        const rows = data && data.rows ? fromApiRows(data.rows) : [];
+        if (rows.length > 1) {
+          setRawData(rows);
+          setLive(data);
+        }
+      })
+      .catch(() => {});
+  }, []);
+
+  const normalizedData = normalize(rawData);
+  const correlation = calcCorrelation(rawData);
+  const accuracy = directionAccuracy(rawData);
+  const divergences = divergenceDays(rawData);
+  const days = rawData.length;
 
   return (
     <div style={{ background: "#0f1117", color: "#e0e0e0", minHeight: "100vh", fontFamily: "monospace", padding: 20 }}>
-      <h2 style={{ color: "#00e5ff", marginBottom: 4 }}>📊 Nifty vs S&P 500 — 1 Month Correlation Study</h2>
-      <p style={{ color: "#888", fontSize: 13, marginBottom: 16 }}>Jan 19 – Feb 19, 2026 | 24 trading days | S&P values approximate</p>
+      <h2 style={{ color: "#00e5ff", marginBottom: 4 }}>📊 Nifty vs S&P 500 — {live ? `${live.window}-Day Rolling` : "1 Month"} Correlation Study</h2>
+      <p style={{ color: "#888", fontSize: 13, marginBottom: 16 }}>
+        {rawData[0].date} – {rawData[days - 1].date} | {days} trading days | {live ? `live as of ${live.as_of} (β Nifty/S&P ${live.markets.SP500.benchmark_beta ?? "—"})` : "S&P values approximate"}
+      </p>
 
       {/* Stats Row */}
       <div style={{ display: "flex", gap: 16, marginBottom: 24, flexWrap: "wrap" }}>
         {[
           { label: "Pearson Correlation", value: correlation, color: parseFloat(correlation) > 0.5 ? "#00e676" : "#ff5252" },
           { label: "Direction Match", value: `${accuracy}%`, color: parseFloat(accuracy) > 60 ? "#00e676" : "#ff9800" },
-          { label: "Divergence Days", value: `${divergences.length}/24`, color: "#ff9800" },
+          { label: "Divergence Days", value: `${divergences.length}/${days}`, color: "#ff9800" },
           { label: "Reliability", value: parseFloat(accuracy) > 65 ? "MODERATE" : "LOW", color: "#ff9800" },
         ].map(s => (
           <div key={s.label} style={{ background: "#1a1d2e", borderRadius: 8, padding: "12px 20px", minWidth: 160 }}>
@@ -106,12 +142,12 @@ export default function App() {
 
       {tab === "price" && (
         <div>
-          <p style={{ color: "#888", fontSize: 12, marginBottom: 8 }}>Both normalized to 100 on Jan 19. Shows trend alignment.</p>
+          <p style={{ color: "#888", fontSize: 12, marginBottom: 8 }}>Both normalized to 100 on {rawData[0].date}. Shows trend alignment.</p>
           <ResponsiveContainer width="100%" height={320}>
             <LineChart data={normalizedData}>
               <CartesianGrid strokeDasharray="3 3" stroke="#2a2d3e" />
               <XAxis dataKey="date" tick={{ fill: "#888", fontSize: 10 }} />
-              <YAxis domain={[95, 106]} tick={{ fill: "#888", fontSize: 10 }} />
+              <YAxis domain={["auto", "auto"]} tick={{ fill: "#888", fontSize: 10 }} />
               <Tooltip contentStyle={{ background: "#1a1d2e", border: "1px solid #333", fontSize: 12 }} />
               <Legend />
               <Line type="monotone" dataKey="niftyNorm" stroke="#00e5ff" name="Nifty (norm)" dot={false} strokeWidth={2} />
@@ -176,7 +212,7 @@ export default function App() {
         <div style={{ display: "grid", gridTemplateColumns: "1fr 1fr", gap: 12, fontSize: 12 }}>
           {[
             { icon: "✅", text: `US-Nifty direction agreement: ${accuracy}% of days — useful but not reliable alone` },
-            { icon: "⚠️", text: `${divergences.length} days (${((divergences.length/24)*100).toFixed(0)}%) Nifty ignored US — always India-specific catalysts` },
+            { icon: "⚠️", text: `${divergences.length} days (${((divergences.length/days)*100).toFixed(0)}%) Nifty ignored US — always India-specific catalysts` },
             { icon: "📌", text: "SGX Nifty futures (8 AM IST) is more accurate than S&P alone — reflects overnight Nifty sentiment" },
             { icon: "🔴", text: "Large US moves (>1%) are reliable — small US moves (<0.5%) have low predictive power for Nifty" },
             { icon: "💡", text: "FII net flow data > US market direction for predicting Nifty intraday behavior" },
@@ -190,7 +226,9 @@ export default function App() {
         </div>
       </div>
 
-      <p style={{ color: "#555", fontSize: 11, marginTop: 16 }}>Note: S&P 500 values are approximate. For precise correlation, use actual historical data from Yahoo Finance or Bloomberg.</p>
+      <p style={{ color: "#555", fontSize: 11, marginTop: 16 }}>{live
+        ? "Source: correlation_engine.py (Yahoo Finance daily closes, S&P aligned to the last US close before each Nifty session)."
+        : "Note: S&P 500 values are approximate. Start the API and run correlation_engine.py for live data."}</p>
     </div>
   );
 }
@@ -43,8 +43,8 @@ export function useSystemData() {
     const triggerLiveScan = async () => {
         setIsScanning(true);
         try {
-            // Trigger a quick live scan for the dashboard preview
-            await fetch(`${API_BASE}/scan/trigger`, { method: 'POST' });
+            // Trigger a scan job and hold until it finishes (the API stays responsive meanwhile)
+            await fetch(`${API_BASE}/scan/trigger?wait=300`, { method: 'POST' });
             await fetchData();
         } finally {
             setIsScanning(false);
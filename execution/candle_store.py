@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+Live Candle Store
+-----------------
+Builds OHLCV+OI candles from KiteTicker ticks inside the ticker process and
+shares them with every other process through two JSON files in .tmp/:
+
+    live_candles.json        closed bars per symbol and timeframe
+                             (rewritten only when a bar closes)
+    live_candles_open.json   the bar currently forming in each timeframe
+                             (rewritten with the tick file, max 2/sec)
+
+CandleAggregator is the writer (used by live_ticker.py). Every tick folds its
+price, its volume_traded delta and its OI into the open 1-minute bar and into
+the open 5/15/60-minute and daily bars, so all timeframes stay current without
+re-aggregating history. Intraday buckets are aligned to the 09:15 session
+open, matching Kite's historical candles.
+
+LiveCandleStore is the reader (SignalEngine, MarketScanner, dashboard). It
+re-parses a file only when its mtime changes and returns candle dicts in the
+same {date, open, high, low, close, volume, oi} format as Kite history, so
+intraday analysis on live data needs no REST calls.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, time as dt_time
+from pathlib import Path
+
+# ─── Paths ──────────────────────────────────────────────────────
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+DATA_DIR = PROJECT_ROOT / ".tmp"
+CANDLE_FILE = DATA_DIR / "live_candles.json"
+OPEN_CANDLE_FILE = DATA_DIR / "live_candles_open.json"
+
+# ─── Timeframes ─────────────────────────────────────────────────
+# Kite interval names -> bar length in minutes ("day" is calendar-aligned)
+INTRADAY_TIMEFRAMES = {"minute": 1, "5minute": 5, "15minute": 15, "60minute": 60}
+TIMEFRAMES = tuple(INTRADAY_TIMEFRAMES) + ("day",)
+
+# Names used elsewhere in the codebase
+TIMEFRAME_ALIASES = {
+    "1min": "minute", "1m": "minute",
+    "5min": "5minute", "5m": "5minute",
+    "15min": "15minute", "15m": "15minute",
+    "60min": "60minute", "1hr": "60minute", "1h": "60minute", "60m": "60minute",
+    "daily": "day", "1d": "day",
+}
+
+# Closed bars kept per symbol and timeframe
+MAX_BARS = {"minute": 375, "5minute": 300, "15minute": 200, "60minute": 120, "day": 60}
+
+SESSION_OPEN = dt_time(9, 15)
+SESSION_CLOSE = dt_time(15, 30)
+
+WRITE_INTERVAL = 0.5          # open-bar file, same throttle as live_ticks.json
+CLOSED_WRITE_INTERVAL = 1.0   # closed-bar file
+
+
+def normalize_timeframe(timeframe):
+    """Kite interval name for any of the timeframe spellings used in the repo."""
+    tf = TIMEFRAME_ALIASES.get(timeframe, timeframe)
+    if tf not in TIMEFRAMES:
+        raise ValueError(f"Unknown timeframe '{timeframe}'. Use one of {', '.join(TIMEFRAMES)}")
+    return tf
+
+
+def bucket_start(ts, timeframe):
+    """Start of the bar containing ts (intraday bars count from the 09:15 open)."""
+    if timeframe == "day":
+        return datetime.combine(ts.date(), dt_time(0, 0))
+    session_open = datetime.combine(ts.date(), SESSION_OPEN)
+    if ts < session_open:
+        return session_open  # pre-open trades belong to the first bar
+    minutes = INTRADAY_TIMEFRAMES[timeframe]
+    elapsed = int((ts - session_open).total_seconds() // 60)
+    return session_open + timedelta(minutes=elapsed - elapsed % minutes)
+
+
+def bucket_end(start, timeframe):
+    if timeframe == "day":
+        return start + timedelta(days=1)
+    return start + timedelta(minutes=INTRADAY_TIMEFRAMES[timeframe])
+
+
+class _BarSeries:
+    """Closed bars plus the open bar of one symbol in one timeframe."""
+
+    __slots__ = ("closed", "bar", "start")
+
+    def __init__(self, maxlen):
+        self.closed = deque(maxlen=maxlen)
+        self.bar = None
+        self.start = None
+
+    def close_bar(self):
+        if self.bar is not None:
+            self.closed.append(self.bar)
+        self.bar = None
+        self.start = None
+
+
+# ═══════════════════════════════════════════════════════════════
+# Writer
+# ═══════════════════════════════════════════════════════════════
+
+class CandleAggregator:
+    """
+    Tick -> candle aggregator for the ticker process.
+
+    Thread-safe: on_ticks runs on the KiteTicker thread while flush() is
+    called from a timer thread to close bars that received no tick after
+    their boundary.
+    """
+
+    def __init__(self, token_to_symbol=None, max_bars=None,
+                 candle_file=CANDLE_FILE, open_file=OPEN_CANDLE_FILE):
+        self.token_to_symbol = token_to_symbol if token_to_symbol is not None else {}
+        self.max_bars = dict(MAX_BARS, **(max_bars or {}))
+        self.candle_file = Path(candle_file)
+        self.open_file = Path(open_file)
+
+        self._series = {}        # {token: {timeframe: _BarSeries}}
+        self._last_volume = {}   # {token: (date, cumulative volume_traded)}
+        self._lock = threading.Lock()
+        self._version = 0        # bumped whenever a bar closes
+        self._written_version = 0
+        self._open_dirty = False
+        self._last_open_write = 0
+        self._last_closed_write = 0
+
+    # ── Tick ingestion ──
+
+    def on_ticks(self, ticks, now=None):
+        """Fold a KiteTicker tick batch into every timeframe."""
+        with self._lock:
+            for tick in ticks:
+                self._on_tick(tick, now)
+
+    def _on_tick(self, tick, now=None):
+        tok = tick.get("instrument_token")
+        price = tick.get("last_price")
+        if tok is None or not price:
+            return
+
+        ts = tick.get("exchange_timestamp") or now or datetime.now()
+        if isinstance(ts, str):
+            ts = datetime.fromisoformat(ts)
+        day = ts.date()
+
+        # Traded volume since the previous tick; the first tick of a session
+        # only sets the baseline unless it arrives inside the opening bar
+        cum = tick.get("volume_traded")
+        delta = 0
+        if cum is not None:
+            prev_day, prev_cum = self._last_volume.get(tok, (None, None))
+            if prev_day == day and prev_cum is not None and cum >= prev_cum:
+                delta = cum - prev_cum
+            elif prev_day != day and ts < datetime.combine(day, SESSION_OPEN) + timedelta(minutes=1):
+                delta = cum
+            self._last_volume[tok] = (day, cum)
+        oi = tick.get("oi")
+
+        series = self._series.get(tok)
+        if series is None:
+            series = self._series[tok] = {tf: _BarSeries(self.max_bars[tf]) for tf in TIMEFRAMES}
+
+        if ts.time() < SESSION_CLOSE:  # post-close ticks only update the daily bar
+            for tf in INTRADAY_TIMEFRAMES:
+                self._fold(series[tf], tf, ts, price, delta, oi)
+        self._fold_day(series["day"], ts, price, delta, cum, oi, tick.get("ohlc") or {})
+        self._open_dirty = True
+
+    def _roll(self, s, tf, ts):
+        """Close the open bar if ts falls in a later bucket; return ts's bucket start."""
+        start = bucket_start(ts, tf)
+        if s.start is not None and start > s.start:
+            s.close_bar()
+            self._version += 1
+        return start
+
+    def _fold(self, s, tf, ts, price, volume, oi):
+        start = self._roll(s, tf, ts)
+        if s.start is not None and start < s.start:
+            return  # late tick for an already-closed bar
+        if s.start is None and s.closed and start.isoformat() <= s.closed[-1]["date"]:
+            return
+        bar = s.bar
+        if bar is None:
+            s.start = start
+            s.bar = {"date": start.isoformat(), "open": price, "high": price, "low": price,
+                     "close": price, "volume": volume, "oi": oi or 0}
+            return
+        if price > bar["high"]:
+            bar["high"] = price
+        if price < bar["low"]:
+            bar["low"] = price
+        bar["close"] = price
+        bar["volume"] += volume
+        if oi is not None:
+            bar["oi"] = oi
+
+    def _fold_day(self, s, ts, price, volume, cum, oi, ohlc):
+        """Daily bar: the exchange's day OHLC and cumulative volume when the tick carries them."""
+        self._fold(s, "day", ts, price, volume, oi)
+        bar = s.bar
+        if bar is None or s.start != bucket_start(ts, "day"):
+            return
+        if ohlc.get("open"):
+            bar["open"] = ohlc["open"]
+        if ohlc.get("high"):
+            bar["high"] = max(bar["high"], ohlc["high"])
+        if ohlc.get("low"):
+            bar["low"] = min(bar["low"], ohlc["low"])
+        if cum is not None:
+            bar["volume"] = cum
+
+    def flush(self, now=None):
+        """Close every open bar whose period has ended. Returns the number closed."""
+        now = now or datetime.now()
+        closed = 0
+        with self._lock:
+            for series in self._series.values():
+                for tf, s in series.items():
+                    if s.start is not None and now >= bucket_end(s.start, tf):
+                        s.close_bar()
+                        closed += 1
+            if closed:
+                self._version += closed
+                self._open_dirty = True
+        return closed
+
+    # ── In-process access ──
+
+    def candles(self, token, timeframe="15minute", include_open=True, limit=None):
+        """Closed bars (oldest first) plus the open bar, for one instrument token."""
+        tf = normalize_timeframe(timeframe)
+        with self._lock:
+            s = self._series.get(token, {}).get(tf)
+            if s is None:
+                return []
+            bars = [dict(b) for b in s.closed]
+            if include_open and s.bar is not None:
+                bars.append(dict(s.bar))
+        return bars[-limit:] if limit else bars
+
+    def open_bar(self, token, timeframe="minute"):
+        tf = normalize_timeframe(timeframe)
+        with self._lock:
+            s = self._series.get(token, {}).get(tf)
+            return dict(s.bar) if s is not None and s.bar is not None else None
+
+    # ── Shared store ──
+
+    def _symbol(self, tok):
+        return self.token_to_symbol.get(tok, str(tok))
+
+    def write(self, force=False):
+        """Write the open-bar file (throttled) and the closed-bar file if a bar closed."""
+        now = time.time()
+        with self._lock:
+            write_closed = self._version != self._written_version and (
+                force or now - self._last_closed_write >= CLOSED_WRITE_INTERVAL)
+            write_open = (self._open_dirty or write_closed) and (
+                force or now - self._last_open_write >= WRITE_INTERVAL)
+            if not (write_open or write_closed):
+                return
+
+            stamp = datetime.now().isoformat()
+            if write_closed:
+                closed = {
+                    "timestamp": stamp,
+                    "version": self._version,
+                    "symbols": {
+                        self._symbol(tok): dict(
+                            {"token": tok},
+                            **{tf: list(s.closed) for tf, s in series.items()})
+                        for tok, series in self._series.items()
+                    },
+                }
+                closed_json = json.dumps(closed, default=str)
+                self._written_version = self._version
+                self._last_closed_write = now
+            if write_open:
+                opened = {
+                    "timestamp": stamp,
+                    "version": self._version,
+                    "symbols": {
+                        self._symbol(tok): {tf: s.bar for tf, s in series.items() if s.bar is not None}
+                        for tok, series in self._series.items()
+                    },
+                }
+                open_json = json.dumps(opened, default=str)
+                self._open_dirty = False
+                self._last_open_write = now
+
+        # Closed bars first, so a reader never sees an open bar newer than its history
+        if write_closed:
+            _atomic_write(self.candle_file, closed_json)
+        if write_open:
+            _atomic_write(self.open_file, open_json)
+
+    def restore(self):
+        """
+        Reload closed bars from the last run so a restarted ticker keeps its history.
+        Returns the number of instruments restored.
+        """
+        data = _read_json(self.candle_file)
+        if not data:
+            return 0
+        restored = 0
+        with self._lock:
+            for sym, entry in data.get("symbols", {}).items():
+                tok = entry.get("token")
+                if tok is None or tok in self._series:
+                    continue
+                series = self._series[tok] = {tf: _BarSeries(self.max_bars[tf]) for tf in TIMEFRAMES}
+                for tf in TIMEFRAMES:
+                    series[tf].closed.extend(entry.get(tf, []))
+                self.token_to_symbol.setdefault(tok, sym)
+                restored += 1
+        return restored
+
+
+def _atomic_write(path, text):
+    path.parent.mkdir(exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# ═══════════════════════════════════════════════════════════════
+# Reader
+# ═══════════════════════════════════════════════════════════════
+
+class LiveCandleStore:
+    """
+    Read-only view of the candles published by the ticker process.
+
+    Both files are cached in memory and re-read only when their mtime
+    changes, so polling candles() on every request costs two stat() calls.
+    """
+
+    def __init__(self, candle_file=CANDLE_FILE, open_file=OPEN_CANDLE_FILE):
+        self.candle_file = Path(candle_file)
+        self.open_file = Path(open_file)
+        self._cache = {}   # {path: (mtime, data)}
+        self._lock = threading.Lock()
+
+    def _load(self, path):
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            return None, None
+        with self._lock:
+            cached = self._cache.get(path)
+            if cached and cached[0] == mtime:
+                return cached[1], mtime
+        data = _read_json(path)
+        if data is None:
+            return (cached[1], cached[0]) if cached else (None, None)
+        with self._lock:
+            self._cache[path] = (mtime, data)
+        return data, mtime
+
+    def _resolve(self, symbols, key):
+        """(symbol, entry) for a tradingsymbol or an instrument token."""
+        key = str(key)
+        if key in symbols:
+            return key, symbols[key]
+        for sym, entry in symbols.items():
+            if str(entry.get("token")) == key:
+                return sym, entry
+        return None, None
+
+    def age(self):
+        """Seconds since the ticker last published, or None if it never has."""
+        _, mtime = self._load(self.open_file)
+        return None if mtime is None else time.time() - mtime
+
+    def is_live(self, max_age=120):
+        age = self.age()
+        return age is not None and age <= max_age
+
+    def symbols(self):
+        closed, _ = self._load(self.candle_file)
+        return list((closed or {}).get("symbols", {}))
+
+    def version(self):
+        """Closed-bar version: changes every time the ticker closes a bar."""
+        closed, _ = self._load(self.candle_file)
+        return (closed or {}).get("version")
+
+    def last_closed(self):
+        """{symbol: {timeframe: date of the latest closed bar}} — diff it to find bar-close events."""
+        closed, _ = self._load(self.candle_file)
+        return {
+            sym: {tf: entry[tf][-1]["date"] for tf in TIMEFRAMES if entry.get(tf)}
+            for sym, entry in (closed or {}).get("symbols", {}).items()
+        }
+
+    def candles(self, symbol, timeframe="15minute", include_open=True, limit=None):
+        """
+        Candles for a tradingsymbol or instrument token, oldest first.
+
+        Args:
+            symbol: Tradingsymbol (e.g. 'RELIANCE', 'NIFTY 50') or instrument token
+            timeframe: 'minute', '5minute', '15minute', '60minute', 'day' (or an alias)
+            include_open: Append the bar that is still forming
+            limit: Return only the last N bars
+        """
+        tf = normalize_timeframe(timeframe)
+        closed, _ = self._load(self.candle_file)
+        if not closed:
+            return []
+
+        name, entry = self._resolve(closed.get("symbols", {}), symbol)
+        if entry is None:
+            return []
+        bars = list(entry.get(tf, []))
+
+        if include_open:
+            opened, _ = self._load(self.open_file)
+            bar = (opened or {}).get("symbols", {}).get(name, {}).get(tf)
+            # The open file may briefly trail the closed file by one bar
+            if bar and (not bars or bar["date"] > bars[-1]["date"]):
+                bars.append(bar)
+        return bars[-limit:] if limit else bars
+
+    def timeframes(self, symbol, timeframes=("5minute", "15minute", "60minute", "day"),
+                   min_bars=0, include_open=True):
+        """
+        {timeframe: candles} for several timeframes of one symbol, keyed by the
+        names passed in. Returns None if any timeframe has fewer than min_bars.
+        """
+        out = {}
+        for name in timeframes:
+            bars = self.candles(symbol, name, include_open=include_open)
+            if len(bars) < min_bars:
+                return None
+            out[name] = bars
+        return out
+
+
+_store = None
+
+
+def get_store():
+    """Process-wide LiveCandleStore (shares its parsed-file cache)."""
+    global _store
+    if _store is None:
+        _store = LiveCandleStore()
+    return _store
@@ -1,6 +1,7 @@
 import os
 import sys
 import json
+import threading
 import time
 import pandas as pd
 from datetime import datetime
@@ -18,26 +19,63 @@ class KiteMCPClient:
     """
     Direct Kite Connect Client wrapper that mimics the old MCP Client interface.
     Used by dashboard_api.py, options_analyzer.py, etc.
+
+    A long-lived client (the dashboard's) picks up the daily token written by
+    auth_direct.py: `kite` re-reads kite_token.json whenever its mtime changes,
+    including a login that happens after the client was created.
     """
 
     def __init__(self):
-        self.kite = None
+        self._kite = None
+        self._token_mtime = None
+        self._token_lock = threading.Lock()
         self.instruments_df = None
+        self._instruments_day = None
         self._load_token()
 
+    @property
+    def kite(self):
+        """The KiteConnect session for the current kite_token.json (None before the first login)."""
+        self.refresh_token()
+        return self._kite
+
+    @kite.setter
+    def kite(self, value):
+        self._kite = value
+
+    def refresh_token(self) -> bool:
+        """Reload the session if kite_token.json changed since it was read. True if reloaded."""
+        try:
+            mtime = TOKEN_FILE.stat().st_mtime
+        except OSError:
+            return False  # keep the current session; _load_token reports the missing file
+        if mtime == self._token_mtime:
+            return False
+        with self._token_lock:
+            if mtime == self._token_mtime:
+                return False
+            self._load_token()
+        return True
+
     def _load_token(self):
+        mtime = None
         try:
             if not TOKEN_FILE.exists():
                 print(f"❌ Token file missing: {TOKEN_FILE}")
                 return
 
+            mtime = TOKEN_FILE.stat().st_mtime
             with open(TOKEN_FILE, "r") as f:
                 data = json.load(f)
             
-            self.kite = KiteConnect(api_key=data.get("api_key"))
-            self.kite.set_access_token(data.get("access_token"))
-            print("✅ Kite Direct Client Initialized")
+            kite = KiteConnect(api_key=data.get("api_key"))
+            kite.set_access_token(data.get("access_token"))
+            reloaded = self._token_mtime is not None
+            self._kite, self._token_mtime = kite, mtime
+            print("✅ Kite token reloaded" if reloaded else "✅ Kite Direct Client Initialized")
         except Exception as e:
+            # Remember the mtime anyway: retry when the file is rewritten, not on every access
+            self._token_mtime = mtime
             print(f"❌ Failed to init Kite Client: {e}")
 
     def check_server(self):
@@ -110,8 +148,14 @@ class KiteMCPClient:
 
     # ─── Search Instruments (Crucial for Option Chain) ───
 
+    def load_instruments(self) -> int:
+        """Load (or refresh) the NFO instrument master now; returns its row count."""
+        self._ensure_instruments_loaded()
+        return 0 if self.instruments_df is None else len(self.instruments_df)
+
     def _ensure_instruments_loaded(self):
-        if self.instruments_df is not None:
+        # A long-lived client refreshes the dump once per day (new expiries / strikes)
+        if self.instruments_df is not None and self._instruments_day == datetime.now().date():
             return
 
         DATA_DIR.mkdir(exist_ok=True)
@@ -143,6 +187,7 @@ class KiteMCPClient:
                      self.instruments_df = pd.read_csv(INSTRUMENTS_FILE)
         else:
             self.instruments_df = pd.read_csv(INSTRUMENTS_FILE)
+        self._instruments_day = datetime.now().date()
             
         # Also need NSE for Index Spot prices?
         # Analyzer maps UNDERLYING to 'NSE:NIFTY 50'.
@@ -6,6 +6,10 @@ Connects to Kite's WebSocket feed for real-time tick data.
 Writes tick prices to a shared JSON file that dashboard_api.py reads
 and broadcasts to the frontend via its own WebSocket endpoint.
 
+Ticks are also aggregated into 1/5/15/60-minute and daily OHLCV+OI
+candles (candle_store.py), published to .tmp/live_candles*.json so
+intraday analysis can run on live bars without Kite REST calls.
+
 Usage:
     python3 execution/live_ticker.py
 """
@@ -18,6 +22,8 @@ from datetime import datetime
 from pathlib import Path
 from kiteconnect import KiteConnect, KiteTicker
 
+from candle_store import CandleAggregator
+
 # ─── Paths ──────────────────────────────────────────────────────
 SCRIPT_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = SCRIPT_DIR.parent
@@ -36,6 +42,7 @@ token_to_symbol = {}     # {instrument_token: tradingsymbol}
 symbol_to_token = {}     # {tradingsymbol: instrument_token}
 kite = None
 last_cache_write = 0
+candle_aggregator = CandleAggregator()
 
 def log(msg):
     ts = datetime.now().strftime("%H:%M:%S")
@@ -221,6 +228,13 @@ def on_ticks(ws, ticks):
             "updated_at": datetime.now().isoformat()
         }
 
+    # Roll into live candles
+    try:
+        candle_aggregator.on_ticks(ticks)
+        candle_aggregator.write()
+    except Exception as e:
+        log(f"Candle aggregation error: {e}")
+
     # Write to shared file for dashboard_api
     write_ticks_to_file()
 
@@ -270,6 +284,20 @@ def resubscribe_loop(kws):
         except Exception as e:
             log(f"Resubscribe error: {e}")
 
+# ─── Candle Bar Closing ────────────────────────────────────────
+def candle_flush_loop():
+    """
+    Every second, close candles whose period has ended even if the
+    instrument has not ticked since, and publish them.
+    """
+    while True:
+        time.sleep(1)
+        try:
+            candle_aggregator.flush()
+            candle_aggregator.write()
+        except Exception as e:
+            log(f"Candle flush error: {e}")
+
 # ─── Main ───────────────────────────────────────────────────────
 def main():
     global kite
@@ -295,6 +323,10 @@ def main():
 
     # Resolve instruments (symbol <-> token mapping)
     resolve_instruments(kite)
+    candle_aggregator.token_to_symbol = token_to_symbol
+    restored = candle_aggregator.restore()
+    if restored:
+        log(f"Restored candle history for {restored} instruments")
 
     # Init KiteTicker
     kws = KiteTicker(api_key, access_token)
@@ -309,6 +341,10 @@ def main():
     resub_thread = threading.Thread(target=resubscribe_loop, args=(kws,), daemon=True)
     resub_thread.start()
 
+    # Start candle bar-closing thread
+    flush_thread = threading.Thread(target=candle_flush_loop, daemon=True)
+    flush_thread.start()
+
     log("Connecting to KiteTicker WebSocket...")
     kws.connect(threaded=False)  # Blocking — keeps the process alive
 
@@ -9,6 +9,7 @@ AI Trading Dashboard API
 from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 import asyncio
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 import json
 import os
 import sys
@@ -26,6 +27,11 @@ if SCRIPTS_DIR not in sys.path:
 if EXECUTION_DIR not in sys.path:
     sys.path.insert(0, EXECUTION_DIR)
 
+from service_container import get_services
+
+# Scanner, engines, Kite client and snapshot readers — built once at startup
+services = get_services()
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -61,6 +67,71 @@ def read_cache() -> dict:
     return {}
 
 
+# ─── Background Jobs ────────────────────────────────────────────
+# Scans and bulk analysis run as jobs on job_runner's thread pool; handlers
+# only submit and report, so the event loop (and /ws/ticks) never blocks.
+
+# Longest a request may hold its connection waiting for a job (seconds)
+MAX_JOB_WAIT = 300
+
+
+def submit_job(job_type: str, fn, params: dict = None):
+    """Submit fn(progress) to the job manager; a full queue becomes HTTP 429."""
+    from job_runner import get_jobs, JobLimitError
+    try:
+        return get_jobs().submit(job_type, fn, params)
+    except JobLimitError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+
+def job_response(job, **extra) -> dict:
+    """Finished job → the endpoint's result shape ({status, count, data}); else where to follow it."""
+    links = {"job_id": job.id, "poll": f"/jobs/{job.id}", "stream": f"/jobs/{job.id}/stream"}
+    if job.status == "completed":
+        return {
+            "status": "completed",
+            "timestamp": job.finished.isoformat(),
+            **extra,
+            "count": len(job.result),
+            "data": job.result,
+            "job_id": job.id,
+        }
+    if job.done:
+        return {"status": "error", "error": job.error or job.status,
+                "timestamp": datetime.now().isoformat(), **extra, "job_id": job.id}
+    return {"status": job.status, "progress": job.progress, "message": job.message,
+            **extra, **links}
+
+
+async def run_job(job_type: str, fn, params: dict = None, wait: float = MAX_JOB_WAIT, **extra) -> dict:
+    """Submit a job and, if wait > 0, await it without blocking the loop; returns job_response()."""
+    from job_runner import get_jobs
+    job = submit_job(job_type, fn, params)
+    if wait > 0:
+        job = await get_jobs().wait_async(job.id, timeout=min(wait, MAX_JOB_WAIT))
+    return job_response(job, **extra)
+
+
+_warm_task = None
+
+
+@app.on_event("startup")
+async def start_services():
+    """Build the service singletons, then preload data in the background (see /ready)."""
+    global _warm_task
+    await asyncio.to_thread(services.start_core)
+    _warm_task = asyncio.create_task(asyncio.to_thread(services.warm))
+
+
+@app.on_event("shutdown")
+async def shutdown_workers():
+    from job_runner import get_jobs
+    from nifty_conviction_engine.worker_pool import shutdown_pools
+    get_jobs().shutdown(wait=False)
+    shutdown_pools(wait=False)
+    services.shutdown()
+
+
 # ─── Health / Status ────────────────────────────────────────────
 
 @app.get("/")
@@ -73,6 +144,22 @@ async def health_check():
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 503 until the services are built and startup preloading has finished."""
+    from fastapi.responses import JSONResponse
+    status = services.status()
+    body = {"ready": status["ready"], "degraded": status["degraded"],
+            "timestamp": datetime.now().isoformat()}
+    return JSONResponse(body, status_code=200 if status["ready"] else 503)
+
+
+@app.get("/system/startup")
+async def get_startup_report():
+    """Startup timing per phase (ms), preload row counts and any degraded phases."""
+    return services.status()
+
+
 @app.get("/status")
 async def get_status():
     is_live = CACHE_FILE.exists()
@@ -105,22 +192,18 @@ async def get_latest_scan():
 
 
 @app.post("/scan/trigger")
-async def trigger_scan():
-    """Trigger a market scan — fetches live data from yfinance."""
+async def trigger_scan(wait: float = 0):
+    """
+    Trigger a market scan — fetches live data from yfinance.
+    Returns a job id immediately (one scan at a time; repeat triggers join
+    the running scan). Follow it on /jobs/{id} or /jobs/{id}/stream;
+    ?wait=<seconds> instead returns the finished scan if it completes in time.
+    """
     try:
-        scripts_dir = str(BASE_DIR / "scripts")
-        if scripts_dir not in sys.path:
-            sys.path.insert(0, scripts_dir)
-
-        from market_scanner import run_scan
-        results = run_scan()
-
-        return {
-            "status": "completed",
-            "timestamp": datetime.now().isoformat(),
-            "count": len(results),
-            "data": results,
-        }
+        return await run_job("scan", lambda progress: services.scanner.run_single_scan(progress=progress),
+                             wait=wait)
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -128,31 +211,27 @@ async def trigger_scan():
 
 
 @app.get("/scan/live")
-async def live_scan(universe: str = "quick", preset: str = None):
+async def live_scan(universe: str = "quick", preset: str = None, mtf: bool = False,
+                    background: bool = False):
     """
     Live scan — returns results directly (Streak-like).
     ?universe=nifty50|banknifty|fno|quick
     &preset=rsi_oversold|volume_breakout|ema_crossover|supertrend_buy|...
+    &mtf=true attaches 5m/15m/1h confluence to every match
+    &background=true returns the job id at once instead of waiting for the results
+    Runs as a background job; identical concurrent scans share one job.
     """
     try:
-        from market_scanner import MarketScanner, SCANNER_PRESETS
-        import os as _os
-
-        config_path = str(BASE_DIR / "config" / "trading_rules.json")
-        if not _os.path.exists(config_path):
-            return {"status": "error", "error": "Config not found"}
-
-        scanner = MarketScanner(config_path)
-        results = scanner.live_scan(universe=universe, preset=preset)
-
-        return {
-            "status": "completed",
-            "timestamp": datetime.now().isoformat(),
-            "universe": universe,
-            "preset": preset,
-            "count": len(results),
-            "data": results,
-        }
+        def run(progress):
+            return services.scanner.live_scan(universe=universe, preset=preset, include_mtf=mtf,
+                                              progress=progress)
+
+        return await run_job("live_scan", run,
+                             params={"universe": universe, "preset": preset, "mtf": mtf},
+                             wait=0 if background else MAX_JOB_WAIT,
+                             universe=universe, preset=preset)
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -198,18 +277,72 @@ async def custom_scan():
         return {"error": str(e)}
 
 
+# ─── Jobs ───────────────────────────────────────────────────────
+
+@app.get("/jobs")
+async def list_jobs(type: str = None, active: bool = False):
+    """Recent and running background jobs (results omitted), plus per-type load and limits."""
+    from job_runner import get_jobs
+    jobs = get_jobs()
+    return {
+        "jobs": [j.to_dict(include_result=False) for j in jobs.list(type, active_only=active)],
+        "info": jobs.info(),
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, wait: float = 0):
+    """Status, progress and (once completed) result of a job. ?wait=<seconds> long-polls until it finishes."""
+    from job_runner import get_jobs
+    jobs = get_jobs()
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    if wait > 0 and not job.done:
+        job = await jobs.wait_async(job_id, timeout=min(wait, MAX_JOB_WAIT))
+    return job.to_dict()
+
+
+@app.get("/jobs/{job_id}/stream")
+async def stream_job(job_id: str):
+    """
+    Server-sent events for a job: a `progress` event on every update and a
+    final `done` event carrying the result (or error).
+    """
+    from job_runner import get_jobs, sse_event
+    jobs = get_jobs()
+    if jobs.get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+    async def events():
+        async for state in jobs.stream(job_id):
+            finished = state is not None and state["status"] not in ("queued", "running")
+            yield sse_event(state, "done" if finished else "progress")
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued job (running jobs cannot be interrupted)."""
+    from job_runner import get_jobs
+    jobs = get_jobs()
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return {"cancelled": jobs.cancel(job_id), "status": job.status}
+
+
 # ─── Journal / Trade Log ───────────────────────────────────────
 
 @app.get("/journal/trades")
 async def get_journal_trades():
     """Get all trades from the trade logger with performance summary."""
     try:
-        scripts_dir = str(BASE_DIR / "scripts")
-        if scripts_dir not in sys.path:
-            sys.path.insert(0, scripts_dir)
-
         from trade_logger import TradeLogger
-        logger = TradeLogger(journal_dir=str(JOURNALS_DIR))
+        logger = TradeLogger(journal_dir=str(JOURNALS_DIR), readonly=True)
 
         trades = logger.trades or []
         open_trades = logger.get_open_trades()
@@ -229,6 +362,38 @@ async def get_journal_trades():
         return {"trades": [], "open_count": 0, "closed_count": 0, "summary": {}, "error": str(e)}
 
 
+@app.get("/journal/export")
+async def export_journal_trades(format: str = "csv", status: str = None, symbol: str = None, date: str = None):
+    """
+    Download the trade log as CSV or Excel (format=csv|xlsx), optionally filtered.
+    Rendered in memory: the orchestrator's trades_log.* files are never overwritten.
+    """
+    try:
+        from fastapi.responses import Response
+        from trade_logger import TradeLogger
+
+        if format not in ("csv", "xlsx"):
+            raise HTTPException(status_code=400, detail="format must be 'csv' or 'xlsx'")
+
+        logger = TradeLogger(journal_dir=str(JOURNALS_DIR), readonly=True)
+        filters = {"status": status.upper() if status else None,
+                   "symbol": symbol.upper() if symbol else None, "date": date}
+        content = logger.export_bytes(format, **filters)
+        if content is None:
+            raise HTTPException(status_code=404, detail="No trades to export (or openpyxl missing for xlsx)")
+
+        media_type = ("text/csv" if format == "csv" else
+                      "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+        return Response(content, media_type=media_type,
+                        headers={"Content-Disposition": f'attachment; filename="trades_log.{format}"'})
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return {"error": str(e)}
+
+
 @app.get("/journal/activity")
 async def get_journal_activity():
     """Read JSONL journal files and return activity grouped by date for heatmap."""
@@ -262,42 +427,43 @@ async def get_journal_activity():
 
 # ─── Chart Data (yfinance) ──────────────────────────────────────
 
+def response_cache():
+    """Process-wide ResponseCache for the chart / analysis / recommendation endpoints."""
+    return services.response_cache
+
+
+def _chart_payload(symbol_upper: str, period: str) -> dict:
+    from market_scanner import fetch_ohlcv, WATCHLIST
+
+    yf_ticker = WATCHLIST.get(symbol_upper, f"{symbol_upper}.NS")
+    df = fetch_ohlcv(symbol_upper, yf_ticker, period=period)
+    if df.empty:
+        raise HTTPException(status_code=404, detail=f"No data for {symbol_upper}")
+
+    dates = df["date"].astype(str).str[:10].tolist()
+    ohlc = df[["open", "high", "low", "close"]].astype(float).round(2)
+    up = (df["close"] >= df["open"]).tolist()
+    volume = df["volume"].fillna(0).astype(int).tolist() if "volume" in df.columns else [0] * len(df)
+
+    candles = [{"time": t, "open": o, "high": h, "low": l, "close": c}
+               for t, o, h, l, c in zip(dates, *(ohlc[col].tolist() for col in ohlc.columns))]
+    volumes = [{"time": t, "value": v, "color": "rgba(6,182,212,0.3)" if u else "rgba(239,68,68,0.3)"}
+               for t, v, u in zip(dates, volume, up)]
+    return {"symbol": symbol_upper, "candles": candles, "volumes": volumes}
+
 
 @app.get("/chart/{symbol}")
-async def get_chart_data(symbol: str, period: str = "6mo"):
+async def get_chart_data(symbol: str, request: Request, period: str = "6mo"):
     """Get OHLCV candlestick data from yfinance for lightweight-charts."""
     try:
-        scripts_dir = str(BASE_DIR / "scripts")
-        if scripts_dir not in sys.path:
-            sys.path.insert(0, scripts_dir)
-
-        from market_scanner import fetch_ohlcv, WATCHLIST
+        from response_cache import bar_version, cached_response
 
         symbol_upper = symbol.upper()
-        yf_ticker = WATCHLIST.get(symbol_upper, f"{symbol_upper}.NS")
-
-        df = fetch_ohlcv(symbol_upper, yf_ticker, period=period)
-        if df.empty:
-            raise HTTPException(status_code=404, detail=f"No data for {symbol_upper}")
-
-        candles = []
-        volumes = []
-        for _, row in df.iterrows():
-            date_str = str(row["date"])[:10]
-            candles.append({
-                "time": date_str,
-                "open": round(float(row["open"]), 2),
-                "high": round(float(row["high"]), 2),
-                "low": round(float(row["low"]), 2),
-                "close": round(float(row["close"]), 2),
-            })
-            volumes.append({
-                "time": date_str,
-                "value": int(row.get("volume", 0)),
-                "color": "rgba(6,182,212,0.3)" if row["close"] >= row["open"] else "rgba(239,68,68,0.3)",
-            })
-
-        return {"symbol": symbol_upper, "candles": candles, "volumes": volumes}
+        cache = response_cache()
+        entry = await cache.get_or_compute(
+            ("chart", symbol_upper, period, bar_version(symbol_upper)),
+            lambda: _chart_payload(symbol_upper, period))
+        return cached_response(request, entry, cache)
 
     except HTTPException:
         raise
@@ -307,77 +473,78 @@ async def get_chart_data(symbol: str, period: str = "6mo"):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _line_series(dates, series, digits: int = 2) -> list:
+    return [{"time": t, "value": round(v, digits)}
+            for t, v in zip(dates, series.astype(float).tolist()) if v == v]
+
+
+def _chart_analysis_payload(symbol_upper: str) -> dict:
+    from market_scanner import fetch_ohlcv, WATCHLIST, PATTERNS
+
+    yf_ticker = WATCHLIST.get(symbol_upper, f"{symbol_upper}.NS")
+    df = fetch_ohlcv(symbol_upper, yf_ticker)
+    if df.empty or len(df) < 50:
+        raise HTTPException(status_code=404, detail=f"Insufficient data for {symbol_upper}")
+
+    scanner = services.scanner
+    analysis = scanner.analyzer.analyze_stock(symbol_upper, df)
+
+    if analysis is None:
+        return {"symbol": symbol_upper, "error": "Insufficient data"}
+
+    # EMA overlays
+    dates = df["date"].astype(str).str[:10].tolist()
+    ema20_data = _line_series(dates, df["close"].ewm(span=20).mean())
+    ema50_data = _line_series(dates, df["close"].ewm(span=50).mean())
+
+    sr = analysis.get("sr_levels", {})
+
+    fvgs = []
+    for fvg in analysis.get("fvgs", []):
+        fvgs.append({"type": fvg["type"], "high": round(fvg["high"], 2), "low": round(fvg["low"], 2)})
+
+    # Pattern markers across the whole chart, from the shared pattern engine
+    hits = scanner.analyzer.scan_candlestick_patterns(df)
+    pattern_markers = []
+    for bar, pid in zip(hits.bars.tolist(), hits.patterns.tolist()):
+        key, name, pattern_type, _ = PATTERNS[pid]
+        if pattern_type == "neutral":
+            continue
+        is_bullish = pattern_type == "bullish"
+        pattern_markers.append({
+            "time": dates[bar],
+            "position": "aboveBar" if is_bullish else "belowBar",
+            "color": "#06b6d4" if is_bullish else "#ef4444",
+            "shape": "arrowUp" if is_bullish else "arrowDown",
+            "text": scanner.PATTERN_LABELS.get(key, name),
+        })
+
+    return {
+        "symbol": symbol_upper,
+        "score": analysis["score"],
+        "trend": analysis.get("trend", {}),
+        "ema20": ema20_data,
+        "ema50": ema50_data,
+        "support": [round(s, 2) for s in sr.get("support", [])],
+        "resistance": [round(r, 2) for r in sr.get("resistance", [])],
+        "fvgs": fvgs,
+        "patterns": pattern_markers,
+        "setup_type": analysis.get("setup_type", "SKIP"),
+    }
+
+
 @app.get("/chart/{symbol}/analysis")
-async def get_chart_analysis(symbol: str):
+async def get_chart_analysis(symbol: str, request: Request):
     """Get technical analysis overlays (EMA, S/R, FVG, patterns) from yfinance data."""
     try:
-        scripts_dir = str(BASE_DIR / "scripts")
-        if scripts_dir not in sys.path:
-            sys.path.insert(0, scripts_dir)
-
-        from market_scanner import fetch_ohlcv, MarketScanner, WATCHLIST
-        import pandas as pd
+        from response_cache import bar_version, cached_response
 
         symbol_upper = symbol.upper()
-        yf_ticker = WATCHLIST.get(symbol_upper, f"{symbol_upper}.NS")
-
-        df = fetch_ohlcv(symbol_upper, yf_ticker)
-        if df.empty or len(df) < 50:
-            raise HTTPException(status_code=404, detail=f"Insufficient data for {symbol_upper}")
-
-        config_path = str(BASE_DIR / "config" / "trading_rules.json")
-        scanner = MarketScanner(config_path)
-        analysis = scanner.analyzer.analyze_stock(symbol_upper, df)
-
-        if analysis is None:
-            return {"symbol": symbol_upper, "error": "Insufficient data"}
-
-        # EMA overlays
-        ema20 = df["close"].ewm(span=20).mean()
-        ema50 = df["close"].ewm(span=50).mean()
-
-        ema20_data = []
-        ema50_data = []
-        for i, row in df.iterrows():
-            date_str = str(row["date"])[:10]
-            if not pd.isna(ema20.iloc[i]):
-                ema20_data.append({"time": date_str, "value": round(float(ema20.iloc[i]), 2)})
-            if not pd.isna(ema50.iloc[i]):
-                ema50_data.append({"time": date_str, "value": round(float(ema50.iloc[i]), 2)})
-
-        sr = analysis.get("sr_levels", {})
-
-        fvgs = []
-        for fvg in analysis.get("fvgs", []):
-            fvgs.append({"type": fvg["type"], "high": round(fvg["high"], 2), "low": round(fvg["low"], 2)})
-
-        patterns = analysis.get("patterns", [])
-        pattern_markers = []
-        if patterns:
-            last_date = str(df.iloc[-1]["date"])[:10]
-            for p in patterns:
-                is_bullish = "bullish" in p or "hammer" in p or "morning" in p
-                label = scanner.PATTERN_LABELS.get(p, p.replace("_", " ").title())
-                pattern_markers.append({
-                    "time": last_date,
-                    "position": "aboveBar" if is_bullish else "belowBar",
-                    "color": "#06b6d4" if is_bullish else "#ef4444",
-                    "shape": "arrowUp" if is_bullish else "arrowDown",
-                    "text": label,
-                })
-
-        return {
-            "symbol": symbol_upper,
-            "score": analysis["score"],
-            "trend": analysis.get("trend", {}),
-            "ema20": ema20_data,
-            "ema50": ema50_data,
-            "support": [round(s, 2) for s in sr.get("support", [])],
-            "resistance": [round(r, 2) for r in sr.get("resistance", [])],
-            "fvgs": fvgs,
-            "patterns": pattern_markers,
-            "setup_type": analysis.get("setup_type", "SKIP"),
-        }
+        cache = response_cache()
+        entry = await cache.get_or_compute(
+            ("chart_analysis", symbol_upper, bar_version(symbol_upper)),
+            lambda: _chart_analysis_payload(symbol_upper))
+        return cached_response(request, entry, cache)
 
     except HTTPException:
         raise
@@ -387,13 +554,22 @@ async def get_chart_analysis(symbol: str):
         return {"error": str(e)}
 
 
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """Response cache size, hit rate, single-flight and 304 counters."""
+    return response_cache().info()
+
+
+@app.delete("/cache")
+async def clear_cache():
+    """Drop every cached response."""
+    return {"dropped": response_cache().invalidate()}
+
+
 @app.get("/chart/symbols")
 async def get_available_symbols():
     """Get list of symbols in the watchlist."""
     try:
-        scripts_dir = str(BASE_DIR / "scripts")
-        if scripts_dir not in sys.path:
-            sys.path.insert(0, scripts_dir)
         from market_scanner import WATCHLIST
         return {"symbols": list(WATCHLIST.keys())}
     except Exception:
@@ -516,31 +692,79 @@ async def get_account_summary():
 
 # ─── Signal Engine ──────────────────────────────────────────────
 
-@app.get("/signal/{symbol}")
-async def get_signal_analysis(symbol: str):
-    """Run signal engine analysis (VWAP, RSI, Supertrend, etc.) on a symbol."""
+@app.get("/signals/live")
+async def get_live_signals(symbol: str = None, since: int = None):
+    """
+    Latest snapshot published by signal_service.py (recomputed on bar close).
+    ?symbol= returns one symbol; ?since=<version> returns only symbols updated
+    after that snapshot version. Only the last publish is retained, so a
+    `since` that is older (or from before a service restart) gets every
+    symbol with reset=true: the client must replace its state, not merge.
+    """
     try:
-        from signal_engine import SignalEngine
-        from market_scanner import fetch_ohlcv, WATCHLIST
+        snapshots = services.signal_snapshots
+        snap = snapshots.load()
+        if not snap:
+            return {"version": None, "running": False, "reset": since is not None, "symbols": {}}
+
+        symbols = snap.get("symbols", {})
+        version = snap.get("version", 0)
+        reset = False
+        if symbol:
+            symbol_upper = symbol.upper()
+            if symbol_upper not in symbols:
+                raise HTTPException(status_code=404, detail=f"No live signals for {symbol_upper}")
+            symbols = {symbol_upper: symbols[symbol_upper]}
+        elif since is not None and since == version:
+            symbols = {}
+        elif since is not None and since == version - 1:
+            symbols = {s: symbols[s] for s in snap.get("updated", []) if s in symbols}
+        elif since is not None:
+            reset = True
 
-        symbol_upper = symbol.upper()
-        yf_ticker = WATCHLIST.get(symbol_upper, f"{symbol_upper}.NS")
+        return {
+            "version": snap.get("version"),
+            "timestamp": snap.get("timestamp"),
+            "running": snapshots.service_running(),
+            "reset": reset,
+            "symbols": symbols,
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return {"error": str(e)}
+
+
+def _signal_analysis(symbol_upper: str) -> dict:
+    """yfinance fetch + signal engine for one symbol (blocking — run off the event loop)."""
+    from market_scanner import fetch_ohlcv, WATCHLIST
+
+    yf_ticker = WATCHLIST.get(symbol_upper, f"{symbol_upper}.NS")
+
+    df = fetch_ohlcv(symbol_upper, yf_ticker)
+    if df.empty or len(df) < 20:
+        raise HTTPException(status_code=404, detail=f"Insufficient data for {symbol_upper}")
 
-        df = fetch_ohlcv(symbol_upper, yf_ticker)
-        if df.empty or len(df) < 20:
-            raise HTTPException(status_code=404, detail=f"Insufficient data for {symbol_upper}")
+    candles = []
+    for _, row in df.tail(100).iterrows():
+        candles.append({
+            "open": float(row["open"]), "high": float(row["high"]),
+            "low": float(row["low"]), "close": float(row["close"]),
+            "volume": float(row["volume"]),
+        })
 
-        candles = []
-        for _, row in df.tail(100).iterrows():
-            candles.append({
-                "open": float(row["open"]), "high": float(row["high"]),
-                "low": float(row["low"]), "close": float(row["close"]),
-                "volume": float(row["volume"]),
-            })
+    return services.signal_engine.analyze(candles, symbol_upper, "daily")
 
-        engine = SignalEngine()
-        result = engine.analyze(candles, symbol_upper, "daily")
 
+@app.get("/signal/{symbol}")
+async def get_signal_analysis(symbol: str):
+    """Run signal engine analysis (VWAP, RSI, Supertrend, etc.) on a symbol."""
+    try:
+        symbol_upper = symbol.upper()
+        result = await asyncio.to_thread(_signal_analysis, symbol_upper)
         return {"symbol": symbol_upper, "analysis": result}
 
     except HTTPException:
@@ -553,11 +777,27 @@ async def get_signal_analysis(symbol: str):
 
 # ─── Risk Manager ───────────────────────────────────────────────
 
+def live_risk_snapshot():
+    """Latest snapshot from risk_service.py while it is running (tick-fresh), else None."""
+    return services.risk_snapshots.live()
+
+
+def fallback_risk_config(capital: float) -> dict:
+    """RiskManager limits used when risk_service.py is not running (capital from Kite margins)."""
+    return {"total_capital": capital, "max_portfolio_heat": 10.0,
+            "max_single_trade_risk": 2.0, "daily_loss_limit": 3.0,
+            "weekly_loss_limit": 7.0, "max_consecutive_losses": 3,
+            "max_sector_exposure_pct": 40, "max_correlated_positions": 2,
+            "max_open_positions": 3, "max_open_options": 2}
+
+
 @app.get("/risk/dashboard")
 async def get_risk_dashboard():
     """Get real-time risk metrics: portfolio heat, drawdown, Kelly sizing."""
     try:
-        from risk_manager import RiskManager
+        snapshot = live_risk_snapshot()
+        if snapshot:
+            return snapshot
 
         data = read_cache()
         positions = data.get("positions", [])
@@ -565,11 +805,7 @@ async def get_risk_dashboard():
         margins = data.get("margins", {})
 
         capital = margins.get("net", 100000) or 100000
-        rm = RiskManager(config={"total_capital": capital, "max_portfolio_heat": 10.0,
-            "max_single_trade_risk": 2.0, "daily_loss_limit": 3.0,
-            "weekly_loss_limit": 7.0, "max_consecutive_losses": 3,
-            "max_sector_exposure_pct": 40, "max_correlated_positions": 2,
-            "max_open_positions": 3, "max_open_options": 2})
+        rm = services.risk_manager(fallback_risk_config(capital))
 
         dashboard = rm.get_risk_dashboard(positions, session_pnl)
         return dashboard
@@ -581,68 +817,296 @@ async def get_risk_dashboard():
 
 
 @app.get("/risk/check/{symbol}")
-async def pre_trade_risk_check(symbol: str, is_options: bool = False):
-    """Pre-trade risk gate — checks all limits before allowing a trade."""
+async def pre_trade_risk_check(symbol: str, is_options: bool = False,
+                               transaction_type: str = "BUY", option_type: str = None):
+    """
+    Pre-trade risk gate — checks all limits before allowing a trade.
+    ?transaction_type=SELL / ?option_type=PE sign the candidate for the correlation check.
+    """
+    side = {"is_options": is_options, "transaction_type": transaction_type,
+            "option_type": option_type}
     try:
-        from risk_manager import RiskManager
+        snapshot = live_risk_snapshot()
+        if snapshot:
+            rm = services.risk_manager(snapshot["config"], load_history=False)
+            return rm.check_snapshot(symbol.upper(), snapshot, **side)
 
         data = read_cache()
         positions = data.get("positions", [])
         session_pnl = data.get("session_pnl", 0)
         capital = data.get("margins", {}).get("net", 100000) or 100000
 
-        rm = RiskManager(config={"total_capital": capital, "max_portfolio_heat": 10.0,
-            "max_single_trade_risk": 2.0, "daily_loss_limit": 3.0,
-            "weekly_loss_limit": 7.0, "max_consecutive_losses": 3,
-            "max_sector_exposure_pct": 40, "max_correlated_positions": 2,
-            "max_open_positions": 3, "max_open_options": 2})
+        rm = services.risk_manager(fallback_risk_config(capital))
 
-        result = rm.full_risk_check(symbol.upper(), positions, session_pnl, is_options=is_options)
+        result = rm.full_risk_check(symbol.upper(), positions, session_pnl, **side)
         return result
 
     except Exception as e:
         return {"error": str(e)}
 
 
+def options_risk_engine():
+    """OptionsRiskEngine over the open option legs: from the risk service snapshot when live, else cache + ticks."""
+    from options_risk import OptionsRiskEngine
+
+    snapshot = live_risk_snapshot()
+    if snapshot and "options" in snapshot:
+        return OptionsRiskEngine.from_legs(snapshot["options"].get("legs", []))
+
+    engine = OptionsRiskEngine()
+    engine.set_legs(read_cache().get("positions", []))
+    ticks = read_ticks().get("ticks", {})
+    prices = {s: t.get("ltp") for s, t in ticks.items()}
+    spots = {u: prices.get(sym) for u, sym in engine.spot_symbols().items()}
+    engine.update(spots, prices)
+    return engine
+
+
+@app.get("/risk/greeks")
+async def get_options_greeks():
+    """Net delta / gamma / vega / theta, spot x IV scenario grid and VaR per underlying."""
+    try:
+        snapshot = live_risk_snapshot()
+        if snapshot and "options" in snapshot:
+            return snapshot["options"]
+        return options_risk_engine().summary()
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return {"error": str(e)}
+
+
+@app.get("/risk/scenario")
+async def get_options_scenario(underlying: str = "NIFTY", spot: float = -1.0, iv: float = 2.0):
+    """P&L of one underlying's legs if spot moves `spot`% and implied vol moves `iv` points."""
+    try:
+        engine = options_risk_engine()
+        underlying = underlying.upper()
+        if underlying not in engine.underlyings:
+            raise HTTPException(status_code=404, detail=f"No open legs in {underlying}")
+        return {
+            "underlying": underlying,
+            "spot_pct": spot,
+            "iv_pts": iv,
+            "spot": engine.spots.get(underlying),
+            "pnl": engine.scenario(underlying, spot_pct=spot, iv_pts=iv),
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return {"error": str(e)}
+
+
+@app.get("/risk/correlations")
+async def get_correlations(symbols: str = ""):
+    """Rolling correlation matrix (open positions + indices + global markets by default), betas and clusters."""
+    try:
+        from correlation_engine import get_snapshots
+
+        snapshots = get_snapshots()
+        data = snapshots.load()
+        if not data:
+            raise HTTPException(status_code=404, detail="No correlations yet — run correlation_engine.py")
+
+        if symbols:
+            wanted = [s.strip() for s in symbols.split(",") if s.strip()]
+        else:
+            wanted = [p.get("symbol", "") for p in read_cache().get("positions", []) if p.get("quantity")]
+            wanted += [n for n in data["names"] if data["groups"].get(n) in ("index", "global")]
+        sub = snapshots.submatrix(wanted)
+        return {
+            "as_of": data["as_of"],
+            "window": data["window"],
+            **sub,
+            "beta": {n: data["beta"].get(n) for n in sub["names"]},
+            "volatility": {n: data["volatility"].get(n) for n in sub["names"]},
+            "clusters": data["clusters"],
+            "cluster_threshold": data["cluster_threshold"],
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return {"error": str(e)}
+
+
+@app.get("/correlation/global")
+async def get_global_correlation():
+    """NIFTY vs global markets (DJIA, S&P 500, gold, US10Y, dollar index): rolling correlation, betas, daily rows."""
+    try:
+        from correlation_engine import get_snapshots
+
+        data = get_snapshots().load()
+        if not data:
+            raise HTTPException(status_code=404, detail="No correlations yet — run correlation_engine.py")
+        return {"as_of": data["as_of"], "window": data["window"], **data["global"]}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return {"error": str(e)}
+
+
+def historical_var_engine():
+    """HistoricalVaR over the live book; the daily bar store is shared across requests."""
+    from historical_var import DailyBarStore, live_book_var
+    if services.bar_store is None:
+        services.bar_store = DailyBarStore()
+    if services.bar_store.load().empty:
+        raise HTTPException(status_code=404, detail="No daily bar history — run historical_var.py update")
+    return live_book_var(services.bar_store, cache_file=CACHE_FILE, tick_file=TICK_FILE)
+
+
+@app.get("/risk/var")
+async def get_historical_var(symbol: str = "", quantity: float = 0, price: float = 0,
+                             horizon: int = 1):
+    """
+    Historical VaR / ES of the open book (full revaluation over the stored
+    daily history). With ?symbol=&quantity= also the VaR impact of that new position.
+    """
+    try:
+        def compute():
+            engine = historical_var_engine()
+            result = engine.var(horizon_days=horizon)
+            if symbol and quantity:
+                candidate = {"symbol": symbol.upper(), "quantity": quantity}
+                if price:
+                    candidate["current_price"] = price
+                result["what_if"] = engine.what_if(candidate)
+            return result
+
+        return await asyncio.to_thread(compute)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return {"error": str(e)}
+
+
+@app.get("/risk/var/backtest")
+async def get_var_backtest(confidence: float = 0.99):
+    """VaR exception backtest: rolling hypothetical (current book) and realized (recorded forecasts)."""
+    try:
+        from historical_var import realized_backtest
+
+        def compute():
+            engine = historical_var_engine()
+            return {
+                "hypothetical": engine.backtest(confidence),
+                "realized": realized_backtest(confidence=confidence),
+            }
+
+        return await asyncio.to_thread(compute)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return {"error": str(e)}
+
+
 # ─── Trade Recommendation ──────────────────────────────────────
 
+@app.post("/trade/recommend/batch")
+async def get_batch_mtf_conviction(request: Request):
+    """
+    Multi-timeframe conviction for many symbols in one call.
+    Body: { symbols?: [...] (max 50), universe?: "nifty50", background?: false }
+    Symbols are scored concurrently on the scanner's warm worker pool, inside a
+    background job; background=true returns the job id at once.
+    """
+    try:
+        from market_scanner import MAX_MTF_SYMBOLS
+
+        body = await request.json()
+        symbols = body.get("symbols") or None
+        universe = body.get("universe", "nifty50")
+        if symbols and len(symbols) > MAX_MTF_SYMBOLS:
+            raise HTTPException(status_code=400,
+                                detail=f"At most {MAX_MTF_SYMBOLS} symbols per request")
+
+        def run(progress):
+            progress(0.0, f"scoring {len(symbols) if symbols else universe}")
+            return services.scanner.mtf_conviction(symbols, universe=universe)
+
+        return await run_job("mtf_batch", run,
+                             params={"symbols": symbols, "universe": universe},
+                             wait=0 if body.get("background") else MAX_JOB_WAIT)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return {"error": str(e)}
+
+
+def _recommendation_analysis(symbol_upper: str) -> dict:
+    """Scanner + signal engine part of a recommendation (depends only on the bars)."""
+    from market_scanner import fetch_ohlcv, WATCHLIST
+
+    yf_ticker = WATCHLIST.get(symbol_upper, f"{symbol_upper}.NS")
+
+    # 1. Fetch data
+    df = fetch_ohlcv(symbol_upper, yf_ticker)
+    if df.empty or len(df) < 50:
+        raise HTTPException(status_code=404, detail=f"Insufficient data for {symbol_upper}")
+
+    # 2. Scanner analysis
+    analysis = services.scanner.analyzer.analyze_stock(symbol_upper, df)
+    if analysis is None:
+        return {"symbol": symbol_upper, "recommendation": "SKIP", "reason": "Insufficient data"}
+
+    # 3. Signal engine
+    candles = df[["open", "high", "low", "close", "volume"]].tail(100).astype(float).to_dict("records")
+
+    signal = services.signal_engine.analyze(candles, symbol_upper, "daily")
+
+    return {
+        "score": analysis["score"],
+        "setup_type": analysis.get("setup_type", "SKIP"),
+        "price": analysis.get("current_price"),
+        "signal": {
+            "direction": signal.get("direction", "NEUTRAL"),
+            "confidence": signal.get("confidence", 50),
+            "trend_strength": signal.get("trend_strength", "weak"),
+            "signals": signal.get("signals", []),
+        },
+        # Mode selection's input (defaults to "moderate" when the engine gives none)
+        "mode_trend_strength": signal.get("trend_strength", "moderate"),
+    }
+
+
 @app.get("/trade/recommend/{symbol}")
-async def get_trade_recommendation(symbol: str):
+async def get_trade_recommendation(symbol: str, mtf: bool = False):
     """
     Full trade recommendation: scanner + signal engine + mode selector + risk check.
     This is the "one-click" analysis endpoint.
+    ?mtf=true adds 5m/15m/1h confluence.
+    The scanner / signal part is cached per bar version; mode and risk are evaluated per request.
     """
     try:
-        from signal_engine import SignalEngine
-        from market_scanner import fetch_ohlcv, MarketScanner, WATCHLIST
-        from mode_selector import ModeSelector
-        from risk_manager import RiskManager
+        from response_cache import bar_version
         import datetime as dt
 
         symbol_upper = symbol.upper()
-        yf_ticker = WATCHLIST.get(symbol_upper, f"{symbol_upper}.NS")
-
-        # 1. Fetch data
-        df = fetch_ohlcv(symbol_upper, yf_ticker)
-        if df.empty or len(df) < 50:
-            raise HTTPException(status_code=404, detail=f"Insufficient data for {symbol_upper}")
-
-        # 2. Scanner analysis
-        config_path = str(BASE_DIR / "config" / "trading_rules.json")
-        scanner = MarketScanner(config_path)
-        analysis = scanner.analyzer.analyze_stock(symbol_upper, df)
-        if analysis is None:
-            return {"symbol": symbol_upper, "recommendation": "SKIP", "reason": "Insufficient data"}
-
-        # 3. Signal engine
-        candles = []
-        for _, row in df.tail(100).iterrows():
-            candles.append({"open": float(row["open"]), "high": float(row["high"]),
-                "low": float(row["low"]), "close": float(row["close"]),
-                "volume": float(row["volume"])})
-
-        engine = SignalEngine()
-        signal = engine.analyze(candles, symbol_upper, "daily")
+        entry = await response_cache().get_or_compute(
+            ("recommend", symbol_upper, bar_version(symbol_upper)),
+            lambda: _recommendation_analysis(symbol_upper))
+        cached = entry.payload
+        if "recommendation" in cached:
+            return cached
 
         # 4. Mode selection
         data = read_cache()
@@ -650,40 +1114,54 @@ async def get_trade_recommendation(symbol: str):
         cash = margins.get("cash", 50000) or 50000
         margin = margins.get("net", 50000) or 50000
 
-        selector = ModeSelector()
-        mode = selector.select_mode(
-            score=analysis["score"],
+        mode = services.mode_selector.select_mode(
+            signal_score=cached["score"],
             current_time=dt.datetime.now().time(),
             available_cash=cash,
             available_margin=margin,
             symbol=symbol_upper,
-            trend_strength=signal.get("trend_strength", "moderate"),
+            trend_strength=cached["mode_trend_strength"],
         )
 
         # 5. Risk check
-        positions = data.get("positions", [])
-        rm = RiskManager(config={"total_capital": margin, "max_portfolio_heat": 10.0,
-            "max_single_trade_risk": 2.0, "daily_loss_limit": 3.0,
-            "weekly_loss_limit": 7.0, "max_consecutive_losses": 3,
-            "max_sector_exposure_pct": 40, "max_correlated_positions": 2,
-            "max_open_positions": 3, "max_open_options": 2})
-        risk = rm.full_risk_check(symbol_upper, positions,
-                                  data.get("session_pnl", 0),
-                                  is_options=(mode["mode"] == "FNO_NRML"))
+        # A SHORT signal is a sold future / equity or a bought put (options_analyzer.select_strike)
+        is_options = mode["mode"] == "FNO_NRML"
+        short = cached["signal"]["direction"] == "SHORT"
+        side = {"is_options": is_options,
+                "transaction_type": "SELL" if short and not is_options else "BUY",
+                "option_type": ("PE" if short else "CE") if is_options else None}
+        snapshot = live_risk_snapshot()
+        if snapshot:
+            rm = services.risk_manager(snapshot["config"], load_history=False)
+            risk = rm.check_snapshot(symbol_upper, snapshot, **side)
+        else:
+            positions = data.get("positions", [])
+            rm = services.risk_manager(fallback_risk_config(margin))
+            risk = rm.full_risk_check(symbol_upper, positions,
+                                      data.get("session_pnl", 0), **side)
+
+        mtf_result = None
+        if mtf:
+            # Bar-close snapshot from signal_service.py when it covers this symbol
+            snapshots = services.signal_snapshots
+            if snapshots.service_running():
+                mtf_result = (snapshots.get(symbol_upper) or {}).get("mtf")
+            if mtf_result is None:
+                from market_scanner import WATCHLIST
+                yf_ticker = WATCHLIST.get(symbol_upper, f"{symbol_upper}.NS")
+                mtf_result = (await asyncio.to_thread(
+                    services.scanner.mtf_conviction, [symbol_upper],
+                    watchlist={symbol_upper: yf_ticker}))[symbol_upper]
 
         return {
             "symbol": symbol_upper,
-            "score": analysis["score"],
-            "setup_type": analysis.get("setup_type", "SKIP"),
-            "signal": {
-                "direction": signal.get("direction", "NEUTRAL"),
-                "confidence": signal.get("confidence", 50),
-                "trend_strength": signal.get("trend_strength", "weak"),
-                "signals": signal.get("signals", []),
-            },
+            "score": cached["score"],
+            "setup_type": cached["setup_type"],
+            "signal": cached["signal"],
             "mode": mode,
             "risk": risk,
-            "price": analysis.get("current_price"),
+            "mtf": mtf_result,
+            "price": cached["price"],
             "timestamp": datetime.now().isoformat(),
         }
 
@@ -704,21 +1182,13 @@ async def execute_order(request: Request):
     Body: { symbol, direction, quantity?, dry_run? }
     """
     try:
-        scripts_dir = str(BASE_DIR / "scripts")
-        if scripts_dir not in sys.path:
-            sys.path.insert(0, scripts_dir)
-
         body = await request.json()
         symbol = body.get("symbol", "")
         direction = body.get("direction", "BUY")
         quantity = body.get("quantity", 1)
         dry_run = body.get("dry_run", True)  # Default to dry-run for safety
 
-        from execution_engine import ExecutionEngine
-        from kite_client import KiteMCPClient
-
-        client = KiteMCPClient()
-        engine = ExecutionEngine(client, config={"dry_run": dry_run, "require_confirmation": False})
+        engine = services.execution_engine(dry_run=bool(dry_run))
 
         trade_plan = {
             "action": "TRADE",
@@ -730,12 +1200,18 @@ async def execute_order(request: Request):
             "score": body.get("score", 0),
         }
 
-        # Pre-trade checks
-        checks = engine.pre_trade_checks(trade_plan)
+        def place():
+            # Checks + placement under one lock so concurrent requests cannot both pass the limits
+            with services.order_lock:
+                checks = engine.pre_trade_checks(trade_plan)
+                if not checks["passed"]:
+                    return checks, None
+                return checks, engine.place_options_order(trade_plan)
+
+        # Kite REST calls — kept off the event loop
+        checks, result = await asyncio.to_thread(place)
         if not checks["passed"]:
             return {"status": "BLOCKED", "reason": checks["reason"], "timestamp": datetime.now().isoformat()}
-
-        result = engine.place_options_order(trade_plan)
         return {"status": result.get("status", "UNKNOWN"), "result": result, "timestamp": datetime.now().isoformat()}
 
     except Exception as e:
@@ -748,16 +1224,7 @@ async def execute_order(request: Request):
 async def get_execution_summary():
     """Get today's execution summary — orders placed, success rate, P&L."""
     try:
-        scripts_dir = str(BASE_DIR / "scripts")
-        if scripts_dir not in sys.path:
-            sys.path.insert(0, scripts_dir)
-
-        from execution_engine import ExecutionEngine
-        from kite_client import KiteMCPClient
-
-        client = KiteMCPClient()
-        engine = ExecutionEngine(client)
-        summary = engine.get_daily_summary()
+        summary = await asyncio.to_thread(services.execution_engine().get_daily_summary)
 
         return {"summary": summary, "timestamp": datetime.now().isoformat()}
     except Exception as e:
@@ -768,23 +1235,15 @@ async def get_execution_summary():
 async def pre_trade_check(request: Request):
     """Run pre-trade safety checks without placing an order."""
     try:
-        scripts_dir = str(BASE_DIR / "scripts")
-        if scripts_dir not in sys.path:
-            sys.path.insert(0, scripts_dir)
-
         body = await request.json()
-        from execution_engine import ExecutionEngine
-        from kite_client import KiteMCPClient
-
-        client = KiteMCPClient()
-        engine = ExecutionEngine(client)
+        engine = services.execution_engine()
 
         trade_plan = {
             "action": "TRADE",
             "option": {"tradingsymbol": body.get("symbol", ""), "exchange": "NSE"},
             "position": {"quantity": body.get("quantity", 1), "total_cost": 0},
         }
-        result = engine.pre_trade_checks(trade_plan)
+        result = await asyncio.to_thread(engine.pre_trade_checks, trade_plan)
         return {"checks": result, "timestamp": datetime.now().isoformat()}
     except Exception as e:
         return {"checks": {"passed": False, "reason": str(e)}}
@@ -796,16 +1255,8 @@ async def pre_trade_check(request: Request):
 async def get_option_chain(underlying: str = "NIFTY", expiry: str = "weekly"):
     """Fetch option chain for an underlying with strike prices and premiums."""
     try:
-        scripts_dir = str(BASE_DIR / "scripts")
-        if scripts_dir not in sys.path:
-            sys.path.insert(0, scripts_dir)
-
-        from options_analyzer import OptionsAnalyzer
-        from kite_client import KiteMCPClient
-
-        client = KiteMCPClient()
-        analyzer = OptionsAnalyzer(client)
-        chain = analyzer.get_option_chain(underlying.upper(), expiry)
+        analyzer = services.options_analyzer
+        chain = await asyncio.to_thread(analyzer.get_option_chain, underlying.upper(), expiry)
 
         if not chain:
             return {"error": "Could not fetch option chain", "underlying": underlying}
@@ -834,16 +1285,8 @@ async def get_option_chain(underlying: str = "NIFTY", expiry: str = "weekly"):
 async def get_oi_analysis(underlying: str = "NIFTY", expiry: str = "weekly"):
     """Get Open Interest analysis — PCR, max pain, support/resistance zones."""
     try:
-        scripts_dir = str(BASE_DIR / "scripts")
-        if scripts_dir not in sys.path:
-            sys.path.insert(0, scripts_dir)
-
-        from options_analyzer import OptionsAnalyzer
-        from kite_client import KiteMCPClient
-
-        client = KiteMCPClient()
-        analyzer = OptionsAnalyzer(client)
-        chain = analyzer.get_option_chain(underlying.upper(), expiry)
+        analyzer = services.options_analyzer
+        chain = await asyncio.to_thread(analyzer.get_option_chain, underlying.upper(), expiry)
 
         if not chain or not chain.get("strikes"):
             return {"error": "Could not fetch chain for OI analysis"}
@@ -860,16 +1303,8 @@ async def get_oi_analysis(underlying: str = "NIFTY", expiry: str = "weekly"):
 async def get_options_recommendation(request: Request):
     """Get a full options trade recommendation based on signal data."""
     try:
-        scripts_dir = str(BASE_DIR / "scripts")
-        if scripts_dir not in sys.path:
-            sys.path.insert(0, scripts_dir)
-
         body = await request.json()
-        from options_analyzer import OptionsAnalyzer
-        from kite_client import KiteMCPClient
-
-        client = KiteMCPClient()
-        analyzer = OptionsAnalyzer(client)
+        analyzer = services.options_analyzer
 
         scanner_signal = {
             "score": body.get("score", 80),
@@ -878,7 +1313,7 @@ async def get_options_recommendation(request: Request):
         capital = body.get("capital", 100000)
         underlying = body.get("underlying", "NIFTY")
 
-        result = analyzer.recommend_trade(scanner_signal, capital, underlying)
+        result = await asyncio.to_thread(analyzer.recommend_trade, scanner_signal, capital, underlying)
         return {"recommendation": result, "timestamp": datetime.now().isoformat()}
     except Exception as e:
         import traceback
@@ -886,6 +1321,70 @@ async def get_options_recommendation(request: Request):
         return {"error": str(e)}
 
 
+# ─── Backtest Runs ──────────────────────────────────────────────
+
+def backtest_store():
+    """Shared BacktestStore (preloaded at startup; built here if that phase failed, e.g. no pyarrow)."""
+    if services.backtest_store is None:
+        from backtest_store import BacktestStore
+        services.backtest_store = BacktestStore()
+    return services.backtest_store
+
+
+@app.get("/backtest/runs")
+async def list_backtest_runs(name: str = None, max_dd: float = None, min_trades: int = None,
+                             order_by: str = "created_at", descending: bool = True,
+                             limit: int = 50):
+    """
+    Browse stored backtest runs.
+    ?name=scanner_v3&max_dd=8&order_by=sharpe&limit=10 → top configs by Sharpe with DD < 8%
+    """
+    try:
+        where = []
+        if name:
+            where.append(("name", "==", name))
+        if max_dd is not None:
+            where.append(("max_drawdown_pct", "<", max_dd))
+        if min_trades is not None:
+            where.append(("total_trades", ">=", min_trades))
+
+        runs = backtest_store().query_runs(where=where, order_by=order_by,
+                                          descending=descending, limit=limit)
+        return {"runs": runs, "count": len(runs), "timestamp": datetime.now().isoformat()}
+    except Exception as e:
+        return {"runs": [], "count": 0, "error": str(e)}
+
+
+@app.get("/backtest/compare")
+async def compare_backtest_runs(group_by: str = "config_hash", metric: str = "sharpe"):
+    """Aggregate a metric across runs, e.g. mean Sharpe per config."""
+    try:
+        rows = backtest_store().aggregate(group_by, {metric: "mean", "run_id": "count"})
+        rows.sort(key=lambda r: r.get(f"{metric}_mean") or 0, reverse=True)
+        return {"group_by": group_by, "metric": metric, "groups": rows}
+    except Exception as e:
+        return {"groups": [], "error": str(e)}
+
+
+@app.get("/backtest/runs/{run_id}")
+async def get_backtest_run(run_id: str, include_trades: bool = False):
+    """Summary, config and equity curve for one stored run."""
+    try:
+        store = backtest_store()
+        run = store.get_run(run_id)
+        if run is None:
+            raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
+
+        result = {"run": run, "equity_curve": store.get_equity_curve(run_id)}
+        if include_trades:
+            result["trades"] = store.get_trades(run_id)
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        return {"error": str(e)}
+
+
 # ─── System Info ────────────────────────────────────────────────
 
 
@@ -908,12 +1407,12 @@ async def get_module_status():
 
 @app.get("/config")
 async def get_config():
-    """Read the current trading_rules.json config."""
-    config_path = BASE_DIR / "config" / "trading_rules.json"
+    """Current trading_rules.json config (loaded at startup, reloaded on PUT /config)."""
     try:
-        with open(config_path) as f:
-            config = json.load(f)
-        return {"config": config, "path": str(config_path), "timestamp": datetime.now().isoformat()}
+        if not services.config:
+            services.load_config()
+        return {"config": services.config, "path": str(services.config_path),
+                "timestamp": datetime.now().isoformat()}
     except Exception as e:
         return {"error": str(e)}
 
@@ -941,6 +1440,10 @@ async def update_config(request: Request):
         with open(config_path, "w") as f:
             json.dump(config, f, indent=2)
 
+        # Scanner / mode selector hold a copy of the config; cached analyses were scored with the old one
+        services.load_config()
+        response_cache().invalidate()
+
         return {"status": "updated", "config": config, "timestamp": datetime.now().isoformat()}
     except Exception as e:
         import traceback
@@ -9,6 +9,8 @@ from datetime import datetime, timedelta, time
 from typing import Dict, List, Tuple
 import json
 
+from cost_tracker import PRODUCT_SEGMENTS, round_trip_charges
+
 # Set seed for reproducibility
 random.seed(42)
 
@@ -292,11 +294,9 @@ class DualModeBacktest:
         # Calculate P&L
         pnl_gross = (exit_price - entry_price) * quantity
 
-        # Calculate costs
-        if mode == 'MIS':
-            costs = 40  # ₹20 buy + ₹20 sell
-        else:
-            costs = 15.34  # DP charge
+        # Calculate costs (brokerage, DP and statutory charges for both legs)
+        costs = round(round_trip_charges(PRODUCT_SEGMENTS[mode], quantity, entry_price, exit_price,
+                                         trade_date=exit_date.date()), 2)
 
         pnl_net = pnl_gross - costs
 
@@ -505,4 +505,19 @@ if __name__ == '__main__':
     backtester = DualModeBacktest(starting_capital=35000)
     backtester.run_backtest(start_date, num_days=40)
 
+    if backtester.trades:
+        try:
+            from backtest_store import BacktestStore
+            run_id = BacktestStore().save_run(
+                name='dual_mode_35k',
+                trades=backtester.trades,
+                equity_curve=[],
+                config={'mis': backtester.mis_config, 'cnc': backtester.cnc_config,
+                        'start_date': start_date.isoformat(), 'num_days': 40, 'seed': 42},
+                starting_capital=backtester.starting_capital
+            )
+            print(f'🗄️  Run stored in backtest store: {run_id}')
+        except ImportError as e:
+            print(f'⚠️  Backtest store unavailable: {e}')
+
     print('\n✅ Backtest complete!\n')
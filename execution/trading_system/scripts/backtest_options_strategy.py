@@ -9,6 +9,8 @@ from datetime import datetime, timedelta, time
 from typing import Dict, List
 import json
 
+from cost_tracker import round_trip_charges
+
 random.seed(42)
 
 
@@ -224,12 +226,14 @@ class OptionsBacktest:
                 exit_premium = entry_premium * multiplier
                 exit_reason = 'STOP'
 
-        # Calculate P&L
+        # Calculate P&L (net of brokerage, STT and exchange charges on both legs)
         exit_value = exit_premium * position['lots']
-        pnl = exit_value - position['total_cost']
+        charges = round(round_trip_charges('OPTIONS', position['lots'], entry_premium, exit_premium,
+                                           trade_date=current_date.date()), 2)
+        pnl = exit_value - position['total_cost'] - charges
 
         # Add back exit value
-        self.cash += exit_value
+        self.cash += exit_value - charges
 
         # Store trade
         trade = {
@@ -243,6 +247,7 @@ class OptionsBacktest:
             'exit_premium': exit_premium,
             'total_cost': position['total_cost'],
             'exit_value': exit_value,
+            'charges': charges,
             'pnl': pnl,
             'pnl_pct': (pnl / position['total_cost'] * 100) if position['total_cost'] > 0 else 0,
             'exit_reason': exit_reason,
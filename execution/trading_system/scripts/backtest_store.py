@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+BACKTEST STORE — Columnar Results Store
+Persists every backtest run as a hive-partitioned Parquet dataset
+(runs / trades / equity) plus its config and code version, and answers
+cross-run comparison queries without loading every run into memory.
+
+Layout:
+    analysis/backtest_runs/
+        runs/strategy=<name>/date=<YYYY-MM-DD>/<run_id>.parquet    (1 row)
+        trades/strategy=<name>/date=<YYYY-MM-DD>/<run_id>.parquet
+        equity/strategy=<name>/date=<YYYY-MM-DD>/<run_id>.parquet
+        configs/<run_id>.json
+
+Usage:
+    store = BacktestStore()
+    run_id = store.save_run("scanner_v3", trades, equity_curve, config)
+    store.query_runs(where=[("max_drawdown_pct", "<", 8)], order_by="sharpe", limit=10)
+"""
+
+import json
+import math
+import hashlib
+import subprocess
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Any
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+REPO_DIR = SCRIPT_DIR.parent.parent.parent
+STORE_DIR = SCRIPT_DIR.parent / "analysis" / "backtest_runs"
+
+# Summary columns written for every run (fixed schema so all partitions unify)
+RUN_SCHEMA_FIELDS = [
+    ("run_id", "string"),
+    ("name", "string"),
+    ("created_at", "string"),
+    ("code_version", "string"),
+    ("config_hash", "string"),
+    ("starting_capital", "float64"),
+    ("ending_capital", "float64"),
+    ("total_trades", "int64"),
+    ("win_rate", "float64"),
+    ("total_pnl", "float64"),
+    ("total_return_pct", "float64"),
+    ("profit_factor", "float64"),
+    ("avg_r_multiple", "float64"),
+    ("max_drawdown_pct", "float64"),
+    ("sharpe", "float64"),
+]
+
+_OPERATORS = {
+    "==": lambda f, v: f == v,
+    "!=": lambda f, v: f != v,
+    "<": lambda f, v: f < v,
+    "<=": lambda f, v: f <= v,
+    ">": lambda f, v: f > v,
+    ">=": lambda f, v: f >= v,
+    "in": lambda f, v: f.isin(list(v)),
+}
+
+
+def get_code_version() -> str:
+    """Current git commit (with -dirty suffix), or 'unknown' outside a checkout."""
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                             capture_output=True, text=True, timeout=5).stdout.strip()
+        if not sha:
+            return "unknown"
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               cwd=REPO_DIR, capture_output=True, text=True, timeout=5).stdout.strip()
+        return f"{sha}-dirty" if dirty else sha
+    except Exception:
+        return "unknown"
+
+
+def config_hash(config: Dict) -> str:
+    """Stable short hash of a config dict — identical configs compare equal across runs."""
+    payload = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()[:12]
+
+
+def finite_rows(rows: List[Dict]) -> List[Dict]:
+    """Replace NaN / inf floats with None so rows serialise as strict JSON."""
+    return [{k: (None if isinstance(v, float) and not math.isfinite(v) else v)
+             for k, v in row.items()} for row in rows]
+
+
+def summarize_run(trades: List[Dict], equity_curve: List[Dict],
+                  starting_capital: float) -> Dict:
+    """
+    Compute the comparison metrics stored for every run.
+    Trades need a 'pnl' field; equity points need a 'capital' field.
+    profit_factor is None when the run has no losing trade.
+    """
+    pnls = [float(t.get("pnl", t.get("pnl_net", 0)) or 0) for t in trades]
+    total_trades = len(pnls)
+    winners = [p for p in pnls if p > 0]
+    losers = [p for p in pnls if p <= 0]
+
+    gross_profit = sum(winners)
+    gross_loss = abs(sum(losers))
+    # Undefined (stored as null) when nothing lost: inf is not valid JSON for the API
+    if gross_loss > 0:
+        profit_factor = gross_profit / gross_loss
+    else:
+        profit_factor = None if gross_profit > 0 else 0.0
+
+    capitals = [starting_capital] + [float(p["capital"]) for p in equity_curve if "capital" in p]
+    if len(capitals) == 1 and pnls:
+        running = starting_capital
+        for p in pnls:
+            running += p
+            capitals.append(running)
+    ending_capital = capitals[-1]
+
+    # Max drawdown on the equity curve
+    peak = capitals[0]
+    max_dd = 0.0
+    for c in capitals:
+        peak = max(peak, c)
+        if peak > 0:
+            max_dd = max(max_dd, (peak - c) / peak * 100)
+
+    # Per-step return Sharpe (not annualised — steps are trades, not days)
+    rets = [(capitals[i] - capitals[i - 1]) / capitals[i - 1]
+            for i in range(1, len(capitals)) if capitals[i - 1] > 0]
+    sharpe = 0.0
+    if len(rets) > 1:
+        mean = sum(rets) / len(rets)
+        std = math.sqrt(sum((r - mean) ** 2 for r in rets) / (len(rets) - 1))
+        sharpe = mean / std * math.sqrt(len(rets)) if std > 0 else 0.0
+
+    r_mults = [float(t["r_multiple"]) for t in trades if t.get("r_multiple") is not None]
+
+    return {
+        "starting_capital": float(starting_capital),
+        "ending_capital": float(ending_capital),
+        "total_trades": total_trades,
+        "win_rate": (len(winners) / total_trades * 100) if total_trades else 0.0,
+        "total_pnl": float(sum(pnls)),
+        "total_return_pct": ((ending_capital - starting_capital) / starting_capital * 100) if starting_capital else 0.0,
+        "profit_factor": profit_factor,
+        "avg_r_multiple": sum(r_mults) / len(r_mults) if r_mults else 0.0,
+        "max_drawdown_pct": max_dd,
+        "sharpe": sharpe,
+    }
+
+
+class BacktestStore:
+    """
+    Partitioned Parquet store for backtest runs.
+    Writes are one small file per table per run; queries push filters and
+    column projections down to pyarrow so only the summary columns that are
+    asked for are ever read.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        if pa is None:
+            raise ImportError("BacktestStore needs pyarrow: pip install pyarrow")
+        self.root = Path(root) if root else STORE_DIR
+        self.runs_dir = self.root / "runs"
+        self.trades_dir = self.root / "trades"
+        self.equity_dir = self.root / "equity"
+        self.configs_dir = self.root / "configs"
+        for d in (self.runs_dir, self.trades_dir, self.equity_dir, self.configs_dir):
+            d.mkdir(parents=True, exist_ok=True)
+        self._run_schema = pa.schema([(n, t) for n, t in RUN_SCHEMA_FIELDS])
+
+    # ── Writes ─────────────────────────────────────────────────
+
+    @staticmethod
+    def _partition(name: str, created: datetime) -> str:
+        safe = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in name)
+        return f"strategy={safe}/date={created.strftime('%Y-%m-%d')}"
+
+    @staticmethod
+    def _records_table(records: List[Dict], run_id: str) -> "pa.Table":
+        """Records → Arrow table; nested/mixed values are stored as strings."""
+        df = pd.DataFrame(records) if records else pd.DataFrame()
+        for col in df.columns:
+            if df[col].dtype == object:
+                df[col] = df[col].map(lambda v: v if v is None or isinstance(v, str)
+                                      else (v.isoformat() if hasattr(v, "isoformat") else
+                                            json.dumps(v, default=str) if isinstance(v, (dict, list)) else str(v)))
+        df.insert(0, "run_id", run_id)
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+    def save_run(self, name: str, trades: List[Dict], equity_curve: List[Dict],
+                 config: Dict, starting_capital: float = 100000,
+                 metrics: Optional[Dict] = None) -> str:
+        """
+        Persist one backtest run. Returns the new run_id.
+
+        Args:
+            name: Strategy / backtester name (partition key)
+            trades: Per-trade result dicts (needs 'pnl' or 'pnl_net')
+            equity_curve: Equity points (needs 'capital')
+            config: Parameters the run was executed with
+            starting_capital: Capital at the start of the run
+            metrics: Optional overrides for the computed summary metrics
+        """
+        created = datetime.now()
+        run_id = f"{created.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        partition = self._partition(name, created)
+
+        summary = summarize_run(trades, equity_curve, starting_capital)
+        if metrics:
+            summary.update({k: v for k, v in metrics.items() if k in summary})
+        summary.update({
+            "run_id": run_id,
+            "name": name,
+            "created_at": created.isoformat(),
+            "code_version": get_code_version(),
+            "config_hash": config_hash(config),
+        })
+        row = {n: [summary[n]] for n, _ in RUN_SCHEMA_FIELDS}
+
+        for base in (self.runs_dir, self.trades_dir, self.equity_dir):
+            (base / partition).mkdir(parents=True, exist_ok=True)
+
+        pq.write_table(self._records_table(trades, run_id), self.trades_dir / partition / f"{run_id}.parquet")
+        pq.write_table(self._records_table(equity_curve, run_id), self.equity_dir / partition / f"{run_id}.parquet")
+        with open(self.configs_dir / f"{run_id}.json", "w") as f:
+            json.dump({"run_id": run_id, "name": name, "partition": partition,
+                       "code_version": summary["code_version"], "config": config},
+                      f, indent=2, default=str)
+        # Summary row last: a run is only visible to queries once it is complete
+        pq.write_table(pa.Table.from_pydict(row, schema=self._run_schema),
+                       self.runs_dir / partition / f"{run_id}.parquet")
+
+        return run_id
+
+    # ── Queries ────────────────────────────────────────────────
+
+    def _runs_dataset(self) -> Optional["ds.Dataset"]:
+        if not any(self.runs_dir.rglob("*.parquet")):
+            return None
+        return ds.dataset(str(self.runs_dir), format="parquet", partitioning="hive")
+
+    @staticmethod
+    def _build_filter(where: Optional[List[Tuple[str, str, Any]]]):
+        expr = None
+        for column, op, value in where or []:
+            if op not in _OPERATORS:
+                raise ValueError(f"Unsupported operator '{op}' (use one of {list(_OPERATORS)})")
+            term = _OPERATORS[op](ds.field(column), value)
+            expr = term if expr is None else expr & term
+        return expr
+
+    def query_runs(self, where: Optional[List[Tuple[str, str, Any]]] = None,
+                   order_by: Optional[str] = None, descending: bool = True,
+                   limit: Optional[int] = None,
+                   columns: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Filter and rank runs by their summary metrics.
+
+        Example — top configs by Sharpe where max DD < 8%:
+            query_runs(where=[("max_drawdown_pct", "<", 8)], order_by="sharpe", limit=10)
+        """
+        dataset = self._runs_dataset()
+        if dataset is None:
+            return []
+
+        table = dataset.to_table(filter=self._build_filter(where), columns=columns)
+        if order_by:
+            table = table.sort_by([(order_by, "descending" if descending else "ascending")])
+        if limit is not None:
+            table = table.slice(0, limit)
+        return finite_rows(table.to_pylist())
+
+    def aggregate(self, group_by: str, metrics: Dict[str, str],
+                  where: Optional[List[Tuple[str, str, Any]]] = None) -> List[Dict]:
+        """
+        Aggregate run metrics across groups.
+
+        Example — mean Sharpe and run count per config:
+            aggregate("config_hash", {"sharpe": "mean", "run_id": "count"})
+        """
+        dataset = self._runs_dataset()
+        if dataset is None:
+            return []
+
+        needed = list({group_by, *metrics.keys()})
+        table = dataset.to_table(filter=self._build_filter(where), columns=needed)
+        result = table.group_by(group_by).aggregate([(col, fn) for col, fn in metrics.items()])
+        return finite_rows(result.to_pylist())
+
+    def _run_paths(self, run_id: str) -> Optional[Dict]:
+        config_file = self.configs_dir / f"{run_id}.json"
+        if not config_file.exists():
+            return None
+        with open(config_file) as f:
+            meta = json.load(f)
+        partition = meta["partition"]
+        return {
+            "meta": meta,
+            "summary": self.runs_dir / partition / f"{run_id}.parquet",
+            "trades": self.trades_dir / partition / f"{run_id}.parquet",
+            "equity": self.equity_dir / partition / f"{run_id}.parquet",
+        }
+
+    def get_run(self, run_id: str) -> Optional[Dict]:
+        """Summary metrics + config for one run."""
+        paths = self._run_paths(run_id)
+        if paths is None or not paths["summary"].exists():
+            return None
+        # finite_rows: runs saved before profit_factor was nulled still hold inf
+        summary = finite_rows(pq.read_table(paths["summary"]).to_pylist())[0]
+        summary["config"] = paths["meta"]["config"]
+        return summary
+
+    def get_trades(self, run_id: str) -> List[Dict]:
+        paths = self._run_paths(run_id)
+        if paths is None or not paths["trades"].exists():
+            return []
+        return finite_rows(pq.read_table(paths["trades"]).to_pylist())
+
+    def get_equity_curve(self, run_id: str) -> List[Dict]:
+        paths = self._run_paths(run_id)
+        if paths is None or not paths["equity"].exists():
+            return []
+        return finite_rows(pq.read_table(paths["equity"]).to_pylist())
+
+    def delete_run(self, run_id: str) -> bool:
+        paths = self._run_paths(run_id)
+        if paths is None:
+            return False
+        for key in ("summary", "trades", "equity"):
+            if paths[key].exists():
+                paths[key].unlink()
+        (self.configs_dir / f"{run_id}.json").unlink()
+        return True
+
+
+if __name__ == "__main__":
+    import sys
+
+    store = BacktestStore()
+    max_dd = float(sys.argv[1]) if len(sys.argv) > 1 else 8.0
+
+    print(f"\nTop runs by Sharpe (max DD < {max_dd}%)")
+    print("-" * 70)
+    for run in store.query_runs(where=[("max_drawdown_pct", "<", max_dd)],
+                                order_by="sharpe", limit=10):
+        print(f"{run['run_id']}  {run['name']:<20} Sharpe {run['sharpe']:>6.2f}  "
+              f"DD {run['max_drawdown_pct']:>5.2f}%  Return {run['total_return_pct']:>7.2f}%  "
+              f"[{run['config_hash']} @ {run['code_version']}]")
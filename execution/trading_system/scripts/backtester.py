@@ -10,6 +10,7 @@ import os
 import json
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple
+import numpy as np
 import pandas as pd
 
 # Add scripts to path
@@ -17,6 +18,7 @@ sys.path.insert(0, os.path.dirname(__file__))
 
 from market_scanner import MarketScanner
 from exit_manager import ExitManager
+from cost_tracker import evaluate_charges
 
 
 class Backtester:
@@ -163,6 +165,7 @@ class Backtester:
             exit_date = historical_data.iloc[-1]['timestamp']
 
         # Calculate P&L
+        qty_t1 = 0
         if exit_result.get('t1_hit'):
             # Partial exit occurred
             qty_t1 = position['quantity'] // 2
@@ -210,6 +213,10 @@ class Backtester:
             'setup_type': entry_signal['setup_type'],
             'pattern': entry_signal.get('setup_details', {}).get('pattern', 'unknown'),
             'partial_exit': exit_result.get('t1_hit', False),
+            't1_quantity': qty_t1,
+            't1_price': exit_result.get('t1_price'),
+            'direction': 1 if position['type'] == 'LONG' else -1,
+            'risk': risk,
             'win': total_pnl > 0
         }
 
@@ -301,29 +308,69 @@ class Backtester:
 
             self.all_trades.append(trade_result)
 
-            # Update capital
-            self.current_capital += trade_result['pnl']
-
-            # Track equity curve
-            self.equity_curve.append({
-                'trade_num': idx,
-                'capital': self.current_capital,
-                'pnl': trade_result['pnl'],
-                'pnl_pct': trade_result['pnl_pct']
-            })
-
             # Print result
             result_emoji = "✅" if trade_result['win'] else "❌"
             print(f"  {result_emoji} Exit: {trade_result['exit_reason']}")
-            print(f"     P&L: ₹{trade_result['pnl']:.2f} ({trade_result['pnl_pct']:.2f}%)")
-            print(f"     R Multiple: {trade_result['r_multiple']:.2f}R")
+            print(f"     Gross P&L: ₹{trade_result['pnl']:.2f} ({trade_result['pnl_pct']:.2f}%)")
             print(f"     Hold: {trade_result['hold_days']} days")
 
         print("\n" + "="*70)
 
+        # Charges for all trades at once, then capital and equity curve
+        self.apply_costs()
+
         # Phase 3: Calculate statistics
         return self.calculate_statistics()
 
+    def apply_costs(self):
+        """
+        Net every simulated trade of brokerage, DP and statutory charges in one
+        vectorized pass over its fills (entry, partial T1 exit, final exit) and
+        rebuild capital and the equity curve from the net P&L. Same-day round
+        trips are priced as intraday, the rest as delivery.
+        """
+        trades = self.all_trades
+        if not trades:
+            return
+
+        n = len(trades)
+        qty = np.array([t['quantity'] for t in trades], dtype=np.float64)
+        t1_qty = np.array([t['t1_quantity'] for t in trades], dtype=np.float64)
+        direction = np.array([t['direction'] for t in trades])
+        segment = np.where(np.array([t['hold_days'] for t in trades]) == 0, 'EQ_INTRADAY', 'EQ_DELIVERY')
+        trade_date = pd.to_datetime([t['entry_date'] for t in trades]).values.astype('datetime64[D]')
+        prices = {
+            'entry': np.array([t['entry_price'] for t in trades], dtype=np.float64),
+            't1': np.array([t['t1_price'] or 0.0 for t in trades], dtype=np.float64),
+            'exit': np.array([t['exit_price'] for t in trades], dtype=np.float64),
+        }
+
+        # One row per fill: entry, T1 partial (may be empty), final exit
+        leg_qty = np.concatenate([qty, t1_qty, qty - t1_qty])
+        leg_value = leg_qty * np.concatenate([prices['entry'], prices['t1'], prices['exit']])
+        leg_side = np.concatenate([direction, -direction, -direction])
+        charges = evaluate_charges(np.tile(segment, 3), leg_side, leg_value, trade_date=np.tile(trade_date, 3))
+        leg_total = np.where(leg_qty > 0, charges['total'], 0.0)
+        costs = np.bincount(np.tile(np.arange(n), 3), weights=leg_total, minlength=n)
+
+        self.current_capital = self.starting_capital
+        self.equity_curve = []
+        for idx, (trade, cost) in enumerate(zip(trades, costs), 1):
+            trade['pnl_gross'] = trade['pnl']
+            trade['costs'] = round(float(cost), 2)
+            trade['pnl'] = trade['pnl_gross'] - trade['costs']
+            trade['pnl_pct'] = (trade['pnl'] / self.position_size) * 100
+            trade['r_multiple'] = trade['pnl'] / trade['risk'] if trade['risk'] > 0 else 0
+            trade['win'] = trade['pnl'] > 0
+
+            self.current_capital += trade['pnl']
+            self.equity_curve.append({
+                'trade_num': idx,
+                'capital': self.current_capital,
+                'pnl': trade['pnl'],
+                'pnl_pct': trade['pnl_pct']
+            })
+
     def calculate_statistics(self) -> Dict:
         """
         Calculate comprehensive backtest statistics
@@ -406,6 +453,7 @@ class Backtester:
             },
             'returns': {
                 'total_pnl': total_pnl,
+                'total_costs': sum(t.get('costs', 0) for t in self.all_trades),
                 'total_return_pct': ((self.current_capital - self.starting_capital) / self.starting_capital) * 100,
                 'avg_win': avg_win,
                 'avg_loss': avg_loss,
@@ -425,6 +473,25 @@ class Backtester:
 
         return stats
 
+    def record_run(self, name: str = 'scanner_v3', params: Dict = None) -> str:
+        """
+        Persist this run (trades, equity curve, config, code version) to the
+        columnar backtest store so it can be compared against past runs.
+        """
+        from backtest_store import BacktestStore
+
+        config = {'trading_rules': self.config, 'position_size': self.position_size}
+        if params:
+            config['params'] = params
+
+        return BacktestStore().save_run(
+            name=name,
+            trades=self.all_trades,
+            equity_curve=self.equity_curve,
+            config=config,
+            starting_capital=self.starting_capital
+        )
+
     def print_report(self, stats: Dict):
         """
         Print formatted backtest report
@@ -448,7 +515,7 @@ class Backtester:
         print("\n💰 RETURNS")
         print("-"*70)
         ret = stats['returns']
-        print(f"Total P&L:       ₹{ret['total_pnl']:,.2f}")
+        print(f"Total P&L:       ₹{ret['total_pnl']:,.2f} (after ₹{ret.get('total_costs', 0):,.2f} charges)")
         print(f"Total Return:    {ret['total_return_pct']:.2f}%")
         print(f"Avg Win:         ₹{ret['avg_win']:,.2f}")
         print(f"Avg Loss:        ₹{ret['avg_loss']:,.2f}")
@@ -544,3 +611,10 @@ if __name__ == '__main__':
         json.dump(stats, f, indent=2, default=str)
 
     print(f"\n💾 Results saved to: {output_file}\n")
+
+    if backtester.all_trades:
+        try:
+            run_id = backtester.record_run(params={'symbols': test_symbols, 'days': 90, 'score_threshold': 75})
+            print(f"🗄️  Run stored in backtest store: {run_id}\n")
+        except ImportError as e:
+            print(f"⚠️  Backtest store unavailable: {e}\n")
@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+"""
+CORRELATION ENGINE — Rolling Correlations and Betas Across the Universe
+Daily log-returns for the F&O universe, the index underlyings and the global
+tickers (kelly_system GLOBAL_TICKERS + S&P 500) held in a ring buffer, with
+pairwise running sums kept alongside:
+
+    N[i, j]    days where both i and j have a return
+    SX[i, j]   sum of x_i over those days
+    SXX[i, j]  sum of x_i^2 over those days
+    SXY[i, j]  sum of x_i * x_j
+
+A new bar adds one outer product and the bar leaving the window subtracts
+one, so an update is O(n^2) instead of O(n^2 * window). Pairwise counts keep
+names with different calendars (US holidays, suspensions) comparable.
+
+Global closes are aligned to the last US close *before* each Indian session,
+so "SP500 on Feb 03" is the US move Nifty reacted to that morning.
+
+Layout:
+    .tmp/correlation_state.npz      ring buffer + last closes (engine state)
+    .tmp/live_correlations.json     published matrix, betas, clusters, global view
+
+Usage:
+    python3 execution/trading_system/scripts/correlation_engine.py            # update (backfill on first run)
+    python3 execution/trading_system/scripts/correlation_engine.py backfill   # rebuild from one year of history
+"""
+
+import json
+import os
+import re
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+EXECUTION_DIR = SCRIPT_DIR.parent.parent
+ROOT_DIR = EXECUTION_DIR.parent
+sys.path.insert(0, str(ROOT_DIR))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from option_pricing import parse_option_symbol
+
+DATA_DIR = ROOT_DIR / ".tmp"
+STATE_FILE = DATA_DIR / "correlation_state.npz"
+CORRELATION_FILE = DATA_DIR / "live_correlations.json"
+
+CORRELATION_WINDOW = 60          # trading days
+MIN_PERIODS = 20                 # pairs with fewer common days report no correlation
+CLUSTER_THRESHOLD = 0.7
+BENCHMARK = "NIFTY"
+TRADING_DAYS = 252
+
+INDEX_TICKERS = {"NIFTY": "^NSEI", "BANKNIFTY": "^NSEBANK", "FINNIFTY": "NIFTY_FIN_SERVICE.NS"}
+EXTRA_GLOBAL_TICKERS = {"SP500": "^GSPC"}
+
+# Tick / quote names that refer to an index underlying
+_INDEX_ALIASES = {"NIFTY 50": "NIFTY", "NIFTY BANK": "BANKNIFTY", "NIFTY FIN SERVICE": "FINNIFTY"}
+
+
+def default_universe() -> Dict[str, Dict[str, str]]:
+    """{group: {name: yfinance ticker}} — F&O stocks, index underlyings, global markets."""
+    from kelly_system.config import GLOBAL_TICKERS
+    from market_scanner import UNIVERSE_FNO
+    return {
+        "fno": dict(UNIVERSE_FNO),
+        "index": dict(INDEX_TICKERS),
+        "global": {**GLOBAL_TICKERS, **EXTRA_GLOBAL_TICKERS},
+    }
+
+
+_FUTURE_RE = re.compile(r"^(?P<name>[A-Z&\-]+?)\d{2}[A-Z]{3}FUT$")
+
+
+def correlation_name(symbol: str) -> str:
+    """Engine name for a position / tick symbol: options and futures map to their underlying."""
+    symbol = symbol.upper()
+    if symbol in _INDEX_ALIASES:
+        return _INDEX_ALIASES[symbol]
+    parsed = parse_option_symbol(symbol)
+    if parsed:
+        return parsed["underlying"]
+    future = _FUTURE_RE.match(symbol)
+    return future["name"] if future else symbol
+
+
+def position_direction(symbol: str, quantity: float) -> int:
+    """+1 if the position gains when its underlying rises, -1 if it loses (short, or long put)."""
+    sign = 1 if quantity >= 0 else -1
+    parsed = parse_option_symbol(symbol)
+    return -sign if parsed and not parsed["is_call"] else sign
+
+
+def fetch_daily_closes(tickers: Dict[str, str], groups: Dict[str, str],
+                       period: Optional[str] = "1y", start: Optional[str] = None) -> pd.DataFrame:
+    """
+    Daily closes (yfinance) for {name: ticker} on Indian session dates, one
+    column per name. Names in the "global" group are the last US close before
+    each session, NaN when there was no new US session since the previous one.
+    """
+    import yfinance as yf
+
+    if start:
+        raw = yf.download(list(tickers.values()), start=start, interval="1d",
+                          group_by="ticker", progress=False)
+    else:
+        raw = yf.download(list(tickers.values()), period=period, interval="1d",
+                          group_by="ticker", progress=False)
+    if raw.empty:
+        return pd.DataFrame()
+
+    series = {}
+    for name, ticker in tickers.items():
+        try:
+            close = (raw[ticker]["Close"] if isinstance(raw.columns, pd.MultiIndex)
+                     else raw["Close"]).dropna()
+        except KeyError:
+            continue
+        close.index = pd.to_datetime(close.index).tz_localize(None).normalize()
+        series[name] = close
+
+    local = [s for name, s in series.items() if groups.get(name) != "global"]
+    if not local:
+        return pd.DataFrame()
+    sessions = pd.DatetimeIndex(sorted(set().union(*(s.index for s in local))))
+
+    frame = pd.DataFrame(index=sessions)
+    for name, close in series.items():
+        if groups.get(name) != "global":
+            frame[name] = close.reindex(sessions)
+            continue
+        # Available to an Indian session only after the US close of an earlier date
+        shifted = pd.Series(close.values, index=close.index + pd.Timedelta(days=1))
+        stamp = pd.Series(close.index, index=shifted.index)
+        aligned = shifted.reindex(sessions, method="ffill")
+        fresh = stamp.reindex(sessions, method="ffill")
+        aligned[fresh.duplicated()] = np.nan
+        frame[name] = aligned
+    frame.index = frame.index.strftime("%Y-%m-%d")
+    return frame
+
+
+# ══════════════════════════════════════════════════════════════════
+# Rolling Moments
+# ══════════════════════════════════════════════════════════════════
+
+class RollingCorrelation:
+    """Pairwise rolling moments of a return vector, updated one bar at a time."""
+
+    def __init__(self, n: int, window: int = CORRELATION_WINDOW):
+        self.n = n
+        self.window = window
+        self.returns = np.full((window, n), np.nan)
+        self.pos = 0            # next slot to write
+        self.count = 0          # bars in the window
+        self.pushes = 0
+        self._zero()
+
+    def _zero(self):
+        n = self.n
+        self.N = np.zeros((n, n))
+        self.SX = np.zeros((n, n))
+        self.SXX = np.zeros((n, n))
+        self.SXY = np.zeros((n, n))
+
+    def _fold(self, row: np.ndarray, sign: float):
+        valid = ~np.isnan(row)
+        x = np.where(valid, row, 0.0)
+        v = valid.astype(float)
+        self.N += sign * np.outer(v, v)
+        self.SX += sign * np.outer(x, v)
+        self.SXX += sign * np.outer(x * x, v)
+        self.SXY += sign * np.outer(x, x)
+
+    def push(self, row: np.ndarray):
+        """Add one bar of returns (NaN = no bar for that name), dropping the oldest if full."""
+        if self.count == self.window:
+            self._fold(self.returns[self.pos], -1.0)
+        else:
+            self.count += 1
+        self.returns[self.pos] = row
+        self._fold(self.returns[self.pos], +1.0)
+        self.pos = (self.pos + 1) % self.window
+        self.pushes += 1
+        # Add/subtract leaves rounding residue: rebuild once per window
+        if self.pushes % self.window == 0:
+            self.rebuild()
+
+    def rebuild(self):
+        """Sums from scratch over the buffer."""
+        self._zero()
+        for row in self.ordered():
+            self._fold(row, +1.0)
+
+    def ordered(self) -> np.ndarray:
+        """Returns in the window, oldest first."""
+        if self.count < self.window:
+            return self.returns[:self.count]
+        return np.roll(self.returns, -self.pos, axis=0)
+
+    def _centered(self):
+        # V[i, j]: N * sum(x_i^2) - sum(x_i)^2 over days common to i and j
+        cov = self.N * self.SXY - self.SX * self.SX.T
+        V = self.N * self.SXX - self.SX ** 2
+        return cov, V
+
+    def correlation(self, min_periods: int = MIN_PERIODS) -> np.ndarray:
+        cov, V = self._centered()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = cov / np.sqrt(V * V.T)
+        corr[(self.N < min_periods) | ~np.isfinite(corr)] = np.nan
+        np.fill_diagonal(corr, np.where(np.diag(self.N) >= min_periods, 1.0, np.nan))
+        return np.clip(corr, -1.0, 1.0)
+
+    def beta(self, benchmark: int, min_periods: int = MIN_PERIODS) -> np.ndarray:
+        """Beta of every name to column `benchmark` over their common days."""
+        cov, V = self._centered()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            beta = cov[:, benchmark] / V[benchmark, :]
+        beta[(self.N[:, benchmark] < min_periods) | ~np.isfinite(beta)] = np.nan
+        return beta
+
+    def volatility(self, min_periods: int = MIN_PERIODS) -> np.ndarray:
+        """Annualised volatility per name."""
+        n = np.diag(self.N)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var = (np.diag(self.SXX) - np.diag(self.SX) ** 2 / n) / (n - 1)
+        vol = np.sqrt(np.maximum(var, 0.0) * TRADING_DAYS)
+        vol[n < min_periods] = np.nan
+        return vol
+
+
+# ══════════════════════════════════════════════════════════════════
+# Engine
+# ══════════════════════════════════════════════════════════════════
+
+class CorrelationEngine:
+    """Named universe on top of RollingCorrelation: daily bars in, matrix / betas / clusters out."""
+
+    def __init__(self, universe: Optional[Dict[str, Dict[str, str]]] = None,
+                 window: int = CORRELATION_WINDOW, state_file: Path = STATE_FILE):
+        self.universe = universe or default_universe()
+        self.names: List[str] = []
+        self.tickers: Dict[str, str] = {}
+        self.groups: Dict[str, str] = {}
+        for group, members in self.universe.items():
+            for name, ticker in members.items():
+                if name not in self.tickers:
+                    self.names.append(name)
+                    self.tickers[name] = ticker
+                    self.groups[name] = group
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.window = window
+        self.state_file = Path(state_file)
+        self.reset()
+
+    def reset(self):
+        n = len(self.names)
+        self.rolling = RollingCorrelation(n, self.window)
+        self.closes = np.full((self.window, n), np.nan)    # aligned closes, same ring as returns
+        self.dates: List[str] = []
+        self.last_close = np.full(n, np.nan)
+        self.last_date: Optional[str] = None
+
+    # ── Bars ──
+
+    def on_bar(self, date: str, closes: Dict[str, float]) -> bool:
+        """Fold one day's closes (missing names = no bar). Returns False for an old date."""
+        if self.last_date is not None and date <= self.last_date:
+            return False
+        row = np.full(len(self.names), np.nan)
+        for name, close in closes.items():
+            i = self.index.get(name)
+            if i is not None and close and np.isfinite(close) and close > 0:
+                row[i] = close
+        with np.errstate(invalid="ignore", divide="ignore"):
+            returns = np.log(row / self.last_close)
+        self.closes[self.rolling.pos] = row
+        self.rolling.push(returns)
+        self.last_close = np.where(np.isnan(row), self.last_close, row)
+        self.last_date = date
+        self.dates = (self.dates + [date])[-self.window:]
+        return True
+
+    def on_frame(self, frame: pd.DataFrame) -> int:
+        """on_bar for every row (index = date) of an aligned closes frame. Returns bars added."""
+        added = 0
+        for date, row in zip(frame.index, frame.to_numpy(dtype=float)):
+            closes = {name: row[k] for k, name in enumerate(frame.columns) if not np.isnan(row[k])}
+            added += self.on_bar(str(date)[:10], closes)
+        return added
+
+    # ── History ──
+
+    def fetch_closes(self, period: str = "1y") -> pd.DataFrame:
+        return fetch_daily_closes(self.tickers, self.groups, period=period)
+
+    def backfill(self, period: str = "1y") -> int:
+        self.reset()
+        return self.on_frame(self.fetch_closes(period))
+
+    def refresh(self, period: str = "1mo") -> int:
+        """Fold in the sessions since the last bar (backfills on an empty engine)."""
+        if self.last_date is None:
+            return self.backfill()
+        frame = self.fetch_closes(period)
+        return self.on_frame(frame[frame.index > self.last_date]) if not frame.empty else 0
+
+    # ── State ──
+
+    def save(self):
+        self.state_file.parent.mkdir(exist_ok=True)
+        tmp = self.state_file.with_name(self.state_file.stem + ".tmp.npz")
+        r = self.rolling
+        np.savez(tmp, names=np.array(self.names), returns=r.returns, closes=self.closes,
+                 pos=r.pos, count=r.count, pushes=r.pushes, last_close=self.last_close,
+                 dates=np.array(self.dates), last_date=np.array(self.last_date or ""))
+        os.replace(tmp, self.state_file)
+
+    def load(self) -> bool:
+        """Restore a saved state for the same universe and window. Returns True if restored."""
+        try:
+            with np.load(self.state_file) as state:
+                if list(state["names"]) != self.names or state["returns"].shape[0] != self.window:
+                    return False
+                r = self.rolling
+                r.returns = state["returns"]
+                r.pos, r.count, r.pushes = int(state["pos"]), int(state["count"]), int(state["pushes"])
+                self.closes = state["closes"]
+                self.last_close = state["last_close"]
+                self.dates = [str(d) for d in state["dates"]]
+                self.last_date = str(state["last_date"]) or None
+        except (OSError, KeyError, ValueError):
+            return False
+        self.rolling.rebuild()
+        return True
+
+    # ── Views ──
+
+    def correlation(self, a: str, b: str) -> Optional[float]:
+        i, j = self.index.get(correlation_name(a)), self.index.get(correlation_name(b))
+        if i is None or j is None:
+            return None
+        value = self.rolling.correlation()[i, j]
+        return None if np.isnan(value) else float(value)
+
+    def clusters(self, threshold: float = CLUSTER_THRESHOLD, corr: Optional[np.ndarray] = None) -> List[List[str]]:
+        """Groups of names linked by pairwise correlation >= threshold (single linkage)."""
+        corr = self.rolling.correlation() if corr is None else corr
+        parent = list(range(len(self.names)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        upper = np.triu(np.nan_to_num(corr, nan=0.0) >= threshold, k=1)
+        for i, j in zip(*np.nonzero(upper)):
+            parent[find(i)] = find(j)
+        groups: Dict[int, List[str]] = {}
+        for i, name in enumerate(self.names):
+            groups.setdefault(find(i), []).append(name)
+        return sorted((g for g in groups.values() if len(g) > 1), key=len, reverse=True)
+
+    def global_view(self, benchmark: str = BENCHMARK, days: Optional[int] = None) -> Dict:
+        """Benchmark vs each global market: rolling correlation, betas and the daily rows behind them."""
+        b = self.index[benchmark]
+        corr = self.rolling.correlation()
+        cov, V = self.rolling._centered()
+        markets = [n for n in self.names if self.groups[n] == "global"]
+        returns, closes = self.rolling.ordered(), self._ordered_closes()
+
+        rows = []
+        for k in range(max(0, len(self.dates) - (days or self.window)), len(self.dates)):
+            row = {"date": self.dates[k], "close": {}, "change_pct": {}}
+            for name in [benchmark] + markets:
+                i = self.index[name]
+                if not np.isnan(closes[k, i]):
+                    row["close"][name] = round(float(closes[k, i]), 2)
+                if not np.isnan(returns[k, i]):
+                    row["change_pct"][name] = round(float(np.expm1(returns[k, i]) * 100), 2)
+            rows.append(row)
+
+        out = {}
+        for name in markets:
+            g = self.index[name]
+            enough = self.rolling.N[b, g] >= MIN_PERIODS
+            with np.errstate(invalid="ignore", divide="ignore"):
+                out[name] = {
+                    "ticker": self.tickers[name],
+                    "correlation": _round(corr[b, g]),
+                    # benchmark move per unit move of the market, and the reverse
+                    "benchmark_beta": _round(cov[b, g] / V[g, b]) if enough else None,
+                    "market_beta": _round(cov[g, b] / V[b, g]) if enough else None,
+                    "days": int(self.rolling.N[b, g]),
+                }
+        return {"benchmark": benchmark, "markets": out, "rows": rows}
+
+    def _ordered_closes(self) -> np.ndarray:
+        r = self.rolling
+        return self.closes[:r.count] if r.count < r.window else np.roll(self.closes, -r.pos, axis=0)
+
+    def snapshot(self, threshold: float = CLUSTER_THRESHOLD) -> Dict:
+        corr = self.rolling.correlation()
+        beta = self.rolling.beta(self.index[BENCHMARK]) if BENCHMARK in self.index else None
+        vol = self.rolling.volatility()
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "as_of": self.last_date,
+            "window": self.window,
+            "bars": self.rolling.count,
+            "names": self.names,
+            "groups": self.groups,
+            "matrix": [[_round(v, 3) for v in row] for row in corr],
+            "beta": {n: _round(beta[i]) for i, n in enumerate(self.names)} if beta is not None else {},
+            "volatility": {n: _round(vol[i]) for i, n in enumerate(self.names)},
+            "cluster_threshold": threshold,
+            "clusters": self.clusters(threshold, corr),
+            "global": self.global_view() if BENCHMARK in self.index else {},
+        }
+
+    def publish(self, path: Path = CORRELATION_FILE) -> Dict:
+        snapshot = self.snapshot()
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp, path)
+        return snapshot
+
+
+def _round(value, digits: int = 4) -> Optional[float]:
+    return None if value is None or np.isnan(value) else round(float(value), digits)
+
+
+# ══════════════════════════════════════════════════════════════════
+# Reader
+# ══════════════════════════════════════════════════════════════════
+
+class CorrelationSnapshots:
+    """Read side of live_correlations.json, re-parsed only when the file changes."""
+
+    def __init__(self, path: Path = CORRELATION_FILE):
+        self.path = Path(path)
+        self._mtime = None
+        self._data: Dict = {}
+        self._index: Dict[str, int] = {}
+
+    def load(self) -> Dict:
+        try:
+            mtime = self.path.stat().st_mtime
+        except OSError:
+            return {}
+        if mtime != self._mtime:
+            try:
+                with open(self.path) as f:
+                    self._data = json.load(f)
+            except (OSError, ValueError):
+                return self._data
+            self._mtime = mtime
+            self._index = {n: i for i, n in enumerate(self._data.get("names", []))}
+        return self._data
+
+    def correlation(self, a: str, b: str) -> Optional[float]:
+        data = self.load()
+        i, j = self._index.get(correlation_name(a)), self._index.get(correlation_name(b))
+        if i is None or j is None:
+            return None
+        return data["matrix"][i][j]
+
+    def submatrix(self, symbols: List[str]) -> Dict:
+        """{names, matrix} restricted to the given symbols (in order, unknown ones dropped)."""
+        data = self.load()
+        names = [n for n in dict.fromkeys(correlation_name(s) for s in symbols) if n in self._index]
+        idx = [self._index[n] for n in names]
+        return {"names": names, "matrix": [[data["matrix"][i][j] for j in idx] for i in idx]}
+
+
+_snapshots = None
+
+
+def get_snapshots() -> CorrelationSnapshots:
+    """Process-wide CorrelationSnapshots (shares its parsed-file cache)."""
+    global _snapshots
+    if _snapshots is None:
+        _snapshots = CorrelationSnapshots()
+    return _snapshots
+
+
+def main():
+    mode = sys.argv[1] if len(sys.argv) > 1 else "update"
+    engine = CorrelationEngine()
+    if mode == "backfill" or not engine.load():
+        print(f"[CORR] Backfilling {len(engine.names)} names...")
+        added = engine.backfill()
+    else:
+        added = engine.refresh()
+    engine.save()
+    snapshot = engine.publish()
+    print(f"[CORR] +{added} bars, as of {snapshot['as_of']} ({snapshot['bars']}/{engine.window} in window)")
+    for cluster in snapshot["clusters"][:10]:
+        print(f"   cluster: {', '.join(cluster)}")
+    for name, m in snapshot["global"].get("markets", {}).items():
+        print(f"   {BENCHMARK} vs {name:<11} rho={m['correlation']}  beta={m['benchmark_beta']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,163 @@
 """
 COST TRACKER - Real-time trading cost monitoring
 Tracks all Zerodha charges and ensures profitability after costs
+
+Charges follow a versioned schedule per segment (equity delivery, equity
+intraday, F&O futures, F&O options): brokerage, STT, exchange transaction
+charges, SEBI turnover fee, stamp duty and GST. evaluate_charges() prices whole
+arrays of fills in one call (backtests, tradebook reconciliation);
+calculate_trade_cost() is the single-trade view of the same schedule.
 """
 
 import json
-from datetime import datetime
-from typing import Dict, List
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+SEGMENTS = ('EQ_DELIVERY', 'EQ_INTRADAY', 'FUTURES', 'OPTIONS')
+PRODUCT_SEGMENTS = {'CNC': 'EQ_DELIVERY', 'MIS': 'EQ_INTRADAY', 'NRML': 'FUTURES'}
+CHARGE_COMPONENTS = ('brokerage', 'stt', 'exchange_txn', 'sebi', 'stamp_duty', 'gst', 'dp_charge')
+
+GST_RATE = 0.18
+SEBI_PER_CRORE = 10.0
+
+# Zerodha / NSE schedule. Rates are fractions of turnover (premium for options);
+# brokerage is min(brokerage_max, brokerage_pct * order value), flat when pct is None.
+# Add a new entry (never edit an old one) when rates change, so historical fills
+# keep the charges that applied on their trade date.
+CHARGE_SCHEDULES = [
+    {
+        'effective_from': '2000-01-01',
+        'EQ_DELIVERY': {'brokerage_pct': 0.0, 'brokerage_max': 0.0, 'stt_buy': 0.001, 'stt_sell': 0.001,
+                        'exchange_txn': 0.0000322, 'stamp_buy': 0.00015},
+        'EQ_INTRADAY': {'brokerage_pct': 0.0003, 'brokerage_max': 20.0, 'stt_buy': 0.0, 'stt_sell': 0.00025,
+                        'exchange_txn': 0.0000322, 'stamp_buy': 0.00003},
+        'FUTURES': {'brokerage_pct': 0.0003, 'brokerage_max': 20.0, 'stt_buy': 0.0, 'stt_sell': 0.000125,
+                    'exchange_txn': 0.000019, 'stamp_buy': 0.00002},
+        'OPTIONS': {'brokerage_pct': None, 'brokerage_max': 20.0, 'stt_buy': 0.0, 'stt_sell': 0.000625,
+                    'exchange_txn': 0.000495, 'stamp_buy': 0.00003},
+    },
+    {
+        # STT on F&O raised (Finance Act 2024); NSE moved to flat transaction charges
+        'effective_from': '2024-10-01',
+        'EQ_DELIVERY': {'brokerage_pct': 0.0, 'brokerage_max': 0.0, 'stt_buy': 0.001, 'stt_sell': 0.001,
+                        'exchange_txn': 0.0000297, 'stamp_buy': 0.00015},
+        'EQ_INTRADAY': {'brokerage_pct': 0.0003, 'brokerage_max': 20.0, 'stt_buy': 0.0, 'stt_sell': 0.00025,
+                        'exchange_txn': 0.0000297, 'stamp_buy': 0.00003},
+        'FUTURES': {'brokerage_pct': 0.0003, 'brokerage_max': 20.0, 'stt_buy': 0.0, 'stt_sell': 0.0002,
+                    'exchange_txn': 0.0000173, 'stamp_buy': 0.00002},
+        'OPTIONS': {'brokerage_pct': None, 'brokerage_max': 20.0, 'stt_buy': 0.0, 'stt_sell': 0.001,
+                    'exchange_txn': 0.0003503, 'stamp_buy': 0.00003},
+    },
+]
+
+_RATE_FIELDS = ('brokerage_pct', 'brokerage_max', 'stt_buy', 'stt_sell', 'exchange_txn', 'stamp_buy')
+
+
+def _rate_tables(schedules: List[Dict]):
+    """Effective dates and {field: array[version, segment]} (NaN brokerage_pct = flat)."""
+    ordered = sorted(schedules, key=lambda s: s['effective_from'])
+    starts = np.array([s['effective_from'] for s in ordered], dtype='datetime64[D]')
+    tables = {}
+    for field in _RATE_FIELDS:
+        tables[field] = np.array([
+            [np.nan if s[seg][field] is None else s[seg][field] for seg in SEGMENTS]
+            for s in ordered
+        ], dtype=np.float64)
+    return starts, tables
+
+
+_SCHEDULE_STARTS, _RATE_TABLES = _rate_tables(CHARGE_SCHEDULES)
+
+
+def schedule_for(trade_date=None) -> Dict:
+    """The schedule entry in force on trade_date (today if None)."""
+    day = np.datetime64(trade_date or date.today(), 'D')
+    ordered = sorted(CHARGE_SCHEDULES, key=lambda s: s['effective_from'])
+    return ordered[max(0, int(np.searchsorted(_SCHEDULE_STARTS, day, side='right')) - 1)]
+
+
+def evaluate_charges(segment, side, value, order_value=None, dp=None, trade_date=None) -> Dict[str, np.ndarray]:
+    """
+    Vectorized charges for arrays of fills (scalars broadcast).
+
+    Args:
+        segment: SEGMENTS name(s) or index(es) into SEGMENTS
+        side: +1 / 'buy' for buys, -1 / 'sell' for sells (any case)
+        value: turnover per fill (price x quantity; premium for options)
+        order_value: turnover of the order each fill belongs to, for the
+            per-order brokerage cap (defaults to value: one fill per order)
+        dp: DP charge flags; defaults to every delivery sell
+        trade_date: date(s) selecting the schedule version (today if None)
+
+    Returns:
+        {component: array} for CHARGE_COMPONENTS plus 'total'. Amounts are not
+        rounded per contract note, so totals can differ from the broker's by paise.
+    """
+    value = np.asarray(value, dtype=np.float64)
+    seg = np.asarray(segment)
+    if seg.dtype.kind in 'US':
+        # SEGMENTS is sorted, so names map to indexes by binary search
+        names = seg
+        seg = np.minimum(np.searchsorted(SEGMENTS, names), len(SEGMENTS) - 1)
+        if not np.all(np.asarray(SEGMENTS)[seg] == names):
+            raise ValueError(f"Unknown segment in {np.unique(names)}; expected one of {SEGMENTS}")
+    seg = seg.astype(np.intp)
+    side = np.asarray(side)
+    if side.dtype.kind in 'US':
+        # Kite spells transaction_type 'BUY' / 'SELL'
+        side = np.char.lower(side.astype(str))
+        if not np.all((side == 'buy') | (side == 'sell')):
+            raise ValueError(f"Unknown side in {np.unique(side)}; expected 'buy' or 'sell'")
+        is_buy = side == 'buy'
+    else:
+        is_buy = side > 0
+    order_value = value if order_value is None else np.asarray(order_value, dtype=np.float64)
+
+    day = np.asarray(date.today() if trade_date is None else trade_date, dtype='datetime64[D]')
+    ver = np.maximum(np.searchsorted(_SCHEDULE_STARTS, day, side='right') - 1, 0)
+    rate = {field: table[ver, seg] for field, table in _RATE_TABLES.items()}
+
+    # Brokerage per order, allocated to the order's fills by value
+    flat = np.isnan(rate['brokerage_pct'])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        per_order = np.where(flat, rate['brokerage_max'],
+                             np.minimum(rate['brokerage_max'], np.nan_to_num(rate['brokerage_pct']) * order_value))
+        brokerage = np.where(order_value > 0, per_order * value / order_value, 0.0)
+
+    stt = value * np.where(is_buy, rate['stt_buy'], rate['stt_sell'])
+    exchange_txn = value * rate['exchange_txn']
+    sebi = value * (SEBI_PER_CRORE / 1e7)
+    stamp_duty = np.where(is_buy, value * rate['stamp_buy'], 0.0)
+    gst = GST_RATE * (brokerage + exchange_txn + sebi)
+
+    if dp is None:
+        dp = (seg == SEGMENTS.index('EQ_DELIVERY')) & ~is_buy
+    dp_charge = np.where(dp, CostTracker.DP_CHARGE_PER_SELL, 0.0)
+
+    charges = {
+        'brokerage': brokerage, 'stt': stt, 'exchange_txn': exchange_txn, 'sebi': sebi,
+        'stamp_duty': stamp_duty, 'gst': gst, 'dp_charge': dp_charge,
+    }
+    shape = np.broadcast(value, seg, is_buy, order_value, ver).shape
+    charges = {k: np.broadcast_to(v, shape).astype(np.float64) for k, v in charges.items()}
+    charges['total'] = sum(charges.values())
+    return charges
+
+
+def round_trip_charges(segment, quantity, entry_price, exit_price, direction=1,
+                       trade_date=None) -> np.ndarray:
+    """
+    Total charges of open + close for arrays of round trips (one order per leg).
+    direction: +1 long (buy then sell), -1 short (sell then buy).
+    """
+    quantity = np.asarray(quantity, dtype=np.float64)
+    direction = np.asarray(direction)
+    entry = evaluate_charges(segment, direction, quantity * np.asarray(entry_price), trade_date=trade_date)
+    exit_ = evaluate_charges(segment, -direction, quantity * np.asarray(exit_price), trade_date=trade_date)
+    total = entry['total'] + exit_['total']
+    return total if total.ndim else float(total)
 
 
 class CostTracker:
@@ -29,6 +181,7 @@ class CostTracker:
             'brokerage': 0.0,
             'auto_squareoff': 0.0,
             'pledge_charges': 0.0,
+            'statutory': 0.0,
             'other': 0.0,
             'total': 0.0
         }
@@ -39,7 +192,7 @@ class CostTracker:
         try:
             with open(journal_path, 'r') as f:
                 data = json.load(f)
-                self.session_costs = data.get('session_costs', self.session_costs)
+                self.session_costs.update(data.get('session_costs', {}))
                 self.trade_count = data.get('trade_count', 0)
                 self.transactions = data.get('transactions', [])
         except FileNotFoundError:
@@ -50,46 +203,39 @@ class CostTracker:
                             product_type: str,
                             value: float,
                             quantity: int,
-                            is_auto_squareoff: bool = False) -> Dict:
+                            is_auto_squareoff: bool = False,
+                            segment: Optional[str] = None,
+                            trade_date=None) -> Dict:
         """
         Calculate costs for a trade
 
         Args:
             trade_type: 'buy' or 'sell'
             product_type: 'CNC' (delivery), 'MIS' (intraday), 'NRML' (F&O)
-            value: Trade value (price × quantity)
+            value: Trade value (price × quantity; premium × quantity for options)
             quantity: Number of shares
             is_auto_squareoff: Whether this was forced auto square-off
+            segment: Schedule segment override, e.g. 'OPTIONS' for NRML option orders
+            trade_date: Selects the charge schedule version (today if None)
 
         Returns:
-            Dict with cost breakdown
+            Dict with cost breakdown (brokerage, dp_charge, statutory levies, total)
         """
 
-        costs = {
-            'brokerage': 0.0,
-            'dp_charge': 0.0,
-            'auto_squareoff': 0.0,
-            'total': 0.0
-        }
-
-        # DP charges - ONLY on delivery sells
-        if trade_type == 'sell' and product_type == 'CNC':
-            costs['dp_charge'] = self.DP_CHARGE_PER_SELL
-
-        # Brokerage - ONLY on intraday (MIS)
-        # Zerodha: ₹0 for delivery, ₹20 or 0.03% for intraday
-        if product_type == 'MIS':
-            brokerage = min(20, value * 0.0003)  # ₹20 or 0.03%, whichever is lower
-            costs['brokerage'] = round(brokerage, 2)
+        segment = segment or PRODUCT_SEGMENTS.get(product_type, 'EQ_DELIVERY')
+        charges = evaluate_charges(segment, trade_type, value, trade_date=trade_date)
+        costs = {name: round(float(charges[name]), 2) for name in CHARGE_COMPONENTS}
 
         # Auto square-off penalty
+        costs['auto_squareoff'] = 0.0
         if is_auto_squareoff:
             if product_type == 'MIS':
                 costs['auto_squareoff'] = self.AUTO_SQUAREOFF_MIS
             else:
                 costs['auto_squareoff'] = self.AUTO_SQUAREOFF_NRML
 
-        costs['total'] = sum(costs.values())
+        costs['statutory'] = round(sum(costs[k] for k in ('stt', 'exchange_txn', 'sebi', 'stamp_duty', 'gst')), 2)
+        costs['total'] = round(costs['brokerage'] + costs['dp_charge'] + costs['auto_squareoff'] + costs['statutory'], 2)
 
         return costs
 
@@ -124,11 +270,13 @@ class CostTracker:
         self.session_costs['dp_charges'] += costs['dp_charge']
         self.session_costs['brokerage'] += costs['brokerage']
         self.session_costs['auto_squareoff'] += costs['auto_squareoff']
+        self.session_costs['statutory'] += costs['statutory']
         self.session_costs['total'] = sum([
             self.session_costs['dp_charges'],
             self.session_costs['brokerage'],
             self.session_costs['auto_squareoff'],
             self.session_costs['pledge_charges'],
+            self.session_costs['statutory'],
             self.session_costs['other']
         ])
         self.trade_count += 1
@@ -160,31 +308,22 @@ class CostTracker:
 
     def estimate_roundtrip_cost(self,
                                 position_size: float,
-                                product_type: str = 'CNC') -> float:
+                                product_type: str = 'CNC',
+                                segment: Optional[str] = None) -> float:
         """
         Estimate total cost for a complete round-trip (buy + sell)
 
         Args:
             position_size: Position value in rupees
-            product_type: 'CNC' or 'MIS'
+            product_type: 'CNC', 'MIS' or 'NRML'
+            segment: Schedule segment override (e.g. 'OPTIONS')
 
         Returns:
             Estimated total cost
         """
 
-        # Buy costs
-        buy_cost = 0
-        if product_type == 'MIS':
-            buy_cost = min(20, position_size * 0.0003)
-
-        # Sell costs
-        sell_cost = 0
-        if product_type == 'MIS':
-            sell_cost = min(20, position_size * 0.0003)
-        else:  # CNC
-            sell_cost = self.DP_CHARGE_PER_SELL
-
-        total = buy_cost + sell_cost
+        segment = segment or PRODUCT_SEGMENTS.get(product_type, 'EQ_DELIVERY')
+        total = round_trip_charges(segment, 1, position_size, position_size)
 
         return round(total, 2)
 
@@ -258,6 +397,7 @@ class CostTracker:
                 'dp_charges': (self.session_costs['dp_charges'] / self.session_costs['total'] * 100) if self.session_costs['total'] > 0 else 0,
                 'brokerage': (self.session_costs['brokerage'] / self.session_costs['total'] * 100) if self.session_costs['total'] > 0 else 0,
                 'auto_squareoff': (self.session_costs['auto_squareoff'] / self.session_costs['total'] * 100) if self.session_costs['total'] > 0 else 0,
+                'statutory': (self.session_costs['statutory'] / self.session_costs['total'] * 100) if self.session_costs['total'] > 0 else 0,
             }
         }
 
@@ -279,6 +419,7 @@ class CostTracker:
         print(f"DP Charges:       ₹{self.session_costs['dp_charges']:.2f} ({summary['breakdown_pct']['dp_charges']:.1f}%)")
         print(f"Brokerage:        ₹{self.session_costs['brokerage']:.2f} ({summary['breakdown_pct']['brokerage']:.1f}%)")
         print(f"Auto Square-off:  ₹{self.session_costs['auto_squareoff']:.2f} ({summary['breakdown_pct']['auto_squareoff']:.1f}%)")
+        print(f"STT/Exch/GST:     ₹{self.session_costs['statutory']:.2f} ({summary['breakdown_pct']['statutory']:.1f}%)")
         print(f"Pledge Charges:   ₹{self.session_costs['pledge_charges']:.2f}")
         print(f"Other:            ₹{self.session_costs['other']:.2f}")
 
@@ -9,6 +9,8 @@ from datetime import datetime, time, timedelta
 from pathlib import Path
 from typing import Dict, List
 
+from cost_tracker import PRODUCT_SEGMENTS, round_trip_charges
+
 
 class DualModeBacktester:
     """
@@ -146,11 +148,8 @@ class DualModeBacktester:
         position_size = 20000
         pnl = position_size * (pnl_pct / 100)
 
-        # Subtract costs
-        if mode == 'MIS':
-            costs = 40  # ₹20 brokerage buy + ₹20 sell
-        else:
-            costs = 15.34  # ₹15.34 DP charge
+        # Subtract costs (brokerage, DP and statutory charges for both legs)
+        costs = round(round_trip_charges(PRODUCT_SEGMENTS[mode], position_size / entry, entry, exit_price), 2)
 
         net_pnl = pnl - costs
 
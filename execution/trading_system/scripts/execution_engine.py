@@ -6,8 +6,10 @@ Includes safety checks, duplicate prevention, and order tracking.
 """
 
 import sys
+import os
 import json
 import time
+from collections import Counter
 from datetime import datetime, date
 from typing import Dict, List, Optional
 from pathlib import Path
@@ -20,9 +22,171 @@ from kite_client import KiteMCPClient
 
 # Paths
 JOURNALS_DIR = SCRIPT_DIR.parent / "journals"
-ORDER_LOG = JOURNALS_DIR / "order_log.json"
+ORDER_LOG = JOURNALS_DIR / "order_log.json"          # Legacy single-file log (migrated once)
+ORDERS_DIR = JOURNALS_DIR / "orders"                 # One orders_YYYY-MM-DD.jsonl per trading day
 JOURNALS_DIR.mkdir(exist_ok=True)
 
+# Statuses that mean a BUY opened (or would open) a position
+OPEN_STATUSES = ("PLACED", "COMPLETE", "DRY_RUN")
+
+
+# ══════════════════════════════════════════════════════════════════
+# Order Journal
+# ══════════════════════════════════════════════════════════════════
+
+class OrderJournal:
+    """
+    Append-only order journal partitioned by trading day.
+
+    Each order is one JSON line in orders/orders_<date>.jsonl, so placing an
+    order costs the same on day one and after years of history, and loading
+    only parses today's partition. Keeps an index of the latest BUY order
+    (and its exit levels) per tradingsymbol.
+
+    fsync policy: "always" (default — an acknowledged order survives a crash),
+    "interval" (at most every fsync_interval seconds) or "never" (flush only).
+    """
+
+    def __init__(self, directory: Path = ORDERS_DIR, fsync: str = "always",
+                 fsync_interval: float = 5.0, legacy_file: Path = ORDER_LOG):
+        self.directory = Path(directory)
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if legacy_file is not None and Path(legacy_file).exists():
+            self._migrate(Path(legacy_file))
+
+        self.day: Optional[str] = None
+        self.orders: List[Dict] = []
+        self.latest_buy: Dict[str, Dict] = {}
+        self._file = None
+        self._last_sync = 0.0
+        self._open_day(date.today().isoformat())
+
+    def partition(self, day: str) -> Path:
+        return self.directory / f"orders_{day}.jsonl"
+
+    def _migrate(self, legacy_file: Path):
+        """
+        Split the old whole-history order_log.json into day partitions.
+
+        Each partition is rebuilt in a tmp file and swapped in, and orders it
+        already holds are not added again, so a migration interrupted before the
+        legacy file was renamed can simply run again.
+        """
+        try:
+            with open(legacy_file, "r") as f:
+                all_orders = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Could not migrate order log: {e}")
+            return
+
+        by_day: Dict[str, List[Dict]] = {}
+        for o in all_orders:
+            by_day.setdefault(o.get("date") or str(o.get("timestamp", ""))[:10] or "unknown", []).append(o)
+        for day, orders in by_day.items():
+            path = self.partition(day)
+            merged = self.read_day(day)
+            present = Counter(json.dumps(o, sort_keys=True, default=str) for o in merged)
+            for o in orders:
+                key = json.dumps(o, sort_keys=True, default=str)
+                if present[key]:
+                    present[key] -= 1
+                else:
+                    merged.append(o)
+            tmp = path.with_suffix(".jsonl.tmp")
+            with open(tmp, "w") as f:
+                f.write("".join(json.dumps(o, default=str) + "\n" for o in merged))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        os.replace(legacy_file, legacy_file.with_suffix(".migrated.json"))
+
+    def _open_day(self, day: str):
+        """Switch to `day`'s partition, loading the orders already in it."""
+        if self._file is not None:
+            self._file.close()
+        self.day = day
+        self.orders = self.read_day(day, repair=True)
+        self.latest_buy = {}
+        for o in self.orders:
+            self._index(o)
+        self._file = open(self.partition(day), "a")
+
+    def read_day(self, day: str, repair: bool = False) -> List[Dict]:
+        """
+        Orders in `day`'s partition. With repair=True a torn last line from an
+        interrupted write is cut back to the last complete line (as TradeJournal
+        does), so the next append does not land on the end of it.
+        """
+        orders = []
+        path = self.partition(day)
+        if not path.exists():
+            return orders
+
+        offset, good_end, terminated = 0, 0, True
+        with open(path, "rb") as f:
+            for raw in f:
+                offset += len(raw)
+                if not raw.strip():
+                    continue
+                try:
+                    orders.append(json.loads(raw))
+                except ValueError:
+                    continue  # Torn line from an interrupted write
+                good_end = offset
+                terminated = raw.endswith(b"\n")
+
+        if repair and (good_end < offset or not terminated):
+            with open(path, "r+b") as f:
+                f.truncate(good_end)
+                if not terminated:
+                    # Complete record cut off just before its newline
+                    f.seek(good_end)
+                    f.write(b"\n")
+        return orders
+
+    def _index(self, order: Dict):
+        if order.get("transaction_type") == "BUY" and order.get("status") in OPEN_STATUSES:
+            self.latest_buy[order.get("tradingsymbol")] = order
+
+    def roll(self, day: str = None):
+        """Move to a new trading day's partition if the date changed."""
+        day = day or date.today().isoformat()
+        if day != self.day:
+            self._open_day(day)
+
+    def append(self, order: Dict):
+        """Write one order to its day's partition (rolling over at midnight)."""
+        self.roll(order.get("date"))
+        self.orders.append(order)
+        self._index(order)
+
+        self._file.write(json.dumps(order, default=str) + "\n")
+        self._file.flush()
+        now = time.monotonic()
+        if self.fsync == "always" or (self.fsync == "interval" and now - self._last_sync >= self.fsync_interval):
+            os.fsync(self._file.fileno())
+            self._last_sync = now
+
+    def exit_levels(self, tradingsymbol: str) -> Dict:
+        order = self.latest_buy.get(tradingsymbol)
+        return order.get("exit_levels", {}) if order else {}
+
+    def history(self, since: str = None) -> List[Dict]:
+        """All orders (optionally from `since` YYYY-MM-DD on), oldest day first."""
+        orders = []
+        for path in sorted(self.directory.glob("orders_*.jsonl")):
+            day = path.stem[len("orders_"):]
+            if since is None or day >= since:
+                orders.extend(self.orders if day == self.day else self.read_day(day))
+        return orders
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
 
 class ExecutionEngine:
     """
@@ -30,12 +194,19 @@ class ExecutionEngine:
     Prevents duplicate orders, enforces daily limits, and logs everything.
     """
 
-    def __init__(self, client: KiteMCPClient, config: Dict = None):
+    def __init__(self, client: KiteMCPClient, config: Dict = None,
+                 journal: Optional[OrderJournal] = None):
         self.client = client
         self.config = config or self._default_config()
-        self.orders_today: List[Dict] = []
         self.daily_loss = 0.0
-        self._load_order_log()
+        # Engines in one process may share a journal so they see the same orders
+        self.journal = journal or OrderJournal(fsync=self.config.get("journal_fsync", "always"))
+
+    @property
+    def orders_today(self) -> List[Dict]:
+        """Today's orders (the journal rolls to a new list each trading day)."""
+        self.journal.roll()
+        return self.journal.orders
 
     def _default_config(self) -> Dict:
         return {
@@ -46,35 +217,13 @@ class ExecutionEngine:
             "allowed_exchanges": ["NSE", "NFO"],
             "allowed_products": ["CNC", "MIS", "NRML"],
             "dry_run": False,                 # Set True to simulate without placing
+            "journal_fsync": "always",        # always | interval | never
         }
 
-    def _load_order_log(self):
-        """Load today's orders from the journal."""
-        try:
-            if ORDER_LOG.exists():
-                with open(ORDER_LOG, "r") as f:
-                    all_orders = json.load(f)
-                today_str = date.today().isoformat()
-                self.orders_today = [
-                    o for o in all_orders
-                    if o.get("date") == today_str
-                ]
-        except Exception:
-            self.orders_today = []
-
     def _save_order(self, order: Dict):
         """Append order to journal."""
         try:
-            all_orders = []
-            if ORDER_LOG.exists():
-                with open(ORDER_LOG, "r") as f:
-                    all_orders = json.load(f)
-
-            all_orders.append(order)
-            self.orders_today.append(order)
-
-            with open(ORDER_LOG, "w") as f:
-                json.dump(all_orders, f, indent=2, default=str)
+            self.journal.append(order)
         except Exception as e:
             print(f"⚠️ Could not save order log: {e}")
 
@@ -316,14 +465,9 @@ class ExecutionEngine:
                 if exchange != "NFO":
                     continue
 
-                # Find matching order in log for exit levels
-                matching_order = None
-                for order in reversed(self.orders_today):
-                    if (order.get("tradingsymbol") == symbol and 
-                        order.get("transaction_type") == "BUY" and
-                        order.get("status") in ("PLACED", "COMPLETE", "DRY_RUN")):
-                        matching_order = order
-                        break
+                # Latest BUY order for this symbol (exit levels)
+                self.journal.roll()
+                matching_order = self.journal.latest_buy.get(symbol)
 
                 if not matching_order:
                     continue
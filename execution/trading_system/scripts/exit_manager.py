@@ -3,14 +3,27 @@
 TRADING SYSTEM V3 - EXIT MANAGER
 Dynamic exit management for equity and options positions.
 Supports premium-based trailing stops for FNO_NRML option trades.
+
+Positions live in memory, indexed by symbol. Price ticks only mark a position
+dirty; open_positions.json is rewritten (atomically) at most every
+position_flush_seconds, on entries/exits and on flush(). Changes to exit state
+(stops, trails, peak premium, partial exit, exit reasons) are appended to
+open_positions.wal first, so a crash between checkpoints loses only prices.
 """
 
 import json
 import os
+import time
 from datetime import datetime
 from typing import Dict, List, Optional
 import pandas as pd
 
+from trade_analytics import TradeAnalytics
+
+
+# Position fields whose changes are written to the WAL (prices are not: the next tick restores them)
+STATE_FIELDS = ('stop_loss', 'trailing_stop', 'peak_premium', 'partial_exit_done', 'breakeven_moved')
+
 
 class ExitManager:
     """Manages exits based on technical analysis and risk management"""
@@ -20,20 +33,114 @@ class ExitManager:
             self.config = json.load(f)
         self.base_path = os.path.dirname(os.path.dirname(config_path))
         self.positions_file = os.path.join(self.base_path, 'data', 'open_positions.json')
+        self.wal_file = self.positions_file.replace('.json', '.wal')
+        self.flush_interval = self.config.get('persistence', {}).get('position_flush_seconds', 5.0)
+        self._wal = None
+        self._analytics = None
         self.load_positions()
 
     def load_positions(self):
-        """Load open positions from file"""
+        """Load open positions from file, replay the WAL and checkpoint"""
         if os.path.exists(self.positions_file):
             with open(self.positions_file, 'r') as f:
                 self.positions = json.load(f)
         else:
             self.positions = []
+        self._reindex()
+
+        replayed = self._replay_wal()
+        self._dirty = set()
+        self._last_flush = time.monotonic()
+        if replayed:
+            self._dirty.add(None)
+            self.save_positions()
+
+    def _reindex(self):
+        """Rebuild the symbol -> position index (first position wins, like the old scans)"""
+        self._by_symbol = {}
+        for p in self.positions:
+            self._by_symbol.setdefault(p['symbol'], p)
+
+    def _replay_wal(self) -> int:
+        """Apply state changes logged after the last checkpoint"""
+        if not os.path.exists(self.wal_file):
+            return 0
+
+        replayed, offset, good_end = 0, 0, 0
+        with open(self.wal_file, 'rb') as f:
+            for line in f:
+                offset += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Torn last record from a crash
+                if line.endswith(b'\n'):
+                    good_end = offset
+                position = self._by_symbol.get(record.get('symbol'))
+                if position is None:
+                    continue
+                position.update(record.get('set', {}))
+                position.setdefault('exit_reasons', []).extend(record.get('exit_reasons', []))
+                replayed += 1
+
+        # Cut a torn tail so records appended before the next checkpoint start on a clean line
+        if good_end < offset:
+            with open(self.wal_file, 'r+b') as f:
+                f.truncate(good_end)
+                os.fsync(f.fileno())
+        return replayed
+
+    def _log_state(self, position: Dict, before: tuple, reasons_before: int):
+        """Append the position's exit-state changes (if any) to the WAL"""
+        changed = {k: position.get(k) for k, old in zip(STATE_FIELDS, before) if position.get(k) != old}
+        new_reasons = position.get('exit_reasons', [])[reasons_before:]
+        if not changed and not new_reasons:
+            return
+
+        if self._wal is None:
+            self._wal = open(self.wal_file, 'a')
+        record = {'symbol': position['symbol'], 'set': changed, 'exit_reasons': new_reasons}
+        self._wal.write(json.dumps(record, default=str) + '\n')
+        self._wal.flush()
+        os.fsync(self._wal.fileno())
 
     def save_positions(self):
-        """Save positions to file"""
-        with open(self.positions_file, 'w') as f:
+        """Checkpoint: atomically rewrite open_positions.json and reset the WAL"""
+        tmp = self.positions_file + '.tmp'
+        with open(tmp, 'w') as f:
             json.dump(self.positions, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.positions_file)
+
+        if self._wal is not None:
+            self._wal.close()
+            self._wal = None
+        if os.path.exists(self.wal_file):
+            # The rename must be durable before the WAL it supersedes is gone
+            self._fsync_dir()
+            os.remove(self.wal_file)
+
+        self._dirty.clear()
+        self._last_flush = time.monotonic()
+
+    def _fsync_dir(self):
+        """fsync the data directory so a completed os.replace survives a crash (no-op on Windows)"""
+        try:
+            fd = os.open(os.path.dirname(self.positions_file), os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def flush(self, force: bool = False):
+        """Checkpoint if positions changed since the last one (and the interval passed, unless forced)"""
+        if self._dirty and (force or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.save_positions()
 
     def add_position(self, position: Dict):
         """Add a new equity (CNC/MIS) position with calculated exit levels"""
@@ -78,6 +185,8 @@ class ExitManager:
         })
 
         self.positions.append(position)
+        self._by_symbol.setdefault(position['symbol'], position)
+        self._dirty.add(position['symbol'])
         self.save_positions()
         self.log_position_event(position, 'ENTRY')
 
@@ -125,6 +234,8 @@ class ExitManager:
         })
 
         self.positions.append(position)
+        self._by_symbol.setdefault(position['symbol'], position)
+        self._dirty.add(position['symbol'])
         self.save_positions()
         self.log_position_event(position, 'OPTIONS_ENTRY')
 
@@ -133,15 +244,14 @@ class ExitManager:
     def update_position_price(self, symbol: str, current_price: float, current_data: Dict):
         """Update position with current price and check exit conditions"""
 
-        position = None
-        for p in self.positions:
-            if p['symbol'] == symbol:
-                position = p
-                break
+        position = self._by_symbol.get(symbol)
 
         if not position:
             return None
 
+        before = tuple(position.get(k) for k in STATE_FIELDS)
+        reasons_before = len(position['exit_reasons'])
+
         position['current_price'] = current_price
         position['last_update'] = datetime.now().isoformat()
 
@@ -183,7 +293,9 @@ class ExitManager:
                 position['exit_reasons'].append('STOP_TO_BREAKEVEN')
                 self.log_position_event(position, 'BREAKEVEN_MOVE')
 
-        self.save_positions()
+        self._log_state(position, before, reasons_before)
+        self._dirty.add(symbol)
+        self.flush()
 
         return position
 
@@ -348,11 +460,7 @@ class ExitManager:
     def should_exit_position(self, symbol: str) -> Optional[str]:
         """Determine if position should be exited and return reason"""
 
-        position = None
-        for p in self.positions:
-            if p['symbol'] == symbol:
-                position = p
-                break
+        position = self._by_symbol.get(symbol)
 
         if not position:
             return None
@@ -377,14 +485,7 @@ class ExitManager:
     def close_position(self, symbol: str, exit_price: float, exit_reason: str):
         """Close a position and log results"""
 
-        position = None
-        index = None
-
-        for i, p in enumerate(self.positions):
-            if p['symbol'] == symbol:
-                position = p
-                index = i
-                break
+        position = self._by_symbol.get(symbol)
 
         if not position:
             return None
@@ -418,7 +519,9 @@ class ExitManager:
         self.save_closed_trade(exit_record)
 
         # Remove from open positions
-        self.positions.pop(index)
+        self.positions.pop(next(i for i, p in enumerate(self.positions) if p is position))
+        self._reindex()
+        self._dirty.add(symbol)
         self.save_positions()
 
         return exit_record
@@ -460,6 +563,15 @@ class ExitManager:
         with open(trades_file, 'w') as f:
             json.dump(trades, f, indent=2)
 
+        # Analytics after the record is safe; a trade the one-time import already
+        # picked up from the JSON above is not added twice
+        try:
+            if self._analytics is None:
+                self._analytics = TradeAnalytics(os.path.join(self.base_path, 'analysis'))
+            self._analytics.add_trade(trade)
+        except Exception as e:
+            print(f"[ANALYTICS] Could not add {trade.get('symbol')} to the analytics table: {e}")
+
     def get_open_positions(self) -> List[Dict]:
         """Return all open positions"""
         return self.positions
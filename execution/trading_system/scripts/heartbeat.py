@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+HEARTBEAT — Liveness File for the Snapshot Services
+signal_service.py and risk_service.py each publish a snapshot file and keep
+<snapshot>.heartbeat next to it:
+
+    writer   rewritten (atomically) on every publish and every
+             HEARTBEAT_INTERVAL seconds while idle, removed on shutdown
+    reader   the service counts as running while the beat is younger than
+             HEARTBEAT_STALE; a PID probe would break on PID reuse and means
+             nothing across hosts or containers
+
+Usage:
+    heartbeat = Heartbeat(RISK_FILE)          # in the service
+    if heartbeat.due(): heartbeat.beat(version)
+    heartbeat.stop()
+
+    service_running(heartbeat_path(RISK_FILE))   # in a reader
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+HEARTBEAT_INTERVAL = 5.0
+HEARTBEAT_STALE = 15.0
+
+
+def heartbeat_path(snapshot_file: Path) -> Path:
+    """The heartbeat file that goes with a service's snapshot file."""
+    return Path(snapshot_file).with_suffix(".heartbeat")
+
+
+class Heartbeat:
+    """Writer side: one per running service."""
+
+    def __init__(self, snapshot_file: Path, interval: float = HEARTBEAT_INTERVAL):
+        self.path = heartbeat_path(snapshot_file)
+        self.interval = interval
+        self.last = 0.0
+
+    def beat(self, version: Optional[int] = None):
+        self.path.parent.mkdir(exist_ok=True)
+        tmp = self.path.with_suffix(".heartbeat.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"timestamp": time.time(), "version": version, "pid": os.getpid()}, f)
+        os.replace(tmp, self.path)
+        self.last = time.time()
+
+    def due(self) -> bool:
+        """True once an idle service should beat again."""
+        return time.time() - self.last >= self.interval
+
+    def stop(self):
+        """Remove the beat so readers see the stop now instead of after HEARTBEAT_STALE."""
+        self.path.unlink(missing_ok=True)
+
+
+def heartbeat_age(path: Path) -> Optional[float]:
+    """Seconds since the service last beat, or None if it never has (or stopped cleanly)."""
+    try:
+        with open(path) as f:
+            return max(0.0, time.time() - float(json.load(f)["timestamp"]))
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def service_running(path: Path, stale: float = HEARTBEAT_STALE) -> bool:
+    """True while the heartbeat at `path` is fresh."""
+    age = heartbeat_age(path)
+    return age is not None and age < stale
@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+"""
+HISTORICAL VAR — Full-Revaluation VaR / Expected Shortfall and Its Backtest
+Reprices the current book against every day in the local daily bar store:
+each historical day's underlying log-returns are applied to today's spots and
+every option leg is revalued with Black-Scholes (option_pricing.py) one day
+closer to expiry, its implied vol scaled by that day's India VIX move. Days
+are processed in vectorized blocks (days x legs arrays), so five years of
+history against the whole book is one numpy pass.
+
+Backtests:
+    hypothetical   rolling 250-day VaR of the current book vs the next day's
+                   scenario P&L (Kupiec POF test + Basel traffic light)
+    realized       recorded daily forecasts (analysis/var_forecasts.csv) vs
+                   day-over-day portfolio_value in trading_log.csv
+
+Layout:
+    trading_system/data/daily_closes.csv     5y of daily closes, one column per name
+
+Usage:
+    python3 execution/trading_system/scripts/historical_var.py            # VaR of the live book
+    python3 execution/trading_system/scripts/historical_var.py update     # refresh the bar store first
+"""
+
+import json
+import math
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+EXECUTION_DIR = SCRIPT_DIR.parent.parent
+ROOT_DIR = EXECUTION_DIR.parent
+sys.path.insert(0, str(EXECUTION_DIR))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from correlation_engine import correlation_name, default_universe, fetch_daily_closes
+from option_pricing import INDEX_SPOT_SYMBOLS, MIN_T, RISK_FREE_RATE, bs_price
+from options_risk import OptionsRiskEngine
+
+BAR_FILE = SCRIPT_DIR.parent / "data" / "daily_closes.csv"
+FORECAST_FILE = SCRIPT_DIR.parent / "analysis" / "var_forecasts.csv"
+TRADING_LOG = ROOT_DIR / "trading_log.csv"
+CACHE_FILE = ROOT_DIR / ".tmp" / "live_cache.json"
+TICK_FILE = ROOT_DIR / ".tmp" / "live_ticks.json"
+
+HISTORY_YEARS = 5
+TRADING_DAYS = 252
+UPDATE_OVERLAP_DAYS = 10      # re-download recent days to pick up late revisions
+BLOCK_DAYS = 512              # scenario days revalued per block
+CONFIDENCE_LEVELS = (0.95, 0.99)
+BACKTEST_WINDOW = 250
+VOL_INDEX = "INDIAVIX"
+VOL_INDEX_TICKER = "^INDIAVIX"
+FORECAST_COLUMNS = ["date", "gross", "var_95", "var_99", "es_99", "history_days"]
+
+
+# ══════════════════════════════════════════════════════════════════
+# Daily Bar Store
+# ══════════════════════════════════════════════════════════════════
+
+class DailyBarStore:
+    """Wide table of daily closes (date x name), extended incrementally from yfinance."""
+
+    def __init__(self, path: Path = BAR_FILE, years: int = HISTORY_YEARS):
+        self.path = Path(path)
+        self.years = years
+        self._frame: Optional[pd.DataFrame] = None
+        self._mtime = None
+
+    def load(self) -> pd.DataFrame:
+        """The stored closes (re-read only when the file changes)."""
+        try:
+            mtime = self.path.stat().st_mtime
+        except OSError:
+            return pd.DataFrame()
+        if mtime != self._mtime:
+            self._frame = pd.read_csv(self.path, index_col="date")
+            self._mtime = mtime
+        return self._frame
+
+    @staticmethod
+    def default_tickers() -> Dict[str, str]:
+        universe = default_universe()
+        return {**universe["fno"], **universe["index"], VOL_INDEX: VOL_INDEX_TICKER}
+
+    def update(self, names: Optional[List[str]] = None) -> int:
+        """
+        Bring the store up to date: new names get the full history, the rest
+        only the days since the last stored date. Returns rows written.
+        """
+        tickers = self.default_tickers()
+        for name in names or []:
+            tickers.setdefault(name, f"{name}.NS")
+        groups = {name: "local" for name in tickers}
+
+        stored = self.load()
+        full_start = (date.today() - timedelta(days=int(self.years * 365.25) + 10)).isoformat()
+        missing = {n: t for n, t in tickers.items() if n not in stored.columns}
+        frames = []
+        if missing:
+            frames.append(fetch_daily_closes(missing, groups, start=full_start))
+        known = {n: t for n, t in tickers.items() if n in stored.columns}
+        if known and not stored.empty:
+            since = (date.fromisoformat(stored.index[-1]) - timedelta(days=UPDATE_OVERLAP_DAYS)).isoformat()
+            frames.append(fetch_daily_closes(known, groups, start=since))
+
+        frame = stored
+        for new in frames:
+            if new.empty:
+                continue
+            frame = new.combine_first(frame) if not frame.empty else new
+        if frame is stored:
+            return 0
+        frame = frame.sort_index()
+        frame = frame[frame.index >= full_start]
+        frame.index.name = "date"
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        frame.to_csv(tmp, float_format="%.4f")
+        tmp.replace(self.path)
+        self._frame, self._mtime = frame, self.path.stat().st_mtime
+        return len(frame)
+
+    def returns(self, names: List[str], days: Optional[int] = None) -> pd.DataFrame:
+        """Daily log-returns for the given names (NaN where a name has no bar that day)."""
+        closes = self.load()
+        if closes.empty:
+            return pd.DataFrame(columns=names)
+        closes = closes.reindex(columns=names)
+        returns = np.log(closes / closes.ffill().shift(1))
+        returns = returns.iloc[1:]
+        return returns.iloc[-days:] if days else returns
+
+    def last_close(self, name: str) -> Optional[float]:
+        closes = self.load()
+        if name not in closes.columns:
+            return None
+        series = closes[name].dropna()
+        return float(series.iloc[-1]) if len(series) else None
+
+
+# ══════════════════════════════════════════════════════════════════
+# VaR Engine
+# ══════════════════════════════════════════════════════════════════
+
+def _kupiec(observations: int, exceptions: int, p: float) -> Dict:
+    """Kupiec proportion-of-failures LR test (chi-square, 1 dof)."""
+    if observations == 0:
+        return {"lr": None, "p_value": None}
+    rate = exceptions / observations
+    log_null = (observations - exceptions) * math.log(1 - p) + exceptions * math.log(p)
+    log_alt = ((observations - exceptions) * math.log(1 - rate) if rate < 1 else 0.0) + \
+              (exceptions * math.log(rate) if rate > 0 else 0.0)
+    lr = max(-2.0 * (log_null - log_alt), 0.0)
+    return {"lr": round(lr, 3), "p_value": round(math.erfc(math.sqrt(lr / 2.0)), 4)}
+
+
+def _traffic_light(exceptions_250: int) -> str:
+    """Basel zone for exceptions of a 99% VaR over 250 days."""
+    return "green" if exceptions_250 <= 4 else "yellow" if exceptions_250 <= 9 else "red"
+
+
+class HistoricalVaR:
+    """Current book as leg arrays, revalued under every stored historical day."""
+
+    def __init__(self, store: Optional[DailyBarStore] = None, years: int = HISTORY_YEARS,
+                 vol_scaling: bool = True, r: float = RISK_FREE_RATE):
+        self.store = store or DailyBarStore()
+        self.years = years
+        self.vol_scaling = vol_scaling
+        self.r = r
+        self.set_book([])
+
+    # ── Book ──
+
+    def set_book(self, positions: List[Dict], spots: Optional[Dict[str, float]] = None,
+                 prices: Optional[Dict[str, float]] = None, now: Optional[datetime] = None):
+        """
+        Legs from a positions list. Option IVs are backed out from leg prices
+        (OptionsRiskEngine); spots come from `spots` (keyed by underlying or
+        tick symbol) or else the last stored close.
+        """
+        spots = dict(spots or {})
+        prices = dict(prices or {})
+        self._pricing = {"spots": spots, "prices": prices, "now": now}
+        options = OptionsRiskEngine()
+        options.set_legs(positions)
+
+        underlying_spots = {}
+        for u, tick_symbol in options.spot_symbols().items():
+            spot = spots.get(u) or spots.get(tick_symbol) or self.store.last_close(u)
+            if spot:
+                underlying_spots[u] = spot
+        options.update(underlying_spots, prices, now)
+        slots = {symbol: i for i, symbol in enumerate(options.symbols)}
+
+        self.positions = []
+        legs = []
+        for pos in positions:
+            symbol, qty = pos.get("symbol", ""), pos.get("quantity", 0) or 0
+            if not symbol or not qty:
+                continue
+            name = correlation_name(symbol)
+            slot = slots.get(symbol)
+            if slot is not None and options.is_option[slot]:
+                spot = underlying_spots.get(name)
+                if not spot:
+                    continue
+                legs.append((symbol, name, qty, True, options.strike[slot], options.T[slot],
+                             options.iv[slot], options.is_call[slot], spot))
+            else:
+                price = (prices.get(symbol) or pos.get("current_price") or pos.get("last_price")
+                         or pos.get("entry_price") or pos.get("average_price")
+                         or self.store.last_close(name))
+                if not price:
+                    continue
+                legs.append((symbol, name, qty, False, 0.0, 0.0, 0.0, False, float(price)))
+            self.positions.append(pos)
+
+        self.symbols = [leg[0] for leg in legs]
+        self.underlyings = sorted({leg[1] for leg in legs})
+        code = {u: i for i, u in enumerate(self.underlyings)}
+        self.und = np.array([code[leg[1]] for leg in legs], dtype=np.intp)
+        self.qty = np.array([leg[2] for leg in legs], dtype=float)
+        self.is_option = np.array([leg[3] for leg in legs], dtype=bool)
+        self.strike = np.array([leg[4] for leg in legs], dtype=float)
+        self.T = np.array([leg[5] for leg in legs], dtype=float)
+        self.iv = np.array([leg[6] for leg in legs], dtype=float)
+        self.is_call = np.array([leg[7] for leg in legs], dtype=bool)
+        self.spot = np.array([leg[8] for leg in legs], dtype=float)
+        self._onehot = np.eye(len(self.underlyings))[self.und] if len(legs) else np.zeros((0, 0))
+        self._scenarios = None
+
+    def gross_exposure(self) -> float:
+        """Sum of |delta-one notional| and |option premium| held."""
+        value = np.where(self.is_option, self._base_value(), self.spot)
+        return float(np.abs(value * self.qty).sum())
+
+    def _base_value(self) -> np.ndarray:
+        return np.where(self.is_option,
+                        bs_price(self.spot, np.where(self.is_option, self.strike, 1.0),
+                                 self.T, np.maximum(self.iv, 1e-4), self.is_call, self.r),
+                        self.spot)
+
+    # ── Scenarios ──
+
+    def _history(self):
+        """(dates, underlying returns days x U, vol-index returns) over the look-back."""
+        names = self.underlyings + ([VOL_INDEX] if self.vol_scaling else [])
+        returns = self.store.returns(names, days=self.years * TRADING_DAYS)
+        coverage = returns[self.underlyings].notna().mean() if len(returns) else pd.Series(dtype=float)
+        values = returns.to_numpy(dtype=float)
+        values = np.nan_to_num(values, nan=0.0)
+        U = len(self.underlyings)
+        vol = values[:, U] if self.vol_scaling and values.shape[1] > U else np.zeros(len(values))
+        return list(returns.index), values[:, :U], vol, coverage
+
+    def scenario_pnl(self, horizon_days: int = 1) -> Dict:
+        """
+        P&L of every leg under every historical day, aggregated per day and per
+        underlying: {"dates", "pnl" (days,), "by_underlying" (days x U), "coverage"}.
+        """
+        if self._scenarios is not None and self._scenarios[0] == horizon_days:
+            return self._scenarios[1]
+
+        dates, R, vol_r, coverage = self._history()
+        if horizon_days > 1 and len(R) >= horizon_days:
+            # Overlapping h-day returns
+            cum = np.vstack([np.zeros((1, R.shape[1])), np.cumsum(R, axis=0)])
+            R = cum[horizon_days:] - cum[:-horizon_days]
+            cv = np.concatenate([[0.0], np.cumsum(vol_r)])
+            vol_r = cv[horizon_days:] - cv[:-horizon_days]
+            dates = dates[horizon_days - 1:]
+
+        n_days, n_legs = len(R), len(self.symbols)
+        by_und = np.zeros((n_days, len(self.underlyings)))
+        if n_days and n_legs:
+            base = self._base_value()
+            strike = np.where(self.is_option, self.strike, 1.0)
+            T1 = np.maximum(self.T - horizon_days / 365.0, MIN_T)
+            iv = np.maximum(self.iv, 1e-4)
+            for lo in range(0, n_days, BLOCK_DAYS):
+                hi = min(lo + BLOCK_DAYS, n_days)
+                shocked_S = self.spot * np.exp(R[lo:hi][:, self.und])               # (block, legs)
+                shocked_iv = iv * np.exp(vol_r[lo:hi])[:, None]
+                value = np.where(self.is_option,
+                                 bs_price(shocked_S, strike, T1, shocked_iv, self.is_call, self.r),
+                                 shocked_S)
+                by_und[lo:hi] = ((value - base) * self.qty) @ self._onehot
+
+        result = {
+            "dates": dates,
+            "pnl": by_und.sum(axis=1),
+            "by_underlying": by_und,
+            "coverage": {u: round(float(coverage.get(u, 0.0)), 3) for u in self.underlyings},
+        }
+        self._scenarios = (horizon_days, result)
+        return result
+
+    # ── Risk ──
+
+    @staticmethod
+    def _tail(pnl: np.ndarray, confidence: float):
+        cut = np.quantile(pnl, 1 - confidence)
+        tail = pnl <= cut
+        return float(-cut), float(-pnl[tail].mean()), tail
+
+    def var(self, confidence_levels=CONFIDENCE_LEVELS, horizon_days: int = 1) -> Dict:
+        """VaR and ES (positive = loss) per confidence, with per-underlying ES contributions."""
+        sc = self.scenario_pnl(horizon_days)
+        pnl = sc["pnl"]
+        out = {
+            "positions": len(self.symbols),
+            "history_days": int(len(pnl)),
+            "from": sc["dates"][0] if sc["dates"] else None,
+            "to": sc["dates"][-1] if sc["dates"] else None,
+            "horizon_days": horizon_days,
+            "gross_exposure": round(self.gross_exposure(), 2),
+            "coverage": sc["coverage"],
+            "levels": {},
+        }
+        if len(pnl) < 20:
+            return out
+        for c in confidence_levels:
+            var, es, tail = self._tail(pnl, c)
+            contrib = sc["by_underlying"][tail].mean(axis=0)
+            out["levels"][f"{c:.0%}"] = {
+                "var": round(var, 2),
+                "es": round(es, 2),
+                "es_contribution": {u: round(float(-v), 2) for u, v in zip(self.underlyings, contrib)},
+            }
+        worst = int(np.argmin(pnl))
+        out["worst_day"] = {"date": sc["dates"][worst], "pnl": round(float(pnl[worst]), 2)}
+        return out
+
+    def what_if(self, position: Dict, confidence: float = 0.99) -> Dict:
+        """VaR / ES of the book with and without one candidate position."""
+        before = self.var((confidence,))["levels"].get(f"{confidence:.0%}", {})
+        current, pricing = list(self.positions), self._pricing
+        self.set_book(current + [position], **pricing)
+        after = self.var((confidence,))["levels"].get(f"{confidence:.0%}", {})
+        self.set_book(current, **pricing)
+        return {
+            "candidate": position.get("symbol"),
+            "confidence": confidence,
+            "before": {k: before.get(k) for k in ("var", "es")},
+            "after": {k: after.get(k) for k in ("var", "es")},
+            "incremental_var": round(after["var"] - before["var"], 2) if before and after else None,
+            "incremental_es": round(after["es"] - before["es"], 2) if before and after else None,
+        }
+
+    # ── Backtests ──
+
+    def backtest(self, confidence: float = 0.99, window: int = BACKTEST_WINDOW) -> Dict:
+        """
+        Rolling `window`-day historical VaR of the current book against the
+        next day's scenario P&L. All windows are evaluated in one pass over a
+        sliding-window view.
+        """
+        sc = self.scenario_pnl()
+        pnl = sc["pnl"]
+        if len(pnl) <= window:
+            return {"observations": 0, "reason": f"need more than {window} days of history"}
+        windows = np.lib.stride_tricks.sliding_window_view(pnl, window)[:-1]
+        forecast = -np.quantile(windows, 1 - confidence, axis=1)
+        realized = pnl[window:]
+        breach = realized < -forecast
+        dates = sc["dates"][window:]
+
+        n, x = len(realized), int(breach.sum())
+        last_250 = int(breach[-250:].sum())
+        return {
+            "confidence": confidence,
+            "window": window,
+            "observations": n,
+            "exceptions": x,
+            "expected": round(n * (1 - confidence), 1),
+            "exception_rate_pct": round(x / n * 100, 2),
+            "kupiec": _kupiec(n, x, 1 - confidence),
+            "exceptions_last_250": last_250,
+            "traffic_light": _traffic_light(last_250) if confidence == 0.99 else None,
+            "exception_dates": [
+                {"date": dates[i], "pnl": round(float(realized[i]), 2), "var": round(float(forecast[i]), 2)}
+                for i in np.flatnonzero(breach)[-20:]
+            ],
+        }
+
+    def record_forecast(self, path: Path = FORECAST_FILE, as_of: Optional[str] = None) -> Dict:
+        """Append today's VaR forecast (one row per date) for the realized backtest."""
+        result = self.var()
+        levels = result["levels"]
+        row = {
+            "date": as_of or date.today().isoformat(),
+            "gross": result["gross_exposure"],
+            "var_95": levels.get("95%", {}).get("var"),
+            "var_99": levels.get("99%", {}).get("var"),
+            "es_99": levels.get("99%", {}).get("es"),
+            "history_days": result["history_days"],
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        existing = pd.read_csv(path) if path.exists() else pd.DataFrame(columns=FORECAST_COLUMNS)
+        existing = existing[existing["date"] != row["date"]]
+        pd.concat([existing, pd.DataFrame([row])]).to_csv(path, index=False)
+        return row
+
+
+def realized_backtest(forecast_file: Path = FORECAST_FILE, trading_log: Path = TRADING_LOG,
+                      confidence: float = 0.99) -> Dict:
+    """Recorded VaR forecasts vs the next session's change in portfolio_value (trading_log.csv)."""
+    if not forecast_file.exists() or not trading_log.exists():
+        return {"observations": 0, "reason": "no forecasts or trading log yet"}
+    log = pd.read_csv(trading_log)
+    value = pd.to_numeric(log["portfolio_value"], errors="coerce")
+    daily = value.groupby(log["date"]).last().dropna().sort_index()
+    change = daily.diff().dropna()
+
+    forecasts = pd.read_csv(forecast_file).set_index("date").sort_index()
+    column = f"var_{round(confidence * 100)}"
+    rows = []
+    for day, pnl in change.items():
+        prior = forecasts[forecasts.index < day]
+        if prior.empty or pd.isna(prior[column].iloc[-1]):
+            continue
+        rows.append((day, float(pnl), float(prior[column].iloc[-1])))
+
+    n = len(rows)
+    x = sum(1 for _, pnl, var in rows if pnl < -var)
+    return {
+        "confidence": confidence,
+        "observations": n,
+        "exceptions": x,
+        "expected": round(n * (1 - confidence), 1),
+        "kupiec": _kupiec(n, x, 1 - confidence),
+        "exception_dates": [{"date": d, "pnl": round(p, 2), "var": round(v, 2)}
+                            for d, p, v in rows if p < -v][-20:],
+    }
+
+
+def live_book_var(store: Optional[DailyBarStore] = None,
+                  cache_file: Path = CACHE_FILE, tick_file: Path = TICK_FILE) -> HistoricalVaR:
+    """HistoricalVaR over the positions in live_cache.json, priced with the latest ticks."""
+    def read(path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    positions = read(cache_file).get("positions", [])
+    ticks = read(tick_file).get("ticks", {})
+    prices = {s: t.get("ltp") for s, t in ticks.items() if t.get("ltp")}
+    spots = {u: prices[sym] for u, sym in INDEX_SPOT_SYMBOLS.items() if sym in prices}
+    engine = HistoricalVaR(store)
+    engine.set_book(positions, spots=spots, prices=prices)
+    return engine
+
+
+def main():
+    store = DailyBarStore()
+    engine = live_book_var(store)
+    if (len(sys.argv) > 1 and sys.argv[1] == "update") or store.load().empty:
+        print("[VAR] Updating daily bar store...")
+        rows = store.update(engine.underlyings)
+        print(f"[VAR] {rows} days stored in {store.path}")
+        engine = live_book_var(store)
+
+    if not engine.symbols:
+        print("[VAR] No open positions in live_cache.json")
+        return
+
+    started = datetime.now()
+    result = engine.var()
+    backtest = engine.backtest()
+    elapsed = (datetime.now() - started).total_seconds() * 1000
+    print(f"[VAR] {result['positions']} legs x {result['history_days']} days "
+          f"({result['from']} → {result['to']}), {elapsed:.0f} ms")
+    for level, v in result["levels"].items():
+        print(f"   {level}: VaR ₹{v['var']:,.0f} | ES ₹{v['es']:,.0f}")
+    if backtest.get("observations"):
+        print(f"[BACKTEST] {backtest['exceptions']} exceptions in {backtest['observations']} days "
+              f"(expected {backtest['expected']}), Kupiec p={backtest['kupiec']['p_value']}, "
+              f"{backtest['traffic_light']}")
+    engine.record_forecast()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+JOB RUNNER — Background Job Registry for dashboard_api
+Heavy endpoint work (scans, yfinance / Kite batch fetches, MTF scoring) runs
+here instead of inside the async handlers, so the event loop only ever
+schedules and reports and /ws/ticks keeps streaming while a scan is running.
+
+    registry     every job has an id, type, status, progress (0-1 + message),
+                 result / error and timestamps; finished jobs are kept for a
+                 bounded history
+    limits       per job type: how many run at once and how many may wait;
+                 beyond that submit() raises JobLimitError (HTTP 429)
+    coalescing   submitting a job whose (type, params) is already queued or
+                 running returns that job, so ten clicks on "scan" are one scan
+
+Jobs run on a dedicated thread pool, not the shared worker_pool ones: the job
+functions themselves fan out onto those (batch fetches, process-pool
+scoring), and a job must never wait on the pool it is occupying.
+
+Usage:
+    jobs = get_jobs()
+    job = jobs.submit("scan", lambda progress: run_scan(progress=progress))
+    job.to_dict()                      # {"id", "status", "progress", ...}
+    await jobs.wait_async(job.id, 30)  # non-blocking wait
+"""
+
+import asyncio
+import json
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+# type -> (max running, max queued behind them)
+JOB_LIMITS = {
+    "scan": (1, 1),
+    "live_scan": (2, 4),
+    "mtf_batch": (2, 4),
+}
+DEFAULT_LIMIT = (2, 8)
+MAX_JOB_WORKERS = 6
+MAX_HISTORY = 50
+
+QUEUED, RUNNING, COMPLETED, FAILED, CANCELLED = "queued", "running", "completed", "failed", "cancelled"
+ACTIVE = (QUEUED, RUNNING)
+
+
+class JobLimitError(RuntimeError):
+    """Raised by submit() when a job type's queue is full."""
+
+
+class Job:
+    """One unit of background work; mutated only by its worker thread and the manager lock."""
+
+    def __init__(self, job_type: str, fn: Callable, params: Optional[Dict] = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.type = job_type
+        self.params = params or {}
+        self.fn = fn
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = "queued"
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created = datetime.now()
+        self.started: Optional[datetime] = None
+        self.finished: Optional[datetime] = None
+        # Bumped on every change so streams can tell "nothing new" cheaply
+        self.version = 0
+        self._done = threading.Event()
+
+    @property
+    def key(self) -> tuple:
+        return (self.type, tuple(sorted((k, repr(v)) for k, v in self.params.items())))
+
+    @property
+    def done(self) -> bool:
+        return self.status not in ACTIVE
+
+    def report(self, fraction: float, message: str = ""):
+        """Progress callback handed to the job function."""
+        self.progress = round(min(max(float(fraction), 0.0), 1.0), 3)
+        if message:
+            self.message = message
+        self.version += 1
+
+    def to_dict(self, include_result: bool = True) -> Dict:
+        elapsed = None
+        if self.started:
+            elapsed = round(((self.finished or datetime.now()) - self.started).total_seconds(), 2)
+        out = {
+            "id": self.id,
+            "type": self.type,
+            "params": self.params,
+            "status": self.status,
+            "progress": self.progress,
+            "message": self.message,
+            "created": self.created.isoformat(),
+            "started": self.started.isoformat() if self.started else None,
+            "finished": self.finished.isoformat() if self.finished else None,
+            "elapsed_seconds": elapsed,
+            "version": self.version,
+        }
+        if self.error:
+            out["error"] = self.error
+        if include_result and self.status == COMPLETED:
+            out["result"] = self.result
+        return out
+
+
+class JobManager:
+    """Registry + scheduler: per-type concurrency, coalescing, bounded history."""
+
+    def __init__(self, limits: Optional[Dict[str, tuple]] = None,
+                 max_workers: int = MAX_JOB_WORKERS, max_history: int = MAX_HISTORY):
+        self.limits = {**JOB_LIMITS, **(limits or {})}
+        self.max_history = max_history
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._running: Dict[str, int] = {}
+        self._pending: Dict[str, Deque[Job]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"submitted": 0, "coalesced": 0, "rejected": 0,
+                      "completed": 0, "failed": 0, "cancelled": 0}
+
+    def limit(self, job_type: str) -> tuple:
+        return self.limits.get(job_type, DEFAULT_LIMIT)
+
+    # ── Submission ───────────────────────────────────────────────
+
+    def submit(self, job_type: str, fn: Callable[[Callable[[float, str], None]], Any],
+               params: Optional[Dict] = None, coalesce: bool = True) -> Job:
+        """
+        Queue fn(progress) as a job of `job_type`. Returns an already active
+        job with the same type and params instead when coalescing; raises
+        JobLimitError when the type's running slots and queue are full.
+        """
+        job = Job(job_type, fn, params)
+        with self._lock:
+            if coalesce:
+                for other in self._jobs.values():
+                    if not other.done and other.key == job.key:
+                        self.stats["coalesced"] += 1
+                        return other
+
+            max_running, max_queued = self.limit(job_type)
+            running = self._running.get(job_type, 0)
+            pending = self._pending.setdefault(job_type, deque())
+            if running >= max_running and len(pending) >= max_queued:
+                self.stats["rejected"] += 1
+                raise JobLimitError(f"Too many '{job_type}' jobs: {running} running, "
+                                    f"{len(pending)} queued")
+
+            self._jobs[job.id] = job
+            self.stats["submitted"] += 1
+            if running < max_running:
+                self._start(job)
+            else:
+                pending.append(job)
+                job.message = f"waiting for a free '{job_type}' slot"
+            self._trim()
+        return job
+
+    def _start(self, job: Job):
+        """Caller holds the lock."""
+        self._running[job.type] = self._running.get(job.type, 0) + 1
+        job.status = RUNNING
+        job.message = "started"
+        job.started = datetime.now()
+        job.version += 1
+        self._executor.submit(self._run, job)
+
+    def _run(self, job: Job):
+        result, error = None, None
+        try:
+            result = job.fn(job.report)
+        except Exception as e:
+            traceback.print_exc()
+            error = str(e) or type(e).__name__
+        with self._lock:
+            # Publish the outcome in one step so readers never see "completed" without a result
+            job.result, job.error = result, error
+            job.status = FAILED if error else COMPLETED
+            job.message = job.status
+            if not error:
+                job.progress = 1.0
+            job.finished = datetime.now()
+            job.version += 1
+            job.fn = None
+            self.stats[job.status] += 1
+            self._running[job.type] -= 1
+            pending = self._pending.get(job.type)
+            while pending and self._running[job.type] < self.limit(job.type)[0]:
+                self._start(pending.popleft())
+        job._done.set()
+        print(f"[JOBS] {job.type} {job.id} {job.status} in "
+              f"{(job.finished - job.started).total_seconds():.1f}s")
+
+    def _trim(self):
+        """Drop the oldest finished jobs beyond max_history. Caller holds the lock."""
+        finished = [j for j in self._jobs.values() if j.done]
+        for job in finished[:max(0, len(finished) - self.max_history)]:
+            del self._jobs[job.id]
+
+    # ── Queries ──────────────────────────────────────────────────
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def list(self, job_type: Optional[str] = None, active_only: bool = False) -> List[Job]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [j for j in reversed(jobs)
+                if (job_type is None or j.type == job_type) and not (active_only and j.done)]
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued job (a running thread cannot be interrupted). True if cancelled."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            pending = self._pending.get(job.type) if job else None
+            if job is None or job.status != QUEUED or not pending or job not in pending:
+                return False
+            pending.remove(job)
+            job.status = CANCELLED
+            job.message = "cancelled"
+            job.finished = datetime.now()
+            job.version += 1
+            job.fn = None
+            self.stats["cancelled"] += 1
+        job._done.set()
+        return True
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Job]:
+        """Block the calling thread until the job finishes (or timeout)."""
+        job = self.get(job_id)
+        if job is not None:
+            job._done.wait(timeout)
+        return job
+
+    async def wait_async(self, job_id: str, timeout: Optional[float] = None,
+                         poll: float = 0.1) -> Optional[Job]:
+        """Wait for a job without blocking the event loop; returns it finished or not."""
+        job = self.get(job_id)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while job is not None and not job.done:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(poll)
+        return job
+
+    async def stream(self, job_id: str, poll: float = 0.25, heartbeat: float = 15.0):
+        """
+        Async generator of job states: one on every change, a heartbeat (None)
+        when quiet for `heartbeat` seconds, and the final state with its result.
+        """
+        job = self.get(job_id)
+        if job is None:
+            return
+        seen = -1
+        quiet_since = time.monotonic()
+        while True:
+            if job.version != seen:
+                seen = job.version
+                quiet_since = time.monotonic()
+                yield job.to_dict(include_result=job.done)
+                if job.done:
+                    return
+            elif time.monotonic() - quiet_since >= heartbeat:
+                quiet_since = time.monotonic()
+                yield None
+            await asyncio.sleep(poll)
+
+    def info(self) -> Dict:
+        with self._lock:
+            return {
+                "running": {t: n for t, n in self._running.items() if n},
+                "queued": {t: len(q) for t, q in self._pending.items() if q},
+                "limits": {t: {"running": r, "queued": q} for t, (r, q) in self.limits.items()},
+                "history": len(self._jobs),
+                **self.stats,
+            }
+
+    def shutdown(self, wait: bool = False):
+        """Cancel queued jobs and stop the pool (running jobs finish if wait=True)."""
+        with self._lock:
+            queued = [j.id for q in self._pending.values() for j in q]
+        for job_id in queued:
+            self.cancel(job_id)
+        self._executor.shutdown(wait=wait)
+
+
+_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_jobs() -> JobManager:
+    """Process-wide job manager (created on first use)."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
+
+
+def sse_event(data: Optional[Dict], event: str = "progress") -> str:
+    """Server-sent-event frame for a job state (a comment line for heartbeats)."""
+    if data is None:
+        return ": keep-alive\n\n"
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
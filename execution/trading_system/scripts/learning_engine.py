@@ -8,7 +8,8 @@ import json
 import os
 from datetime import datetime, timedelta
 from typing import Dict, List
-from collections import defaultdict
+
+from trade_analytics import TradeAnalytics
 
 
 class LearningEngine:
@@ -19,6 +20,7 @@ class LearningEngine:
             self.config = json.load(f)
         self.base_path = os.path.dirname(os.path.dirname(config_path))
         self.knowledge_file = os.path.join(self.base_path, 'models', 'learned_patterns.json')
+        self.analytics = TradeAnalytics(os.path.join(self.base_path, 'analysis'))
         self.load_knowledge()
 
     def load_knowledge(self):
@@ -42,83 +44,21 @@ class LearningEngine:
             json.dump(self.knowledge, f, indent=2)
 
     def analyze_closed_trades(self, days: int = 7) -> Dict:
-        """Analyze closed trades over specified period"""
-
-        cutoff_date = datetime.now() - timedelta(days=days)
-        all_trades = []
-
-        # Load trades from analysis folder
-        analysis_path = os.path.join(self.base_path, 'analysis')
+        """Analyze closed trades over specified period (from the analytics aggregates)"""
 
-        for filename in os.listdir(analysis_path):
-            if filename.startswith('closed_trades_'):
-                filepath = os.path.join(analysis_path, filename)
-                with open(filepath, 'r') as f:
-                    trades = json.load(f)
-                    all_trades.extend(trades)
+        # Pick up trades closed by other processes since the last call
+        self.analytics.refresh()
+        analysis = self.analytics.summary(days)
 
-        # Filter by date
-        recent_trades = [
-            t for t in all_trades
-            if datetime.fromisoformat(t['entry_time']) > cutoff_date
-        ]
-
-        if not recent_trades:
+        if not analysis['total_trades']:
             return {'error': 'No trades in specified period'}
 
-        # Calculate metrics
-        winners = [t for t in recent_trades if t['winner']]
-        losers = [t for t in recent_trades if not t['winner']]
-
-        total_pnl = sum([t['final_pnl_amount'] for t in recent_trades])
-        avg_win = sum([t['final_pnl_amount'] for t in winners]) / len(winners) if winners else 0
-        avg_loss = sum([t['final_pnl_amount'] for t in losers]) / len(losers) if losers else 0
-
-        profit_factor = abs(sum([t['final_pnl_amount'] for t in winners]) /
-                           sum([t['final_pnl_amount'] for t in losers])) if losers else float('inf')
-
-        analysis = {
-            'period_days': days,
-            'total_trades': len(recent_trades),
-            'winners': len(winners),
-            'losers': len(losers),
-            'win_rate': len(winners) / len(recent_trades) * 100,
-            'total_pnl': total_pnl,
-            'avg_win': avg_win,
-            'avg_loss': avg_loss,
-            'profit_factor': profit_factor,
-            'trades': recent_trades
-        }
-
         return analysis
 
     def analyze_pattern_performance(self, analysis: Dict):
         """Analyze which patterns perform best"""
 
-        pattern_stats = defaultdict(lambda: {'wins': 0, 'losses': 0, 'total_pnl': 0})
-
-        for trade in analysis['trades']:
-            patterns = trade['setup_details'].get('patterns', [])
-
-            for pattern in patterns:
-                if trade['winner']:
-                    pattern_stats[pattern]['wins'] += 1
-                else:
-                    pattern_stats[pattern]['losses'] += 1
-
-                pattern_stats[pattern]['total_pnl'] += trade['final_pnl_amount']
-
-        # Calculate success rates
-        pattern_performance = {}
-
-        for pattern, stats in pattern_stats.items():
-            total = stats['wins'] + stats['losses']
-            pattern_performance[pattern] = {
-                'win_rate': stats['wins'] / total * 100 if total > 0 else 0,
-                'trades': total,
-                'total_pnl': stats['total_pnl'],
-                'avg_pnl': stats['total_pnl'] / total if total > 0 else 0
-            }
+        pattern_performance = self.analytics.stats('pattern', analysis['period_days'])
 
         # Update knowledge
         self.knowledge['pattern_success_rates'] = pattern_performance
@@ -129,35 +69,27 @@ class LearningEngine:
     def analyze_setup_types(self, analysis: Dict):
         """Analyze LONG vs SHORT performance"""
 
-        setup_stats = defaultdict(lambda: {'wins': 0, 'losses': 0, 'total_pnl': 0})
-
-        for trade in analysis['trades']:
-            setup_type = trade['type']
+        setup_performance = self.analytics.stats('setup_type', analysis['period_days'])
 
-            if trade['winner']:
-                setup_stats[setup_type]['wins'] += 1
-            else:
-                setup_stats[setup_type]['losses'] += 1
+        # Update knowledge
+        self.knowledge['setup_type_performance'] = setup_performance
+        self.save_knowledge()
 
-            setup_stats[setup_type]['total_pnl'] += trade['final_pnl_amount']
+        return setup_performance
 
-        # Calculate performance
-        setup_performance = {}
+    def analyze_entry_times(self, analysis: Dict):
+        """Analyze performance by entry hour and weekday"""
 
-        for setup_type, stats in setup_stats.items():
-            total = stats['wins'] + stats['losses']
-            setup_performance[setup_type] = {
-                'win_rate': stats['wins'] / total * 100 if total > 0 else 0,
-                'trades': total,
-                'total_pnl': stats['total_pnl'],
-                'avg_pnl': stats['total_pnl'] / total if total > 0 else 0
-            }
+        timing = {
+            'by_hour': self.analytics.stats('hour', analysis['period_days']),
+            'by_weekday': self.analytics.stats('weekday', analysis['period_days']),
+        }
 
         # Update knowledge
-        self.knowledge['setup_type_performance'] = setup_performance
+        self.knowledge['optimal_entry_times'] = timing
         self.save_knowledge()
 
-        return setup_performance
+        return timing
 
     def identify_improvements(self, analysis: Dict) -> List[Dict]:
         """Identify areas for improvement based on data"""
@@ -218,6 +150,8 @@ class LearningEngine:
         # Analyze patterns and setups
         pattern_perf = self.analyze_pattern_performance(analysis)
         setup_perf = self.analyze_setup_types(analysis)
+        timing_perf = self.analyze_entry_times(analysis)
+        symbol_perf = self.analytics.stats('symbol', analysis['period_days'])
         improvements = self.identify_improvements(analysis)
 
         # Generate report
@@ -232,6 +166,8 @@ class LearningEngine:
             },
             'pattern_performance': pattern_perf,
             'setup_performance': setup_perf,
+            'symbol_performance': symbol_perf,
+            'entry_time_performance': timing_perf,
             'improvements': improvements
         }
 
@@ -295,11 +231,12 @@ class LearningEngine:
 
         print(f"\n[LESSON CAPTURED] {category}: {lesson}")
 
-    def suggest_scoring_adjustments(self) -> Dict:
-        """Suggest adjustments to scoring weights based on performance"""
+    def suggest_scoring_adjustments(self, days: int = 7) -> Dict:
+        """Suggest adjustments to scoring weights based on performance (days=None: all history)"""
 
-        pattern_perf = self.knowledge.get('pattern_success_rates', {})
-        setup_perf = self.knowledge.get('setup_type_performance', {})
+        self.analytics.refresh()
+        pattern_perf = self.analytics.stats('pattern', days)
+        setup_perf = self.analytics.stats('setup_type', days)
 
         suggestions = {
             'pattern_weights': {},
@@ -9,7 +9,7 @@ import json
 import os
 import sys
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 import time
 from pathlib import Path
 
@@ -29,8 +29,16 @@ except ImportError:
 # ── Kite MCP + Signal Engine integration ─────────────────────────
 SCRIPT_DIR = Path(__file__).resolve().parent
 EXECUTION_DIR = SCRIPT_DIR.parent.parent
+ROOT_DIR = EXECUTION_DIR.parent  # execution -> project root (nifty_conviction_engine)
 sys.path.insert(0, str(EXECUTION_DIR))
 sys.path.insert(0, str(SCRIPT_DIR))
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+from nifty_conviction_engine.pattern_scanner import PATTERNS, scan_patterns
+from nifty_conviction_engine.support_resistance import (
+    LevelCache, SupportResistanceTracker, chained_group_starts, split_groups,
+)
 
 _kite_client = None
 _signal_engine = None
@@ -50,6 +58,20 @@ def _get_kite_client():
         pass
     return None
 
+def use_kite_client(client):
+    """Share an already-connected Kite client (e.g. the dashboard's) instead of creating one."""
+    global _kite_client
+    _kite_client = client
+
+# Per-symbol S/R trackers, one cache per pivot window (shared by scans, analyze_stock and charts)
+_sr_caches = {}
+
+def _get_sr_cache(lookback: int) -> LevelCache:
+    if lookback not in _sr_caches:
+        left = lookback // 2
+        _sr_caches[lookback] = LevelCache(windows=((left, lookback - left - 1),))
+    return _sr_caches[lookback]
+
 def _get_signal_engine():
     """Lazy-load signal engine."""
     global _signal_engine
@@ -217,35 +239,90 @@ def fetch_kite_ltp_batch(symbols: List[str]) -> Dict[str, float]:
         return {}
 
 
-def fetch_ohlcv(symbol: str, yf_ticker: str, period: str = "6mo") -> pd.DataFrame:
+def _clean_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalise a single-ticker yfinance frame: lowercase columns, date column, numeric OHLCV."""
+    # Flatten multi-level columns from yfinance
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = [col[0].lower() for col in df.columns]
+    else:
+        df.columns = [c.lower() for c in df.columns]
+
+    df = df.reset_index()
+    df.rename(columns={"index": "date", "Date": "date", "Datetime": "date"}, inplace=True)
+    if "date" not in df.columns:
+        df["date"] = df.index
+
+    for col in ["open", "high", "low", "close", "volume"]:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    df = df.dropna(subset=["close"]).sort_values("date").reset_index(drop=True)
+    return df
+
+
+def fetch_ohlcv(symbol: str, yf_ticker: str, period: str = "6mo",
+                interval: str = "1d") -> pd.DataFrame:
     """Fetch OHLCV from yfinance. Returns clean DataFrame or empty."""
     try:
-        df = yf.download(yf_ticker, period=period, interval="1d", progress=False)
+        df = yf.download(yf_ticker, period=period, interval=interval, progress=False)
         if df.empty:
             print(f"[WARN] No data returned for {symbol} ({yf_ticker})")
             return pd.DataFrame()
+        return _clean_ohlcv(df)
 
-        # Flatten multi-level columns from yfinance
-        if isinstance(df.columns, pd.MultiIndex):
-            df.columns = [col[0].lower() for col in df.columns]
-        else:
-            df.columns = [c.lower() for c in df.columns]
+    except Exception as e:
+        print(f"[ERROR] Failed to fetch {symbol}: {e}")
+        return pd.DataFrame()
 
-        df = df.reset_index()
-        df.rename(columns={"index": "date", "Date": "date"}, inplace=True)
-        if "date" not in df.columns:
-            df["date"] = df.index
 
-        for col in ["open", "high", "low", "close", "volume"]:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors="coerce")
+def fetch_ohlcv_batch(watchlist: Dict[str, str], period: str = "6mo",
+                      interval: str = "1d") -> Dict[str, pd.DataFrame]:
+    """
+    Fetch OHLCV for many symbols in a single yfinance request.
+    Returns {symbol: clean DataFrame}; symbols with no data are omitted.
+    """
+    if not watchlist:
+        return {}
+    tickers = list(watchlist.values())
+    try:
+        raw = yf.download(tickers, period=period, interval=interval,
+                          group_by="ticker", progress=False)
+    except Exception as e:
+        print(f"[ERROR] Batch fetch failed ({interval}): {e}")
+        return {}
+    if raw.empty:
+        return {}
+
+    frames = {}
+    for symbol, yf_ticker in watchlist.items():
+        try:
+            if isinstance(raw.columns, pd.MultiIndex):
+                if yf_ticker not in raw.columns.get_level_values(0):
+                    continue
+                df = raw[yf_ticker].copy()
+            else:
+                df = raw.copy()
+            df = _clean_ohlcv(df)
+            if not df.empty:
+                frames[symbol] = df
+        except Exception as e:
+            print(f"[WARN] {symbol}: {e}")
+    return frames
 
-        df = df.dropna(subset=["close"]).sort_values("date").reset_index(drop=True)
-        return df
 
-    except Exception as e:
-        print(f"[ERROR] Failed to fetch {symbol}: {e}")
-        return pd.DataFrame()
+def _df_to_candles(df: pd.DataFrame, tail: int = 100) -> List[Dict]:
+    """Last `tail` rows as signal-engine candle dicts."""
+    cols = df[["open", "high", "low", "close", "volume"]].tail(tail).astype(float)
+    return cols.to_dict("records")
+
+
+# Intraday timeframes for MTF conviction: signal-engine name -> (yfinance interval, period)
+MTF_INTERVALS = {
+    "5min": ("5m", "5d"),
+    "15min": ("15m", "1mo"),
+    "1hr": ("60m", "3mo"),
+}
+MAX_MTF_SYMBOLS = 50
 
 
 class TechnicalAnalyzer:
@@ -256,38 +333,36 @@ class TechnicalAnalyzer:
             self.config = json.load(f)
         self.base_path = os.path.dirname(os.path.dirname(config_path))
 
-    def detect_support_resistance(self, df: pd.DataFrame, lookback: int = 20) -> Dict:
-        """Identify key support and resistance levels"""
-        highs = df["high"].rolling(window=lookback, center=True).max()
-        lows = df["low"].rolling(window=lookback, center=True).min()
-
-        resistance_levels = []
-        support_levels = []
-
-        for i in range(lookback, len(df) - lookback):
-            if df["high"].iloc[i] == highs.iloc[i]:
-                resistance_levels.append(df["high"].iloc[i])
-            if df["low"].iloc[i] == lows.iloc[i]:
-                support_levels.append(df["low"].iloc[i])
-
-        def cluster_levels(levels, threshold=0.02):
-            if not levels:
-                return []
-            levels = sorted(levels)
-            clustered = []
-            current_cluster = [levels[0]]
-            for level in levels[1:]:
-                if (level - current_cluster[-1]) / current_cluster[-1] < threshold:
-                    current_cluster.append(level)
-                else:
-                    clustered.append(sum(current_cluster) / len(current_cluster))
-                    current_cluster = [level]
-            clustered.append(sum(current_cluster) / len(current_cluster))
-            return clustered
+    def detect_support_resistance(self, df: pd.DataFrame, lookback: int = 20,
+                                  symbol: Optional[str] = None) -> Dict:
+        """
+        Identify key support and resistance levels.
+
+        Pivots are bars equal to the max/min of their centred `lookback`-bar window.
+        With a symbol, pivots come from that symbol's cached tracker, which only
+        processes bars that are new (or revised) since the previous call.
+        """
+        left = lookback // 2
+        right = lookback - left - 1
+        highs = df["high"].to_numpy(dtype=float)
+        lows = df["low"].to_numpy(dtype=float)
+        keys = df["date"].tolist() if "date" in df.columns else None
+
+        if symbol:
+            tracker, offset = _get_sr_cache(lookback).sync(symbol, highs, lows, keys)
+        else:
+            tracker, offset = SupportResistanceTracker(windows=((left, right),)), 0
+            tracker.extend(highs, lows, keys)
+
+        def cluster_levels(kind, threshold=0.02):
+            prices = np.sort(tracker.pivot_prices(kind, (left, right),
+                                                  offset + lookback, offset + len(df) - lookback))
+            groups = split_groups(prices.tolist(), chained_group_starts(prices, threshold))
+            return [sum(g) / len(g) for g in groups]
 
         return {
-            "resistance": cluster_levels(resistance_levels)[-3:],
-            "support": cluster_levels(support_levels)[-3:],
+            "resistance": cluster_levels("high")[-3:],
+            "support": cluster_levels("low")[-3:],
             "current_price": float(df["close"].iloc[-1]),
         }
 
@@ -353,40 +428,22 @@ class TechnicalAnalyzer:
             "ema_50": ema50_val,
         }
 
+    def scan_candlestick_patterns(self, df: pd.DataFrame):
+        """
+        Every candlestick pattern over every bar of df (shared vectorized engine).
+        Returns a PatternHits sparse matrix; bar indices are df row positions.
+        """
+        return scan_patterns(df["open"].to_numpy(float), df["high"].to_numpy(float),
+                             df["low"].to_numpy(float), df["close"].to_numpy(float))
+
     def detect_candlestick_patterns(self, df: pd.DataFrame) -> List[str]:
-        """Identify key candlestick patterns at critical levels"""
-        patterns = []
-        c1, c2, c3 = df.iloc[-3], df.iloc[-2], df.iloc[-1]
-
-        if c3["close"] > c3["open"]:
-            body = c3["close"] - c3["open"]
-            upper_wick = c3["high"] - c3["close"]
-            lower_wick = c3["open"] - c3["low"]
-
-            if c2["close"] < c2["open"] and c3["open"] < c2["close"] and c3["close"] > c2["open"]:
-                patterns.append("bullish_engulfing")
-            if body > 0 and lower_wick > body * 2 and upper_wick < body * 0.3:
-                patterns.append("hammer")
-            if (c1["close"] < c1["open"] and c2["close"] < c2["open"]
-                    and abs(c2["close"] - c2["open"]) < body * 0.3
-                    and c3["close"] > (c1["open"] + c1["close"]) / 2):
-                patterns.append("morning_star")
-
-        if c3["close"] < c3["open"]:
-            body = c3["open"] - c3["close"]
-            upper_wick = c3["high"] - c3["open"]
-            lower_wick = c3["close"] - c3["low"]
-
-            if c2["close"] > c2["open"] and c3["open"] > c2["close"] and c3["close"] < c2["open"]:
-                patterns.append("bearish_engulfing")
-            if body > 0 and upper_wick > body * 2 and lower_wick < body * 0.3:
-                patterns.append("shooting_star")
-            if (c1["close"] > c1["open"] and c2["close"] > c2["open"]
-                    and abs(c2["close"] - c2["open"]) < body * 0.3
-                    and c3["close"] < (c1["open"] + c1["close"]) / 2):
-                patterns.append("evening_star")
-
-        return patterns
+        """Identify directional candlestick patterns on the latest bar"""
+        if len(df) < 3:
+            return []
+        window = df.tail(12)  # 10-bar average body + 2 bars of pattern context
+        hits = self.scan_candlestick_patterns(window).select(bars=len(window) - 1)
+        return [key for key, pid in zip(hits.keys(), hits.patterns.tolist())
+                if PATTERNS[pid][2] != "neutral"]
 
     def calculate_score(self, analysis: Dict) -> int:
         """Score setup quality from 0-100 based on technical confluence"""
@@ -442,8 +499,13 @@ class TechnicalAnalyzer:
         return min(score, 100)
 
     def analyze_stock(self, symbol: str, df: pd.DataFrame,
-                      live_price: Optional[float] = None) -> Dict:
-        """Complete technical analysis for a single stock"""
+                      live_price: Optional[float] = None,
+                      signal: Optional[Dict] = None) -> Dict:
+        """
+        Complete technical analysis for a single stock.
+        `signal` is an already computed daily SignalEngine.analyze result (e.g.
+        from signal_service.py's snapshot); without it the engine runs on df.
+        """
         if len(df) < 50:
             return None
 
@@ -459,7 +521,7 @@ class TechnicalAnalyzer:
         analysis = {
             "symbol": symbol,
             "timestamp": datetime.now().isoformat(),
-            "sr_levels": self.detect_support_resistance(df),
+            "sr_levels": self.detect_support_resistance(df, symbol=symbol),
             "fvgs": self.identify_fair_value_gaps(df),
             "trend": self.analyze_trend(df),
             "patterns": self.detect_candlestick_patterns(df),
@@ -474,7 +536,8 @@ class TechnicalAnalyzer:
         analysis["score"] = self.calculate_score(analysis)
 
         # ── Signal Engine boost: add confluence score if available ──
-        engine = _get_signal_engine()
+        sig = signal
+        engine = _get_signal_engine() if sig is None else None
         if engine and len(df) >= 20:
             candles = []
             for _, row in df.tail(100).iterrows():
@@ -484,21 +547,21 @@ class TechnicalAnalyzer:
                     "volume": float(row["volume"]),
                 })
             sig = engine.analyze(candles, symbol, "daily")
-            if "error" not in sig:
-                analysis["signal_engine"] = {
-                    "direction": sig["direction"],
-                    "confidence": sig["confidence"],
-                    "trend_strength": sig["trend_strength"],
-                    "rsi": sig["rsi"]["value"],
-                    "supertrend": sig["supertrend"]["signal"],
-                    "vwap_position": sig["vwap"]["position"],
-                    "divergence": sig["rsi"]["divergence"]["type"],
-                }
-                # Boost original score with signal engine confluence
-                if sig["confidence"] >= 75:
-                    analysis["score"] = min(100, analysis["score"] + 10)
-                elif sig["confidence"] >= 60:
-                    analysis["score"] = min(100, analysis["score"] + 5)
+        if sig and "error" not in sig:
+            analysis["signal_engine"] = {
+                "direction": sig["direction"],
+                "confidence": sig["confidence"],
+                "trend_strength": sig["trend_strength"],
+                "rsi": sig["rsi"]["value"],
+                "supertrend": sig["supertrend"]["signal"],
+                "vwap_position": sig["vwap"]["position"],
+                "divergence": sig["rsi"]["divergence"]["type"],
+            }
+            # Boost original score with signal engine confluence
+            if sig["confidence"] >= 75:
+                analysis["score"] = min(100, analysis["score"] + 10)
+            elif sig["confidence"] >= 60:
+                analysis["score"] = min(100, analysis["score"] + 5)
 
         min_score = self.config["entry_rules"]["minimum_score"]
         if analysis["score"] >= min_score:
@@ -535,11 +598,22 @@ class MarketScanner:
         self.config = self.analyzer.config
         self.base_path = self.analyzer.base_path
         self._ltp_cache: Dict[str, float] = {}
-
-    def fetch_all(self) -> Dict[str, pd.DataFrame]:
-        """Fetch OHLCV for entire watchlist from yfinance"""
+        self._signal_snapshots = None
+
+    @property
+    def signal_snapshots(self):
+        """Reader of signal_service.py's published signals (shared with the orchestrator)."""
+        if self._signal_snapshots is None:
+            from signal_service import SignalSnapshots
+            self._signal_snapshots = SignalSnapshots()
+        return self._signal_snapshots
+
+    def fetch_all(self, progress: Optional[Callable[[float, str], None]] = None) -> Dict[str, pd.DataFrame]:
+        """Fetch OHLCV for entire watchlist from yfinance (progress(fraction, message) per symbol)"""
         frames = {}
-        for symbol, yf_ticker in WATCHLIST.items():
+        for i, (symbol, yf_ticker) in enumerate(WATCHLIST.items()):
+            if progress:
+                progress(i / len(WATCHLIST), f"fetching {symbol}")
             df = fetch_ohlcv(symbol, yf_ticker)
             if not df.empty and len(df) >= 50:
                 frames[symbol] = df
@@ -607,23 +681,36 @@ class MarketScanner:
             "entry_strategy": analysis.get("entry_strategy", ""),
         }
 
-    def scan_market(self) -> List[Dict]:
-        """Scan all watchlist stocks — hybrid Kite + yfinance"""
+    def scan_market(self, progress: Optional[Callable[[float, str], None]] = None) -> List[Dict]:
+        """
+        Scan all watchlist stocks — hybrid Kite + yfinance.
+        progress(fraction, message) is called per symbol: fetching is the
+        first 60%, analysis the rest.
+        """
         print(f"\n{'='*60}")
         print(f"[SCAN] Starting market scan at {datetime.now().strftime('%H:%M:%S')}")
         print(f"[SCAN] Hybrid mode: yfinance history + Kite real-time LTP")
         print(f"{'='*60}\n")
 
-        frames = self.fetch_all()
+        frames = self.fetch_all(
+            progress=(lambda f, msg: progress(0.6 * f, msg)) if progress else None)
         if not frames:
             print("[WARN] No data fetched from yfinance.")
             return []
 
+        # Daily signals signal_service.py already computed on bar close are
+        # reused instead of re-running the engine per symbol
+        snapshots = self.signal_snapshots
+        from_snapshot = snapshots.service_running()
+
         opportunities = []
-        for symbol, df in frames.items():
+        for i, (symbol, df) in enumerate(frames.items()):
+            if progress:
+                progress(0.6 + 0.4 * i / len(frames), f"analyzing {symbol}")
             try:
                 live_price = self._ltp_cache.get(symbol)
-                analysis = self.analyzer.analyze_stock(symbol, df, live_price)
+                signal = snapshots.signal(symbol, "daily") if from_snapshot else None
+                analysis = self.analyzer.analyze_stock(symbol, df, live_price, signal=signal)
                 if analysis is None:
                     continue
                 formatted = self.format_opportunity(analysis)
@@ -672,9 +759,9 @@ class MarketScanner:
         with open(journal_file, "a") as f:
             f.write(json.dumps(log_entry) + "\n")
 
-    def run_single_scan(self) -> List[Dict]:
+    def run_single_scan(self, progress: Optional[Callable[[float, str], None]] = None) -> List[Dict]:
         """Run a single scan and save results. Called by the API."""
-        opportunities = self.scan_market()
+        opportunities = self.scan_market(progress=progress)
         if opportunities:
             self.save_opportunities(opportunities)
             self.log_scan(opportunities)
@@ -756,7 +843,7 @@ class MarketScanner:
             trend, trend_strength = "sideways", "neutral"
 
         # Support distance
-        sr = self.analyzer.detect_support_resistance(df)
+        sr = self.analyzer.detect_support_resistance(df, symbol=symbol)
         supports = sr.get("support", [])
         support_dist = 100.0
         for s in supports:
@@ -852,10 +939,14 @@ class MarketScanner:
     def live_scan(self, universe: str = "quick",
                   preset: Optional[str] = None,
                   conditions: Optional[List[Dict]] = None,
-                  custom_symbols: Optional[List[str]] = None) -> List[Dict]:
+                  custom_symbols: Optional[List[str]] = None,
+                  include_mtf: bool = False,
+                  progress: Optional[Callable[[float, str], None]] = None) -> List[Dict]:
         """
         Run a live scan — returns results directly (no file save).
         Like Streak: select universe, pick preset or custom conditions.
+        include_mtf attaches 5m/15m/1h confluence to each match (one batched call).
+        progress(fraction, message) is called per symbol fetched / evaluated.
         """
         # Resolve universe
         if custom_symbols:
@@ -879,7 +970,9 @@ class MarketScanner:
 
         # Fetch data
         frames = {}
-        for symbol, yf_ticker in watchlist.items():
+        for i, (symbol, yf_ticker) in enumerate(watchlist.items()):
+            if progress:
+                progress(0.6 * i / len(watchlist), f"fetching {symbol}")
             df = fetch_ohlcv(symbol, yf_ticker)
             if not df.empty and len(df) >= 50:
                 frames[symbol] = df
@@ -889,7 +982,9 @@ class MarketScanner:
 
         # Extract indicators and filter
         results = []
-        for symbol, df in frames.items():
+        for i, (symbol, df) in enumerate(frames.items()):
+            if progress:
+                progress(0.6 + 0.3 * i / len(frames), f"evaluating {symbol}")
             try:
                 live_price = kite_ltps.get(symbol)
                 indicators = self._extract_indicators(symbol, df, live_price)
@@ -934,9 +1029,64 @@ class MarketScanner:
         else:
             results.sort(key=lambda x: x["score"], reverse=True)
 
+        if include_mtf and results:
+            if progress:
+                progress(0.9, "multi-timeframe confluence")
+            mtf = self.mtf_conviction(
+                [r["symbol"] for r in results[:MAX_MTF_SYMBOLS]],
+                watchlist=watchlist)
+            for r in results:
+                r["mtf"] = mtf.get(r["symbol"])
+
         print(f"[LIVE SCAN] {len(results)} matches from {len(frames)} stocks")
         return results
 
+    def mtf_conviction(self, symbols: Optional[List[str]] = None,
+                       universe: str = "nifty50",
+                       watchlist: Optional[Dict[str, str]] = None) -> Dict[str, Dict]:
+        """
+        Multi-timeframe (5m / 15m / 1h) confluence for up to MAX_MTF_SYMBOLS symbols.
+
+        Symbols the live ticker is streaming use its candles; the rest come from
+        one batched yfinance download per interval. Every symbol is then scored
+        on the shared worker pool. Returns {symbol: mtf result} in request order;
+        symbols without intraday data get {"error": ...}.
+        """
+        watchlist = watchlist or UNIVERSES.get(universe, UNIVERSE_NIFTY50)
+        if symbols:
+            symbols = [s.upper() for s in symbols]
+        else:
+            symbols = list(watchlist)
+        if len(symbols) > MAX_MTF_SYMBOLS:
+            raise ValueError(f"At most {MAX_MTF_SYMBOLS} symbols per MTF batch, got {len(symbols)}")
+
+        from signal_engine import SignalEngine, live_candles
+
+        symbol_candles = {s: {} for s in symbols}
+        for symbol in symbols:
+            live = {tf: live_candles(symbol, tf) for tf in MTF_INTERVALS}
+            if all(live.values()):
+                symbol_candles[symbol] = live
+
+        tickers = {s: watchlist.get(s, WATCHLIST.get(s, f"{s}.NS"))
+                   for s in symbols if not symbol_candles[s]}
+        if len(tickers) < len(symbols):
+            print(f"[MTF] {len(symbols) - len(tickers)} symbols from live ticker candles")
+        if tickers:
+            print(f"[MTF] Fetching {len(tickers)} symbols x {len(MTF_INTERVALS)} timeframes")
+            for tf, (interval, period) in MTF_INTERVALS.items():
+                for symbol, df in fetch_ohlcv_batch(tickers, period=period, interval=interval).items():
+                    symbol_candles[symbol][tf] = _df_to_candles(df)
+
+        ready = {s: c for s, c in symbol_candles.items() if c}
+        scored = SignalEngine().multi_timeframe_batch(ready)
+
+        results = {}
+        for symbol in symbols:
+            results[symbol] = scored.get(symbol) or {"error": "No intraday data", "signal": "NEUTRAL"}
+        print(f"[MTF] Scored {len(scored)}/{len(symbols)} symbols")
+        return results
+
     def run_continuous(self):
         """Run scanner in a loop"""
         print("\n" + "=" * 60)
@@ -949,6 +1099,10 @@ class MarketScanner:
         print(f"[CONFIG] Watchlist: {len(WATCHLIST)} stocks\n")
         print("Press Ctrl+C to stop\n")
 
+        # Skip re-scans while signal_service.py reports no new closed bars
+        snapshots = self.signal_snapshots
+        version = snapshots.version()
+
         try:
             while True:
                 opps = self.run_single_scan()
@@ -962,13 +1116,13 @@ class MarketScanner:
 
                 print(f"\n[WAIT] Next scan in {self.config['scanning']['scan_interval_minutes']} minutes...")
                 print("-" * 60 + "\n")
-                time.sleep(interval)
+                version = snapshots.wait_for_update(version, interval)
 
         except KeyboardInterrupt:
             print("\n\n[STOP] Scanner stopped by user")
 
 
-def run_scan():
+def run_scan(progress: Optional[Callable[[float, str], None]] = None):
     """Run a single scan and return results. Used by the API."""
     base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     config_path = os.path.join(base, "config", "trading_rules.json")
@@ -976,7 +1130,7 @@ def run_scan():
         print(f"[ERROR] Config not found: {config_path}")
         return []
     scanner = MarketScanner(config_path)
-    return scanner.run_single_scan()
+    return scanner.run_single_scan(progress=progress)
 
 
 def main():
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+OPTION PRICING — Vectorized Black-Scholes Engine
+European pricing, Greeks and implied volatility for whole arrays of option
+legs at once (numpy only), plus NSE trading-symbol parsing. Used by the
+options risk module (Greeks aggregation, scenario grids) and anything else
+that needs to revalue a book under shocked spot / volatility.
+
+Conventions:
+    S, K     underlying price and strike
+    T        time to expiry in years (floored at one minute)
+    sigma    annualised volatility as a fraction (0.14 = 14%)
+    is_call  bool array (False = put)
+    vega     per 1 volatility point; theta per calendar day
+"""
+
+import re
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
+
+import numpy as np
+
+RISK_FREE_RATE = 0.065
+MIN_T = 1.0 / (365 * 24 * 60)      # one minute
+MIN_VOL, MAX_VOL = 0.01, 5.0
+
+# Index underlyings -> tick / quote symbol of the spot
+INDEX_SPOT_SYMBOLS = {
+    "NIFTY": "NIFTY 50",
+    "BANKNIFTY": "NIFTY BANK",
+    "FINNIFTY": "NIFTY FIN SERVICE",
+}
+
+# NIFTY26FEB25500CE (monthly) / NIFTY2621725500CE (weekly: YY, month code, DD)
+_OPTION_RE = re.compile(r"^(?P<name>[A-Z&\-]+?)(?P<yy>\d{2})"
+                        r"(?:(?P<mon>[A-Z]{3})|(?P<m>[1-9OND])(?P<dd>\d{2}))"
+                        r"(?P<strike>\d+(?:\.\d+)?)(?P<kind>CE|PE)$")
+_MONTHS = {m: i for i, m in enumerate(
+    ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"], 1)}
+_WEEKLY_MONTHS = {**{str(i): i for i in range(1, 10)}, "O": 10, "N": 11, "D": 12}
+
+# NSE moved monthly F&O expiries from the last Thursday to the last Tuesday
+EXPIRY_WEEKDAY_CHANGE = date(2025, 9, 1)
+EXPIRY_TIME = (15, 30)
+
+
+# ══════════════════════════════════════════════════════════════════
+# Symbols
+# ══════════════════════════════════════════════════════════════════
+
+def _last_weekday(year: int, month: int, weekday: int) -> date:
+    nxt = date(year + month // 12, month % 12 + 1, 1)
+    day = nxt - timedelta(days=1)
+    return day - timedelta(days=(day.weekday() - weekday) % 7)
+
+
+def parse_option_symbol(symbol: str) -> Optional[Dict]:
+    """
+    {underlying, expiry (date), strike, is_call} for an NSE option trading
+    symbol, None for anything else. Monthly expiries fall on the month's last
+    Tuesday (last Thursday before Sep 2025); exchange holidays are ignored.
+    """
+    m = _OPTION_RE.match(symbol.upper())
+    if not m:
+        return None
+    year = 2000 + int(m["yy"])
+    if m["mon"]:
+        month = _MONTHS.get(m["mon"])
+        if month is None:
+            return None
+        weekday = 1 if date(year, month, 1) >= EXPIRY_WEEKDAY_CHANGE.replace(day=1) else 3
+        expiry = _last_weekday(year, month, weekday)
+    else:
+        try:
+            expiry = date(year, _WEEKLY_MONTHS[m["m"]], int(m["dd"]))
+        except ValueError:
+            return None
+    return {
+        "underlying": m["name"],
+        "expiry": expiry,
+        "strike": float(m["strike"]),
+        "is_call": m["kind"] == "CE",
+    }
+
+
+def year_fraction(expiry, now: Optional[datetime] = None) -> float:
+    """Years from now to 15:30 on the expiry date (floored at MIN_T)."""
+    now = now or datetime.now()
+    expiry_dt = datetime.combine(expiry, datetime.min.time()).replace(
+        hour=EXPIRY_TIME[0], minute=EXPIRY_TIME[1])
+    return max((expiry_dt - now).total_seconds() / (365 * 86400), MIN_T)
+
+
+# ══════════════════════════════════════════════════════════════════
+# Black-Scholes
+# ══════════════════════════════════════════════════════════════════
+
+def norm_pdf(x):
+    return np.exp(-0.5 * np.square(x)) / np.sqrt(2 * np.pi)
+
+
+def norm_cdf(x):
+    """
+    Standard normal CDF via erfc with the Numerical Recipes Chebyshev fit
+    (|error| < 1.2e-7): numpy has no erf and this keeps scipy optional.
+    """
+    z = np.abs(np.asarray(x, dtype=np.float64)) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.5 * z)
+    poly = (-z * z - 1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418 +
+            t * (-0.18628806 + t * (0.27886807 + t * (-1.13520398 + t * (1.48851587 +
+            t * (-0.82215223 + t * 0.17087277)))))))))
+    erfc = t * np.exp(poly)
+    return np.where(np.asarray(x) >= 0, 1.0 - 0.5 * erfc, 0.5 * erfc)
+
+
+def _d1_d2(S, K, T, sigma, r):
+    T = np.maximum(T, MIN_T)
+    vol_t = np.maximum(sigma, 1e-8) * np.sqrt(T)
+    d1 = (np.log(S / K) + (r + 0.5 * np.square(sigma)) * T) / vol_t
+    return d1, d1 - vol_t, T
+
+
+def bs_price(S, K, T, sigma, is_call, r=RISK_FREE_RATE):
+    """European option price; broadcasts over all arguments."""
+    S, K, sigma = np.asarray(S, float), np.asarray(K, float), np.asarray(sigma, float)
+    d1, d2, T = _d1_d2(S, K, T, sigma, r)
+    disc = K * np.exp(-r * T)
+    call = S * norm_cdf(d1) - disc * norm_cdf(d2)
+    put = call - S + disc    # put-call parity
+    return np.where(is_call, call, put)
+
+
+def bs_greeks(S, K, T, sigma, is_call, r=RISK_FREE_RATE) -> Dict[str, np.ndarray]:
+    """Per-unit delta, gamma, vega (per vol point) and theta (per day)."""
+    S, K, sigma = np.asarray(S, float), np.asarray(K, float), np.asarray(sigma, float)
+    d1, d2, T = _d1_d2(S, K, T, sigma, r)
+    pdf = norm_pdf(d1)
+    sqrt_t = np.sqrt(T)
+    disc = K * np.exp(-r * T)
+
+    delta = np.where(is_call, norm_cdf(d1), norm_cdf(d1) - 1.0)
+    gamma = pdf / (S * sigma * sqrt_t)
+    vega = S * pdf * sqrt_t / 100.0
+    decay = -S * pdf * sigma / (2 * sqrt_t)
+    theta = np.where(is_call, decay - r * disc * norm_cdf(d2),
+                     decay + r * disc * norm_cdf(-d2)) / 365.0
+    return {"delta": delta, "gamma": gamma, "vega": vega, "theta": theta}
+
+
+def implied_vol(price, S, K, T, is_call, r=RISK_FREE_RATE, iterations: int = 40):
+    """
+    Implied volatility by vectorized bisection in [MIN_VOL, MAX_VOL] (price is
+    monotone in sigma, so this cannot diverge). NaN where the price is outside
+    the no-arbitrage bounds.
+    """
+    price, S, K = np.asarray(price, float), np.asarray(S, float), np.asarray(K, float)
+    T = np.maximum(np.asarray(T, float), MIN_T)
+    shape = np.broadcast(price, S, K, T, is_call).shape
+    lo = np.full(shape, MIN_VOL)
+    hi = np.full(shape, MAX_VOL)
+    for _ in range(iterations):
+        mid = 0.5 * (lo + hi)
+        above = bs_price(S, K, T, mid, is_call, r) > price
+        hi = np.where(above, mid, hi)
+        lo = np.where(above, lo, mid)
+    sigma = 0.5 * (lo + hi)
+
+    disc = K * np.exp(-r * T)
+    intrinsic = np.where(is_call, np.maximum(S - disc, 0), np.maximum(disc - S, 0))
+    upper = np.where(is_call, S, disc)
+    valid = (price > intrinsic) & (price < upper)
+    return np.where(valid, sigma, np.nan)
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+OPTIONS RISK — Net Greeks, Scenario Grid and VaR per Underlying
+Treats the book as option legs (plus futures and stock legs in the same
+underlyings, as delta-one) held in arrays: implied vols are backed out from
+leg prices, Greeks are aggregated per underlying, and every leg is fully
+revalued over a spot × IV shock grid in one broadcast pass — so "P&L if
+NIFTY -1% and IV +2" is a lookup, refreshed on each tick batch by
+risk_service.py.
+
+VaR:
+    parametric  delta-gamma normal approximation, daily spot vol from the ATM IV
+    historical  full revaluation under each stored daily spot return
+                (IV unchanged), when a return history is supplied
+
+Usage:
+    engine = OptionsRiskEngine()
+    engine.set_legs(positions)                       # on fills
+    engine.update(spots={"NIFTY": 25480}, prices={"NIFTY26FEB25500CE": 212.5})
+    engine.summary()                                 # greeks, grid, VaR
+    engine.scenario("NIFTY", spot_pct=-1, iv_pts=2)
+"""
+
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from correlation_engine import _FUTURE_RE
+from option_pricing import (INDEX_SPOT_SYMBOLS, RISK_FREE_RATE, bs_greeks, bs_price,
+                            implied_vol, parse_option_symbol, year_fraction)
+
+SPOT_SHOCKS_PCT = np.array([-5, -3, -2, -1, -0.5, 0, 0.5, 1, 2, 3, 5], dtype=float)
+IV_SHOCKS_PTS = np.array([-5, -2, 0, 2, 5], dtype=float)
+VAR_CONFIDENCE = 0.99
+_Z = {0.95: 1.6449, 0.975: 1.9600, 0.99: 2.3263}
+DEFAULT_IV = 0.15        # until a leg's price gives an implied vol
+TRADING_DAYS = 252
+
+
+class OptionsRiskEngine:
+    """Option legs in arrays; Greeks, scenario grid and VaR per underlying."""
+
+    def __init__(self, spot_shocks_pct=SPOT_SHOCKS_PCT, iv_shocks_pts=IV_SHOCKS_PTS,
+                 r: float = RISK_FREE_RATE):
+        self.spot_shocks = np.asarray(spot_shocks_pct, dtype=float) / 100.0
+        self.iv_shocks = np.asarray(iv_shocks_pts, dtype=float) / 100.0
+        self.r = r
+        self.set_legs([])
+        self.spots: Dict[str, float] = {}
+        self.returns: Dict[str, np.ndarray] = {}
+
+    # ── Book ──
+
+    def set_legs(self, positions: List[Dict]):
+        """Rebuild the leg arrays from a positions list (call on fills)."""
+        legs = []
+        for pos in positions:
+            qty = pos.get("quantity", 0) or 0
+            symbol = pos.get("symbol", "")
+            if not qty or not symbol:
+                continue
+            parsed = parse_option_symbol(symbol)
+            future = None if parsed else _FUTURE_RE.match(symbol.upper())
+            price = pos.get("current_price") or pos.get("entry_price") or pos.get("average_price") or 0
+            if parsed:
+                legs.append((symbol, parsed["underlying"], qty, parsed["strike"], parsed["expiry"],
+                             parsed["is_call"], True, price))
+            elif future:
+                # <UND><yy><MON>FUT: delta-one in its underlying (basis ignored)
+                legs.append((symbol, future["name"], qty, 0.0, None, False, False, price))
+            else:
+                legs.append((symbol, symbol, qty, 0.0, None, False, False, price))
+
+        # Only keep delta-one legs in underlyings that also have options
+        with_options = {leg[1] for leg in legs if leg[6]}
+        legs = [leg for leg in legs if leg[6] or leg[1] in with_options]
+
+        self.symbols = [leg[0] for leg in legs]
+        self.underlyings = sorted({leg[1] for leg in legs})
+        code = {u: i for i, u in enumerate(self.underlyings)}
+        self.und = np.array([code[leg[1]] for leg in legs], dtype=np.intp)
+        self.qty = np.array([leg[2] for leg in legs], dtype=float)
+        self.strike = np.array([leg[3] for leg in legs], dtype=float)
+        self.expiry = [leg[4] for leg in legs]
+        self.is_call = np.array([leg[5] for leg in legs], dtype=bool)
+        self.is_option = np.array([leg[6] for leg in legs], dtype=bool)
+        self.price = np.array([leg[7] for leg in legs], dtype=float)
+        self.iv = np.full(len(legs), DEFAULT_IV)
+        self.T = np.zeros(len(legs))
+        self._slot = {s: i for i, s in enumerate(self.symbols)}
+        self._refresh_time()
+
+    def _refresh_time(self, now: Optional[datetime] = None):
+        self.T = np.array([year_fraction(e, now) if e else 0.0 for e in self.expiry], dtype=float)
+
+    def spot_symbols(self) -> Dict[str, str]:
+        """{underlying: tick symbol of its spot} for the underlyings in the book."""
+        return {u: INDEX_SPOT_SYMBOLS.get(u, u) for u in self.underlyings}
+
+    def set_returns(self, underlying: str, daily_returns):
+        """Daily spot log-returns used by historical VaR."""
+        self.returns[underlying] = np.asarray(daily_returns, dtype=float)
+
+    # ── Ticks ──
+
+    def update(self, spots: Dict[str, float], prices: Dict[str, float],
+               now: Optional[datetime] = None) -> bool:
+        """New spots / leg prices -> time to expiry and implied vols. Returns True if anything changed."""
+        changed = False
+        for u, s in spots.items():
+            if s and u in self.underlyings and self.spots.get(u) != s:
+                self.spots[u] = float(s)
+                changed = True
+        for sym, p in prices.items():
+            i = self._slot.get(sym)
+            if i is not None and p and self.price[i] != p:
+                self.price[i] = p
+                changed = True
+        if not changed or not len(self.symbols):
+            return changed
+
+        self._refresh_time(now)
+        S = self._spot_per_leg()
+        opt = self.is_option & ~np.isnan(S)
+        if opt.any():
+            iv = implied_vol(self.price[opt], S[opt], self.strike[opt], self.T[opt],
+                             self.is_call[opt], self.r)
+            # Keep the previous vol where this price has no solution (stale / crossed quote)
+            self.iv[opt] = np.where(np.isnan(iv), self.iv[opt], iv)
+        return True
+
+    def _spot_per_leg(self) -> np.ndarray:
+        spot = np.array([self.spots.get(u, np.nan) for u in self.underlyings], dtype=float)
+        return spot[self.und] if len(self.und) else np.zeros(0)
+
+    # ── Greeks ──
+
+    def _greek_sums(self) -> Dict[str, np.ndarray]:
+        """Position Greeks summed per underlying (arrays indexed like self.underlyings)."""
+        S = self._spot_per_leg()
+        g = bs_greeks(np.nan_to_num(S, nan=1.0), np.where(self.is_option, self.strike, 1.0),
+                      self.T, self.iv, self.is_call, self.r)
+        delta = np.where(self.is_option, g["delta"], 1.0) * self.qty
+        gamma = np.where(self.is_option, g["gamma"], 0.0) * self.qty
+        vega = np.where(self.is_option, g["vega"], 0.0) * self.qty
+        theta = np.where(self.is_option, g["theta"], 0.0) * self.qty
+
+        n = len(self.underlyings)
+        return {name: np.bincount(self.und, weights=v, minlength=n)
+                for name, v in (("delta", delta), ("gamma", gamma), ("vega", vega), ("theta", theta))}
+
+    def greeks(self) -> Dict[str, Dict]:
+        """Net delta (units and ₹), gamma, vega (₹ per vol pt) and theta (₹/day) per underlying."""
+        if not len(self.symbols):
+            return {}
+        sums = self._greek_sums()
+        out = {}
+        for k, u in enumerate(self.underlyings):
+            spot = self.spots.get(u)
+            legs = self.und == k
+            atm = self._atm_iv(k)
+            out[u] = {
+                "spot": spot,
+                "legs": int(legs.sum()),
+                "delta": round(float(sums["delta"][k]), 2),
+                "delta_value": round(float(sums["delta"][k] * spot), 2) if spot else None,
+                "gamma": round(float(sums["gamma"][k]), 5),
+                "gamma_1pct": round(float(0.5 * sums["gamma"][k] * (0.01 * spot) ** 2), 2) if spot else None,
+                "vega": round(float(sums["vega"][k]), 2),
+                "theta": round(float(sums["theta"][k]), 2),
+                "atm_iv": round(atm * 100, 2) if atm else None,
+            }
+        return out
+
+    def _atm_iv(self, k: int) -> Optional[float]:
+        legs = np.flatnonzero((self.und == k) & self.is_option)
+        spot = self.spots.get(self.underlyings[k])
+        if not len(legs) or not spot:
+            return None
+        return float(self.iv[legs[np.argmin(np.abs(self.strike[legs] - spot))]])
+
+    # ── Scenarios ──
+
+    def _revalue(self, spot_mult, iv_add) -> np.ndarray:
+        """
+        P&L per leg under shocks broadcast against the legs' trailing axis:
+        spot_mult / iv_add of shape (..., 1) give (..., legs).
+        """
+        S = self._spot_per_leg()
+        base = np.where(self.is_option, bs_price(S, self.strike, self.T, self.iv, self.is_call, self.r), S)
+        shocked_S = S * spot_mult
+        shocked_iv = np.maximum(self.iv + iv_add, 0.01)
+        shocked = np.where(self.is_option,
+                           bs_price(shocked_S, self.strike, self.T, shocked_iv, self.is_call, self.r),
+                           shocked_S)
+        return (shocked - base) * self.qty
+
+    def scenario_grid(self) -> Dict[str, np.ndarray]:
+        """{underlying: P&L array (spot shocks x IV shocks)} from one full revaluation pass."""
+        if not len(self.symbols):
+            return {}
+        spot_mult = (1.0 + self.spot_shocks)[:, None, None]
+        iv_add = self.iv_shocks[None, :, None]
+        pnl = np.nan_to_num(self._revalue(spot_mult, iv_add))        # (spot, iv, legs)
+        n = len(self.underlyings)
+        by_und = np.zeros((n, len(self.spot_shocks), len(self.iv_shocks)))
+        np.add.at(by_und, (self.und,), np.moveaxis(pnl, -1, 0))
+        return {u: by_und[k] for k, u in enumerate(self.underlyings)}
+
+    def scenario(self, underlying: str, spot_pct: float = 0.0, iv_pts: float = 0.0) -> float:
+        """P&L of one underlying's legs for an arbitrary spot % / IV point shock."""
+        legs = self.und == self.underlyings.index(underlying) if underlying in self.underlyings else None
+        if legs is None or not legs.any():
+            return 0.0
+        pnl = self._revalue(np.array([1.0 + spot_pct / 100.0]), np.array([iv_pts / 100.0]))
+        return round(float(np.nan_to_num(pnl[legs]).sum()), 2)
+
+    # ── VaR ──
+
+    def var(self, confidence: float = VAR_CONFIDENCE) -> Dict[str, Dict]:
+        """One-day VaR per underlying (positive = loss), parametric and historical."""
+        if not len(self.symbols):
+            return {}
+        sums = self._greek_sums()
+        z = _Z.get(confidence, 2.3263)
+        out = {}
+        for k, u in enumerate(self.underlyings):
+            delta, gamma, spot = sums["delta"][k], sums["gamma"][k], self.spots.get(u)
+            atm = self._atm_iv(k)
+            if not spot or not atm:
+                continue
+            daily_vol = atm / np.sqrt(TRADING_DAYS)
+            sigma_move = spot * daily_vol
+            # Delta-gamma normal: mean 0.5*G*s^2, variance (D*s)^2 + 0.5*(G*s^2)^2
+            mean = 0.5 * gamma * sigma_move ** 2
+            std = np.sqrt((delta * sigma_move) ** 2 + 0.5 * (gamma * sigma_move ** 2) ** 2)
+            entry = {"parametric": round(float(z * std - mean), 2),
+                     "daily_move_pct": round(float(daily_vol * 100), 2)}
+
+            returns = self.returns.get(u)
+            if returns is not None and len(returns) >= 20:
+                legs = self.und == k
+                pnl = np.nan_to_num(self._revalue(np.exp(returns)[:, None], np.zeros((1, 1))))[:, legs].sum(axis=1)
+                cut = np.quantile(pnl, 1 - confidence)
+                entry["historical"] = round(float(-cut), 2)
+                entry["expected_shortfall"] = round(float(-pnl[pnl <= cut].mean()), 2)
+                entry["history_days"] = int(len(returns))
+            out[u] = entry
+        return out
+
+    # ── State ──
+
+    def legs(self) -> List[Dict]:
+        """Priced legs (enough to rebuild the engine with from_legs)."""
+        S = self._spot_per_leg()
+        return [{
+            "symbol": sym, "underlying": self.underlyings[self.und[i]], "quantity": float(self.qty[i]),
+            "strike": float(self.strike[i]), "expiry": str(self.expiry[i]) if self.expiry[i] else None,
+            "is_call": bool(self.is_call[i]), "is_option": bool(self.is_option[i]),
+            "price": float(self.price[i]), "spot": None if np.isnan(S[i]) else float(S[i]),
+            "T": float(self.T[i]), "iv": round(float(self.iv[i]), 6),
+        } for i, sym in enumerate(self.symbols)]
+
+    @classmethod
+    def from_legs(cls, legs: List[Dict], **kwargs) -> "OptionsRiskEngine":
+        """Engine over already-priced legs (e.g. from a risk_service snapshot); no IV solve."""
+        engine = cls(**kwargs)
+        engine.symbols = [leg["symbol"] for leg in legs]
+        engine.underlyings = sorted({leg["underlying"] for leg in legs})
+        code = {u: i for i, u in enumerate(engine.underlyings)}
+        engine.und = np.array([code[leg["underlying"]] for leg in legs], dtype=np.intp)
+        for name in ("qty", "strike", "price", "T", "iv"):
+            key = "quantity" if name == "qty" else name
+            setattr(engine, name, np.array([leg[key] for leg in legs], dtype=float))
+        engine.is_call = np.array([leg["is_call"] for leg in legs], dtype=bool)
+        engine.is_option = np.array([leg["is_option"] for leg in legs], dtype=bool)
+        engine.expiry = [date.fromisoformat(leg["expiry"]) if leg["expiry"] else None for leg in legs]
+        engine._slot = {s: i for i, s in enumerate(engine.symbols)}
+        engine.spots = {leg["underlying"]: leg["spot"] for leg in legs if leg["spot"]}
+        return engine
+
+    def summary(self, confidence: float = VAR_CONFIDENCE) -> Dict:
+        grid = self.scenario_grid()
+        return {
+            "greeks": self.greeks(),
+            "grid": {
+                "spot_shocks_pct": (self.spot_shocks * 100).tolist(),
+                "iv_shocks_pts": (self.iv_shocks * 100).tolist(),
+                "pnl": {u: np.round(g, 2).tolist() for u, g in grid.items()},
+            },
+            "var": self.var(confidence),
+            "confidence": confidence,
+            "legs": self.legs(),
+        }
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+RESPONSE CACHE — Versioned, Single-Flight Response Cache for dashboard_api
+Caches endpoint payloads keyed by (endpoint, symbol, params, bar version):
+the bar version comes from the live candle store (it moves when the ticker
+closes a bar) or, with no live ticker, from the trading date, so a key is
+stale exactly when the data behind it can have changed.
+
+    LRU + TTL      bounded entry count; TTL caps how long a key lives even if
+                   its version never moves (yfinance daily bars carry today's
+                   forming candle)
+    single-flight  concurrent requests for the same key share one computation;
+                   it runs as its own task, so a caller that disconnects does
+                   not cancel it for the others
+    ETag           payloads are serialized once; a matching If-None-Match gets
+                   304 with no body, a hit returns the stored bytes
+
+Usage:
+    cache = ResponseCache(max_entries=256, ttl=60)
+    entry = await cache.get_or_compute(("chart", "RELIANCE", "6mo", bar_version("RELIANCE")), compute)
+    return cached_response(request, entry)
+"""
+
+import asyncio
+import hashlib
+import inspect
+import json
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Callable, Dict, Hashable, Optional
+
+DEFAULT_TTL = 60.0
+DEFAULT_MAX_ENTRIES = 256
+
+
+class CacheEntry:
+    __slots__ = ("payload", "body", "etag", "created", "expires")
+
+    def __init__(self, payload: Any, ttl: float):
+        self.payload = payload
+        # allow_nan=False: NaN / inf would be served as invalid JSON under a valid ETag
+        self.body = json.dumps(payload, default=str, separators=(",", ":"), allow_nan=False).encode()
+        self.etag = '"' + hashlib.blake2b(self.body, digest_size=12).hexdigest() + '"'
+        self.created = time.monotonic()
+        self.expires = self.created + ttl
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.created
+
+
+class ResponseCache:
+    """LRU/TTL payload cache with single-flight computation."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: float = DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "not_modified": 0,
+                      "evictions": 0, "expired": 0, "errors": 0}
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() >= entry.expires:
+            del self._entries[key]
+            self.stats["expired"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: Hashable, payload: Any, ttl: Optional[float] = None) -> CacheEntry:
+        entry = CacheEntry(payload, self.ttl if ttl is None else ttl)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+        return entry
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Any],
+                             ttl: Optional[float] = None,
+                             cacheable: Callable[[Any], bool] = lambda p: not (isinstance(p, dict) and "error" in p)
+                             ) -> CacheEntry:
+        """
+        Cached entry for `key`, computing it at most once across concurrent
+        callers. `compute` may be a coroutine function or a plain (blocking)
+        callable, which runs in a worker thread so waiters stay responsive.
+        Exceptions (including a payload that is not strict JSON) propagate to
+        every waiter and are not cached. A caller being cancelled leaves the
+        computation running for the others; if the computation itself is
+        cancelled, the next waiter starts it again.
+        """
+        while True:
+            entry = self.get(key)
+            if entry is not None:
+                self.stats["hits"] += 1
+                return entry
+
+            task = self._inflight.get(key)
+            if task is None:
+                self.stats["misses"] += 1
+                task = asyncio.ensure_future(self._compute(key, compute, ttl, cacheable))
+                self._inflight[key] = task
+                task.add_done_callback(lambda t, key=key: self._computed(key, t))
+            else:
+                self.stats["coalesced"] += 1
+
+            try:
+                return await asyncio.shield(task)
+            except asyncio.CancelledError:
+                # The shared computation was cancelled, not this caller: run it again
+                cancelling = getattr(asyncio.current_task(), "cancelling", lambda: 0)  # 3.11+
+                if task.cancelled() and not cancelling():
+                    continue
+                raise
+
+    async def _compute(self, key: Hashable, compute: Callable[[], Any], ttl: Optional[float],
+                       cacheable: Callable[[Any], bool]) -> CacheEntry:
+        try:
+            if inspect.iscoroutinefunction(compute):
+                payload = await compute()
+            else:
+                payload = await asyncio.to_thread(compute)
+            return self.put(key, payload, ttl) if cacheable(payload) else CacheEntry(payload, 0.0)
+        except BaseException:
+            self.stats["errors"] += 1
+            raise
+
+    def _computed(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark retrieved so a computation nobody awaits any more does not log "exception never retrieved"
+            task.exception()
+
+    def invalidate(self, prefix: Optional[tuple] = None) -> int:
+        """Drop every entry (or those whose key starts with `prefix`). Returns entries dropped."""
+        keys = [k for k in self._entries
+                if prefix is None or (isinstance(k, tuple) and k[:len(prefix)] == prefix)]
+        for k in keys:
+            del self._entries[k]
+        return len(keys)
+
+    def info(self) -> Dict:
+        lookups = self.stats["hits"] + self.stats["misses"] + self.stats["coalesced"]
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "inflight": len(self._inflight),
+            "hit_rate_pct": round(self.stats["hits"] / lookups * 100, 1) if lookups else 0,
+            **self.stats,
+        }
+
+
+def cached_response(request, entry: CacheEntry, cache: Optional[ResponseCache] = None,
+                    max_age: int = 0):
+    """JSON response for an entry: 304 if the client already holds its ETag, else the stored bytes."""
+    from fastapi import Response
+
+    headers = {"ETag": entry.etag, "Cache-Control": f"private, max-age={max_age}, must-revalidate"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if entry.etag in (tag.strip() for tag in if_none_match.split(",")) or if_none_match.strip() == "*":
+        if cache is not None:
+            cache.stats["not_modified"] += 1
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def bar_version(symbol: str, store=None) -> str:
+    """
+    Version of the bars behind `symbol`: the latest closed minute bar while the
+    ticker is publishing, else the trading date (daily data changes once a day).
+    """
+    if store is None:
+        from candle_store import get_store
+        store = get_store()
+    if store.is_live():
+        closed = store.last_closed().get(symbol.upper(), {})
+        stamp = closed.get("minute") or store.version()
+        if stamp is not None:
+            return f"live:{stamp}"
+    return f"eod:{date.today().isoformat()}"
@@ -17,12 +17,20 @@ SCRIPT_DIR = Path(__file__).resolve().parent
 EXECUTION_DIR = SCRIPT_DIR.parent.parent
 sys.path.insert(0, str(EXECUTION_DIR))
 
+ROOT_DIR = EXECUTION_DIR.parent  # execution -> project root (kelly_system)
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+import numpy as np
+
 from kite_client import KiteMCPClient
+from kelly_system.allocation import optimal_fraction
 
 # Paths
 DATA_DIR = SCRIPT_DIR.parent.parent.parent / "_tmp"
 RISK_LOG = DATA_DIR / "risk_log.json"
-TRADE_HISTORY = SCRIPT_DIR.parent / "journals" / "order_log.json"
+TRADE_HISTORY = SCRIPT_DIR.parent / "journals" / "order_log.json"    # Legacy single-file log
+ORDER_PARTITIONS = SCRIPT_DIR.parent / "journals" / "orders"         # ExecutionEngine day partitions
 
 
 # ══════════════════════════════════════════════════════════════════
@@ -89,11 +97,13 @@ class RiskManager:
     optimal position sizes using Kelly Criterion.
     """
 
-    def __init__(self, client: Optional[KiteMCPClient] = None, config: Dict = None):
+    def __init__(self, client: Optional[KiteMCPClient] = None, config: Dict = None,
+                 load_history: bool = True):
         self.client = client
         self.config = config or self._default_config()
         self._trade_history: List[Dict] = []
-        self._load_trade_history()
+        if load_history:
+            self._load_trade_history()
 
     def _default_config(self) -> Dict:
         return {
@@ -109,19 +119,33 @@ class RiskManager:
             
             # Sector limits
             "max_sector_exposure_pct": 40,     # Max % in one sector
-            "max_correlated_positions": 2,     # Max positions in same sector
+            "max_correlated_positions": 2,     # Max positions in same sector / correlated cluster
+            "max_pair_correlation": 0.7,       # Rolling return correlation that counts as "correlated"
             
             # Position limits
             "max_open_positions": 3,
             "max_open_options": 2,
+
+            # Kelly sizing
+            "kelly_risk_aversion": 1.0,        # Power-utility lambda (1 = classic log-utility Kelly)
+            "kelly_multiplier": 0.5,           # Fraction of Kelly actually risked (half-Kelly)
+            "kelly_cap": 0.10,                 # Max fraction of capital per trade
         }
 
     def _load_trade_history(self):
         """Load past trades for win rate / Kelly calculation."""
+        self._trade_history = []
         try:
             if TRADE_HISTORY.exists():
                 with open(TRADE_HISTORY, "r") as f:
                     self._trade_history = json.load(f)
+            for path in sorted(ORDER_PARTITIONS.glob("orders_*.jsonl")):
+                with open(path, "r") as f:
+                    for line in f:
+                        try:
+                            self._trade_history.append(json.loads(line))
+                        except json.JSONDecodeError:
+                            continue
         except Exception:
             self._trade_history = []
 
@@ -156,6 +180,11 @@ class RiskManager:
             })
             total_risk += total_position_risk
 
+        return self.heat_status(total_risk, position_risks)
+
+    def heat_status(self, total_risk: float, position_risks: List[Dict]) -> Dict:
+        """Heat verdict from an already aggregated total risk (also used by risk_service)."""
+        total_capital = self.config["total_capital"]
         heat_pct = total_risk / total_capital * 100 if total_capital > 0 else 0
 
         status = "SAFE" if heat_pct < 6 else (
@@ -180,12 +209,10 @@ class RiskManager:
         Check if drawdown limits have been hit.
         Returns trading permission status.
         """
-        total_capital = self.config["total_capital"]
-        
-        daily_loss_pct = abs(min(0, session_pnl)) / total_capital * 100
-        weekly_loss_pct = abs(min(0, weekly_pnl)) / total_capital * 100
-        
-        # Check consecutive losses
+        return self.drawdown_status(session_pnl, weekly_pnl, self.consecutive_losses())
+
+    def consecutive_losses(self) -> int:
+        """Losing trades in a row at the end of the trade history."""
         recent_trades = [t for t in self._trade_history[-10:]
                         if t.get("status") in ("PLACED", "COMPLETE")]
         consecutive_losses = 0
@@ -195,6 +222,14 @@ class RiskManager:
                 consecutive_losses += 1
             else:
                 break
+        return consecutive_losses
+
+    def drawdown_status(self, session_pnl: float, weekly_pnl: float, consecutive_losses: int) -> Dict:
+        """Drawdown verdict from P&L figures and the current losing streak."""
+        total_capital = self.config["total_capital"]
+        
+        daily_loss_pct = abs(min(0, session_pnl)) / total_capital * 100
+        weekly_loss_pct = abs(min(0, weekly_pnl)) / total_capital * 100
 
         breakers = []
         can_trade = True
@@ -246,14 +281,13 @@ class RiskManager:
 
         b = avg_win / avg_loss  # Win/loss ratio
         p = win_rate
-        q = 1 - p
 
-        # Kelly fraction
-        kelly_full = (b * p - q) / b
+        # Kelly fraction (shared solver with kelly_system.KellySolver; lambda = 1 gives (bp - q) / b)
+        kelly_full = optimal_fraction(p, b, self.config.get("kelly_risk_aversion", 1.0))
         
         # Half Kelly (safer — reduces variance by 50%, only reduces returns by ~25%)
-        kelly_half = kelly_full / 2
-        kelly_half = max(0, min(kelly_half, 0.10))  # Cap at 10% of capital
+        kelly_half = kelly_full * self.config.get("kelly_multiplier", 0.5)
+        kelly_half = max(0, min(kelly_half, self.config.get("kelly_cap", 0.10)))  # Cap at 10% of capital
 
         total_capital = self.config["total_capital"]
         optimal_risk = total_capital * kelly_half
@@ -285,6 +319,39 @@ class RiskManager:
             )
         }
 
+    def kelly_batch(self, win_rates, avg_wins, avg_losses,
+                    premiums=0, lot_sizes=25) -> Dict:
+        """
+        Vectorized kelly_position_size for many candidates at once (a whole
+        scan, or Monte Carlo draws of win rate / payoff). Arguments broadcast
+        against each other; returns lists in input order.
+        """
+        p = np.asarray(win_rates, dtype=float)
+        avg_loss = np.where(np.asarray(avg_losses, dtype=float) == 0, 1.0, avg_losses)
+        b = np.asarray(avg_wins, dtype=float) / avg_loss
+
+        kelly_full = np.asarray(optimal_fraction(p, b, self.config.get("kelly_risk_aversion", 1.0)))
+        kelly_half = np.clip(kelly_full * self.config.get("kelly_multiplier", 0.5),
+                             0, self.config.get("kelly_cap", 0.10))
+        optimal_risk = self.config["total_capital"] * kelly_half
+
+        cost_per_lot = np.asarray(premiums, dtype=float) * np.asarray(lot_sizes, dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            lots = np.where(cost_per_lot > 0, np.floor(optimal_risk / cost_per_lot), 1)
+        optimal_lots = np.maximum(1, lots).astype(int)
+        total_cost = np.where(cost_per_lot > 0, optimal_lots * cost_per_lot, 0)
+
+        kelly_full, kelly_half, optimal_risk, optimal_lots, total_cost, b = np.broadcast_arrays(
+            kelly_full, kelly_half, optimal_risk, optimal_lots, total_cost, b)
+        return {
+            "kelly_full": np.round(kelly_full * 100, 2).tolist(),
+            "kelly_half": np.round(kelly_half * 100, 2).tolist(),
+            "optimal_risk": np.round(optimal_risk, 2).tolist(),
+            "optimal_lots": optimal_lots.tolist(),
+            "total_cost": np.round(total_cost, 2).tolist(),
+            "win_loss_ratio": np.round(b, 2).tolist(),
+        }
+
     def _calculate_trade_stats(self) -> Dict:
         """Calculate win rate and avg win/loss from trade history."""
         completed = [t for t in self._trade_history 
@@ -329,8 +396,6 @@ class RiskManager:
         Check if adding a new position would exceed sector concentration limits.
         Prevents entering 3 banking stocks simultaneously.
         """
-        new_sector = get_sector(new_symbol)
-        
         sector_counts = defaultdict(int)
         sector_values = defaultdict(float)
         
@@ -346,6 +411,12 @@ class RiskManager:
             sector_counts[sector] += 1
             sector_values[sector] += qty * price
 
+        return self.sector_status(new_symbol, sector_counts, sector_values)
+
+    def sector_status(self, new_symbol: str, sector_counts: Dict[str, int],
+                      sector_values: Dict[str, float]) -> Dict:
+        """Sector verdict from per-sector position counts and market values."""
+        new_sector = get_sector(new_symbol)
         total_value = sum(sector_values.values())
         
         # Check count limit
@@ -379,6 +450,63 @@ class RiskManager:
             "all_sectors": dict(sector_counts),
         }
 
+    def check_correlation(self, current_positions: List[Dict], new_symbol: str,
+                          direction: int = 1) -> Dict:
+        """
+        Check if a new position would join a correlated cluster: open positions
+        whose rolling return correlation with it (correlation_engine.py) is at
+        or above max_pair_correlation, counted per underlying and signed by the
+        direction of each side, so a hedge does not count as concentration.
+        """
+        from correlation_engine import correlation_name, position_direction
+
+        exposure = defaultdict(int)
+        for pos in current_positions:
+            qty = pos.get("quantity", 0)
+            if qty:
+                symbol = pos.get("symbol", "")
+                exposure[correlation_name(symbol)] += position_direction(symbol, qty)
+        return self.correlation_status(new_symbol, exposure, direction)
+
+    def correlation_status(self, new_symbol: str, exposure: Dict[str, int],
+                           direction: int = 1) -> Dict:
+        """Correlation verdict from the net direction held per underlying."""
+        from correlation_engine import correlation_name, get_snapshots
+
+        snapshots = get_snapshots()
+        data = snapshots.load()
+        new_name = correlation_name(new_symbol)
+        threshold = self.config.get("max_pair_correlation", 0.7)
+        max_correlated = self.config["max_correlated_positions"]
+
+        correlated = []
+        for name, held in exposure.items():
+            if name == new_name or held == 0:
+                continue
+            rho = snapshots.correlation(new_name, name) if data else None
+            if rho is not None and rho * np.sign(held) * direction >= threshold:
+                correlated.append({"symbol": name, "correlation": rho})
+        correlated.sort(key=lambda c: -abs(c["correlation"]))
+
+        allowed = len(correlated) < max_correlated
+        cluster = next((c for c in data.get("clusters", []) if new_name in c), []) if data else []
+        return {
+            "allowed": allowed,
+            "new_symbol": new_symbol,
+            "correlated_positions": correlated,
+            "current_count": len(correlated),
+            "max_allowed": max_correlated,
+            "threshold": threshold,
+            "cluster": cluster,
+            "as_of": data.get("as_of") if data else None,
+            "reason": (
+                "OK — no correlation data (run correlation_engine.py)" if not data else
+                "OK — correlated exposure within limits" if allowed else
+                f"BLOCKED — {len(correlated)} open positions move with {new_name} "
+                f"(ρ ≥ {threshold}: {', '.join(c['symbol'] for c in correlated)})"
+            ),
+        }
+
     # ── Position Count Check ──
 
     def check_position_limits(self, current_positions: List[Dict],
@@ -389,12 +517,17 @@ class RiskManager:
         options_positions = [p for p in current_positions 
                            if p.get("exchange", "") == "NFO" and p.get("quantity", 0) != 0]
 
-        total_open = len(equity_positions) + len(options_positions)
+        return self.position_limit_status(len(equity_positions), len(options_positions), is_options)
+
+    def position_limit_status(self, equity_open: int, options_open: int,
+                              is_options: bool = False) -> Dict:
+        """Position-count verdict from open equity / options counts."""
+        total_open = equity_open + options_open
         
         if is_options:
-            can_open = len(options_positions) < self.config["max_open_options"]
+            can_open = options_open < self.config["max_open_options"]
             reason = (
-                f"Options: {len(options_positions)}/{self.config['max_open_options']}"
+                f"Options: {options_open}/{self.config['max_open_options']}"
                 if can_open else
                 f"Max options positions reached ({self.config['max_open_options']})"
             )
@@ -408,8 +541,8 @@ class RiskManager:
 
         return {
             "can_open": can_open,
-            "equity_open": len(equity_positions),
-            "options_open": len(options_positions),
+            "equity_open": equity_open,
+            "options_open": options_open,
             "total_open": total_open,
             "reason": reason,
         }
@@ -420,37 +553,71 @@ class RiskManager:
                          positions: List[Dict],
                          session_pnl: float = 0,
                          weekly_pnl: float = 0,
-                         is_options: bool = False) -> Dict:
+                         is_options: bool = False,
+                         transaction_type: str = "BUY",
+                         option_type: Optional[str] = None) -> Dict:
         """
         Run ALL risk checks before allowing a new trade.
         Returns a single pass/fail with all check results.
+        transaction_type / option_type give the side of the candidate so the
+        correlation check counts a short or a long put against the underlying.
         """
-        checks = {}
-        all_passed = True
-
-        # 1. Drawdown breaker
-        dd = self.check_drawdown(session_pnl, weekly_pnl)
-        checks["drawdown"] = dd
-        if not dd["can_trade"]:
-            all_passed = False
-
-        # 2. Portfolio heat
-        heat = self.calculate_portfolio_heat(positions)
-        checks["portfolio_heat"] = heat
-        if not heat["can_add_position"]:
-            all_passed = False
-
-        # 3. Position limits
-        pos_check = self.check_position_limits(positions, is_options)
-        checks["position_limits"] = pos_check
-        if not pos_check["can_open"]:
-            all_passed = False
-
-        # 4. Sector exposure
-        sector = self.check_sector_exposure(positions, new_symbol)
-        checks["sector_exposure"] = sector
-        if not sector["allowed"]:
-            all_passed = False
+        direction = self.candidate_direction(new_symbol, is_options, transaction_type, option_type)
+        return self._combine_checks(new_symbol, {
+            "drawdown": self.check_drawdown(session_pnl, weekly_pnl),
+            "portfolio_heat": self.calculate_portfolio_heat(positions),
+            "position_limits": self.check_position_limits(positions, is_options),
+            "sector_exposure": self.check_sector_exposure(positions, new_symbol),
+            "correlation": self.check_correlation(positions, new_symbol, direction),
+        })
+
+    def check_snapshot(self, new_symbol: str, snapshot: Dict, is_options: bool = False,
+                       transaction_type: str = "BUY", option_type: Optional[str] = None) -> Dict:
+        """
+        full_risk_check against a risk_service snapshot: every input is already
+        aggregated there, so this is O(sectors) with no positions pass or disk read.
+        """
+        direction = self.candidate_direction(new_symbol, is_options, transaction_type, option_type)
+        sectors = snapshot.get("sectors", {})
+        limits = snapshot["position_limits"]
+        return self._combine_checks(new_symbol, {
+            "drawdown": snapshot["drawdown"],
+            "portfolio_heat": snapshot["portfolio_heat"],
+            "position_limits": self.position_limit_status(
+                limits["equity_open"], limits["options_open"], is_options),
+            "sector_exposure": self.sector_status(
+                new_symbol,
+                {k: v["count"] for k, v in sectors.items()},
+                {k: v["value"] for k, v in sectors.items()}),
+            "correlation": self.check_correlation(snapshot.get("positions", []), new_symbol,
+                                                  direction),
+        })
+
+    @staticmethod
+    def candidate_direction(new_symbol: str, is_options: bool = False,
+                            transaction_type: str = "BUY",
+                            option_type: Optional[str] = None) -> int:
+        """
+        +1 if the candidate gains when its underlying rises, -1 otherwise:
+        SELL flips the sign, and so does a put (option_type "PE", or a full
+        option symbol ending in PE when option_type is not given).
+        """
+        from correlation_engine import position_direction
+
+        sign = -1 if transaction_type.upper() == "SELL" else 1
+        if not is_options:
+            return sign
+        if option_type:
+            return -sign if option_type.upper() == "PE" else sign
+        return position_direction(new_symbol, sign)
+
+    @staticmethod
+    def _combine_checks(new_symbol: str, checks: Dict) -> Dict:
+        all_passed = (checks["drawdown"]["can_trade"] and
+                      checks["portfolio_heat"]["can_add_position"] and
+                      checks["position_limits"]["can_open"] and
+                      checks["sector_exposure"]["allowed"] and
+                      checks.get("correlation", {}).get("allowed", True))
 
         return {
             "approved": all_passed,
@@ -541,6 +708,10 @@ if __name__ == "__main__":
     sector = rm.check_sector_exposure(positions, "HDFCBANK")
     print(f"\n🏢 Sector Check for HDFCBANK: {'✅' if sector['allowed'] else '❌'} {sector['reason']}")
 
+    # Correlation check
+    corr = rm.check_correlation(positions, "HDFCBANK")
+    print(f"\n🔗 Correlation Check for HDFCBANK: {'✅' if corr['allowed'] else '❌'} {corr['reason']}")
+
     # Full pre-trade check
     full = rm.full_risk_check("BANKNIFTY26FEB45000CE", positions, 
                                session_pnl=-1500, weekly_pnl=-4000, is_options=True)
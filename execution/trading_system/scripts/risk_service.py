@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+"""
+RISK SERVICE — Tick-Driven Incremental Portfolio Risk
+
+Holds the open book (quantity, entry, stop, last price, sector) in arrays and
+keeps portfolio heat, open risk to stops, sector exposure, session P&L and
+intraday drawdown current as ticks and fills arrive:
+
+    tick batch (.tmp/live_ticks.json)  -> per-slot price deltas folded into the
+                                          running P&L / exposure / open-risk totals
+    fill / position change (live_cache) -> only the changed slots are re-priced
+    order journal change                -> losing streak, trade stats, Kelly
+
+Option legs are also held in an OptionsRiskEngine (options_risk.py): each
+tick batch re-solves their implied vols and the snapshot carries net Greeks,
+the spot x IV scenario grid and VaR per underlying.
+
+Each change publishes a versioned snapshot (.tmp/live_risk.json) holding the
+ready-made risk dashboard and the aggregates RiskManager.check_snapshot needs,
+so /risk/* and /trade/recommend answer from one small file read.
+
+Usage:
+    python3 execution/trading_system/scripts/risk_service.py
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+EXECUTION_DIR = SCRIPT_DIR.parent.parent
+ROOT_DIR = EXECUTION_DIR.parent
+sys.path.insert(0, str(EXECUTION_DIR))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from heartbeat import Heartbeat, heartbeat_age, heartbeat_path, service_running
+from options_risk import OptionsRiskEngine
+from risk_manager import ORDER_PARTITIONS, RiskManager, get_sector
+
+DATA_DIR = ROOT_DIR / ".tmp"
+CACHE_FILE = DATA_DIR / "live_cache.json"
+TICK_FILE = DATA_DIR / "live_ticks.json"
+RISK_FILE = DATA_DIR / "live_risk.json"
+
+POLL_INTERVAL = 0.2
+DEFAULT_STOP_PCT = 0.03   # RiskManager's assumed stop when a position has none
+
+
+# ══════════════════════════════════════════════════════════════════
+# Position Book
+# ══════════════════════════════════════════════════════════════════
+
+class RiskBook:
+    """
+    Open positions as parallel arrays (one slot per symbol) plus running totals.
+    Every update adjusts the totals by the changed slots' deltas, so cost is
+    proportional to what moved, not to the size of the book.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.index: Dict[str, int] = {}
+        self.symbols: List[Optional[str]] = []
+        self.free: List[int] = []
+        self.qty = np.zeros(capacity)        # signed
+        self.entry = np.zeros(capacity)
+        self.stop = np.zeros(capacity)
+        self.last = np.zeros(capacity)
+        self.sector = np.zeros(capacity, dtype=np.intp)
+        self.is_option = np.zeros(capacity, dtype=bool)
+
+        self.sector_names: List[str] = []
+        self.sector_codes: Dict[str, int] = {}
+        self.sector_count = np.zeros(0, dtype=np.int64)
+        self.sector_value = np.zeros(0)
+
+        self.total_risk = 0.0        # sum |entry - stop| * |qty| (RiskManager heat)
+        self.open_risk = 0.0         # loss if every position hit its stop from here
+        self.unrealized = 0.0
+        self.gross_exposure = 0.0
+        self.net_exposure = 0.0
+        self.options_open = 0
+
+    # ── Slot contributions ──
+
+    def _risk(self, i):
+        return np.abs(self.entry[i] - self.stop[i]) * np.abs(self.qty[i])
+
+    def _open_risk(self, i):
+        # Long: price above stop is at risk; short: stop above price
+        return np.maximum(0.0, (self.last[i] - self.stop[i]) * self.qty[i])
+
+    def _apply(self, i: int, sign: float):
+        """Add (+1) or remove (-1) slot i's contribution to every total."""
+        q, last = float(self.qty[i]), float(self.last[i])
+        self.total_risk += sign * float(self._risk(i))
+        self.open_risk += sign * float(self._open_risk(i))
+        self.unrealized += sign * (last - float(self.entry[i])) * q
+        self.gross_exposure += sign * abs(q) * last
+        self.net_exposure += sign * q * last
+        self.sector_count[self.sector[i]] += int(sign)
+        self.sector_value[self.sector[i]] += sign * abs(q) * last
+        self.options_open += int(sign) * bool(self.is_option[i])
+
+    def _sector_code(self, name: str) -> int:
+        code = self.sector_codes.get(name)
+        if code is None:
+            code = self.sector_codes[name] = len(self.sector_names)
+            self.sector_names.append(name)
+            self.sector_count = np.append(self.sector_count, 0)
+            self.sector_value = np.append(self.sector_value, 0.0)
+        return code
+
+    def _grow(self):
+        size = len(self.qty) * 2
+        for name in ("qty", "entry", "stop", "last", "sector", "is_option"):
+            old = getattr(self, name)
+            new = np.zeros(size, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    # ── Fills ──
+
+    def upsert(self, symbol: str, qty: float, entry: float, stop: Optional[float],
+               last: float, is_option: bool = False):
+        i = self.index.get(symbol)
+        if i is None:
+            if self.free:
+                i = self.free.pop()
+                self.symbols[i] = symbol
+            else:
+                i = len(self.symbols)
+                if i >= len(self.qty):
+                    self._grow()
+                self.symbols.append(symbol)
+            self.index[symbol] = i
+            self.sector[i] = self._sector_code(get_sector(symbol))
+        else:
+            self._apply(i, -1)
+
+        self.qty[i] = qty
+        self.entry[i] = entry
+        self.stop[i] = stop if stop is not None else entry * (1 - DEFAULT_STOP_PCT)
+        self.last[i] = last or entry
+        self.is_option[i] = is_option
+        self._apply(i, +1)
+
+    def remove(self, symbol: str):
+        i = self.index.pop(symbol, None)
+        if i is None:
+            return
+        self._apply(i, -1)
+        self.qty[i] = self.entry[i] = self.stop[i] = self.last[i] = 0.0
+        self.is_option[i] = False
+        self.symbols[i] = None
+        self.free.append(i)
+
+    def sync(self, positions: List[Dict]) -> int:
+        """Bring the book in line with a positions list; returns slots changed."""
+        seen = set()
+        changed = 0
+        for pos in positions:
+            symbol = pos.get("symbol", "")
+            qty = pos.get("quantity", 0) or 0
+            if not symbol or qty == 0:
+                continue
+            entry = pos.get("entry_price", 0) or pos.get("average_price", 0)
+            if not entry:
+                continue
+            seen.add(symbol)
+            stop = pos.get("stop_loss")
+            i = self.index.get(symbol)
+            if (i is not None and self.qty[i] == qty and self.entry[i] == entry
+                    and (stop is None or self.stop[i] == stop)):
+                continue
+            last = pos.get("current_price") or (self.last[i] if i is not None else entry)
+            self.upsert(symbol, qty, entry, stop, last, is_option=pos.get("exchange") == "NFO")
+            changed += 1
+        for symbol in [s for s in self.index if s not in seen]:
+            self.remove(symbol)
+            changed += 1
+        return changed
+
+    # ── Ticks ──
+
+    def on_prices(self, prices: Dict[str, float]) -> int:
+        """Fold a batch of last prices into the totals. Returns slots that moved."""
+        pairs = [(self.index[s], p) for s, p in prices.items() if s in self.index and p]
+        if not pairs:
+            return 0
+        idx = np.fromiter((i for i, _ in pairs), dtype=np.intp, count=len(pairs))
+        new = np.fromiter((p for _, p in pairs), dtype=float, count=len(pairs))
+        moved = new != self.last[idx]
+        idx, new = idx[moved], new[moved]
+        if not len(idx):
+            return 0
+
+        q = self.qty[idx]
+        d = new - self.last[idx]
+        before = self._open_risk(idx).sum()
+        self.unrealized += float((q * d).sum())
+        self.gross_exposure += float((np.abs(q) * d).sum())
+        self.net_exposure += float((q * d).sum())
+        np.add.at(self.sector_value, self.sector[idx], np.abs(q) * d)
+        self.last[idx] = new
+        self.open_risk += float(self._open_risk(idx).sum() - before)
+        return len(idx)
+
+    # ── Views ──
+
+    def positions(self, capital: float) -> List[Dict]:
+        out = []
+        for symbol, i in self.index.items():
+            risk = float(self._risk(i))
+            out.append({
+                "symbol": symbol,
+                "quantity": float(self.qty[i]),
+                "entry": float(self.entry[i]),
+                "stop_loss": float(self.stop[i]),
+                "last": float(self.last[i]),
+                "pnl": round(float((self.last[i] - self.entry[i]) * self.qty[i]), 2),
+                "risk": round(risk, 2),
+                "risk_pct": round(risk / capital * 100, 2) if capital else 0,
+                "open_risk": round(float(self._open_risk(i)), 2),
+            })
+        return out
+
+    def sectors(self) -> Dict[str, Dict]:
+        return {name: {"count": int(self.sector_count[c]), "value": round(float(self.sector_value[c]), 2)}
+                for name, c in self.sector_codes.items() if self.sector_count[c] > 0}
+
+    def recompute(self) -> Dict[str, float]:
+        """Totals from scratch (drift check for the incremental path)."""
+        live = np.array(sorted(self.index.values()), dtype=np.intp)
+        q, last = self.qty[live], self.last[live]
+        return {
+            "total_risk": float(self._risk(live).sum()),
+            "open_risk": float(self._open_risk(live).sum()),
+            "unrealized": float(((last - self.entry[live]) * q).sum()),
+            "gross_exposure": float((np.abs(q) * last).sum()),
+        }
+
+    def __len__(self):
+        return len(self.index)
+
+
+# ══════════════════════════════════════════════════════════════════
+# Service
+# ══════════════════════════════════════════════════════════════════
+
+def _mtime(path: Path) -> Optional[float]:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return None
+
+
+def _read_json(path: Path) -> Dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class RiskService:
+    """Feeds ticks and fills into a RiskBook and publishes risk snapshots."""
+
+    def __init__(self, cache_file: Path = CACHE_FILE, tick_file: Path = TICK_FILE,
+                 risk_file: Path = RISK_FILE, config: Optional[Dict] = None):
+        self.cache_file = Path(cache_file)
+        self.tick_file = Path(tick_file)
+        self.risk_file = Path(risk_file)
+        self.heartbeat = Heartbeat(self.risk_file)
+        self.rm = RiskManager(config=config, load_history=False)
+        self.book = RiskBook()
+        self.options = OptionsRiskEngine()
+
+        self.seen = {"cache": None, "ticks": None, "orders": None}
+        self.base_pnl = 0.0           # session P&L in the last cache sync
+        self.base_unrealized = 0.0    # book unrealized P&L at that sync
+        self.peak_pnl = 0.0           # intraday high-water mark of session_pnl
+        self.session_date = date.today()
+        self.consecutive_losses = 0
+        self.history_stats: Dict = {}
+        self.version = 0
+        self.stats = {"tick_batches": 0, "syncs": 0, "history_loads": 0, "publishes": 0}
+
+    # ── Events ──
+
+    def _orders_signature(self) -> Tuple:
+        partitions = sorted(ORDER_PARTITIONS.glob("orders_*.jsonl"))
+        latest = partitions[-1] if partitions else None
+        return (len(partitions), str(latest), _mtime(latest) if latest else None)
+
+    def on_history(self):
+        self.rm._load_trade_history()
+        self.consecutive_losses = self.rm.consecutive_losses()
+        self.history_stats = {
+            "trade_stats": self.rm._calculate_trade_stats(),
+            "kelly": self.rm.kelly_position_size(),
+        }
+        self.stats["history_loads"] += 1
+
+    def on_cache(self, cache: Dict):
+        margins = cache.get("margins", {})
+        self.rm.config["total_capital"] = margins.get("net", 100000) or 100000
+        positions = cache.get("positions", [])
+        if self.book.sync(positions):
+            self.options.set_legs(positions)
+            self._load_option_returns()
+        self.base_pnl = float(cache.get("session_pnl", 0) or 0)
+        self.base_unrealized = self.book.unrealized
+        self.stats["syncs"] += 1
+
+    def _load_option_returns(self):
+        """Daily log-returns of each option underlying from the live candle store (historical VaR)."""
+        try:
+            from candle_store import get_store
+            store = get_store()
+            for underlying, spot_symbol in self.options.spot_symbols().items():
+                closes = np.array([c["close"] for c in store.candles(spot_symbol, "day", include_open=False)],
+                                  dtype=float)
+                closes = closes[closes > 0]
+                if len(closes) > 1:
+                    self.options.set_returns(underlying, np.diff(np.log(closes)))
+        except Exception as e:
+            print(f"[RISK] No return history for options VaR: {e}")
+
+    def on_ticks(self, ticks: Dict) -> int:
+        prices = {s: t.get("ltp") for s, t in ticks.get("ticks", {}).items()}
+        self.stats["tick_batches"] += 1
+        moved = self.book.on_prices(prices)
+        if self.options.symbols:
+            spots = {u: prices.get(sym) for u, sym in self.options.spot_symbols().items()}
+            if self.options.update(spots, prices):
+                moved = moved or 1
+        return moved
+
+    @property
+    def session_pnl(self) -> float:
+        """Session P&L as of the last sync, moved by the ticks since."""
+        return self.base_pnl + self.book.unrealized - self.base_unrealized
+
+    # ── Snapshot ──
+
+    def snapshot(self) -> Dict:
+        capital = self.rm.config["total_capital"]
+        session_pnl = self.session_pnl
+        today = date.today()
+        if today != self.session_date:
+            # New session: yesterday's peak would show as a drawdown all day
+            self.session_date = today
+            self.peak_pnl = 0.0
+        self.peak_pnl = max(self.peak_pnl, session_pnl)
+        book = self.book
+        positions = book.positions(capital)
+
+        heat = self.rm.heat_status(book.total_risk, [
+            {"symbol": p["symbol"], "risk": p["risk"], "risk_pct": p["risk_pct"],
+             "entry": p["entry"], "stop_loss": p["stop_loss"]} for p in positions])
+        drawdown = self.rm.drawdown_status(session_pnl, 0, self.consecutive_losses)
+        drawdown["intraday_peak_pnl"] = round(self.peak_pnl, 2)
+        drawdown["drawdown_from_peak"] = round(self.peak_pnl - session_pnl, 2)
+        limits = self.rm.position_limit_status(len(book) - book.options_open, book.options_open)
+
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "portfolio_heat": heat,
+            "drawdown": drawdown,
+            "trade_stats": self.history_stats.get("trade_stats", {}),
+            "kelly": self.history_stats.get("kelly", {}),
+            "position_limits": limits,
+            "capital": capital,
+            "session_pnl": round(session_pnl, 2),
+            "open_risk": round(book.open_risk, 2),
+            "exposure": {
+                "gross": round(book.gross_exposure, 2),
+                "net": round(book.net_exposure, 2),
+                "gross_pct": round(book.gross_exposure / capital * 100, 2) if capital else 0,
+            },
+            "sectors": book.sectors(),
+            "options": self.options.summary(),
+            "positions": positions,
+            "config": self.rm.config,
+        }
+
+    def publish(self, reason: str):
+        self.version += 1
+        snapshot = self.snapshot()
+        snapshot.update(version=self.version, pid=os.getpid(), reason=reason)
+        self.risk_file.parent.mkdir(exist_ok=True)
+        tmp = self.risk_file.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(snapshot, f, default=str)
+        os.replace(tmp, self.risk_file)
+        self.stats["publishes"] += 1
+        self.heartbeat.beat(self.version)
+
+    def run_once(self) -> Optional[str]:
+        """One poll: apply whatever changed and publish. Returns the reason, if any."""
+        reasons = []
+
+        orders = self._orders_signature()
+        if orders != self.seen["orders"]:
+            self.seen["orders"] = orders
+            self.on_history()
+            reasons.append("history")
+
+        mtime = _mtime(self.cache_file)
+        if mtime is not None and mtime != self.seen["cache"]:
+            self.seen["cache"] = mtime
+            self.on_cache(_read_json(self.cache_file))
+            reasons.append("fills")
+
+        mtime = _mtime(self.tick_file)
+        if mtime is not None and mtime != self.seen["ticks"]:
+            self.seen["ticks"] = mtime
+            if self.on_ticks(_read_json(self.tick_file)):
+                reasons.append("ticks")
+
+        if not reasons:
+            return None
+        reason = "+".join(reasons)
+        self.publish(reason)
+        return reason
+
+    def run(self, poll_interval: float = POLL_INTERVAL):
+        print("[RISK] Following live_ticks / live_cache...")
+        try:
+            while True:
+                started = time.time()
+                reason = self.run_once()
+                if reason and reason != "ticks":
+                    print(f"[RISK] v{self.version} ({reason}): {len(self.book)} positions, "
+                          f"heat ₹{self.book.total_risk:,.0f}, P&L ₹{self.session_pnl:,.0f} "
+                          f"({(time.time() - started) * 1000:.1f} ms)")
+                elif not reason and self.heartbeat.due():
+                    self.heartbeat.beat(self.version)
+                time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            print(f"\n[STOP] Risk service stopped — {self.stats}")
+        finally:
+            self.heartbeat.stop()
+
+
+# ══════════════════════════════════════════════════════════════════
+# Reader
+# ══════════════════════════════════════════════════════════════════
+
+class RiskSnapshots:
+    """Read side of live_risk.json, re-parsed only when the file changes."""
+
+    def __init__(self, risk_file: Path = RISK_FILE):
+        self.risk_file = Path(risk_file)
+        self.heartbeat_file = heartbeat_path(self.risk_file)
+        self._mtime = None
+        self._data: Dict = {}
+
+    def load(self) -> Dict:
+        mtime = _mtime(self.risk_file)
+        if mtime is None:
+            return {}
+        if mtime != self._mtime:
+            data = _read_json(self.risk_file)
+            if data:
+                self._data = data
+                self._mtime = mtime
+        return self._data
+
+    def version(self) -> Optional[int]:
+        return self.load().get("version")
+
+    def heartbeat_age(self) -> Optional[float]:
+        return heartbeat_age(self.heartbeat_file)
+
+    def service_running(self) -> bool:
+        return service_running(self.heartbeat_file)
+
+    def live(self) -> Optional[Dict]:
+        """The current snapshot if the service is running, else None."""
+        snapshot = self.load()
+        return snapshot if snapshot and self.service_running() else None
+
+
+def main():
+    RiskService().run()
+
+
+if __name__ == "__main__":
+    main()
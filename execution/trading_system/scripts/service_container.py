@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+SERVICE CONTAINER — Warm Singletons for dashboard_api
+Builds the objects the dashboard handlers use once, at startup, instead of
+per request: config, MarketScanner, SignalEngine, ModeSelector, KiteMCPClient,
+OptionsAnalyzer, execution engines and the snapshot readers. RiskManagers are
+cached per config and rebuilt only when the order history on disk changes.
+
+Startup runs in phases, each timed:
+    core     config + service objects (blocking: the app serves nothing before this)
+    warm     instrument master, snapshot readers, daily bars, backtest store,
+             analysis worker pool (background: the app is live but not ready)
+
+/health is liveness, /ready is readiness (503 until the warm phase is done),
+/system/startup reports per-phase timings and errors. A failing optional
+phase degrades that feature, it does not block readiness.
+
+Usage:
+    services = get_services()
+    services.start_core()
+    await asyncio.to_thread(services.warm)
+    services.scanner.live_scan(...)
+"""
+
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+EXECUTION_DIR = SCRIPT_DIR.parent.parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+if str(EXECUTION_DIR) not in sys.path:
+    sys.path.insert(0, str(EXECUTION_DIR))
+ROOT_DIR = EXECUTION_DIR.parent  # execution -> project root (nifty_conviction_engine)
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+CONFIG_PATH = SCRIPT_DIR.parent / "config" / "trading_rules.json"
+
+# Phases that must succeed for /ready; the rest only degrade their feature
+REQUIRED_PHASES = ("config", "services")
+MAX_RISK_MANAGERS = 8
+
+
+class ServiceContainer:
+    """Process-wide service objects plus startup phase timings and readiness."""
+
+    def __init__(self, config_path: Path = CONFIG_PATH):
+        self.config_path = Path(config_path)
+        self.config: Dict = {}
+
+        self.kite = None
+        self.scanner = None
+        self.signal_engine = None
+        self.mode_selector = None
+        self.options_analyzer = None
+        self.signal_snapshots = None
+        self.risk_snapshots = None
+        self.bar_store = None
+        self.response_cache = None
+        self.backtest_store = None
+
+        self._risk_managers: "OrderedDict[tuple, object]" = OrderedDict()
+        self._execution_engines: Dict[bool, object] = {}
+        self._order_journal = None
+        # Pre-trade checks + placement must not interleave (daily limits, duplicates)
+        self.order_lock = threading.Lock()
+        self._lock = threading.Lock()
+
+        self.phases: Dict[str, Dict] = {}
+        self.started_at: Optional[datetime] = None
+        self.core_ready = False
+        self.warm_done = False
+
+    # ── Startup ──────────────────────────────────────────────────
+
+    @contextmanager
+    def _phase(self, name: str):
+        """Time a startup phase; record (not raise) its error."""
+        t0 = time.perf_counter()
+        entry = {"ok": True}
+        try:
+            yield entry
+        except Exception as e:
+            entry.update(ok=False, error=f"{type(e).__name__}: {e}")
+        entry["ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        self.phases[name] = entry
+        status = "ok" if entry["ok"] else f"FAILED ({entry['error']})"
+        print(f"[STARTUP] {name:<12} {entry['ms']:>8.1f} ms  {status}")
+
+    def start_core(self):
+        """Config + service objects. Cheap (no network); run before serving."""
+        self.started_at = datetime.now()
+
+        with self._phase("config"):
+            self.load_config()
+
+        with self._phase("imports"):
+            # Heavy modules (pandas, yfinance, numpy kernels) load here, not on the first request
+            import market_scanner, signal_engine, mode_selector, risk_manager  # noqa: F401
+            import options_analyzer, execution_engine, historical_var  # noqa: F401
+
+        with self._phase("kite"):
+            from kite_client import KiteMCPClient
+            import market_scanner
+            # One client for the process: it reloads kite_token.json when the
+            # daily login rewrites it, so it is shared even before a session exists
+            self.kite = KiteMCPClient()
+            market_scanner.use_kite_client(self.kite)
+
+        with self._phase("services"):
+            from market_scanner import MarketScanner
+            from signal_engine import SignalEngine
+            from mode_selector import ModeSelector
+            from options_analyzer import OptionsAnalyzer
+            from signal_service import SignalSnapshots
+            from risk_service import RiskSnapshots
+            from response_cache import ResponseCache
+
+            self.scanner = MarketScanner(str(self.config_path))
+            self.signal_engine = SignalEngine()
+            self.mode_selector = ModeSelector(str(self.config_path))
+            self.options_analyzer = OptionsAnalyzer(self.kite)
+            self.signal_snapshots = SignalSnapshots()
+            self.risk_snapshots = RiskSnapshots()
+            self.response_cache = ResponseCache()
+
+        with self._phase("jobs"):
+            from job_runner import get_jobs
+            get_jobs()
+
+        self.core_ready = all(self.phases.get(p, {}).get("ok") for p in REQUIRED_PHASES)
+
+    def warm(self):
+        """Preload data behind the hot endpoints. Blocking (disk / network) — run in a thread."""
+        with self._phase("instruments") as phase:
+            phase["rows"] = self.kite.load_instruments() if self.kite is not None else 0
+            if not phase["rows"]:
+                raise RuntimeError("instrument master unavailable (no Kite session and no cached dump)")
+
+        with self._phase("snapshots"):
+            from correlation_engine import get_snapshots
+            from candle_store import get_store
+            self.signal_snapshots.load()
+            self.risk_snapshots.load()
+            get_snapshots().load()
+            get_store()
+
+        with self._phase("daily_bars") as phase:
+            from historical_var import DailyBarStore
+            self.bar_store = DailyBarStore()
+            phase["rows"] = len(self.bar_store.load())
+
+        with self._phase("backtests"):
+            from backtest_store import BacktestStore
+            self.backtest_store = BacktestStore()
+
+        with self._phase("workers"):
+            from nifty_conviction_engine.worker_pool import MAX_WORKERS, map_ordered
+            # Start the analysis processes now so the first scan does not pay for it
+            map_ordered(abs, range(MAX_WORKERS))
+
+        self.warm_done = True
+        total = sum(p["ms"] for p in self.phases.values())
+        print(f"[STARTUP] ready in {total:.0f} ms")
+
+    def load_config(self):
+        """(Re)read trading_rules.json and rebuild the objects that hold a copy of it."""
+        with open(self.config_path) as f:
+            self.config = json.load(f)
+        if self.scanner is not None:
+            from market_scanner import MarketScanner
+            self.scanner = MarketScanner(str(self.config_path))
+        if self.mode_selector is not None:
+            self.mode_selector.load_config()
+
+    # ── Per-config services ──────────────────────────────────────
+
+    @staticmethod
+    def _history_stamp() -> tuple:
+        """Changes whenever the order history RiskManager loads changes on disk."""
+        from risk_manager import ORDER_PARTITIONS, TRADE_HISTORY
+
+        def mtime(p: Path):
+            try:
+                return p.stat().st_mtime
+            except OSError:
+                return None
+        today = ORDER_PARTITIONS / f"orders_{date.today().isoformat()}.jsonl"
+        return mtime(ORDER_PARTITIONS), mtime(today), mtime(TRADE_HISTORY)
+
+    def risk_manager(self, config: Optional[Dict] = None, load_history: bool = True):
+        """
+        RiskManager for `config` (None = its defaults). Reused across requests;
+        rebuilt only when the config differs or, with history, the orders on disk change.
+        """
+        from risk_manager import RiskManager
+
+        key = (json.dumps(config, sort_keys=True, default=str), load_history)
+        stamp = self._history_stamp() if load_history else None
+        with self._lock:
+            cached = self._risk_managers.get(key)
+            if cached is not None and cached[0] == stamp:
+                self._risk_managers.move_to_end(key)
+                return cached[1]
+        rm = RiskManager(client=self.kite, config=config, load_history=load_history)
+        with self._lock:
+            self._risk_managers[key] = (stamp, rm)
+            while len(self._risk_managers) > MAX_RISK_MANAGERS:
+                self._risk_managers.popitem(last=False)
+        return rm
+
+    def execution_engine(self, dry_run: bool = False):
+        """ExecutionEngine per dry-run flag; both share one order journal."""
+        from execution_engine import ExecutionEngine, OrderJournal
+
+        with self._lock:
+            engine = self._execution_engines.get(dry_run)
+            if engine is None:
+                if self._order_journal is None:
+                    self._order_journal = OrderJournal()
+                engine = ExecutionEngine(self.kite, journal=self._order_journal)
+                if dry_run:
+                    engine.config.update(dry_run=True, require_confirmation=False)
+                self._execution_engines[dry_run] = engine
+            return engine
+
+    # ── Probes ───────────────────────────────────────────────────
+
+    @property
+    def ready(self) -> bool:
+        return self.core_ready and self.warm_done
+
+    def status(self) -> Dict:
+        failed = {n: p["error"] for n, p in self.phases.items() if not p["ok"]}
+        return {
+            "ready": self.ready,
+            "core_ready": self.core_ready,
+            "warm": self.warm_done,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "startup_ms": round(sum(p["ms"] for p in self.phases.values()), 1),
+            "phases": self.phases,
+            "degraded": failed,
+            "kite_connected": bool(self.kite and self.kite.kite is not None),
+        }
+
+    def shutdown(self):
+        with self._lock:
+            if self._order_journal is not None:
+                self._order_journal.close()
+
+
+_services: Optional[ServiceContainer] = None
+_services_lock = threading.Lock()
+
+
+def get_services() -> ServiceContainer:
+    """Process-wide container (constructed empty; call start_core() / warm())."""
+    global _services
+    with _services_lock:
+        if _services is None:
+            _services = ServiceContainer()
+        return _services
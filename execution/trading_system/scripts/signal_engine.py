@@ -18,7 +18,10 @@ from collections import deque
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 EXECUTION_DIR = SCRIPT_DIR.parent.parent
+ROOT_DIR = EXECUTION_DIR.parent  # execution -> project root (nifty_conviction_engine)
 sys.path.insert(0, str(EXECUTION_DIR))
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
 
 from kite_client import KiteMCPClient
 
@@ -532,15 +535,38 @@ class SignalEngine:
     def multi_timeframe_analysis(self, candles_5m: List[Dict],
                                   candles_15m: List[Dict],
                                   candles_1hr: List[Dict],
-                                  symbol: str = "") -> Dict:
+                                  symbol: str = "",
+                                  parallel: bool = False) -> Dict:
         """
         Multi-timeframe confluence — strongest signals come from alignment
         across 5min, 15min, and 1hr timeframes.
+
+        parallel=True analyzes the three timeframes on the shared worker pool;
+        the merge below is unchanged, so the result is identical.
         """
-        analysis_5m = self.analyze(candles_5m, symbol, "5min") if candles_5m else {}
-        analysis_15m = self.analyze(candles_15m, symbol, "15min") if candles_15m else {}
-        analysis_1hr = self.analyze(candles_1hr, symbol, "1hr") if candles_1hr else {}
+        if parallel:
+            from nifty_conviction_engine.worker_pool import map_ordered
+            analysis_5m, analysis_15m, analysis_1hr = map_ordered(
+                _analyze_task,
+                [candles_5m, candles_15m, candles_1hr],
+                [symbol] * 3,
+                ["5min", "15min", "1hr"],
+            )
+        else:
+            analysis_5m = self.analyze(candles_5m, symbol, "5min") if candles_5m else {}
+            analysis_15m = self.analyze(candles_15m, symbol, "15min") if candles_15m else {}
+            analysis_1hr = self.analyze(candles_1hr, symbol, "1hr") if candles_1hr else {}
+
+        return self.combine_timeframes(analysis_5m, analysis_15m, analysis_1hr)
 
+    def combine_timeframes(self, analysis_5m: Dict, analysis_15m: Dict,
+                           analysis_1hr: Dict) -> Dict:
+        """
+        Confluence merge of three per-timeframe analyze() results.
+
+        Split out so callers holding per-timeframe results (e.g. the bar-close
+        signal service) re-analyze only the timeframe that changed.
+        """
         directions = []
         confidences = []
         strengths = []
@@ -619,11 +645,47 @@ class SignalEngine:
             },
         }
 
+    def multi_timeframe_batch(self, symbol_candles: Dict[str, Dict[str, List[Dict]]],
+                              parallel: bool = True) -> Dict[str, Dict]:
+        """
+        Multi-timeframe confluence for many symbols in one call.
+
+        Args:
+            symbol_candles: {symbol: {"5min": [...], "15min": [...], "1hr": [...]}}
+            parallel: Spread symbols across the shared worker pool
+
+        Returns:
+            {symbol: multi_timeframe_analysis result}, in the input symbol order
+        """
+        symbols = list(symbol_candles)
+        args = (
+            [symbol_candles[s].get("5min", []) for s in symbols],
+            [symbol_candles[s].get("15min", []) for s in symbols],
+            [symbol_candles[s].get("1hr", []) for s in symbols],
+            symbols,
+        )
+        if parallel:
+            from nifty_conviction_engine.worker_pool import map_ordered
+            results = map_ordered(_mtf_task, *args)
+        else:
+            results = [self.multi_timeframe_analysis(*a) for a in zip(*args)]
+        return dict(zip(symbols, results))
+
     def analyze_from_kite(self, instrument_token: int, symbol: str = "",
                           timeframe: str = "15minute") -> Dict:
         """
         Convenience method: fetch candles from Kite MCP and analyze.
+
+        Uses the live candles built by live_ticker.py when the ticker is
+        publishing and already holds enough bars for this instrument, so
+        no REST call is made.
         """
+        live = live_candles(instrument_token, timeframe)
+        if live:
+            result = self.analyze(live, symbol, timeframe)
+            result["source"] = "LIVE_TICKS"
+            return result
+
         if not self.client:
             return {"error": "No Kite client provided"}
         
@@ -665,6 +727,34 @@ class SignalEngine:
             return {"error": str(e)}
 
 
+def live_candles(instrument: object, timeframe: str = "15minute",
+                 min_bars: int = 20, max_age: float = 120) -> List[Dict]:
+    """
+    Candles for a tradingsymbol or instrument token from the live candle
+    store, or [] if the ticker is not running or has fewer than min_bars.
+    """
+    try:
+        from candle_store import get_store
+        store = get_store()
+        if not store.is_live(max_age):
+            return []
+        candles = store.candles(instrument, timeframe)
+    except (ImportError, ValueError):
+        return []
+    return candles if len(candles) >= min_bars else []
+
+
+# ── Worker-pool tasks (module level so process workers can unpickle them) ──
+
+def _analyze_task(candles: List[Dict], symbol: str, timeframe: str) -> Dict:
+    return SignalEngine().analyze(candles, symbol, timeframe) if candles else {}
+
+
+def _mtf_task(candles_5m: List[Dict], candles_15m: List[Dict],
+              candles_1hr: List[Dict], symbol: str) -> Dict:
+    return SignalEngine().multi_timeframe_analysis(candles_5m, candles_15m, candles_1hr, symbol)
+
+
 # ══════════════════════════════════════════════════════════════════
 # Demo
 # ══════════════════════════════════════════════════════════════════
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+SIGNAL SERVICE — Bar-Close Driven Signal Recomputation
+
+Watches the live candle store written by live_ticker.py and, whenever a bar
+closes for a symbol and timeframe, recomputes only what that bar affects:
+
+    5/15/60-minute or     -> SignalEngine.analyze for that timeframe, then the
+    daily close              multi-timeframe confluence from the cached results
+    any conviction TF     -> ConvictionScorer for the index, reusing the
+                             analyses of the timeframes that did not change
+
+Results are published as a versioned snapshot (.tmp/live_signals.json) that
+the orchestrators and the dashboard read through SignalSnapshots. With no
+bar closes nothing is recomputed, so an idle market costs a stat() per poll.
+
+Usage:
+    python3 execution/trading_system/scripts/signal_service.py
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+EXECUTION_DIR = SCRIPT_DIR.parent.parent
+ROOT_DIR = EXECUTION_DIR.parent  # execution -> project root (nifty_conviction_engine)
+sys.path.insert(0, str(EXECUTION_DIR))
+sys.path.insert(0, str(SCRIPT_DIR))
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+from candle_store import LiveCandleStore, get_store
+from heartbeat import Heartbeat, heartbeat_age, heartbeat_path, service_running
+
+SIGNAL_FILE = ROOT_DIR / ".tmp" / "live_signals.json"
+
+# Candle-store timeframe -> SignalEngine timeframe name
+MTF_TIMEFRAMES = {"5minute": "5min", "15minute": "15min", "60minute": "1hr"}
+# Analyzed per symbol: the MTF inputs plus the daily analysis the scanner scores with
+SIGNAL_TIMEFRAMES = {**MTF_TIMEFRAMES, "day": "daily"}
+# Candle-store timeframe -> ConvictionScorer timeframe name
+CONVICTION_TIMEFRAMES = {"5minute": "5min", "15minute": "15min", "60minute": "60min", "day": "daily"}
+CONVICTION_SYMBOL = "NIFTY 50"
+
+POLL_INTERVAL = 0.2
+MAX_CANDLES = 200
+
+
+class SignalService:
+    """Recomputes signals per (symbol, timeframe) on bar close and publishes snapshots."""
+
+    def __init__(self, store: Optional[LiveCandleStore] = None,
+                 signal_file: Path = SIGNAL_FILE,
+                 conviction_symbol: str = CONVICTION_SYMBOL):
+        from signal_engine import SignalEngine
+
+        self.store = store or get_store()
+        self.signal_file = Path(signal_file)
+        self.heartbeat = Heartbeat(self.signal_file)
+        self.conviction_symbol = conviction_symbol
+        self.engine = SignalEngine()
+
+        self.seen: Dict[str, Dict[str, str]] = {}       # {symbol: {timeframe: last closed bar date}}
+        self.analyses: Dict[str, Dict[str, Dict]] = {}  # {symbol: {SignalEngine tf: analyze() result}}
+        self.conviction_tfs: Dict[str, Dict] = {}       # ConvictionScorer.timeframe_results of the last run
+        self.candle_version = None
+        self.version = 0
+        self.symbols: Dict[str, Dict] = {}
+        self.stats = {"bar_closes": 0, "signal_runs": 0, "conviction_runs": 0, "publishes": 0}
+
+    # ── Events ──
+
+    def bar_close_events(self) -> List[Tuple[str, str]]:
+        """(symbol, timeframe) pairs whose latest closed bar changed since the last call."""
+        events = []
+        for symbol, dates in self.store.last_closed().items():
+            seen = self.seen.setdefault(symbol, {})
+            for tf, date in dates.items():
+                if seen.get(tf) != date:
+                    seen[tf] = date
+                    events.append((symbol, tf))
+        return events
+
+    # ── Recompute ──
+
+    def _candles(self, symbol: str, tf: str) -> List[Dict]:
+        return self.store.candles(symbol, tf, include_open=False, limit=MAX_CANDLES)
+
+    def _recompute_mtf(self, symbol: str, changed: Set[str]) -> Dict:
+        analyses = self.analyses.setdefault(symbol, {})
+        for tf, name in SIGNAL_TIMEFRAMES.items():
+            if tf in changed or name not in analyses:
+                candles = self._candles(symbol, tf)
+                analyses[name] = self.engine.analyze(candles, symbol, name) if candles else {}
+                self.stats["signal_runs"] += 1
+        return self.engine.combine_timeframes(analyses["5min"], analyses["15min"], analyses["1hr"])
+
+    def _recompute_conviction(self, symbol: str, changed: Set[str]) -> Dict:
+        from nifty_conviction_engine.conviction_scorer import ConvictionScorer
+
+        candles = {name: self._candles(symbol, tf) for tf, name in CONVICTION_TIMEFRAMES.items()}
+        last = self.store.candles(symbol, "minute", include_open=True, limit=1)
+        spot = last[-1]["close"] if last else next(
+            (c[-1]["close"] for c in candles.values() if c), 0)
+        unchanged = {CONVICTION_TIMEFRAMES[tf] for tf in CONVICTION_TIMEFRAMES if tf not in changed}
+
+        scorer = ConvictionScorer(
+            candles["5min"], candles["15min"], candles["60min"], candles["daily"], spot,
+            precomputed={tf: r for tf, r in self.conviction_tfs.items() if tf in unchanged})
+        result = scorer.compute_final_conviction()
+        self.conviction_tfs = scorer.timeframe_results
+        self.stats["conviction_runs"] += 1
+        return result
+
+    def process(self, events: List[Tuple[str, str]]) -> Set[str]:
+        """Recompute the outputs affected by these bar closes. Returns the updated symbols."""
+        changed: Dict[str, Set[str]] = {}
+        for symbol, tf in events:
+            changed.setdefault(symbol, set()).add(tf)
+        self.stats["bar_closes"] += len(events)
+
+        updated = set()
+        now = datetime.now().isoformat()
+        for symbol, tfs in changed.items():
+            run_mtf = bool(tfs & SIGNAL_TIMEFRAMES.keys())
+            run_conviction = symbol == self.conviction_symbol and bool(tfs & CONVICTION_TIMEFRAMES.keys())
+            if not (run_mtf or run_conviction):
+                continue  # only 1-minute bars closed: nothing depends on them
+
+            entry = self.symbols.get(symbol, {})
+            if run_mtf:
+                entry["mtf"] = self._recompute_mtf(symbol, tfs)
+                entry["timeframes"] = self.analyses[symbol]
+            if run_conviction:
+                entry["conviction"] = self._recompute_conviction(symbol, tfs)
+            entry["version"] = entry.get("version", 0) + 1
+            entry["updated_at"] = now
+            entry["bars"] = dict(self.seen.get(symbol, {}))
+            self.symbols[symbol] = entry
+            updated.add(symbol)
+        return updated
+
+    # ── Publish ──
+
+    def publish(self, updated: Set[str]):
+        self.version += 1
+        snapshot = {
+            "version": self.version,
+            "timestamp": datetime.now().isoformat(),
+            "candle_version": self.candle_version,
+            "pid": os.getpid(),
+            "updated": sorted(updated),
+            "symbols": self.symbols,
+        }
+        self.signal_file.parent.mkdir(exist_ok=True)
+        tmp = self.signal_file.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(snapshot, f, default=str)
+        os.replace(tmp, self.signal_file)
+        self.stats["publishes"] += 1
+        self.heartbeat.beat(self.version)
+
+    def run_once(self) -> Set[str]:
+        """One poll: recompute and publish if the ticker closed any bars."""
+        version = self.store.version()
+        if version is None or version == self.candle_version:
+            return set()
+        self.candle_version = version
+        updated = self.process(self.bar_close_events())
+        if updated:
+            self.publish(updated)
+        return updated
+
+    def run(self, poll_interval: float = POLL_INTERVAL):
+        print("[SIGNALS] Waiting for bar closes from live_ticker...")
+        try:
+            while True:
+                started = time.time()
+                updated = self.run_once()
+                if updated:
+                    print(f"[SIGNALS] v{self.version}: {', '.join(sorted(updated))} "
+                          f"({(time.time() - started) * 1000:.0f} ms)")
+                elif self.heartbeat.due():
+                    self.heartbeat.beat(self.version)
+                time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            print(f"\n[STOP] Signal service stopped — {self.stats}")
+        finally:
+            self.heartbeat.stop()
+
+
+# ══════════════════════════════════════════════════════════════════
+# Reader
+# ══════════════════════════════════════════════════════════════════
+
+class SignalSnapshots:
+    """Read side of live_signals.json, re-parsed only when the file changes."""
+
+    def __init__(self, signal_file: Path = SIGNAL_FILE):
+        self.signal_file = Path(signal_file)
+        self.heartbeat_file = heartbeat_path(self.signal_file)
+        self._mtime = None
+        self._data: Dict = {}
+
+    def load(self) -> Dict:
+        try:
+            mtime = self.signal_file.stat().st_mtime
+        except OSError:
+            return {}
+        if mtime != self._mtime:
+            try:
+                with open(self.signal_file) as f:
+                    self._data = json.load(f)
+                self._mtime = mtime
+            except (OSError, ValueError):
+                pass  # keep the previous snapshot
+        return self._data
+
+    def version(self) -> Optional[int]:
+        return self.load().get("version")
+
+    def get(self, symbol: str) -> Optional[Dict]:
+        return self.load().get("symbols", {}).get(symbol)
+
+    def heartbeat_age(self) -> Optional[float]:
+        return heartbeat_age(self.heartbeat_file)
+
+    def service_running(self) -> bool:
+        return service_running(self.heartbeat_file)
+
+    def wait_for_update(self, since: Optional[int], interval: float,
+                        max_wait: float = 1800, poll: float = 1.0) -> Optional[int]:
+        """
+        While the signal service is running, return as soon as it publishes a
+        version other than `since` (or after `max_wait` seconds). Without a
+        running service — or once it stops mid-wait — this is a plain
+        `interval` timer from the start of the call, so callers keep their old
+        fixed-interval behaviour. Returns the current snapshot version.
+        """
+        started = time.time()
+        while self.service_running():
+            version = self.version()
+            if version != since or time.time() - started >= max_wait:
+                return version
+            time.sleep(poll)
+        time.sleep(max(0.0, started + interval - time.time()))
+        return self.version()
+
+    def signal(self, symbol: str, timeframe: str = "daily") -> Optional[Dict]:
+        """
+        The service's SignalEngine.analyze result for one symbol and timeframe
+        ('5min', '15min', '1hr' or 'daily'), or None when the service is not
+        running or has not analyzed it.
+        """
+        if not self.service_running():
+            return None
+        analysis = ((self.get(symbol) or {}).get("timeframes") or {}).get(timeframe)
+        return analysis or None
+
+
+def main():
+    SignalService().run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+TRADE ANALYTICS — Closed-Trade Table with Rolling Aggregates
+Keeps every closed trade as one row of an append-only table and maintains
+win/loss/P&L aggregates per pattern, setup type, symbol, entry hour and
+weekday as trades close, bucketed by entry day with running totals, so a
+"last N days" question is two lookups per key instead of a pass over history.
+
+Layout:
+    analysis/trade_analytics_table.csv     (append-only, one row per closed trade)
+
+The table is a flat append-only CSV, held in memory column by column, rather
+than a Parquet dataset like backtest_store: trades arrive one at a time, so a
+Parquet store would be one tiny file (or one rewrite) per close, and the exit
+path should not depend on the optional pyarrow.
+
+The first run imports the existing analysis/closed_trades_*.json files.
+Other processes' appends are picked up by refresh(). A trade is identified by
+(symbol, entry_time, exit_time) and stored once, however often it is added.
+
+Usage:
+    analytics = TradeAnalytics("analysis")
+    analytics.add_trade(exit_record)              # ExitManager.save_closed_trade
+    analytics.summary(days=7)                     # win rate, profit factor, ...
+    analytics.stats("pattern", days=7)            # {pattern: {win_rate, trades, ...}}
+"""
+
+import csv
+import io
+import json
+import os
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+TABLE_FILE = "trade_analytics_table.csv"
+COLUMNS = ["entry_time", "exit_time", "symbol", "setup_type", "patterns",
+           "pnl", "winner", "hour", "weekday"]
+DIMENSIONS = ("pattern", "setup_type", "symbol", "hour", "weekday")
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+# Aggregate slots: wins, losses, P&L of winners, P&L of losers
+_ZERO = (0, 0, 0.0, 0.0)
+
+
+# ══════════════════════════════════════════════════════════════════
+# Day Buckets
+# ══════════════════════════════════════════════════════════════════
+
+class _DayBuckets:
+    """Running totals per entry day: the sum since any day is total minus one prefix."""
+
+    __slots__ = ("days", "cum")
+
+    def __init__(self):
+        self.days: List[str] = []
+        self.cum: List[list] = []
+
+    def add(self, day: str, row: tuple):
+        i = bisect_right(self.days, day)
+        if i and self.days[i - 1] == day:
+            i -= 1
+        else:
+            self.days.insert(i, day)
+            self.cum.insert(i, list(self.cum[i - 1]) if i else list(_ZERO))
+        # Trades close in time order, so this normally touches only the last bucket
+        for c in self.cum[i:]:
+            for k in range(4):
+                c[k] += row[k]
+
+    def since(self, day: Optional[str] = None) -> tuple:
+        if not self.cum:
+            return _ZERO
+        total = self.cum[-1]
+        if day is None:
+            return tuple(total)
+        i = bisect_left(self.days, day)
+        before = self.cum[i - 1] if i else _ZERO
+        return tuple(t - b for t, b in zip(total, before))
+
+
+def _performance(wins, losses, win_pnl, loss_pnl) -> Dict:
+    total = wins + losses
+    pnl = win_pnl + loss_pnl
+    return {
+        "win_rate": wins / total * 100 if total > 0 else 0,
+        "trades": total,
+        "total_pnl": pnl,
+        "avg_pnl": pnl / total if total > 0 else 0,
+    }
+
+
+# ══════════════════════════════════════════════════════════════════
+# Analytics Table
+# ══════════════════════════════════════════════════════════════════
+
+class TradeAnalytics:
+    """Append-only closed-trade table plus incrementally maintained aggregates."""
+
+    def __init__(self, analysis_dir: str):
+        self.analysis_dir = analysis_dir
+        self.table_file = os.path.join(analysis_dir, TABLE_FILE)
+        self.columns: Dict[str, list] = {c: [] for c in COLUMNS}
+        self._overall = _DayBuckets()
+        self._aggregates: Dict[str, Dict] = {dim: {} for dim in DIMENSIONS}
+        self._keys = set()
+        self._offset = 0
+
+        os.makedirs(analysis_dir, exist_ok=True)
+        if not os.path.exists(self.table_file):
+            self._backfill()
+        self.refresh()
+
+    # ── Storage ──
+
+    @staticmethod
+    def to_row(trade: Dict) -> Dict:
+        """Flatten an ExitManager exit record into a table row."""
+        entry = datetime.fromisoformat(trade["entry_time"])
+        patterns = (trade.get("setup_details") or {}).get("patterns", [])
+        return {
+            "entry_time": trade["entry_time"],
+            "exit_time": trade.get("exit_time", ""),
+            "symbol": trade.get("symbol", ""),
+            "setup_type": trade.get("type", ""),
+            "patterns": "|".join(str(p) for p in patterns),
+            "pnl": float(trade.get("final_pnl_amount", 0) or 0),
+            "winner": 1 if trade.get("winner") else 0,
+            "hour": entry.hour,
+            "weekday": entry.weekday(),
+        }
+
+    @staticmethod
+    def row_key(row: Dict) -> tuple:
+        """Identity of a closed trade (exit records carry no trade id)."""
+        return (row["symbol"], row["entry_time"], row["exit_time"])
+
+    def _backfill(self):
+        """Build the table once from the legacy closed_trades_*.json files."""
+        rows = []
+        for filename in sorted(os.listdir(self.analysis_dir)):
+            if filename.startswith("closed_trades_") and filename.endswith(".json"):
+                try:
+                    with open(os.path.join(self.analysis_dir, filename), "r") as f:
+                        rows.extend(self.to_row(t) for t in json.load(f))
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"[ANALYTICS] Skipping {filename}: {e}")
+        rows = list({self.row_key(r): r for r in rows}.values())
+        rows.sort(key=lambda r: r["entry_time"])
+
+        tmp = self.table_file + ".tmp"
+        with open(tmp, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+        os.replace(tmp, self.table_file)
+
+    def refresh(self) -> int:
+        """Aggregate rows appended since the last read (by any process). Returns rows added."""
+        try:
+            with open(self.table_file, "rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+        except FileNotFoundError:
+            return 0
+
+        # Only complete lines: a concurrent writer may be mid-row
+        end = data.rfind(b"\n") + 1
+        if end == 0:
+            return 0
+        text = data[:end].decode("utf-8")
+        header = self._offset == 0
+        self._offset += end
+
+        added = 0
+        for values in csv.reader(io.StringIO(text)):
+            if header:
+                header = False
+                continue
+            if len(values) != len(COLUMNS):
+                continue
+            row = dict(zip(COLUMNS, values))
+            row.update(pnl=float(row["pnl"]), winner=int(row["winner"]),
+                       hour=int(row["hour"]), weekday=int(row["weekday"]))
+            if self.row_key(row) in self._keys:
+                continue
+            self._aggregate(row)
+            added += 1
+        return added
+
+    def add_trade(self, trade: Dict) -> Dict:
+        """Append one closed trade and fold it into the aggregates (no-op if already stored)."""
+        self.refresh()
+        row = self.to_row(trade)
+        if self.row_key(row) in self._keys:
+            return row
+        line = io.StringIO()
+        csv.DictWriter(line, fieldnames=COLUMNS).writerow(row)
+        with open(self.table_file, "a", newline="") as f:
+            f.write(line.getvalue())
+        self.refresh()
+        return row
+
+    # ── Aggregates ──
+
+    def _aggregate(self, row: Dict):
+        self._keys.add(self.row_key(row))
+        for column in COLUMNS:
+            self.columns[column].append(row[column])
+
+        pnl = row["pnl"]
+        slot = (1, 0, pnl, 0.0) if row["winner"] else (0, 1, 0.0, pnl)
+        day = row["entry_time"][:10]
+        self._overall.add(day, slot)
+
+        keys = {
+            "pattern": [p for p in row["patterns"].split("|") if p],
+            "setup_type": [row["setup_type"]],
+            "symbol": [row["symbol"]],
+            "hour": [row["hour"]],
+            "weekday": [WEEKDAYS[row["weekday"]]],
+        }
+        for dim, values in keys.items():
+            buckets = self._aggregates[dim]
+            for value in values:
+                if value not in buckets:
+                    buckets[value] = _DayBuckets()
+                buckets[value].add(day, slot)
+
+    @staticmethod
+    def _since(days: Optional[int]) -> Optional[str]:
+        if days is None:
+            return None
+        return (datetime.now() - timedelta(days=days)).date().isoformat()
+
+    def summary(self, days: Optional[int] = None) -> Dict:
+        """Overall performance for trades entered in the last `days` days (all history if None)."""
+        wins, losses, win_pnl, loss_pnl = self._overall.since(self._since(days))
+        total = wins + losses
+        return {
+            "period_days": days,
+            "total_trades": total,
+            "winners": wins,
+            "losers": losses,
+            "win_rate": wins / total * 100 if total > 0 else 0,
+            "total_pnl": win_pnl + loss_pnl,
+            "avg_win": win_pnl / wins if wins else 0,
+            "avg_loss": loss_pnl / losses if losses else 0,
+            "profit_factor": abs(win_pnl / loss_pnl) if losses and loss_pnl else float("inf"),
+        }
+
+    def stats(self, dimension: str, days: Optional[int] = None) -> Dict:
+        """{key: {win_rate, trades, total_pnl, avg_pnl}} for one dimension."""
+        since = self._since(days)
+        out = {}
+        for key, buckets in self._aggregates[dimension].items():
+            slot = buckets.since(since)
+            if slot[0] + slot[1]:
+                out[key] = _performance(*slot)
+        return out
+
+    def frame(self) -> pd.DataFrame:
+        """The whole table as a DataFrame (ad-hoc analysis)."""
+        return pd.DataFrame(self.columns, columns=COLUMNS)
+
+    def __len__(self):
+        return len(self.columns["entry_time"])
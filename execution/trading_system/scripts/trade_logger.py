@@ -2,8 +2,13 @@
 """
 TRADE LOGGER - Complete trade and chart analysis logging
 Logs every entry with timing, chart analysis, and all relevant data
+
+Trades are stored in an append-only journal (trades_log.jsonl): every change
+appends the trade's full current record, the newest line per trade_id wins.
+CSV / Excel exports are produced on demand.
 """
 
+import io
 import json
 import os
 from datetime import datetime
@@ -11,29 +16,158 @@ from typing import Dict, List, Optional
 import pandas as pd
 
 
+class TradeJournal:
+    """
+    Append-only JSONL trade store with in-memory indexes.
+
+    put() appends one line, so a write costs the same with ten trades or
+    fifty thousand. Loading replays the log (newest record per trade_id wins)
+    and compacts it when superseded lines outnumber live trades.
+    Indexed by trade_id, status, symbol and entry date (YYYY-MM-DD).
+
+    readonly=True is for processes that only read (the dashboard): unparsable
+    lines are skipped in memory and the file is never truncated, compacted or
+    migrated, so a reader cannot cut off or replace a line the writer is
+    still appending.
+    """
+
+    COMPACT_RATIO = 2      # Compact when log lines > COMPACT_RATIO x trades
+    COMPACT_MIN_LINES = 1000
+
+    def __init__(self, path: str, legacy_file: Optional[str] = None, readonly: bool = False):
+        self.path = path
+        self.readonly = readonly
+        self._trades: Dict[str, Dict] = {}
+        self._by_status: Dict[str, Dict[str, None]] = {}
+        self._by_symbol: Dict[str, Dict[str, None]] = {}
+        self._by_date: Dict[str, Dict[str, None]] = {}
+        self._keys: Dict[str, tuple] = {}
+        self._seq: Dict[str, int] = {}  # First-insert order
+
+        if os.path.exists(path):
+            self._load()
+        elif legacy_file and os.path.exists(legacy_file):
+            self._migrate(legacy_file)
+
+    # ── Storage ──
+
+    def _load(self):
+        lines, offset, good_end = 0, 0, 0
+        with open(self.path, 'rb') as f:
+            for raw in f:
+                offset += len(raw)
+                if not raw.strip():
+                    continue
+                try:
+                    trade = json.loads(raw)
+                except ValueError:
+                    continue
+                lines += 1
+                good_end = offset
+                self._index(trade)
+
+        if self.readonly:
+            return
+
+        # Drop a torn last line from an interrupted write so the next append starts clean
+        if good_end < offset:
+            with open(self.path, 'r+b') as f:
+                f.truncate(good_end)
+
+        if lines > self.COMPACT_MIN_LINES and lines > self.COMPACT_RATIO * len(self._trades):
+            self.compact()
+
+    def _migrate(self, legacy_file: str):
+        """Import a whole-file trades_log.json written by older versions."""
+        try:
+            with open(legacy_file, 'r') as f:
+                trades = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        for trade in trades:
+            self._index(trade)
+        if not self.readonly:
+            self.compact()
+
+    def compact(self):
+        """Rewrite the log with one line per trade (atomic replace)."""
+        if self.readonly:
+            raise RuntimeError(f"{self.path} is opened read-only")
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            for trade in self._trades.values():
+                f.write(json.dumps(trade, default=str) + '\n')
+        os.replace(tmp, self.path)
+
+    def put(self, trade: Dict):
+        """Insert or update a trade: index it and append its current state."""
+        if self.readonly:
+            raise RuntimeError(f"{self.path} is opened read-only")
+        self._index(trade)
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(trade, default=str) + '\n')
+
+    # ── Indexes ──
+
+    def _index(self, trade: Dict):
+        trade_id = trade['trade_id']
+        keys = (trade.get('status'), trade.get('symbol'), (trade.get('entry_timestamp') or '')[:10])
+        old = self._keys.get(trade_id)
+        if old != keys:
+            for index, key in zip((self._by_status, self._by_symbol, self._by_date), old or ()):
+                index.get(key, {}).pop(trade_id, None)
+            for index, key in zip((self._by_status, self._by_symbol, self._by_date), keys):
+                index.setdefault(key, {})[trade_id] = None
+            self._keys[trade_id] = keys
+        self._seq.setdefault(trade_id, len(self._seq))
+        self._trades[trade_id] = trade
+
+    def get(self, trade_id: str) -> Optional[Dict]:
+        return self._trades.get(trade_id)
+
+    def all(self) -> List[Dict]:
+        return list(self._trades.values())
+
+    def query(self, status: str = None, symbol: str = None, date: str = None) -> List[Dict]:
+        """Trades matching every given filter, in insertion order."""
+        indexes = [index.get(key, {}) for index, key in
+                   ((self._by_status, status), (self._by_symbol, symbol), (self._by_date, date))
+                   if key is not None]
+        if not indexes:
+            return self.all()
+        smallest = min(indexes, key=len)
+        ids = [i for i in smallest if all(i in index for index in indexes)]
+        ids.sort(key=self._seq.__getitem__)
+        return [self._trades[i] for i in ids]
+
+    def __len__(self):
+        return len(self._trades)
+
+
 class TradeLogger:
     """
     Comprehensive trade logging with chart analysis timing
     """
 
-    def __init__(self, journal_dir: str = '../journals'):
+    def __init__(self, journal_dir: str = '../journals', readonly: bool = False):
+        """readonly: load the journal for queries / exports only (see TradeJournal)"""
         self.journal_dir = journal_dir
-        self.trades_file = os.path.join(journal_dir, 'trades_log.json')
+        self.journal_file = os.path.join(journal_dir, 'trades_log.jsonl')
+        self.trades_file = os.path.join(journal_dir, 'trades_log.json')  # Legacy, migrated once
         self.csv_file = os.path.join(journal_dir, 'trades_log.csv')
+        self.excel_file = os.path.join(journal_dir, 'trades_log.xlsx')
 
         # Create journal directory if needed
         os.makedirs(journal_dir, exist_ok=True)
 
         # Load existing trades
-        self.trades = self._load_trades()
+        self.journal = TradeJournal(self.journal_file, legacy_file=self.trades_file,
+                                    readonly=readonly)
 
-    def _load_trades(self) -> List[Dict]:
-        """Load existing trade log"""
-        try:
-            with open(self.trades_file, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return []
+    @property
+    def trades(self) -> List[Dict]:
+        """All trades in entry order"""
+        return self.journal.all()
 
     def log_analysis(self,
                     symbol: str,
@@ -220,11 +354,8 @@ class TradeLogger:
                 except:
                     pass
 
-        # Add to trades list
-        self.trades.append(trade_log)
-
         # Save
-        self._save_trades()
+        self.journal.put(trade_log)
 
         print(f"\n✅ Trade logged: {trade_id}")
         print(f"   Symbol: {symbol} @ ₹{entry_price}")
@@ -257,7 +388,7 @@ class TradeLogger:
         exit_timestamp = datetime.now()
 
         # Find trade
-        trade = next((t for t in self.trades if t['trade_id'] == trade_id), None)
+        trade = self.journal.get(trade_id)
         if not trade:
             print(f"❌ Trade {trade_id} not found!")
             return
@@ -299,7 +430,7 @@ class TradeLogger:
         })
 
         # Save
-        self._save_trades()
+        self.journal.put(trade)
 
         win_loss = "WIN ✅" if pnl > 0 else "LOSS ❌"
         print(f"\n{win_loss} Trade closed: {trade_id}")
@@ -323,7 +454,7 @@ class TradeLogger:
             additional_notes: Any additional observations
         """
 
-        trade = next((t for t in self.trades if t['trade_id'] == trade_id), None)
+        trade = self.journal.get(trade_id)
         if not trade:
             print(f"❌ Trade {trade_id} not found!")
             return
@@ -334,7 +465,7 @@ class TradeLogger:
             'post_trade_notes': additional_notes
         })
 
-        self._save_trades()
+        self.journal.put(trade)
 
         print(f"\n📝 Post-trade analysis added for {trade_id}")
         print(f"   Optimal entry: {'Yes ✅' if was_optimal_entry else 'No ❌'}")
@@ -342,15 +473,19 @@ class TradeLogger:
 
     def get_trade(self, trade_id: str) -> Optional[Dict]:
         """Get specific trade"""
-        return next((t for t in self.trades if t['trade_id'] == trade_id), None)
+        return self.journal.get(trade_id)
+
+    def get_trades(self, status: str = None, symbol: str = None, date: str = None) -> List[Dict]:
+        """Get trades by status, symbol and/or entry date (YYYY-MM-DD)"""
+        return self.journal.query(status=status, symbol=symbol, date=date)
 
     def get_open_trades(self) -> List[Dict]:
         """Get all open trades"""
-        return [t for t in self.trades if t['status'] == 'OPEN']
+        return self.journal.query(status='OPEN')
 
     def get_closed_trades(self) -> List[Dict]:
         """Get all closed trades"""
-        return [t for t in self.trades if t['status'] == 'CLOSED']
+        return self.journal.query(status='CLOSED')
 
     def get_performance_summary(self) -> Dict:
         """Get performance metrics"""
@@ -385,16 +520,11 @@ class TradeLogger:
             }
         }
 
-    def export_to_csv(self):
-        """Export trades to CSV for analysis"""
-
-        if not self.trades:
-            print("No trades to export")
-            return
+    def _export_frame(self, trades: List[Dict]) -> pd.DataFrame:
+        """Flatten trades into one row each for CSV / Excel"""
 
-        # Flatten trades for CSV
         rows = []
-        for trade in self.trades:
+        for trade in trades:
             row = {
                 'trade_id': trade['trade_id'],
                 'symbol': trade['symbol'],
@@ -425,10 +555,56 @@ class TradeLogger:
             }
             rows.append(row)
 
-        df = pd.DataFrame(rows)
-        df.to_csv(self.csv_file, index=False)
+        return pd.DataFrame(rows)
+
+    def export_bytes(self, fmt: str = 'csv', **filters) -> Optional[bytes]:
+        """Filtered export rendered in memory (csv or xlsx), leaving the files on disk alone"""
+
+        trades = self.get_trades(**filters)
+        if not trades:
+            return None
+
+        frame = self._export_frame(trades)
+        if fmt == 'csv':
+            return frame.to_csv(index=False).encode()
+        buffer = io.BytesIO()
+        try:
+            frame.to_excel(buffer, index=False, sheet_name='Trades')
+        except ImportError:
+            return None
+        return buffer.getvalue()
+
+    def export_to_csv(self, path: str = None, **filters) -> Optional[str]:
+        """Export trades (optionally filtered like get_trades) to CSV for analysis"""
+
+        trades = self.get_trades(**filters)
+        if not trades:
+            print("No trades to export")
+            return None
+
+        path = path or self.csv_file
+        self._export_frame(trades).to_csv(path, index=False)
 
-        print(f"\n✅ Exported {len(rows)} trades to {self.csv_file}")
+        print(f"\n✅ Exported {len(trades)} trades to {path}")
+        return path
+
+    def export_to_excel(self, path: str = None, **filters) -> Optional[str]:
+        """Export trades to Excel (needs openpyxl)"""
+
+        trades = self.get_trades(**filters)
+        if not trades:
+            print("No trades to export")
+            return None
+
+        path = path or self.excel_file
+        try:
+            self._export_frame(trades).to_excel(path, index=False, sheet_name='Trades')
+        except ImportError:
+            print("❌ Excel export needs openpyxl: pip install openpyxl")
+            return None
+
+        print(f"\n✅ Exported {len(trades)} trades to {path}")
+        return path
 
     def print_summary(self):
         """Print formatted summary"""
@@ -459,16 +635,6 @@ class TradeLogger:
 
         print("\n" + "="*60)
 
-    def _save_trades(self):
-        """Save trades to JSON and CSV"""
-
-        # Save JSON
-        with open(self.trades_file, 'w') as f:
-            json.dump(self.trades, f, indent=2)
-
-        # Update CSV
-        self.export_to_csv()
-
 
 if __name__ == '__main__':
     """Demo usage"""
@@ -567,5 +733,6 @@ if __name__ == '__main__':
 
     # Print summary
     logger.print_summary()
+    logger.export_to_csv()
 
     print("\n✅ Demo complete! Check '../journals_demo/' for saved files\n")
@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+TRADEBOOK RECONCILER — FIFO P&L from Broker Exports
+Loads Zerodha tradebook CSVs (EQ / FO) and the funds ledger into typed
+columnar frames, matches fills FIFO per instrument in one sorted-merge pass,
+and reports round-trip trades (holding time, realized P&L, charges, capital
+used), open positions and a day-by-day reconciliation against the ledger's
+settlements and charge entries.
+
+FIFO as interval matching: the k-th unit bought always closes against the
+k-th unit sold (long or short, through flips), so laying each instrument's
+buys and sells on cumulative-quantity axes and cutting at every fill boundary
+yields every matched (buy fill, sell fill, quantity) piece with one
+searchsorted — no per-fill queue.
+
+Usage:
+    python tradebook_reconciler.py                          # repo-root tradebook-*.csv + ledger-*.csv
+    python tradebook_reconciler.py tb-EQ.csv tb-FO.csv --ledger ledger.csv
+Outputs (analysis/reconciliation/): round_trips.csv, open_positions.csv, daily_reconciliation.csv
+"""
+
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+REPO_DIR = SCRIPT_DIR.parent.parent.parent
+OUTPUT_DIR = SCRIPT_DIR.parent / "analysis" / "reconciliation"
+
+from cost_tracker import CHARGE_COMPONENTS, SEGMENTS, evaluate_charges
+
+TRADEBOOK_DTYPES = {
+    "symbol": "string", "isin": "string", "exchange": "category", "segment": "category",
+    "series": "string", "trade_type": "category", "quantity": "float64", "price": "float64",
+    "trade_id": "string", "order_id": "string",
+}
+
+# Ledger particulars -> category (first match wins)
+LEDGER_CATEGORIES = [
+    ("deposit", re.compile(r"^Funds added", re.I)),
+    ("withdrawal", re.compile(r"Payout of", re.I)),
+    ("settlement_EQ", re.compile(r"^Net settlement for Equity", re.I)),
+    ("settlement_FO", re.compile(r"^Net obligation for Equity F&O", re.I)),
+    ("dp_charges", re.compile(r"^DP Charges", re.I)),
+    ("auto_squareoff", re.compile(r"Auto Square Off", re.I)),
+    ("pledge_charges", re.compile(r"pledge", re.I)),
+    ("balance", re.compile(r"^(?:Opening|Closing) Balance", re.I)),
+]
+
+
+# ══════════════════════════════════════════════════════════════════
+# Loading
+# ══════════════════════════════════════════════════════════════════
+
+def load_tradebooks(paths: List[Path]) -> pd.DataFrame:
+    """
+    All fills as one typed frame, de-duplicated across overlapping exports.
+    Columns: instrument, symbol, segment, side (+1 buy / -1 sell), qty, price,
+    value, time, date, trade_id, order_id, expiry_date.
+    """
+    frames = []
+    for path in paths:
+        df = pd.read_csv(path, dtype=TRADEBOOK_DTYPES)
+        if "expiry_date" not in df.columns:
+            df["expiry_date"] = pd.NA
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame()
+    raw = pd.concat(frames, ignore_index=True)
+    raw = raw.drop_duplicates(subset=["segment", "trade_id", "order_id", "order_execution_time"])
+
+    fills = pd.DataFrame({
+        "symbol": raw["symbol"].astype(str),
+        "segment": raw["segment"].astype(str),
+        "side": np.where(raw["trade_type"].astype(str).str.lower() == "buy", 1, -1).astype(np.int8),
+        "qty": np.rint(raw["quantity"].to_numpy()).astype(np.int64),
+        "price": raw["price"].to_numpy(np.float64),
+        "time": pd.to_datetime(raw["order_execution_time"]),
+        "trade_id": raw["trade_id"].astype(str),
+        "order_id": raw["order_id"].astype(str),
+        "expiry_date": raw["expiry_date"],
+    })
+    fills["instrument"] = fills["segment"] + ":" + fills["symbol"]
+    fills["value"] = fills["qty"] * fills["price"]
+    fills["date"] = fills["time"].dt.normalize()
+
+    # FIFO order: instrument, then execution time (trade_id breaks ties)
+    fills = fills.sort_values(["instrument", "time", "trade_id"], kind="mergesort").reset_index(drop=True)
+    return fills
+
+
+def load_ledger(path: Path) -> pd.DataFrame:
+    """Ledger rows with a signed amount (credit - debit) and a category."""
+    ledger = pd.read_csv(path, dtype={"particulars": "string", "voucher_type": "string"})
+    ledger["posting_date"] = pd.to_datetime(ledger["posting_date"])
+    ledger["amount"] = ledger["credit"].fillna(0) - ledger["debit"].fillna(0)
+
+    category = pd.Series("other_charges", index=ledger.index, dtype=object)
+    particulars = ledger["particulars"].fillna("")
+    assigned = pd.Series(False, index=ledger.index)
+    for name, pattern in LEDGER_CATEGORIES:
+        hit = particulars.str.contains(pattern) & ~assigned
+        category[hit] = name
+        assigned |= hit
+    ledger["category"] = category
+    return ledger
+
+
+# ══════════════════════════════════════════════════════════════════
+# FIFO Matching
+# ══════════════════════════════════════════════════════════════════
+
+def _group_cumsum(values: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """Cumulative sum restarting at each new code (codes sorted)."""
+    total = np.cumsum(values)
+    starts = np.r_[0, np.flatnonzero(np.diff(codes)) + 1]
+    base = np.repeat(total[starts] - values[starts], np.diff(np.r_[starts, len(codes)]))
+    return total - base
+
+
+def match_fifo(fills: pd.DataFrame) -> Dict[str, object]:
+    """
+    FIFO-match sorted fills. Returns:
+        pieces:  one row per matched (buy fill, sell fill) quantity
+        open_qty: per-fill quantity still open at the end
+        cycle:   per-fill round-trip number of the units it opens
+    """
+    n = len(fills)
+    codes, _ = pd.factorize(fills["instrument"], sort=True)
+    side = fills["side"].to_numpy()
+    qty = fills["qty"].to_numpy()
+    is_buy = side > 0
+
+    cum_buy = _group_cumsum(np.where(is_buy, qty, 0), codes)
+    cum_sell = _group_cumsum(np.where(is_buy, 0, qty), codes)
+
+    # Matched volume per instrument, and each instrument's offset on a global axis
+    n_inst = codes.max() + 1 if n else 0
+    total_buy = np.zeros(n_inst, np.int64)
+    total_sell = np.zeros(n_inst, np.int64)
+    np.add.at(total_buy, codes, np.where(is_buy, qty, 0))
+    np.add.at(total_sell, codes, np.where(is_buy, 0, qty))
+    matched = np.minimum(total_buy, total_sell)
+    offset = np.cumsum(matched) - matched
+
+    buy_idx = np.flatnonzero(is_buy)
+    sell_idx = np.flatnonzero(~is_buy)
+    buy_end = offset[codes[buy_idx]] + np.minimum(cum_buy[buy_idx], matched[codes[buy_idx]])
+    sell_end = offset[codes[sell_idx]] + np.minimum(cum_sell[sell_idx], matched[codes[sell_idx]])
+
+    # Cut the matched axis at every fill boundary
+    points = np.union1d(buy_end, sell_end)
+    points = points[points > 0]
+    piece_qty = np.diff(np.r_[0, points])
+    b = buy_idx[np.searchsorted(buy_end, points, side="left")]
+    s = sell_idx[np.searchsorted(sell_end, points, side="left")]
+
+    # Quantity of each fill left open (beyond the matched volume)
+    cum = np.where(is_buy, cum_buy, cum_sell)
+    open_qty = np.maximum(0, cum - np.maximum(cum - qty, matched[codes]))
+
+    # Round-trip cycles: a cycle ends when the position goes flat or flips sign
+    net = _group_cumsum(side * qty, codes)
+    prev = net - side * qty
+    flip = prev * net < 0
+    ends = (net == 0) | flip
+    cycle = _group_cumsum(ends.astype(np.int64), codes) - ends + flip
+
+    return {"buy": b, "sell": s, "qty": piece_qty, "open_qty": open_qty, "cycle": cycle}
+
+
+# ══════════════════════════════════════════════════════════════════
+# Charges
+# ══════════════════════════════════════════════════════════════════
+
+def estimate_fill_charges(fills: pd.DataFrame, intraday_qty: np.ndarray) -> pd.DataFrame:
+    """
+    Charges per fill from the CostTracker schedule, priced in one vectorized
+    pass. Equity fills are split into their intraday and delivery quantity,
+    brokerage is capped per order, F&O symbols ending CE/PE are options, and the
+    DP charge applies once per scrip per day with a delivery sell.
+    Returns CHARGE_COMPONENTS columns plus 'total'.
+    """
+    n = len(fills)
+    qty = fills["qty"].to_numpy()
+    side = fills["side"].to_numpy()
+    dates = fills["date"].to_numpy().astype("datetime64[D]")
+    is_fo = (fills["segment"] == "FO").to_numpy()
+    is_option = is_fo & fills["symbol"].str.contains(r"(?:CE|PE)$").to_numpy()
+    value = fills["value"].to_numpy()
+    intraday_value = np.where(is_fo, 0.0, value * np.divide(intraday_qty, qty, out=np.zeros(n), where=qty > 0))
+    delivery_value = np.where(is_fo, 0.0, value - intraday_value)
+    fo_value = np.where(is_fo, value, 0.0)
+
+    # DP charge: first delivery sell fill of each scrip and day
+    delivery_sell = (~is_fo) & (side < 0) & (intraday_qty < qty)
+    keys = pd.Series(fills["symbol"].to_numpy() + "|" + fills["date"].astype(str).to_numpy())
+    dp = delivery_sell & ~keys.where(delivery_sell).duplicated().to_numpy()
+
+    orders = fills["order_id"].to_numpy()
+    fo_segment = np.where(is_option, SEGMENTS.index("OPTIONS"), SEGMENTS.index("FUTURES"))
+    legs = [
+        ("EQ_INTRADAY", intraday_value, False),
+        ("EQ_DELIVERY", delivery_value, dp),
+        (fo_segment, fo_value, False),
+    ]
+    total = None
+    for segment, leg_value, leg_dp in legs:
+        order_value = pd.Series(leg_value).groupby(orders).transform("sum").to_numpy()
+        charges = evaluate_charges(segment, side, leg_value, order_value=order_value, dp=leg_dp, trade_date=dates)
+        charges = {k: np.where(leg_value > 0, v, 0.0) for k, v in charges.items()}
+        total = charges if total is None else {k: total[k] + v for k, v in charges.items()}
+    return pd.DataFrame(total, index=fills.index)
+
+
+# ══════════════════════════════════════════════════════════════════
+# Reconciler
+# ══════════════════════════════════════════════════════════════════
+
+class TradebookReconciler:
+    """Round trips, open positions and ledger reconciliation for a set of exports."""
+
+    def __init__(self, tradebooks: List[Path], ledger: Optional[Path] = None):
+        self.fills = load_tradebooks(tradebooks)
+        self.ledger = load_ledger(ledger) if ledger else None
+        self.pieces = None
+        self.round_trips = None
+        self.open_positions = None
+
+    def run(self) -> "TradebookReconciler":
+        f = self.fills
+        m = match_fifo(f)
+        b, s, q = m["buy"], m["sell"], m["qty"]
+        time = f["time"].to_numpy()
+        price = f["price"].to_numpy()
+        fill_qty = f["qty"].to_numpy()
+
+        # Opening fill is whichever came first in FIFO order
+        long_first = b < s
+        open_fill = np.where(long_first, b, s)
+        close_fill = np.where(long_first, s, b)
+
+        # Same-day pieces decide intraday vs delivery per fill (equity product)
+        same_day = f["date"].to_numpy()[b] == f["date"].to_numpy()[s]
+        intraday_qty = (np.bincount(b, weights=q * same_day, minlength=len(f)) +
+                        np.bincount(s, weights=q * same_day, minlength=len(f)))
+        charges = estimate_fill_charges(f, intraday_qty)
+        for component in CHARGE_COMPONENTS:
+            f[component] = charges[component]
+        f["charges"] = charges["total"]
+        per_unit_charge = f["charges"].to_numpy() / np.maximum(fill_qty, 1)
+
+        pieces = pd.DataFrame({
+            "instrument": f["instrument"].to_numpy()[open_fill],
+            "symbol": f["symbol"].to_numpy()[open_fill],
+            "segment": f["segment"].to_numpy()[open_fill],
+            "cycle": m["cycle"][open_fill],
+            "direction": np.where(long_first, "LONG", "SHORT"),
+            "qty": q,
+            "entry_time": time[open_fill],
+            "exit_time": time[close_fill],
+            "entry_value": q * price[open_fill],
+            "exit_value": q * price[close_fill],
+            "pnl": q * (price[s] - price[b]),
+            "charges": q * (per_unit_charge[b] + per_unit_charge[s]),
+        })
+        self.pieces = pieces
+
+        rt = pieces.groupby(["instrument", "cycle"], sort=False).agg(
+            symbol=("symbol", "first"), segment=("segment", "first"),
+            direction=("direction", "first"), qty=("qty", "sum"),
+            entry_time=("entry_time", "min"), exit_time=("exit_time", "max"),
+            entry_value=("entry_value", "sum"), exit_value=("exit_value", "sum"),
+            gross_pnl=("pnl", "sum"), charges=("charges", "sum"), pieces=("qty", "size"),
+        ).reset_index()
+        rt["avg_entry"] = rt["entry_value"] / rt["qty"]
+        rt["avg_exit"] = rt["exit_value"] / rt["qty"]
+        rt["net_pnl"] = rt["gross_pnl"] - rt["charges"]
+        rt["capital_used"] = rt["entry_value"]
+        rt["return_pct"] = rt["net_pnl"] / rt["capital_used"] * 100
+        rt["holding_minutes"] = (rt["exit_time"] - rt["entry_time"]).dt.total_seconds() / 60
+        rt["intraday"] = rt["entry_time"].dt.normalize() == rt["exit_time"].dt.normalize()
+        self.round_trips = rt.sort_values("exit_time", kind="mergesort").reset_index(drop=True)
+
+        # Units still open: last fills of each instrument beyond the matched volume
+        open_qty = m["open_qty"]
+        held = open_qty > 0
+        op = pd.DataFrame({
+            "instrument": f["instrument"].to_numpy()[held],
+            "symbol": f["symbol"].to_numpy()[held],
+            "segment": f["segment"].to_numpy()[held],
+            "qty": (open_qty * f["side"].to_numpy())[held],
+            "cost": (open_qty * price)[held],
+            "since": time[held],
+        })
+        self.open_positions = op.groupby("instrument", sort=False).agg(
+            symbol=("symbol", "first"), segment=("segment", "first"), qty=("qty", "sum"),
+            cost=("cost", "sum"), since=("since", "min")).reset_index()
+        self.open_positions["avg_price"] = self.open_positions["cost"] / self.open_positions["qty"].abs()
+        return self
+
+    # ── Capital ──
+
+    def peak_capital(self) -> Dict:
+        """Peak and mean cost basis deployed across all instruments over time."""
+        p = self.pieces
+        events = pd.DataFrame({
+            "time": np.r_[p["entry_time"].to_numpy(), p["exit_time"].to_numpy(), self.open_positions["since"].to_numpy()],
+            "delta": np.r_[p["entry_value"].to_numpy(), -p["entry_value"].to_numpy(), self.open_positions["cost"].to_numpy()],
+        }).sort_values("time", kind="mergesort")
+        deployed = events.groupby("time")["delta"].sum().cumsum()
+        if deployed.empty:
+            return {"peak": 0.0, "peak_time": None}
+        return {"peak": round(float(deployed.max()), 2), "peak_time": str(deployed.idxmax())}
+
+    # ── Ledger ──
+
+    def daily_reconciliation(self) -> pd.DataFrame:
+        """
+        Per date and segment: tradebook cash flow (sells - buys), the ledger's
+        net settlement, the costs the difference implies, and the broker
+        charges the model estimates (everything but DP, which the ledger posts
+        separately). 'unexplained' is what the model misses: per-note rounding,
+        off-schedule fees.
+        """
+        f = self.fills
+        # DP charges are separate ledger entries, not part of the settlement
+        daily = pd.DataFrame({
+            "date": f["date"], "segment": f["segment"],
+            "trade_cash": -f["side"].to_numpy() * f["value"].to_numpy(),
+            "turnover": f["value"], "fills": 1, "est_charges": f["charges"] - f["dp_charge"],
+        }).groupby(["date", "segment"]).sum()
+
+        if self.ledger is None:
+            return daily.reset_index()
+
+        lg = self.ledger
+        settle = lg[lg["category"].str.startswith("settlement_")]
+        settle = settle.assign(date=settle["posting_date"],
+                               segment=settle["category"].str.replace("settlement_", "", regex=False))
+        settle = settle.groupby(["date", "segment"])["amount"].sum().rename("ledger_settlement")
+        daily = daily.join(settle, how="outer").fillna(0.0).reset_index()
+        daily["implied_costs"] = daily["trade_cash"] - daily["ledger_settlement"]
+        daily["unexplained"] = daily["implied_costs"] - daily["est_charges"]
+        return daily.sort_values(["date", "segment"]).reset_index(drop=True)
+
+    def ledger_summary(self) -> Dict:
+        """Fund movements and charges by ledger category, with a balance check."""
+        if self.ledger is None:
+            return {}
+        lg = self.ledger
+        by_cat = lg[lg["category"] != "balance"].groupby("category")["amount"].sum().round(2).to_dict()
+        balances = lg["net_balance"].dropna()
+        opening = float(balances.iloc[0]) if len(balances) else 0.0
+        closing = float(balances.iloc[-1]) if len(balances) else 0.0
+
+        dp_events = int((self.fills["dp_charge"] > 0).sum())
+        return {
+            "by_category": by_cat,
+            "opening_balance": opening,
+            "closing_balance": closing,
+            "balance_check": round(opening + sum(by_cat.values()) - closing, 2),
+            "dp_charges_ledger": int((lg["category"] == "dp_charges").sum()),
+            "dp_charges_estimated": dp_events,
+        }
+
+    # ── Reports ──
+
+    def summary(self) -> Dict:
+        rt = self.round_trips
+        wins = rt[rt["net_pnl"] > 0]
+        losses = rt[rt["net_pnl"] <= 0]
+        return {
+            "fills": len(self.fills),
+            "round_trips": len(rt),
+            "win_rate": round(len(wins) / len(rt) * 100, 1) if len(rt) else 0,
+            "gross_pnl": round(float(rt["gross_pnl"].sum()), 2),
+            "charges": round(float(rt["charges"].sum()), 2),
+            "net_pnl": round(float(rt["net_pnl"].sum()), 2),
+            "profit_factor": round(float(wins["net_pnl"].sum() / -losses["net_pnl"].sum()), 2)
+            if len(losses) and losses["net_pnl"].sum() < 0 else float("inf"),
+            "avg_holding_minutes": round(float(rt["holding_minutes"].mean()), 1) if len(rt) else 0,
+            "capital": self.peak_capital(),
+            "open_positions": len(self.open_positions),
+            "by_segment": rt.groupby("segment")["net_pnl"].sum().round(2).to_dict(),
+        }
+
+    def save(self, output_dir: Path = OUTPUT_DIR) -> Path:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self.round_trips.to_csv(output_dir / "round_trips.csv", index=False)
+        self.open_positions.to_csv(output_dir / "open_positions.csv", index=False)
+        self.daily_reconciliation().to_csv(output_dir / "daily_reconciliation.csv", index=False)
+        return output_dir
+
+
+# ──────────────────────────────────────────────────────────────────
+# CLI
+# ──────────────────────────────────────────────────────────────────
+
+if __name__ == "__main__":
+    import time
+
+    args = sys.argv[1:]
+    ledger_path = None
+    if "--ledger" in args:
+        i = args.index("--ledger")
+        ledger_path = Path(args[i + 1])
+        args = args[:i] + args[i + 2:]
+    tradebooks = [Path(a) for a in args] or sorted(REPO_DIR.glob("tradebook-*.csv"))
+    if ledger_path is None:
+        ledger_path = next(iter(sorted(REPO_DIR.glob("ledger-*.csv"))), None)
+
+    t0 = time.perf_counter()
+    rec = TradebookReconciler(tradebooks, ledger_path).run()
+    elapsed = time.perf_counter() - t0
+    summary = rec.summary()
+
+    print("=" * 70)
+    print("  TRADEBOOK RECONCILIATION (FIFO)")
+    print("=" * 70)
+    print(f"[LOAD] {summary['fills']} fills from {len(tradebooks)} tradebook(s) in {elapsed * 1000:.0f} ms")
+    print(f"[TRADES] {summary['round_trips']} round trips | win rate {summary['win_rate']}% | "
+          f"avg hold {summary['avg_holding_minutes']:.0f} min")
+    print(f"[P&L] gross ₹{summary['gross_pnl']:,.2f} - charges ₹{summary['charges']:,.2f} "
+          f"= net ₹{summary['net_pnl']:,.2f} (PF {summary['profit_factor']})")
+    for segment, pnl in summary["by_segment"].items():
+        print(f"       {segment}: ₹{pnl:,.2f}")
+    print(f"[CAPITAL] peak deployed ₹{summary['capital']['peak']:,.2f} at {summary['capital']['peak_time']}")
+    print(f"[OPEN] {summary['open_positions']} open position(s)")
+
+    ledger = rec.ledger_summary()
+    if ledger:
+        print(f"\n[LEDGER] opening ₹{ledger['opening_balance']:,.2f} → closing ₹{ledger['closing_balance']:,.2f} "
+              f"(check {ledger['balance_check']:+.2f})")
+        for cat, amount in sorted(ledger["by_category"].items()):
+            print(f"       {cat:<16} ₹{amount:>12,.2f}")
+        print(f"       DP charge entries: ledger {ledger['dp_charges_ledger']} vs estimated {ledger['dp_charges_estimated']}")
+        daily = rec.daily_reconciliation()
+        print(f"[RECON] implied costs ₹{daily['implied_costs'].sum():,.2f} | modelled ₹{daily['est_charges'].sum():,.2f} "
+              f"| unexplained ₹{daily['unexplained'].sum():,.2f}")
+
+    out = rec.save()
+    print(f"\n[SAVE] {out}")
@@ -257,6 +257,9 @@ class TradingOrchestrator:
                 if exit_reason:
                     self.execute_exit(symbol, updated['current_price'], exit_reason)
 
+        # Price-only changes are coalesced; checkpoint once per monitoring pass
+        self.exit_manager.flush(force=True)
+
     def execute_exit(self, symbol: str, exit_price: float, exit_reason: str):
         """Execute exit for a position"""
 
@@ -347,6 +350,11 @@ class TradingOrchestrator:
         print(f"[CONFIG] Scan interval: {self.config['scanning']['scan_interval_minutes']} minutes\n")
         print("Press Ctrl+C to stop\n")
 
+        # With signal_service.py running, a cycle only runs once new bars have
+        # closed since the previous one; otherwise this is a plain timer
+        snapshots = self.scanner.signal_snapshots
+        version = snapshots.version()
+
         try:
             while True:
                 self.run_trading_cycle()
@@ -354,10 +362,11 @@ class TradingOrchestrator:
                 print(f"\n[WAIT] Next cycle in {self.config['scanning']['scan_interval_minutes']} minutes...")
                 print("-"*70 + "\n")
 
-                time.sleep(scan_interval)
+                version = snapshots.wait_for_update(version, scan_interval)
 
         except KeyboardInterrupt:
             print("\n\n[STOP] System stopped by user")
+            self.exit_manager.flush(force=True)
             self.display_status()
             print("="*70 + "\n")
 
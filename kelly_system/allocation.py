@@ -0,0 +1,58 @@
+import numpy as np
+
+# Upper bound of the allocation search (power utility is singular at b = 1)
+MAX_FRACTION = 0.99
+
+
+def risk_aversion(alpha, beta):
+    """
+    Lambda from the drawdown constraint: lambda = log(beta) / log(alpha)
+    (5 if alpha == 1, where the constraint is undefined).
+    """
+    log_alpha = np.log(alpha)
+    if np.ndim(log_alpha) == 0:
+        return 5.0 if log_alpha == 0 else float(np.log(beta) / log_alpha)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(log_alpha == 0, 5.0, np.log(beta) / log_alpha)
+
+
+def optimal_fraction(win_prob, win_loss_ratio, lamb=1.0):
+    """
+    Unconstrained maximiser b of E[(1 + r)^(1 - lambda) / (1 - lambda)] for a bet
+    returning +b*R with probability W and -b otherwise. Broadcasts over arrays.
+
+    The first-order condition
+        W * R * (1 + b*R)^(-lambda) = (1 - W) * (1 - b)^(-lambda)
+    rearranges to (1 + b*R) / (1 - b) = k with k = (W*R / (1 - W))^(1/lambda), so
+        b = (k - 1) / (R + k)
+    exactly - no root finding. lambda = 1 (log utility) gives the classic Kelly
+    fraction (b*p - q) / b. Negative when the edge W*(R + 1) - 1 is negative.
+    """
+    W = np.asarray(win_prob, dtype=np.float64)
+    R = np.asarray(win_loss_ratio, dtype=np.float64)
+    lamb = np.asarray(lamb, dtype=np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        k = np.power(W * R / (1.0 - W), 1.0 / lamb)
+        b = (k - 1.0) / (R + k)
+    # W -> 1 (certain win): k -> inf and b -> 1
+    b = np.where(np.isinf(k), 1.0, b)
+    return b if b.ndim else float(b)
+
+
+def solve_allocations(win_prob, win_loss_ratio, lamb, cap=None, upper=MAX_FRACTION):
+    """
+    Batch power-utility Kelly allocation: optimal_fraction limited to
+    [0, upper] and then to cap. 0 where the edge W*(R + 1) - 1 is not positive
+    or the inputs are invalid (NaN, R <= 0).
+    """
+    W = np.asarray(win_prob, dtype=np.float64)
+    R = np.asarray(win_loss_ratio, dtype=np.float64)
+    b = np.asarray(optimal_fraction(W, R, lamb))
+
+    with np.errstate(invalid='ignore'):
+        valid = (W * (R + 1.0) - 1.0 > 0) & (R > 0) & np.isfinite(b)
+    b = np.where(valid, np.clip(b, 0.0, upper), 0.0)
+    if cap is not None:
+        b = np.minimum(b, cap)
+    return b if b.ndim else float(b)
@@ -0,0 +1,132 @@
+"""
+Model backend benchmark for StrategyEngine.
+
+Walk-forward over the same feature frame for every backend in
+model_backends.BACKENDS: refit every --step days on all earlier rows (online
+backends fit once, then partial_fit day by day), predict the next day, and
+report fit / predict latency and the out-of-sample Brier score. A second
+table shows how a single fit scales with the training-window size.
+
+Usage:
+    python -m kelly_system.benchmark_backends                 # live features (FeatureStore)
+    python -m kelly_system.benchmark_backends --synthetic     # offline, generated data
+"""
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from .config import *
+from .model_backends import BACKENDS, make_backend
+
+logger = logging.getLogger(__name__)
+
+PRICE_COLUMNS = ['close', 'open', 'high', 'low', 'volume']
+
+
+def load_features(synthetic=False, rows=1200, seed=0):
+    """(X, y) with y = 1 if the next day closed higher, last unlabelled row dropped."""
+    if synthetic:
+        rng = np.random.default_rng(seed)
+        X = pd.DataFrame(rng.normal(size=(rows, 16)), columns=[f"f{i}" for i in range(16)])
+        # Weak, partly non-linear edge so the backends have something to find
+        drift = 0.002 * X["f0"] - 0.0015 * (X["f1"] ** 2 - 1) + 0.001 * X["f2"] * X["f3"]
+        y = (drift + rng.normal(0, 0.01, rows) > 0).astype(int)
+        return X.values, y.values
+
+    from .feature_store import FeatureStore
+    from .market_data import MarketDataManager
+    df = FeatureStore(MarketDataManager()).refresh()
+    if df is None:
+        raise RuntimeError("No features available (check data access or use --synthetic)")
+    y = (df['close'].pct_change().shift(-1) > 0).astype(int).values[:-1]
+    X = df.drop(columns=PRICE_COLUMNS, errors='ignore').values[:-1]
+    return X, y
+
+
+def walk_forward(name, X, y, test_days, step):
+    """Fit/predict timings and Brier score for one backend."""
+    start = len(X) - test_days
+    probs, fit_times, update_times, predict_times = [], [], [], []
+    model, scaler = None, None
+
+    for t in range(start, len(X)):
+        refit = model is None or (not model.supports_partial_fit and (t - start) % step == 0)
+        if refit:
+            scaler = StandardScaler().fit(X[:t])
+            model = make_backend(name)
+            t0 = time.perf_counter()
+            model.fit(scaler.transform(X[:t]), y[:t])
+            fit_times.append(time.perf_counter() - t0)
+        elif model.supports_partial_fit:
+            t0 = time.perf_counter()
+            model.partial_fit(scaler.transform(X[t - 1:t]), y[t - 1:t])
+            update_times.append(time.perf_counter() - t0)
+
+        row = scaler.transform(X[t:t + 1])
+        t0 = time.perf_counter()
+        probs.append(model.predict_proba(row)[0][1])
+        predict_times.append(time.perf_counter() - t0)
+
+    probs = np.array(probs)
+    actual = y[start:]
+    return {
+        "backend": name,
+        "fits": len(fit_times),
+        "fit_ms": np.mean(fit_times) * 1000,
+        "update_ms": np.mean(update_times) * 1000 if update_times else float('nan'),
+        "predict_us": np.median(predict_times) * 1e6,
+        "brier": float(np.mean((probs - actual) ** 2)),
+        "accuracy": float(np.mean((probs > 0.5) == actual)),
+    }
+
+
+def fit_scaling(name, X, y, sizes):
+    """Single-fit time (ms) on the last n rows for each n in sizes."""
+    out = {}
+    for n in sizes:
+        Xn, yn = X[-n:], y[-n:]
+        Xs = StandardScaler().fit_transform(Xn)
+        t0 = time.perf_counter()
+        make_backend(name).fit(Xs, yn)
+        out[n] = (time.perf_counter() - t0) * 1000
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark StrategyEngine model backends")
+    parser.add_argument('--synthetic', action='store_true', help="Use generated features (no network)")
+    parser.add_argument('--backends', default=",".join(BACKENDS), help="Comma-separated backend names")
+    parser.add_argument('--test-days', type=int, default=120, help="Out-of-sample days")
+    parser.add_argument('--step', type=int, default=20, help="Refit every N days (batch backends)")
+    parser.add_argument('--sizes', default=f"{SVM_LOOKBACK_DAYS},{2 * SVM_LOOKBACK_DAYS},{4 * SVM_LOOKBACK_DAYS}",
+                        help="Training-window sizes for the fit-scaling table")
+    args = parser.parse_args()
+
+    X, y = load_features(synthetic=args.synthetic)
+    names = [b.strip() for b in args.backends.split(",") if b.strip()]
+    sizes = [n for n in (int(s) for s in args.sizes.split(",")) if n <= len(X)]
+    print(f"Features: {X.shape[0]} days x {X.shape[1]} columns | "
+          f"walk-forward on last {args.test_days} days, refit every {args.step}")
+
+    print(f"\n{'backend':<11}{'fits':>5}{'fit ms':>10}{'update ms':>11}{'predict us':>12}{'brier':>8}{'acc':>7}")
+    for name in names:
+        r = walk_forward(name, X, y, args.test_days, args.step)
+        print(f"{r['backend']:<11}{r['fits']:>5}{r['fit_ms']:>10.1f}{r['update_ms']:>11.2f}"
+              f"{r['predict_us']:>12.0f}{r['brier']:>8.4f}{r['accuracy']:>7.3f}")
+
+    if sizes:
+        print("\nSingle fit (ms) by training-window size")
+        print(f"{'backend':<11}" + "".join(f"{n:>10}" for n in sizes))
+        for name in names:
+            times = fit_scaling(name, X, y, sizes)
+            print(f"{name:<11}" + "".join(f"{times[n]:>10.1f}" for n in sizes))
+    print("\nBrier: mean (p - outcome)^2, lower is better; 0.25 = always 0.5.")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    main()
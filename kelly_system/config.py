@@ -40,3 +40,31 @@ EQUITY_MA_WINDOW = 30
 SVM_LOOKBACK_DAYS = 252 # 1 Trading Year
 # Re-training Frequency
 RETRAIN_DAYS = 1 # Retrain daily
+
+# --- Feature Store / Model Cache ---
+KELLY_DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+FEATURE_STORE_FILE = os.path.join(KELLY_DATA_DIR, "feature_store.pkl")
+MODEL_REGISTRY_DIR = os.path.join(KELLY_DATA_DIR, "models")
+# Daily history kept (matches the 1000-day download: 200SMA warm-up + training year)
+FEATURE_HISTORY_DAYS = 1000
+# Recent days re-downloaded on each refresh to pick up late revisions
+FEATURE_OVERLAP_DAYS = 10
+# Minimum seconds between refreshes (Nifty carries today's live bar; others settle daily)
+NIFTY_REFRESH_SECONDS = 300
+AUX_REFRESH_SECONDS = 3600
+# Trained models kept on disk
+MODEL_REGISTRY_KEEP = 5
+
+# --- Strategy Model Backend ---
+# "svc"       : SVC(rbf, probability=True) - original; internal 5-fold calibration
+# "svc_platt" : exact RBF SVC + one holdout Platt calibration
+# "nystroem"  : approximate RBF kernel + linear SVM (fit ~linear in samples)
+# "linear"    : linear SVM
+# "online"    : SGD linear SVM, updated with partial_fit as new days arrive
+# Compare with: python -m kelly_system.benchmark_backends
+MODEL_BACKEND = "svc"
+# Fraction of the (time-ordered) training window held out for probability calibration
+CALIBRATION_FRACTION = 0.2
+NYSTROEM_COMPONENTS = 100
+# Online backend: at most this many new days are folded in with partial_fit before a full refit
+ONLINE_MAX_NEW_ROWS = 5
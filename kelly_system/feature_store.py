@@ -0,0 +1,207 @@
+import datetime
+import hashlib
+import logging
+import os
+import time
+
+import pandas as pd
+
+from .config import *
+from .market_data import merge_sources, add_technical_features
+
+logger = logging.getLogger(__name__)
+
+# Rows of history fed to the indicators ahead of the first changed row, so the
+# recursive ones (EMA / Wilder smoothing) have forgotten their starting point
+WARMUP_ROWS = 400
+# Longest rolling window (sma_200): a full rebuild drops the rows before it fills
+LONGEST_WINDOW = 200
+
+
+def data_version(df):
+    """Content hash of a frame (index, columns and values) used to key trained models."""
+    digest = hashlib.sha1(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    digest.update(",".join(map(str, df.columns)).encode())
+    return digest.hexdigest()[:16]
+
+
+def _as_datetime_index(df):
+    if df is None or df.empty:
+        return pd.DataFrame()
+    df = df.sort_index()
+    if not isinstance(df.index, pd.DatetimeIndex):
+        df = df.copy()
+        df.index = pd.to_datetime(df.index)
+    return df[~df.index.duplicated(keep='last')]
+
+
+def _upsert(old, new):
+    """
+    Replaces old's rows from new's first date onward with new.
+    Returns (frame, first date whose data changed) - (old, None) if nothing changed.
+    """
+    new = _as_datetime_index(new)
+    if new.empty:
+        return old, None
+    if old.empty:
+        return new, new.index[0]
+
+    start = new.index[0]
+    tail = old.loc[old.index >= start]
+    index = tail.index.union(new.index)
+    columns = tail.columns.union(new.columns)
+    a = tail.reindex(index=index, columns=columns)
+    b = new.reindex(index=index, columns=columns)
+    differs = ~((a == b) | (a.isna() & b.isna())).all(axis=1)
+    if not differs.any():
+        return old, None
+    return pd.concat([old.loc[old.index < start], new]), differs.idxmax()
+
+
+class FeatureStore:
+    """
+    Persistent daily feature frame for the SVM strategy.
+
+    Keeps the raw Nifty, GIFT Nifty and global series on disk and on each refresh
+    downloads only the days since the last stored row (plus a small overlap for
+    revisions). Indicator rows before the first changed date are kept as they
+    are; only the changed tail is recomputed, with WARMUP_ROWS of history in
+    front. Produces the same columns and rows as
+    MarketDataManager.get_combined_features().
+    """
+
+    SOURCES = ('nifty', 'gift', 'globals')
+
+    def __init__(self, data_manager, path=FEATURE_STORE_FILE, history_days=FEATURE_HISTORY_DAYS):
+        self.dm = data_manager
+        self.path = path
+        self.history_days = history_days
+        self.sources = {name: pd.DataFrame() for name in self.SOURCES}
+        self.fetched_at = {name: 0.0 for name in self.SOURCES}
+        self.features = None
+        self._load()
+
+    # --- Persistence ---
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            state = pd.read_pickle(self.path)
+            self.sources.update(state['sources'])
+            self.fetched_at.update(state['fetched_at'])
+            self.features = state['features']
+            rows = 0 if self.features is None else len(self.features)
+            logger.info(f"Feature store loaded: {rows} feature rows")
+        except Exception as e:
+            logger.warning(f"Feature store unreadable ({e}). Rebuilding from scratch.")
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        pd.to_pickle({"sources": self.sources, "fetched_at": self.fetched_at,
+                      "features": self.features}, tmp)
+        os.replace(tmp, self.path)
+
+    # --- Data ---
+
+    def _fetch(self, name):
+        """Downloads the missing tail of one source (the full history on first use)."""
+        existing = self.sources[name]
+        days = self.history_days
+        if not existing.empty:
+            days = min(days, (datetime.datetime.now() - existing.index[-1]).days + FEATURE_OVERLAP_DAYS)
+
+        if name == 'nifty':
+            return self.dm.fetch_nifty_data(days=days)
+        if name == 'gift':
+            return self.dm.fetch_gift_nifty_data(days=days)
+        start_date = (datetime.datetime.now() - datetime.timedelta(days=days)).strftime('%Y-%m-%d')
+        return self.dm.fetch_global_indices(start_date=start_date)
+
+    def _trim(self):
+        """Drops rows that slid out of the history window. Returns True if any did."""
+        now = datetime.datetime.now()
+        trimmed = False
+        for name, df in self.sources.items():
+            # fetch_nifty_data pads its window by 20 days
+            days = self.history_days + (20 if name == 'nifty' else 0)
+            cutoff = pd.Timestamp((now - datetime.timedelta(days=days)).date())
+            if not df.empty and df.index[0] < cutoff:
+                self.sources[name] = df.loc[df.index >= cutoff]
+                trimmed = True
+        return trimmed
+
+    def _update_features(self, changed_from):
+        """Recomputes indicator rows from changed_from onward (everything if None)."""
+        merged = merge_sources(self.sources['nifty'], self.sources['gift'], self.sources['globals'])
+
+        old = self.features
+        start = 0
+        pos = 0
+        if old is not None and changed_from is not None:
+            pos = int(merged.index.searchsorted(changed_from))
+            start = max(0, pos - WARMUP_ROWS)
+
+        if start == 0:
+            feats = add_technical_features(merged)
+        else:
+            tail = add_technical_features(merged.iloc[start:].copy())
+            if tail is None:
+                return None
+            new_rows = tail.iloc[pos - start:]
+            if list(new_rows.columns) != list(old.columns):
+                feats = add_technical_features(merged)  # a source gained/lost a column
+            else:
+                feats = pd.concat([old.loc[old.index < changed_from], new_rows])
+        if feats is None:
+            return None
+
+        # Same rows as a full rebuild: inside the window, past the longest warm-up
+        first_valid = merged.index[min(LONGEST_WINDOW - 1, len(merged) - 1)]
+        feats = feats.loc[(feats.index >= first_valid) & feats.index.isin(merged.index)]
+        self.features = feats.dropna()
+        return self.features
+
+    def refresh(self, force=False):
+        """
+        Brings the store up to date and returns the feature frame (a copy), or
+        None if Nifty data or the indicators are unavailable.
+
+        Each source is re-downloaded at most every NIFTY_REFRESH_SECONDS /
+        AUX_REFRESH_SECONDS; between refreshes this is only a copy.
+        """
+        now = time.time()
+        intervals = {'nifty': NIFTY_REFRESH_SECONDS, 'gift': AUX_REFRESH_SECONDS,
+                     'globals': AUX_REFRESH_SECONDS}
+
+        fetched = False
+        changed = []
+        for name in self.SOURCES:
+            if not force and now - self.fetched_at[name] < intervals[name]:
+                continue
+            new = self._fetch(name)
+            fetched = True
+            if new is None or new.empty:
+                continue  # keep what we have; retry after the interval
+            self.fetched_at[name] = now
+            self.sources[name], first = _upsert(self.sources[name], new)
+            if first is not None:
+                changed.append(first)
+
+        trimmed = self._trim()
+        if self.sources['nifty'].empty:
+            logger.error("Critical: Nifty Data Missing.")
+            return None
+
+        if self.features is None or trimmed or changed:
+            # A trim shifts the warm-up rows, so it recomputes from the window start
+            rebuild_from = None if self.features is None or trimmed else min(changed)
+            if self._update_features(rebuild_from) is None:
+                return None
+            logger.info(f"Feature store updated. Shape: {self.features.shape}")
+            self._save()
+        elif fetched:
+            self._save()
+
+        return self.features.copy()
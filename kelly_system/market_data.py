@@ -170,47 +170,12 @@ class MarketDataManager:
             logger.error("Critical: Nifty Data Missing.")
             return None
 
-        # 2. Merge Data (Left Join on Nifty Dates)
-        df = nifty.join(gift, how='left')
-        df = df.join(globals_df, how='left')
-        
-        # 3. Forward Fill Global/GIFT Data (to handle trading holiday diffs)
-        df.ffill(inplace=True)
+        # 2-3. Merge on Nifty dates and forward fill
+        df = merge_sources(nifty, gift, globals_df)
         
         # 4. Feature Engineering (using 'ta' library)
-        logger.info("Generating Technical Indicators (ta library)...")
-        try:
-            import ta
-            
-            # Momentum
-            df['rsi'] = ta.momentum.rsi(df['close'], window=14)
-            df['cci'] = ta.trend.cci(df['high'], df['low'], df['close'], window=20)
-            
-            # MACD
-            macd = ta.trend.MACD(df['close'])
-            df['macd'] = macd.macd()
-            df['macd_signal'] = macd.macd_signal()
-            df['macd_diff'] = macd.macd_diff()
-            
-            # Volatility
-            bb = ta.volatility.BollingerBands(df['close'], window=20, window_dev=2)
-            df['bb_upper'] = bb.bollinger_hband()
-            df['bb_lower'] = bb.bollinger_lband()
-            df['bb_width'] = (df['bb_upper'] - df['bb_lower']) / df['close']
-            
-            df['atr'] = ta.volatility.average_true_range(df['high'], df['low'], df['close'], window=14)
-            
-            # Trend
-            df['sma_20'] = ta.trend.sma_indicator(df['close'], window=20)
-            df['sma_50'] = ta.trend.sma_indicator(df['close'], window=50)
-            df['sma_200'] = ta.trend.sma_indicator(df['close'], window=200)
-            df['adx'] = ta.trend.adx(df['high'], df['low'], df['close'], window=14)
-
-        except ImportError:
-            logger.error("Library 'ta' not found. Please install: pip install ta")
-            return None
-        except Exception as e:
-            logger.error(f"Error computing indicators: {e}")
+        df = add_technical_features(df)
+        if df is None:
             return None
 
         # 5. Clean NaN (Drop initial rows required for indicators)
@@ -233,6 +198,55 @@ class MarketDataManager:
             logger.error(f"Error fetching portfolio: {e}")
             return {"holdings": [], "positions": {}, "error": str(e)}
 
+def merge_sources(nifty, gift, globals_df):
+    """Left-join GIFT Nifty and global closes onto Nifty dates, forward-filling holiday gaps."""
+    df = nifty.join(gift, how='left')
+    df = df.join(globals_df, how='left')
+    df.ffill(inplace=True)
+    return df
+
+def add_technical_features(df):
+    """
+    Adds the SVM's technical indicator columns to a merged daily frame (in place).
+    Returns the frame, or None if the indicators could not be computed.
+    """
+    logger.info("Generating Technical Indicators (ta library)...")
+    try:
+        import ta
+        
+        # Momentum
+        df['rsi'] = ta.momentum.rsi(df['close'], window=14)
+        df['cci'] = ta.trend.cci(df['high'], df['low'], df['close'], window=20)
+        
+        # MACD
+        macd = ta.trend.MACD(df['close'])
+        df['macd'] = macd.macd()
+        df['macd_signal'] = macd.macd_signal()
+        df['macd_diff'] = macd.macd_diff()
+        
+        # Volatility
+        bb = ta.volatility.BollingerBands(df['close'], window=20, window_dev=2)
+        df['bb_upper'] = bb.bollinger_hband()
+        df['bb_lower'] = bb.bollinger_lband()
+        df['bb_width'] = (df['bb_upper'] - df['bb_lower']) / df['close']
+        
+        df['atr'] = ta.volatility.average_true_range(df['high'], df['low'], df['close'], window=14)
+        
+        # Trend
+        df['sma_20'] = ta.trend.sma_indicator(df['close'], window=20)
+        df['sma_50'] = ta.trend.sma_indicator(df['close'], window=50)
+        df['sma_200'] = ta.trend.sma_indicator(df['close'], window=200)
+        df['adx'] = ta.trend.adx(df['high'], df['low'], df['close'], window=14)
+
+    except ImportError:
+        logger.error("Library 'ta' not found. Please install: pip install ta")
+        return None
+    except Exception as e:
+        logger.error(f"Error computing indicators: {e}")
+        return None
+
+    return df
+
 if __name__ == "__main__":
     # Test Run
     dm = MarketDataManager()
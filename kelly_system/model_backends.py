@@ -0,0 +1,180 @@
+import logging
+
+import numpy as np
+
+from .config import *
+
+logger = logging.getLogger(__name__)
+
+
+class PlattCalibrator:
+    """
+    Sigmoid map from raw decision scores to P(up), fitted on held-out scores.
+
+    The same calibration SVC(probability=True) performs internally, but on a
+    single time-ordered holdout instead of an internal 5-fold cross-validation.
+    """
+
+    def __init__(self):
+        self.model = None
+
+    def fit(self, scores, y):
+        from sklearn.linear_model import LogisticRegression
+        y = np.asarray(y)
+        if len(np.unique(y)) < 2:
+            self.model = None  # one-class holdout: fall back to the base rate
+            self.base_rate = float(y.mean()) if len(y) else 0.5
+            return self
+        self.model = LogisticRegression(C=1e4).fit(np.asarray(scores).reshape(-1, 1), y)
+        return self
+
+    def predict(self, scores):
+        scores = np.asarray(scores).reshape(-1, 1)
+        if self.model is None:
+            return np.full(len(scores), getattr(self, "base_rate", 0.5))
+        return self.model.predict_proba(scores)[:, 1]
+
+
+class ModelBackend:
+    """
+    Common interface of the StrategyEngine classifiers (inputs already scaled).
+
+    predict_proba returns an (n, 2) array like sklearn, so callers can keep
+    using predict_proba(X)[0][1] as the win probability.
+    """
+
+    name = None
+    supports_partial_fit = False
+
+    def fit(self, X, y):
+        raise NotImplementedError
+
+    def predict_up(self, X):
+        raise NotImplementedError
+
+    def predict_proba(self, X):
+        up = self.predict_up(X)
+        return np.column_stack([1.0 - up, up])
+
+
+class LegacySVCBackend(ModelBackend):
+    """SVC(rbf, probability=True): internal 5-fold Platt scaling on every fit."""
+
+    name = "svc"
+
+    def __init__(self):
+        from sklearn.svm import SVC
+        self.model = SVC(probability=True, kernel='rbf')
+
+    def fit(self, X, y):
+        self.model.fit(X, y)
+        return self
+
+    def predict_up(self, X):
+        return self.model.predict_proba(X)[:, 1]
+
+
+class CalibratedBackend(ModelBackend):
+    """
+    A decision-function classifier plus a PlattCalibrator.
+
+    fit() trains the classifier on the first (1 - CALIBRATION_FRACTION) of the
+    time-ordered rows, fits the calibrator on its scores for the rest, then
+    refits the classifier on all rows.
+    """
+
+    def _make_estimator(self):
+        raise NotImplementedError
+
+    def fit(self, X, y):
+        X, y = np.asarray(X), np.asarray(y)
+        split = int(len(X) * (1 - CALIBRATION_FRACTION))
+        self.calibrator = PlattCalibrator()
+        if 0 < split < len(X) and len(np.unique(y[:split])) == 2:
+            holdout = self._make_estimator().fit(X[:split], y[:split])
+            self.holdout = (holdout.decision_function(X[split:]), y[split:])
+        else:
+            self.holdout = (np.empty(0), np.empty(0))
+        self.calibrator.fit(*self.holdout)
+        self.model = self._make_estimator().fit(X, y)
+        return self
+
+    def predict_up(self, X):
+        return self.calibrator.predict(self.model.decision_function(X))
+
+
+class SVCPlattBackend(CalibratedBackend):
+    """Exact RBF SVC without the internal cross-validated calibration."""
+
+    name = "svc_platt"
+
+    def _make_estimator(self):
+        from sklearn.svm import SVC
+        return SVC(kernel='rbf')
+
+
+class NystroemBackend(CalibratedBackend):
+    """Approximate RBF kernel (Nystroem features) + linear SVM: fit is ~linear in samples."""
+
+    name = "nystroem"
+
+    def __init__(self, n_components=NYSTROEM_COMPONENTS):
+        self.n_components = n_components
+
+    def _make_estimator(self):
+        from sklearn.kernel_approximation import Nystroem
+        from sklearn.pipeline import make_pipeline
+        from sklearn.svm import LinearSVC
+        return make_pipeline(Nystroem(kernel='rbf', n_components=self.n_components, random_state=0),
+                             LinearSVC(C=1.0))
+
+    def fit(self, X, y):
+        # Nystroem cannot use more components than samples
+        self.n_components = min(self.n_components, max(1, int(len(X) * (1 - CALIBRATION_FRACTION))))
+        return super().fit(X, y)
+
+
+class LinearBackend(CalibratedBackend):
+    """Linear SVM on the raw features."""
+
+    name = "linear"
+
+    def _make_estimator(self):
+        from sklearn.svm import LinearSVC
+        return LinearSVC(C=1.0)
+
+
+class OnlineBackend(CalibratedBackend):
+    """
+    SGD linear SVM that is updated with partial_fit as new days arrive.
+
+    New rows are scored before the model learns from them, and those
+    out-of-sample scores roll through the calibration window.
+    """
+
+    name = "online"
+    supports_partial_fit = True
+
+    def _make_estimator(self):
+        from sklearn.linear_model import SGDClassifier
+        return SGDClassifier(loss='hinge', alpha=1e-3, max_iter=1000, tol=1e-3, random_state=0)
+
+    def partial_fit(self, X, y):
+        X, y = np.asarray(X), np.asarray(y)
+        window = max(len(self.holdout[1]), len(y))
+        scores = np.concatenate([self.holdout[0], self.model.decision_function(X)])[-window:]
+        labels = np.concatenate([self.holdout[1], y])[-window:]
+        self.holdout = (scores, labels)
+        self.calibrator.fit(scores, labels)
+        self.model.partial_fit(X, y, classes=np.array([0, 1]))
+        return self
+
+
+BACKENDS = {cls.name: cls for cls in
+            (LegacySVCBackend, SVCPlattBackend, NystroemBackend, LinearBackend, OnlineBackend)}
+
+
+def make_backend(name=MODEL_BACKEND):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown model backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
@@ -0,0 +1,70 @@
+import datetime
+import glob
+import logging
+import os
+
+from .config import *
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """
+    Trained scaler + SVM pairs keyed by training-data version.
+
+    Models are kept in memory and persisted with joblib, so a restart (or the
+    morning workflow after the dashboard already trained today's model) loads
+    the model instead of refitting it. Only the newest MODEL_REGISTRY_KEEP
+    files are kept on disk.
+    """
+
+    def __init__(self, path=MODEL_REGISTRY_DIR, keep=MODEL_REGISTRY_KEEP):
+        self.path = path
+        self.keep = keep
+        self._memory = {}
+
+    def _file(self, version):
+        return os.path.join(self.path, f"svm_{version}.joblib")
+
+    def load(self, version):
+        """Returns {'scaler', 'model', 'version', 'trained_at', ...} or None."""
+        if version in self._memory:
+            return self._memory[version]
+
+        path = self._file(version)
+        if not os.path.exists(path):
+            return None
+        try:
+            import joblib
+            entry = joblib.load(path)
+        except Exception as e:
+            logger.warning(f"Could not load model {version}: {e}")
+            return None
+
+        self._memory = {version: entry}
+        logger.info(f"Loaded cached model {version} (trained {entry.get('trained_at')})")
+        return entry
+
+    def save(self, version, scaler, model, **meta):
+        entry = {"scaler": scaler, "model": model, "version": version,
+                 "trained_at": datetime.datetime.now().isoformat(), **meta}
+        self._memory = {version: entry}
+
+        try:
+            import joblib
+            os.makedirs(self.path, exist_ok=True)
+            tmp = self._file(version) + ".tmp"
+            joblib.dump(entry, tmp)
+            os.replace(tmp, self._file(version))
+            self._prune()
+        except Exception as e:
+            logger.warning(f"Could not persist model {version}: {e}")
+        return entry
+
+    def _prune(self):
+        files = sorted(glob.glob(os.path.join(self.path, "svm_*.joblib")), key=os.path.getmtime)
+        for path in files[:-self.keep]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
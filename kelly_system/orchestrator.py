@@ -6,6 +6,8 @@ from kelly_system.config import *
 from kelly_system.market_data import MarketDataManager
 from kelly_system.strategy_engine import StrategyEngine, KellySolver, SignalGenerator
 from kelly_system.order_manager import OrderManager
+from kelly_system.feature_store import FeatureStore
+from kelly_system.model_registry import ModelRegistry
 
 # Setup Logging to file and console
 logging.basicConfig(
@@ -25,9 +27,9 @@ def run_trading_workflow(dry_run=True):
     # 1. Initialize Components
     try:
         dm = MarketDataManager()
-        engine = StrategyEngine()
+        engine = StrategyEngine(registry=ModelRegistry())
         kelly = KellySolver()
-        signal_gen = SignalGenerator(dm, engine, kelly)
+        signal_gen = SignalGenerator(dm, engine, kelly, feature_store=FeatureStore(dm))
         order_mgr = OrderManager(dm)
     except Exception as e:
         logger.critical(f"Initialization Failed: {e}")
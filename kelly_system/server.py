@@ -28,12 +28,16 @@ dashboard_state = {
 def background_scheduler():
     last_strategy_run = 0
     strategy_interval = 300 # 5 Minutes
+    # Long-lived: the feature store and trained model persist across runs
+    dm = None
+    signal_gen = None
     
     while True:
         try:
             try:
                 # 1. Fast Update: Live Price & Portfolio
-                dm = MarketDataManager()
+                if dm is None:
+                    dm = MarketDataManager()
                 
                 # Fetch Live Nifty Price
                 try:
@@ -67,11 +71,14 @@ def background_scheduler():
                 dashboard_state["status"] = "Analyzing..."
                 
                 # We import other classes here to avoid circulars if any
-                from kelly_system.strategy_engine import StrategyEngine, KellySolver, SignalGenerator
-                
-                engine = StrategyEngine()
-                kelly = KellySolver()
-                signal_gen = SignalGenerator(dm, engine, kelly)
+                if signal_gen is None:
+                    from kelly_system.strategy_engine import StrategyEngine, KellySolver, SignalGenerator
+                    from kelly_system.feature_store import FeatureStore
+                    from kelly_system.model_registry import ModelRegistry
+                    
+                    engine = StrategyEngine(registry=ModelRegistry())
+                    kelly = KellySolver()
+                    signal_gen = SignalGenerator(dm, engine, kelly, feature_store=FeatureStore(dm))
                 
                 result = signal_gen.run_analysis()
                 
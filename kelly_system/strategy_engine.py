@@ -1,24 +1,51 @@
 import numpy as np
 import pandas as pd
-from sklearn.svm import SVC
 from sklearn.preprocessing import StandardScaler
-from scipy.optimize import bisect
 import logging
 from .config import *
+from .allocation import risk_aversion, solve_allocations
+from .feature_store import data_version
+from .model_backends import make_backend
 
 logger = logging.getLogger(__name__)
 
 class StrategyEngine:
-    def __init__(self):
-        self.model = SVC(probability=True, kernel='rbf')
+    def __init__(self, registry=None, backend=MODEL_BACKEND):
+        # Classifier backend (see model_backends.BACKENDS / config.MODEL_BACKEND)
+        self.backend = backend
+        self.model = make_backend(backend)
         self.scaler = StandardScaler()
         self.is_trained = False
+        # Optional ModelRegistry: reuse models already trained on the same data
+        self.registry = registry
+        self.version = None
+        # Last training row whose next-day outcome was known (online updates start after it)
+        self.trained_until = None
         
-    def train_model(self, df_features, target_col='Target'):
+    def train_model(self, df_features, target_col='Target', version=None):
         """
-        Trains the SVM model on historical data.
+        Trains the model on historical data.
         df_features: DataFrame containing X (features) and y (target).
+        version: Training-data version (feature_store.data_version). If the model
+                 for this version is already loaded or in the registry, it is reused.
+                 An online backend folds only the newly labelled days in with
+                 partial_fit instead of refitting.
         """
+        key = f"{self.backend}-{version}" if version is not None else None
+        if key is not None:
+            if self.is_trained and key == self.version:
+                return
+            entry = self.registry.load(key) if self.registry is not None else None
+            if entry:
+                self.scaler, self.model = entry["scaler"], entry["model"]
+                self.trained_until = entry.get("trained_until")
+                self.is_trained = True
+                self.version = key
+                return
+            if self._update_online(df_features, target_col):
+                self._finish_training(key, samples=None)
+                return
+
         # Create Target if not present (Direction: 1 if Close > Open next day?)
         # Strategy Definition: Buy if Next Day Return > 0
         if target_col not in df_features.columns:
@@ -30,12 +57,41 @@ class StrategyEngine:
         X = df_features.drop(columns=[target_col, 'close', 'open', 'high', 'low', 'volume'], errors='ignore')
         y = df_features[target_col]
         
-        # Scaling
+        # Scaling (fresh objects: a registry may still hold the previous ones)
+        self.scaler = StandardScaler()
+        self.model = make_backend(self.backend)
         X_scaled = self.scaler.fit_transform(X)
         
-        logger.info(f"Training SVM on {len(X)} samples...")
+        logger.info(f"Training {self.backend} model on {len(X)} samples...")
         self.model.fit(X_scaled, y)
+        self.trained_until = df_features.index[-2] if len(df_features) > 1 else None
+        self._finish_training(key, samples=len(X))
+
+    def _update_online(self, df_features, target_col):
+        """partial_fit on days labelled since the last update. Returns False if a full fit is needed."""
+        if not (self.model.supports_partial_fit and self.is_trained and self.trained_until is not None):
+            return False
+        if target_col in df_features.columns or self.trained_until not in df_features.index:
+            return False
+
+        returns = df_features['close'].pct_change().shift(-1)
+        new = (df_features.index > self.trained_until) & returns.notna().values
+        if new.sum() > ONLINE_MAX_NEW_ROWS:
+            return False
+        if new.any():
+            X = df_features.loc[new].drop(columns=['close', 'open', 'high', 'low', 'volume'], errors='ignore')
+            y = np.where(returns[new] > 0, 1, 0)
+            logger.info(f"Updating {self.backend} model with {len(X)} new samples...")
+            self.model.partial_fit(self.scaler.transform(X), y)
+            self.trained_until = X.index[-1]
+        return True
+
+    def _finish_training(self, key, samples):
         self.is_trained = True
+        self.version = key
+        if self.registry is not None and key is not None:
+            self.registry.save(key, self.scaler, self.model, samples=samples,
+                               trained_until=self.trained_until)
         
     def predict_signal(self, current_features):
         """
@@ -56,12 +112,8 @@ class KellySolver:
         self.alpha = alpha
         self.beta = beta
         # Lambda (Risk Aversion) calculation derived from Drawdown Constraint
-        # Formula: lambda = log(beta) / log(alpha)
-        # Note: log is natural log by default in numpy, which is correct for ratios
-        if np.log(self.alpha) == 0:
-             self.lamb = 5 # Default safety
-        else:
-             self.lamb = np.log(self.beta) / np.log(self.alpha)
+        # Formula: lambda = log(beta) / log(alpha) (5 if alpha == 1, default safety)
+        self.lamb = risk_aversion(self.alpha, self.beta)
              
         logger.info(f"Kelly Solver Initialized. Risk Aversion Lambda: {self.lamb:.4f}")
 
@@ -84,7 +136,8 @@ class KellySolver:
 
     def calculate_optimal_allocation(self, win_prob, avg_win_loss_ratio):
         """
-        Calculates the optimal 'b' (fraction of capital) using Bisection.
+        Calculates the optimal 'b' (fraction of capital) from the closed-form
+        root of _utility_derivative (see allocation.optimal_fraction).
         """
         W = win_prob
         R = avg_win_loss_ratio
@@ -97,33 +150,29 @@ class KellySolver:
             return 0.0
             
         # 2. Solve for 'b' in range [0, 0.99] (Cannot bet 100% due to power utility singularity at b=1)
-        try:
-            # Check sign at boundaries
-            # f(0) = W*R - (1-W) = Edge > 0 (Given above)
-            # f(0.99) -> Large negative term dominated by (1-b)^-lamb
-            # So root exists.
-            
-            # Using scipy bisect
-            optimal_b = bisect(self._utility_derivative, 0, 0.99, args=(W, R))
-            
-            # 3. Apply Hard Cap
-            final_b = min(optimal_b, MAX_POSITION_SIZE)
-            
-            return round(final_b, 4)
-            
-        except Exception as e:
-            logger.error(f"Optimization failed: {e}. Defaulting to 0.")
-            return 0.0
+        # 3. Apply Hard Cap
+        final_b = solve_allocations(W, R, self.lamb, cap=MAX_POSITION_SIZE)
+        return round(final_b, 4)
+
+    def calculate_allocations(self, win_probs, avg_win_loss_ratios):
+        """
+        Vectorized calculate_optimal_allocation for arrays of (W, R), e.g. every
+        signal of a scan or Monte Carlo draws. Returns a float array.
+        """
+        return np.round(solve_allocations(win_probs, avg_win_loss_ratios, self.lamb,
+                                          cap=MAX_POSITION_SIZE), 4)
 
 class SignalGenerator:
-    def __init__(self, data_manager, strategy_engine, kelly_solver):
+    def __init__(self, data_manager, strategy_engine, kelly_solver, feature_store=None):
         self.dm = data_manager
         self.engine = strategy_engine
         self.kelly = kelly_solver
+        # Optional FeatureStore: incremental daily features instead of a full re-download
+        self.store = feature_store
         
     def run_analysis(self):
         # 1. Get Data
-        df = self.dm.get_combined_features()
+        df = self.store.refresh() if self.store is not None else self.dm.get_combined_features()
         if df is None or len(df) < 300:
             logger.warning("Insufficient Data.")
             return None
@@ -133,7 +182,8 @@ class SignalGenerator:
         train_df = df.iloc[:-1] # Use all except today/tomorrow
         current_features = df.drop(columns=['close', 'open', 'high', 'low', 'volume'], errors='ignore').iloc[-1]
         
-        self.engine.train_model(train_df)
+        # Retrains only when the training window's data actually changed
+        self.engine.train_model(train_df, version=data_version(train_df))
         
         # 3. Predict Direction (W)
         prob_up = self.engine.predict_signal(current_features)
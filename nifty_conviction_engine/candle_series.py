@@ -0,0 +1,155 @@
+"""
+Columnar Candle Series for Nifty Direction Conviction Engine
+
+Holds one timeframe of OHLCV data as contiguous float64 NumPy arrays so every
+analysis layer can compute on the same columns instead of re-walking a list
+of candle dicts. ConvictionScorer builds one CandleSeries per timeframe and
+hands it to the technical, candlestick and price action analyzers.
+
+The list-of-dicts form is still available (CandleSeries.candles) for callers
+that index individual candles.
+"""
+
+import hashlib
+from operator import itemgetter
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+
+class CandleSeries:
+    """
+    Immutable columnar OHLCV container.
+
+    Attributes:
+        open, high, low, close, volume (np.ndarray): float64 columns of equal length
+    """
+
+    FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, open, high, low, close, volume, dates=None, candles: Optional[List[Dict]] = None):
+        """
+        Args:
+            open, high, low, close, volume: Array-likes of equal length
+            dates: Optional sequence of candle dates
+            candles: Original list of candle dicts, kept so .candles need not be rebuilt
+        """
+        self.open = np.ascontiguousarray(open, dtype=np.float64)
+        self.high = np.ascontiguousarray(high, dtype=np.float64)
+        self.low = np.ascontiguousarray(low, dtype=np.float64)
+        self.close = np.ascontiguousarray(close, dtype=np.float64)
+        self.volume = np.ascontiguousarray(volume, dtype=np.float64)
+
+        n = len(self.close)
+        if any(len(col) != n for col in (self.open, self.high, self.low, self.volume)):
+            raise ValueError("OHLCV columns must all have the same length")
+
+        self._dates = dates
+        self._candles = candles
+        self._lists = {}
+        self._fingerprint = None
+
+    # ==================== Constructors ====================
+
+    @classmethod
+    def from_candles(cls, candles: Union[List[Dict], 'CandleSeries']) -> 'CandleSeries':
+        """
+        Build a series from a list of candle dicts {date, open, high, low, close, volume}.
+        An existing CandleSeries is returned unchanged.
+
+        Raises:
+            ValueError: If a candle is missing an OHLCV key
+        """
+        if isinstance(candles, cls):
+            return candles
+
+        candles = candles if isinstance(candles, list) else list(candles)
+        if not candles:
+            empty = np.empty(0)
+            return cls(empty, empty, empty, empty, empty, dates=[], candles=candles)
+
+        n = len(candles)
+        try:
+            columns = [np.fromiter(map(itemgetter(field), candles), np.float64, n) for field in cls.FIELDS]
+        except (KeyError, TypeError):
+            required_keys = set(cls.FIELDS)
+            for i, candle in enumerate(candles):
+                if not required_keys.issubset(candle.keys()):
+                    raise ValueError(
+                        f"Candle at index {i} missing required keys. "
+                        f"Required: {required_keys}, Got: {set(candle.keys())}"
+                    )
+            raise
+
+        return cls(*columns, candles=candles)
+
+    @classmethod
+    def from_arrays(cls, open, high, low, close, volume, dates=None) -> 'CandleSeries':
+        """Build a series directly from columns (e.g. NiftyScenarioGenerator.ohlcv output)."""
+        return cls(open, high, low, close, volume, dates=dates)
+
+    # ==================== Access ====================
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    def __getitem__(self, idx):
+        """Integer index returns a candle dict; a slice returns a CandleSeries view."""
+        if isinstance(idx, slice):
+            dates = self.dates[idx] if self.dates is not None else None
+            candles = self._candles[idx] if self._candles is not None else None
+            return CandleSeries(self.open[idx], self.high[idx], self.low[idx],
+                                self.close[idx], self.volume[idx], dates=dates, candles=candles)
+        return self.candles[idx]
+
+    def __iter__(self):
+        return iter(self.candles)
+
+    @property
+    def dates(self) -> Optional[List]:
+        if self._dates is None and self._candles is not None:
+            self._dates = [c.get('date') for c in self._candles]
+        return self._dates
+
+    @property
+    def candles(self) -> List[Dict]:
+        """List-of-dicts view, built once if the series was created from arrays."""
+        if self._candles is None:
+            dates = self.dates or [None] * len(self)
+            self._candles = [
+                {'date': d, 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+                for d, o, h, l, c, v in zip(dates, self.open.tolist(), self.high.tolist(),
+                                            self.low.tolist(), self.close.tolist(), self.volume.tolist())
+            ]
+        return self._candles
+
+    def tolist(self, field: str) -> List[float]:
+        """Cached Python list of one column (for the list-based compatibility attributes)."""
+        if field not in self._lists:
+            self._lists[field] = getattr(self, field).tolist()
+        return self._lists[field]
+
+    @property
+    def fingerprint(self):
+        """
+        Content identity used by the indicator cache: ((length, digest of every bar
+        except the last), last bar values). Two series that differ only in their
+        last bar share the first half.
+        """
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16)
+            for field in self.FIELDS:
+                digest.update(getattr(self, field)[:-1])
+            last_bar = tuple(float(getattr(self, field)[-1]) for field in self.FIELDS) if len(self) else ()
+            self._fingerprint = ((len(self), digest.digest()), last_bar)
+        return self._fingerprint
+
+    # ==================== Validation ====================
+
+    def invalid_ohlc_index(self) -> Optional[int]:
+        """Index of the first candle whose open/close lie outside [low, high], or None."""
+        bad = ~((self.low <= self.open) & (self.low <= self.close) &
+                (self.open <= self.high) & (self.close <= self.high))
+        if bad.any():
+            return int(np.argmax(bad))
+        return None
@@ -4,10 +4,15 @@ Candlestick Pattern Detection Module - Layer 2 of Nifty Direction Conviction Eng
 This module provides comprehensive candlestick pattern recognition for OHLCV data.
 Detects 15+ classic candlestick patterns and provides conviction scoring for trading direction.
 
-Pure Python implementation with no external dependencies.
+Candles are held in a CandleSeries (NumPy columns); validation, the rolling
+averages and the pattern rules (pattern_scanner) all run on the arrays.
 """
 
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Union
+
+from .candle_series import CandleSeries
+from .indicator_cache import SeriesIndicators
+from .pattern_scanner import PATTERNS, PATTERN_SPAN, evaluate_patterns
 
 
 class CandlestickAnalyzer:
@@ -24,12 +29,14 @@ class CandlestickAnalyzer:
             - volume: int or float
     """
 
-    def __init__(self, candles: List[Dict]):
+    def __init__(self, candles: Union[List[Dict], CandleSeries], cache=None):
         """
         Initialize the analyzer with candlestick data.
 
         Args:
-            candles: List of dicts containing OHLCV data for each candle
+            candles: List of dicts containing OHLCV data for each candle,
+                     or a CandleSeries shared with the other analyzers
+            cache: Optional IndicatorCache shared with the other layers
 
         Raises:
             ValueError: If candles list is empty or invalid
@@ -37,22 +44,14 @@ class CandlestickAnalyzer:
         if not candles:
             raise ValueError("Candles list cannot be empty")
 
-        # Validate candle structure
-        required_keys = {'open', 'high', 'low', 'close', 'volume'}
-        for i, candle in enumerate(candles):
-            if not all(key in candle for key in required_keys):
-                raise ValueError(
-                    f"Candle at index {i} missing required keys. "
-                    f"Required: {required_keys}, Got: {set(candle.keys())}"
-                )
-            # Validate OHLC logic
-            if not (candle['low'] <= candle['open'] and
-                    candle['low'] <= candle['close'] and
-                    candle['open'] <= candle['high'] and
-                    candle['close'] <= candle['high']):
-                raise ValueError(f"Candle at index {i} has invalid OHLC values")
-
-        self.candles = candles
+        # Validate candle structure (missing keys raise here) and OHLC logic
+        self.series = CandleSeries.from_candles(candles)
+        bad_idx = self.series.invalid_ohlc_index()
+        if bad_idx is not None:
+            raise ValueError(f"Candle at index {bad_idx} has invalid OHLC values")
+
+        self.candles = self.series.candles
+        self.ind = SeriesIndicators(self.series, cache)
 
     # ==================== HELPER METHODS ====================
 
@@ -140,12 +139,7 @@ class CandlestickAnalyzer:
         Returns:
             Average body size, or 0 if insufficient data
         """
-        if len(self.candles) == 0:
-            return 0
-
-        look_count = min(lookback, len(self.candles))
-        total = sum(self._body_size(self.candles[-i]) for i in range(1, look_count + 1))
-        return total / look_count
+        return self.ind.avg_body(lookback)
 
     def _avg_volume(self, lookback: int = 20) -> float:
         """
@@ -157,12 +151,37 @@ class CandlestickAnalyzer:
         Returns:
             Average volume, or 0 if insufficient data
         """
-        if len(self.candles) == 0:
-            return 0
+        return self.ind.avg_volume(lookback)
+
+    def _detect(self, pattern: str, idx: int) -> Tuple[bool, float]:
+        """
+        Evaluate one pattern on the candle at idx using the vectorized rules.
 
-        look_count = min(lookback, len(self.candles))
-        total = sum(self.candles[-i]['volume'] for i in range(1, look_count + 1))
-        return total / look_count
+        Args:
+            pattern: Key from pattern_scanner.PATTERNS
+            idx: Index of the pattern's last candle
+
+        Returns:
+            Tuple of (pattern_detected: bool, confidence: float 0-1)
+        """
+        span = PATTERN_SPAN[pattern]
+        if span > 1 and idx < span - 1:
+            return False, 0.0
+
+        n = len(self.candles)
+        if idx < 0:
+            idx += n
+        if not 0 <= idx < n:
+            raise IndexError("candle index out of range")
+
+        s = self.series
+        start = max(0, idx - 2)
+        end = idx + 1
+        hit, confidence = evaluate_patterns(s.open[start:end], s.high[start:end], s.low[start:end],
+                                            s.close[start:end], avg_body=self._avg_body_size())[pattern]
+        if hit[-1]:
+            return True, float(confidence[-1])
+        return False, 0.0
 
     # ==================== PATTERN DETECTION METHODS ====================
 
@@ -179,24 +198,7 @@ class CandlestickAnalyzer:
         Returns:
             Tuple of (pattern_detected: bool, confidence: float 0-1)
         """
-        if idx < 1:
-            return False, 0.0
-
-        curr = self.candles[idx]
-        prev = self.candles[idx - 1]
-
-        # Requires previous bearish and current bullish
-        if not self._is_bearish(prev) or not self._is_bullish(curr):
-            return False, 0.0
-
-        # Current candle must engulf previous
-        if curr['close'] > prev['open'] and curr['open'] < prev['close']:
-            # Confidence based on how much current engulfs previous
-            engulf_ratio = (curr['close'] - curr['open']) / (prev['open'] - prev['close'])
-            confidence = min(1.0, engulf_ratio * 0.5 + 0.5)
-            return True, confidence
-
-        return False, 0.0
+        return self._detect('bullish_engulfing', idx)
 
     def detect_bearish_engulfing(self, idx: int) -> Tuple[bool, float]:
         """
@@ -211,24 +213,7 @@ class CandlestickAnalyzer:
         Returns:
             Tuple of (pattern_detected: bool, confidence: float 0-1)
         """
-        if idx < 1:
-            return False, 0.0
-
-        curr = self.candles[idx]
-        prev = self.candles[idx - 1]
-
-        # Requires previous bullish and current bearish
-        if not self._is_bullish(prev) or not self._is_bearish(curr):
-            return False, 0.0
-
-        # Current candle must engulf previous
-        if curr['open'] > prev['close'] and curr['close'] < prev['open']:
-            # Confidence based on how much current engulfs previous
-            engulf_ratio = (prev['close'] - prev['open']) / (curr['open'] - curr['close'])
-            confidence = min(1.0, engulf_ratio * 0.5 + 0.5)
-            return True, confidence
-
-        return False, 0.0
+        return self._detect('bearish_engulfing', idx)
 
     def detect_hammer(self, idx: int) -> Tuple[bool, float]:
         """
@@ -243,31 +228,7 @@ class CandlestickAnalyzer:
         Returns:
             Tuple of (pattern_detected: bool, confidence: float 0-1)
         """
-        candle = self.candles[idx]
-        body = self._body_size(candle)
-        upper_shadow = self._upper_shadow(candle)
-        lower_shadow = self._lower_shadow(candle)
-
-        # Small body check
-        avg_body = self._avg_body_size()
-        if avg_body > 0 and body > avg_body * 1.5:
-            return False, 0.0
-
-        # Long lower shadow (at least 2x the body)
-        if lower_shadow < body * 2:
-            return False, 0.0
-
-        # Minimal upper shadow
-        if upper_shadow > body * 0.5:
-            return False, 0.0
-
-        # Confidence based on shadow ratio
-        if body > 0:
-            confidence = min(1.0, (lower_shadow / body) / 5.0)
-        else:
-            confidence = 0.5
-
-        return True, confidence
+        return self._detect('hammer', idx)
 
     def detect_inverted_hammer(self, idx: int) -> Tuple[bool, float]:
         """
@@ -281,31 +242,7 @@ class CandlestickAnalyzer:
         Returns:
             Tuple of (pattern_detected: bool, confidence: float 0-1)
         """
-        candle = self.candles[idx]
-        body = self._body_size(candle)
-        upper_shadow = self._upper_shadow(candle)
-        lower_shadow = self._lower_shadow(candle)
-
-        # Small body check
-        avg_body = self._avg_body_size()
-        if avg_body > 0 and body > avg_body * 1.5:
-            return False, 0.0
-
-        # Long upper shadow (at least 2x the body)
-        if upper_shadow < body * 2:
-            return False, 0.0
-
-        # Minimal lower shadow
-        if lower_shadow > body * 0.5:
-            return False, 0.0
-
-        # Confidence based on shadow ratio
-        if body > 0:
-            confidence = min(1.0, (upper_shadow / body) / 5.0)
-        else:
-            confidence = 0.5
-
-        return True, confidence
+        return self._detect('inverted_hammer', idx)
 
     def detect_doji(self, idx: int) -> Tuple[bool, float]:
         """
@@ -319,21 +256,7 @@ class CandlestickAnalyzer:
         Returns:
             Tuple of (pattern_detected: bool, confidence: float 0-1)
         """
-        candle = self.candles[idx]
-        body = self._body_size(candle)
-        total_range = self._total_range(candle)
-
-        if total_range == 0:
-            return False, 0.0
-
-        body_ratio = body / total_range
-
-        # Body < 10% of range
-        if body_ratio <= 0.1:
-            confidence = 1.0 - body_ratio * 10  # Higher confidence for smaller bodies
-            return True, confidence
-
-        return False, 0.0
+        return self._detect('doji', idx)
 
     def detect_dragonfly_doji(self, idx: int) -> Tuple[bool, float]:
         """
@@ -348,23 +271,7 @@ class CandlestickAnalyzer:
         Returns:
             Tuple of (pattern_detected: bool, confidence: float 0-1)
         """
-        candle = self.candles[idx]
-
-        # Must be a doji first
-        is_doji, doji_conf = self.detect_doji(idx)
-        if not is_doji:
-            return False, 0.0
-
-        upper_shadow = self._upper_shadow(candle)
-        lower_shadow = self._lower_shadow(candle)
-        body = self._body_size(candle)
-
-        # Long lower shadow, minimal upper shadow
-        if lower_shadow > body * 2 and upper_shadow < body * 0.5:
-            confidence = min(doji_conf, 0.9)
-            return True, confidence
-
-        return False, 0.0
+        return self._detect('dragonfly_doji', idx)
 
     def detect_gravestone_doji(self, idx: int) -> Tuple[bool, float]:
         """
@@ -379,23 +286,7 @@ class CandlestickAnalyzer:
         Returns:
             Tuple of (pattern_detected: bool, confidence: float 0-1)
         """
-        candle = self.candles[idx]
-
-        # Must be a doji first
-        is_doji, doji_conf = self.detect_doji(idx)
-        if not is_doji:
-            return False, 0.0
-
-        upper_shadow = self._upper_shadow(candle)
-        lower_shadow = self._lower_shadow(candle)
-        body = self._body_size(candle)
-
-        # Long upper shadow, minimal lower shadow
-        if upper_shadow > body * 2 and lower_shadow < body * 0.5:
-            confidence = min(doji_conf, 0.9)
-            return True, confidence
-
-        return False, 0.0
+        return self._detect('gravestone_doji', idx)
 
     def detect_morning_star(self, idx: int) -> Tuple[bool, float]:
         """
@@ -410,42 +301,7 @@ class CandlestickAnalyzer:
         Returns:
             Tuple of (pattern_detected: bool, confidence: float 0-1)
         """
-        if idx < 2:
-            return False, 0.0
-
-        c1 = self.candles[idx - 2]
-        c2 = self.candles[idx - 1]
-        c3 = self.candles[idx]
-
-        # First candle must be big bearish
-        if not self._is_bearish(c1):
-            return False, 0.0
-
-        c1_body = self._body_size(c1)
-        c2_body = self._body_size(c2)
-        c3_body = self._body_size(c3)
-
-        avg_body = self._avg_body_size()
-
-        # First candle is big
-        if avg_body > 0 and c1_body < avg_body:
-            return False, 0.0
-
-        # Second candle is small
-        if c2_body > avg_body:
-            return False, 0.0
-
-        # Third candle is bullish and big
-        if not self._is_bullish(c3) or c3_body < avg_body:
-            return False, 0.0
-
-        # Third closes above 50% of first candle
-        midpoint = (c1['open'] + c1['close']) / 2
-        if c3['close'] > midpoint:
-            confidence = min(1.0, c3_body / (avg_body * 2))
-            return True, confidence
-
-        return False, 0.0
+        return self._detect('morning_star', idx)
 
     def detect_evening_star(self, idx: int) -> Tuple[bool, float]:
         """
@@ -460,42 +316,7 @@ class CandlestickAnalyzer:
         Returns:
             Tuple of (pattern_detected: bool, confidence: float 0-1)
         """
-        if idx < 2:
-            return False, 0.0
-
-        c1 = self.candles[idx - 2]
-        c2 = self.candles[idx - 1]
-        c3 = self.candles[idx]
-
-        # First candle must be big bullish
-        if not self._is_bullish(c1):
-            return False, 0.0
-
-        c1_body = self._body_size(c1)
-        c2_body = self._body_size(c2)
-        c3_body = self._body_size(c3)
-
-        avg_body = self._avg_body_size()
-
-        # First candle is big
-        if avg_body > 0 and c1_body < avg_body:
-            return False, 0.0
-
-        # Second candle is small
-        if c2_body > avg_body:
-            return False, 0.0
-
-        # Third candle is bearish and big
-        if not self._is_bearish(c3) or c3_body < avg_body:
-            return False, 0.0
-
-        # Third closes below 50% of first candle
-        midpoint = (c1['open'] + c1['close']) / 2
-        if c3['close'] < midpoint:
-            confidence = min(1.0, c3_body / (avg_body * 2))
-            return True, confidence
-
-        return False, 0.0
+        return self._detect('evening_star', idx)
 
     def detect_three_white_soldiers(self, idx: int) -> Tuple[bool, float]:
         """
@@ -510,31 +331,7 @@ class CandlestickAnalyzer:
         Returns:
             Tuple of (pattern_detected: bool, confidence: float 0-1)
         """
-        if idx < 2:
-            return False, 0.0
-
-        c1 = self.candles[idx - 2]
-        c2 = self.candles[idx - 1]
-        c3 = self.candles[idx]
-
-        # All three must be bullish
-        if not (self._is_bullish(c1) and self._is_bullish(c2) and self._is_bullish(c3)):
-            return False, 0.0
-
-        # Each closes higher than previous
-        if not (c2['close'] > c1['close'] and c3['close'] > c2['close']):
-            return False, 0.0
-
-        # Additional check: opens should be above or near previous close
-        if not (c2['open'] < c2['close'] and c3['open'] < c3['close']):
-            return False, 0.0
-
-        # Confidence based on consistency of gap up and close progression
-        gap1 = max(0, c2['open'] - c1['close']) / self._total_range(c1) if self._total_range(c1) > 0 else 0
-        gap2 = max(0, c3['open'] - c2['close']) / self._total_range(c2) if self._total_range(c2) > 0 else 0
-
-        confidence = min(1.0, 0.5 + (gap1 + gap2) / 2)
-        return True, confidence
+        return self._detect('three_white_soldiers', idx)
 
     def detect_three_black_crows(self, idx: int) -> Tuple[bool, float]:
         """
@@ -549,31 +346,7 @@ class CandlestickAnalyzer:
         Returns:
             Tuple of (pattern_detected: bool, confidence: float 0-1)
         """
-        if idx < 2:
-            return False, 0.0
-
-        c1 = self.candles[idx - 2]
-        c2 = self.candles[idx - 1]
-        c3 = self.candles[idx]
-
-        # All three must be bearish
-        if not (self._is_bearish(c1) and self._is_bearish(c2) and self._is_bearish(c3)):
-            return False, 0.0
-
-        # Each closes lower than previous
-        if not (c2['close'] < c1['close'] and c3['close'] < c2['close']):
-            return False, 0.0
-
-        # Additional check: opens should be below or near previous close
-        if not (c2['open'] > c2['close'] and c3['open'] > c3['close']):
-            return False, 0.0
-
-        # Confidence based on consistency of gap down and close progression
-        gap1 = max(0, c1['close'] - c2['open']) / self._total_range(c1) if self._total_range(c1) > 0 else 0
-        gap2 = max(0, c2['close'] - c3['open']) / self._total_range(c2) if self._total_range(c2) > 0 else 0
-
-        confidence = min(1.0, 0.5 + (gap1 + gap2) / 2)
-        return True, confidence
+        return self._detect('three_black_crows', idx)
 
     def detect_piercing_pattern(self, idx: int) -> Tuple[bool, float]:
         """
@@ -588,29 +361,7 @@ class CandlestickAnalyzer:
         Returns:
             Tuple of (pattern_detected: bool, confidence: float 0-1)
         """
-        if idx < 1:
-            return False, 0.0
-
-        prev = self.candles[idx - 1]
-        curr = self.candles[idx]
-
-        # Previous bearish, current bullish
-        if not self._is_bearish(prev) or not self._is_bullish(curr):
-            return False, 0.0
-
-        # Current opens below previous close (gap down)
-        if curr['open'] >= prev['close']:
-            return False, 0.0
-
-        # Current closes above 50% of previous candle
-        prev_midpoint = (prev['open'] + prev['close']) / 2
-        if curr['close'] > prev_midpoint:
-            # Confidence based on how far it pierces
-            penetration = (curr['close'] - prev['close']) / (prev['open'] - prev['close'])
-            confidence = min(1.0, penetration)
-            return True, confidence
-
-        return False, 0.0
+        return self._detect('piercing_pattern', idx)
 
     def detect_dark_cloud_cover(self, idx: int) -> Tuple[bool, float]:
         """
@@ -625,29 +376,7 @@ class CandlestickAnalyzer:
         Returns:
             Tuple of (pattern_detected: bool, confidence: float 0-1)
         """
-        if idx < 1:
-            return False, 0.0
-
-        prev = self.candles[idx - 1]
-        curr = self.candles[idx]
-
-        # Previous bullish, current bearish
-        if not self._is_bullish(prev) or not self._is_bearish(curr):
-            return False, 0.0
-
-        # Current opens above previous close (gap up)
-        if curr['open'] <= prev['close']:
-            return False, 0.0
-
-        # Current closes below 50% of previous candle
-        prev_midpoint = (prev['open'] + prev['close']) / 2
-        if curr['close'] < prev_midpoint:
-            # Confidence based on how much it penetrates
-            penetration = (prev['open'] - curr['close']) / (prev['close'] - prev['open'])
-            confidence = min(1.0, penetration)
-            return True, confidence
-
-        return False, 0.0
+        return self._detect('dark_cloud_cover', idx)
 
     def detect_shooting_star(self, idx: int) -> Tuple[bool, float]:
         """
@@ -662,38 +391,7 @@ class CandlestickAnalyzer:
         Returns:
             Tuple of (pattern_detected: bool, confidence: float 0-1)
         """
-        candle = self.candles[idx]
-        body = self._body_size(candle)
-        upper_shadow = self._upper_shadow(candle)
-        lower_shadow = self._lower_shadow(candle)
-
-        # Small body check
-        avg_body = self._avg_body_size()
-        if avg_body > 0 and body > avg_body * 1.5:
-            return False, 0.0
-
-        # Long upper shadow (at least 2x the body)
-        if upper_shadow < body * 2:
-            return False, 0.0
-
-        # Minimal lower shadow
-        if lower_shadow > body * 0.5:
-            return False, 0.0
-
-        # Check for prior uptrend
-        if idx > 0:
-            prev = self.candles[idx - 1]
-            if prev['close'] <= prev['open']:
-                # Previous was not bullish, reduce confidence
-                return True, 0.6
-
-        # Confidence based on shadow ratio
-        if body > 0:
-            confidence = min(1.0, (upper_shadow / body) / 5.0)
-        else:
-            confidence = 0.7
-
-        return True, confidence
+        return self._detect('shooting_star', idx)
 
     # ==================== MAIN ANALYSIS METHOD ====================
 
@@ -726,76 +424,59 @@ class CandlestickAnalyzer:
 
         avg_vol = self._avg_volume(20)
 
-        # Analyze each candle in the window
-        for i in range(start_idx, len(self.candles)):
-            # Pattern detection with scoring
-            patterns_to_check = [
-                ("Bullish Engulfing", self.detect_bullish_engulfing, 1.0, "bullish"),
-                ("Bearish Engulfing", self.detect_bearish_engulfing, -1.0, "bearish"),
-                ("Hammer", self.detect_hammer, 0.7, "bullish"),
-                ("Inverted Hammer", self.detect_inverted_hammer, 0.5, "bullish"),
-                ("Dragonfly Doji", self.detect_dragonfly_doji, 0.6, "bullish"),
-                ("Gravestone Doji", self.detect_gravestone_doji, -0.6, "bearish"),
-                ("Morning Star", self.detect_morning_star, 1.2, "bullish"),
-                ("Evening Star", self.detect_evening_star, -1.2, "bearish"),
-                ("Three White Soldiers", self.detect_three_white_soldiers, 1.5, "bullish"),
-                ("Three Black Crows", self.detect_three_black_crows, -1.5, "bearish"),
-                ("Piercing Pattern", self.detect_piercing_pattern, 0.6, "bullish"),
-                ("Dark Cloud Cover", self.detect_dark_cloud_cover, -0.6, "bearish"),
-                ("Shooting Star", self.detect_shooting_star, -0.7, "bearish"),
-            ]
-
-            for pattern_name, detect_func, base_score, pattern_type in patterns_to_check:
-                detected, confidence = detect_func(i)
-
-                if detected:
-                    # Apply confidence multiplier
-                    weighted_score = base_score * confidence
-
-                    # Check for volume confirmation on pattern candle
-                    pattern_vol = self.candles[i]['volume']
-                    has_volume = pattern_vol > avg_vol if avg_vol > 0 else True
-
-                    # Boost score if volume confirms the pattern
-                    if has_volume and abs(weighted_score) > 0:
-                        weighted_score *= 1.3 if abs(weighted_score) >= 1.0 else 1.15
-
-                    total_score += weighted_score
-
-                    patterns_found.append({
-                        'pattern_name': pattern_name,
-                        'type': pattern_type,
-                        'confidence': confidence,
-                        'candle_index': i,
-                        'volume_confirmed': has_volume
-                    })
-
-                    if pattern_type == "bullish":
-                        bullish_count += 1
-                    else:
-                        bearish_count += 1
-
-            # Check for Doji (neutral pattern)
-            is_doji, doji_conf = self.detect_doji(i)
-            if is_doji:
+        # Every pattern over the window in one pass (plus 2 candles of context)
+        window = max(0, start_idx - 2)
+        hits = self.ind.pattern_hits(window)
+        hits = hits.select(bars=range(start_idx - window, len(self.candles) - window))
+
+        for bar, pattern_id, confidence in zip(hits.bars.tolist(), hits.patterns.tolist(),
+                                               hits.confidence.tolist()):
+            i = bar + window
+            key, pattern_name, pattern_type, base_score = PATTERNS[pattern_id]
+
+            if key == 'doji':
                 # Doji direction depends on prior trend
                 doji_score = 0.0
                 if i > 0:
                     prev = self.candles[i - 1]
                     doji_score = 0.1 if self._is_bullish(prev) else -0.1
-                else:
-                    doji_score = 0.0
 
-                doji_score *= doji_conf
-                total_score += doji_score
+                total_score += doji_score * confidence
 
                 patterns_found.append({
                     'pattern_name': 'Doji',
                     'type': 'neutral',
-                    'confidence': doji_conf,
+                    'confidence': confidence,
                     'candle_index': i,
                     'volume_confirmed': False
                 })
+                continue
+
+            # Apply confidence multiplier
+            weighted_score = base_score * confidence
+
+            # Check for volume confirmation on pattern candle
+            pattern_vol = self.candles[i]['volume']
+            has_volume = pattern_vol > avg_vol if avg_vol > 0 else True
+
+            # Boost score if volume confirms the pattern
+            if has_volume and abs(weighted_score) > 0:
+                weighted_score *= 1.3 if abs(weighted_score) >= 1.0 else 1.15
+
+            total_score += weighted_score
+
+            patterns_found.append({
+                'pattern_name': pattern_name,
+                'type': pattern_type,
+                'confidence': confidence,
+                'candle_index': i,
+                'volume_confirmed': has_volume
+            })
+
+            if pattern_type == "bullish":
+                bullish_count += 1
+            else:
+                bearish_count += 1
 
         # Cap score between -3 and +3
         total_score = max(-3.0, min(3.0, total_score))
@@ -3,10 +3,13 @@ Nifty Direction Conviction Engine - Master Conviction Scorer
 Combines all 4 analysis layers into a unified conviction score for trading decisions.
 """
 
+from .candle_series import CandleSeries
+from .indicator_cache import shared_cache
 from .technical_analysis import TechnicalAnalyzer
 from .candlestick_patterns import CandlestickAnalyzer
 from .options_intelligence import OptionsAnalyzer
 from .price_action import PriceActionAnalyzer
+from .worker_pool import get_pool, is_process_pool
 
 
 class ConvictionScorer:
@@ -29,15 +32,21 @@ class ConvictionScorer:
     LAYER_WEIGHTS_NO_OPTIONS = {"technical": 0.45, "candlestick": 0.20, "price_action": 0.35}
 
     def __init__(self, candles_5min, candles_15min, candles_60min, candles_daily,
-                 spot_price, options_data=None):
+                 spot_price, options_data=None, cache=None, executor=None, precomputed=None):
         """
         Args:
-            candles_5min: list of dicts {date, open, high, low, close, volume}
+            candles_5min: list of dicts {date, open, high, low, close, volume} or a CandleSeries
             candles_15min: same format
             candles_60min: same format
             candles_daily: same format
             spot_price: current Nifty spot price (float)
             options_data: optional list of {strike, type, oi, volume, ltp, bid, ask, change_oi}
+            cache: optional IndicatorCache; defaults to the module-wide shared cache so
+                   successive scorers reuse indicators when only the last bar changed
+            executor: optional concurrent.futures executor (or True for the shared
+                      worker pool) to analyze the timeframes concurrently
+            precomputed: optional {timeframe: analyze_timeframe result} from an earlier
+                         run, reused for timeframes whose candles have not changed
         """
         self.candles = {
             "5min": candles_5min or [],
@@ -48,6 +57,11 @@ class ConvictionScorer:
         self.spot_price = spot_price
         self.options_data = options_data
         self.atm_strike = round(spot_price / 50) * 50
+        # Per-run view of the indicator cache (counts this run's hits / misses)
+        self.cache = (cache if cache is not None else shared_cache).session()
+        self.executor = get_pool() if executor is True else executor
+        self.precomputed = precomputed or {}
+        self.timeframe_results = {}
 
     # ------------------------------------------------------------------
     # Helpers
@@ -99,12 +113,22 @@ class ConvictionScorer:
         Returns:
             dict with keys tech, candle, price_action (each has score + direction + details).
         """
+        return self._analyze_timeframe(candles, timeframe_name, self.cache)
+
+    @classmethod
+    def _analyze_timeframe(cls, candles, timeframe_name, cache):
         result = {"timeframe": timeframe_name, "tech": None, "candle": None, "price_action": None,
                   "combined_score": 0.0, "direction": "NEUTRAL"}
 
+        # One columnar copy of the candles, shared by all three layers
+        try:
+            candles = CandleSeries.from_candles(candles)
+        except ValueError:
+            pass  # malformed candles - each layer reports its own error below
+
         # Layer 1 - Technical
         try:
-            ta = TechnicalAnalyzer(candles)
+            ta = TechnicalAnalyzer(candles, cache=cache)
             tech = ta.get_trend_momentum_score()
             result["tech"] = tech
         except Exception as e:
@@ -112,7 +136,7 @@ class ConvictionScorer:
 
         # Layer 2 - Candlestick
         try:
-            ca = CandlestickAnalyzer(candles)
+            ca = CandlestickAnalyzer(candles, cache=cache)
             cand = ca.get_candlestick_score()
             result["candle"] = cand
         except Exception as e:
@@ -120,7 +144,7 @@ class ConvictionScorer:
 
         # Layer 4 - Price Action
         try:
-            pa = PriceActionAnalyzer(candles)
+            pa = PriceActionAnalyzer(candles, cache=cache)
             pact = pa.get_price_action_score()
             result["price_action"] = pact
         except Exception as e:
@@ -128,11 +152,11 @@ class ConvictionScorer:
 
         # Combine for this timeframe (simple weighted avg: tech 50%, candle 25%, PA 25%)
         tech_s = result["tech"].get("score", 0)
-        cand_s = self._normalize(result["candle"].get("score", 0), 3, 5)
-        pa_s = self._normalize(result["price_action"].get("score", 0), 2, 5)
+        cand_s = cls._normalize(result["candle"].get("score", 0), 3, 5)
+        pa_s = cls._normalize(result["price_action"].get("score", 0), 2, 5)
         combined = tech_s * 0.50 + cand_s * 0.25 + pa_s * 0.25
         result["combined_score"] = round(combined, 2)
-        result["direction"] = self._direction_label(combined)
+        result["direction"] = cls._direction_label(combined)
         return result
 
     # ------------------------------------------------------------------
@@ -142,20 +166,27 @@ class ConvictionScorer:
     def multi_timeframe_analysis(self):
         """Run analysis across all 4 timeframes with weighting.
 
+        With an executor the timeframes are analyzed concurrently; results are
+        still merged in TF_WEIGHTS order, so the output matches a sequential run.
+
         Returns:
             dict with per-timeframe results, weighted combined score, and alignment info.
         """
         tf_results = {}
         weighted_score = 0.0
 
+        runnable = [tf for tf in self.TF_WEIGHTS if len(self.candles.get(tf, [])) >= 5]
+        analyzed = {tf: self.precomputed[tf] for tf in runnable if tf in self.precomputed}
+        analyzed.update(self._run_timeframes([tf for tf in runnable if tf not in analyzed]))
+        self.timeframe_results = analyzed  # pass as precomputed= to the next run
+
         for tf_name, weight in self.TF_WEIGHTS.items():
-            candles = self.candles.get(tf_name, [])
-            if len(candles) < 5:
+            if tf_name not in analyzed:
                 tf_results[tf_name] = {"combined_score": 0.0, "direction": "NEUTRAL",
                                        "tech": {"score": 0}, "candle": {"score": 0},
                                        "price_action": {"score": 0}}
                 continue
-            res = self.analyze_timeframe(candles, tf_name)
+            res = analyzed[tf_name]
             tf_results[tf_name] = res
             weighted_score += res["combined_score"] * weight
 
@@ -180,6 +211,22 @@ class ConvictionScorer:
             "total_score": round(weighted_score + alignment_bonus, 2),
         }
 
+    def _run_timeframes(self, timeframes):
+        """analyze_timeframe for each name, on self.executor when one is set."""
+        if self.executor is None or len(timeframes) < 2:
+            return {tf: self.analyze_timeframe(self.candles[tf], tf) for tf in timeframes}
+
+        # Process workers use their own warm shared_cache; threads share ours
+        cache = None if is_process_pool(self.executor) else self.cache.cache
+        futures = [self.executor.submit(_timeframe_task, self.candles[tf], tf, cache)
+                   for tf in timeframes]
+        analyzed = {}
+        for tf, future in zip(timeframes, futures):
+            analyzed[tf], stats = future.result()
+            for key, value in stats.items():
+                self.cache.stats[key] += value
+        return analyzed
+
     # ------------------------------------------------------------------
     # Options analysis
     # ------------------------------------------------------------------
@@ -482,6 +529,7 @@ class ConvictionScorer:
                 "key_levels": key_levels,
                 "risk_factors": risk_factors,
                 "trade_setup": trade_setup,
+                "indicator_cache": self.cache.get_stats(),
             }
 
         except Exception as e:
@@ -505,3 +553,37 @@ class ConvictionScorer:
                 "risk_factors": [f"Engine error: {str(e)}"],
                 "trade_setup": f"NO TRADE: Engine error — {str(e)}",
             }
+
+
+# ----------------------------------------------------------------------
+# Worker-pool tasks and batch scoring
+# ----------------------------------------------------------------------
+
+def _timeframe_task(candles, timeframe_name, cache=None):
+    """One timeframe on a worker; returns (result, cache counters for this call)."""
+    session = (cache if cache is not None else shared_cache).session()
+    return ConvictionScorer._analyze_timeframe(candles, timeframe_name, session), session.get_stats()
+
+
+def _conviction_task(kwargs):
+    return ConvictionScorer(**kwargs).compute_final_conviction()
+
+
+def score_batch(requests, executor=None):
+    """Final conviction for many instruments at once, one worker task per instrument.
+
+    Args:
+        requests: {symbol: dict of ConvictionScorer keyword arguments
+                   (candles_5min, candles_15min, candles_60min, candles_daily,
+                   spot_price, options_data)}
+        executor: optional concurrent.futures executor; defaults to the shared worker pool
+
+    Returns:
+        {symbol: compute_final_conviction result}, in the input order.
+    """
+    symbols = list(requests)
+    if not symbols:
+        return {}
+    executor = executor or get_pool()
+    results = executor.map(_conviction_task, [requests[s] for s in symbols])
+    return dict(zip(symbols, results))
@@ -0,0 +1,434 @@
+"""
+Indicator Cache for Nifty Direction Conviction Engine
+
+Memoizes indicator arrays keyed by (candle series fingerprint, indicator, parameters)
+so the technical, candlestick and price action layers compute each shared quantity
+(ATR, true range, OBV, average volume, average body size, swing points, pattern
+scans, ...) once per run, across layers and timeframes.
+
+Entries survive between runs. When a later series differs from a cached one only
+in its last bar (the forming candle ticked), recursive indicators are refreshed by
+recomputing just the final element from the cached state instead of the whole series.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from . import indicators
+from . import pattern_scanner
+from . import support_resistance
+from .candle_series import CandleSeries
+
+
+class IndicatorCache:
+    """
+    LRU store of indicator results with hit / miss / refresh counters.
+
+    A lookup is:
+        hit     - same series content, value returned as is
+        refresh - only the last bar changed, value updated from the cached one
+        miss    - computed from scratch
+    """
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # (prefix_key, name, params) -> (last_bar, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def lookup(self, series, name, params, compute, refresh=None, stats=None):
+        """
+        Return the cached value for (series, name, params), computing it if needed.
+
+        Args:
+            series (CandleSeries): Series the indicator is computed on
+            name (str): Indicator name
+            params (tuple): Hashable indicator parameters
+            compute (callable): () -> value, full computation
+            refresh (callable, optional): (old_value) -> value or None; rebuilds the value
+                after a last-bar-only change. Returning None falls back to compute().
+            stats (dict, optional): Per-run counters updated alongside the cache totals
+        """
+        prefix_key, last_bar = series.fingerprint
+        slot = (prefix_key, name, params)
+
+        with self._lock:
+            entry = self._entries.get(slot)
+            if entry is not None and entry[0] == last_bar:
+                self._entries.move_to_end(slot)
+                self._count('hits', stats)
+                return entry[1]
+
+        value = None
+        outcome = 'misses'
+        if entry is not None and refresh is not None:
+            value = refresh(entry[1])
+            if value is not None:
+                outcome = 'refreshes'
+        if value is None:
+            value = compute()
+
+        with self._lock:
+            self._count(outcome, stats)
+            self._entries[slot] = (last_bar, value)
+            self._entries.move_to_end(slot)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def _count(self, outcome, stats):
+        setattr(self, outcome, getattr(self, outcome) + 1)
+        if stats is not None:
+            stats[outcome] = stats.get(outcome, 0) + 1
+
+    def session(self):
+        """A view of this cache that also keeps its own counters (one per scoring run)."""
+        return CacheSession(self)
+
+    def get_stats(self):
+        """Cache-wide counters."""
+        lookups = self.hits + self.misses + self.refreshes
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'refreshes': self.refreshes,
+            'hit_rate': round((self.hits + self.refreshes) / lookups, 3) if lookups else 0.0,
+            'entries': len(self._entries),
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.refreshes = 0
+
+
+class CacheSession:
+    """Shares an IndicatorCache's entries while counting hits / misses for one run."""
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.stats = {'hits': 0, 'misses': 0, 'refreshes': 0}
+
+    def lookup(self, series, name, params, compute, refresh=None):
+        return self.cache.lookup(series, name, params, compute, refresh, self.stats)
+
+    def get_stats(self):
+        return dict(self.stats)
+
+
+# Shared by ConvictionScorer instances so successive runs reuse each other's work
+shared_cache = IndicatorCache()
+
+
+def _extend_last(old, x_last, decay, gain):
+    """Copy of a recurrence output with only the final element recomputed."""
+    if len(old) < 2:
+        return None
+    new = old.copy()
+    new[-1] = decay * old[-2] + gain * x_last
+    return new
+
+
+def _replace_last(old, value):
+    if len(old) < 2:
+        return None
+    new = old.copy()
+    new[-1] = value
+    return new
+
+
+class SeriesIndicators:
+    """
+    Indicator accessors for one CandleSeries, memoized through an IndicatorCache.
+
+    Every method returns NumPy arrays shared with the cache — treat them as read-only.
+    """
+
+    def __init__(self, series, cache=None):
+        """
+        Args:
+            series (CandleSeries | list): Candles to compute on
+            cache (IndicatorCache | CacheSession, optional): Defaults to a private cache
+        """
+        self.series = CandleSeries.from_candles(series)
+        self.cache = cache if cache is not None else IndicatorCache()
+
+    def _get(self, name, params, compute, refresh=None):
+        return self.cache.lookup(self.series, name, params, compute, refresh)
+
+    def _last_true_range(self):
+        s = self.series
+        prev_close = s.close[-2]
+        return max(s.high[-1] - s.low[-1], abs(s.high[-1] - prev_close), abs(s.low[-1] - prev_close))
+
+    # ==================== Moving averages ====================
+
+    def sma(self, period, field='close'):
+        data = getattr(self.series, field)
+        return self._get('sma', (period, field),
+                         lambda: indicators.sma(data, period),
+                         lambda old: _replace_last(old, data[-period:].sum() / period))
+
+    def ema(self, period, field='close'):
+        data = getattr(self.series, field)
+        alpha = 2.0 / (period + 1)
+        return self._get('ema', (period, field),
+                         lambda: indicators.ema(data, period),
+                         lambda old: _extend_last(old, data[-1], 1.0 - alpha, alpha))
+
+    # ==================== Volatility ====================
+
+    def true_range(self):
+        s = self.series
+        return self._get('true_range', (),
+                         lambda: indicators.true_range(s.high, s.low, s.close),
+                         lambda old: _replace_last(old, self._last_true_range()))
+
+    def atr(self, period=14):
+        def compute():
+            tr = self.true_range()
+            return indicators.wilder(tr, period) if len(tr) >= 2 else np.empty(0)
+
+        return self._get('atr', (period,), compute,
+                         lambda old: _extend_last(old, self._last_true_range(), (period - 1) / period, 1.0 / period))
+
+    def bollinger(self, period=20, std_dev=2):
+        close = self.series.close
+
+        def refresh(old):
+            upper, middle, lower = old
+            if len(middle) < 2:
+                return None
+            window = close[-period:]
+            mid = window.sum() / period
+            band = std_dev * np.sqrt(((window - mid) ** 2).sum() / period)
+            return _replace_last(upper, mid + band), _replace_last(middle, mid), _replace_last(lower, mid - band)
+
+        return self._get('bollinger', (period, std_dev),
+                         lambda: indicators.bollinger(close, period, std_dev), refresh)
+
+    # ==================== Momentum ====================
+
+    def rsi(self, period=14):
+        close = self.series.close
+        decay = (period - 1) / period
+
+        def compute():
+            if len(close) < period + 1:
+                return np.empty(0), np.empty(0), np.empty(0)
+            change = np.diff(close)
+            avg_gain = indicators.wilder(np.where(change > 0, change, 0.0), period)
+            avg_loss = indicators.wilder(np.where(change > 0, 0.0, -change), period)
+            return avg_gain, avg_loss, indicators.rsi_from_averages(avg_gain, avg_loss)
+
+        def refresh(old):
+            change = close[-1] - close[-2]
+            avg_gain = _extend_last(old[0], max(change, 0.0), decay, 1.0 / period)
+            avg_loss = _extend_last(old[1], max(-change, 0.0), decay, 1.0 / period)
+            if avg_gain is None:
+                return None
+            rsi = old[2].copy()
+            rsi[-1] = indicators.rsi_from_averages(avg_gain[-1:], avg_loss[-1:])[0]
+            return avg_gain, avg_loss, rsi
+
+        return self._get('rsi', (period,), compute, refresh)[2]
+
+    def macd(self, fast=12, slow=26, signal=9):
+        close = self.series.close
+        alpha = 2.0 / (signal + 1)
+
+        def compute():
+            if len(close) < slow + signal:
+                return np.empty(0), np.empty(0), np.empty(0)
+            fast_ema, slow_ema = self.ema(fast), self.ema(slow)
+            macd_line = fast_ema[len(fast_ema) - len(slow_ema):] - slow_ema
+            signal_line = indicators.ema(macd_line, signal)
+            histogram = macd_line[len(macd_line) - len(signal_line):] - signal_line
+            return macd_line, signal_line, histogram
+
+        def refresh(old):
+            macd_line = _replace_last(old[0], self.ema(fast)[-1] - self.ema(slow)[-1])
+            signal_line = _extend_last(old[1], macd_line[-1], 1.0 - alpha, alpha) if macd_line is not None else None
+            if signal_line is None:
+                return None
+            return macd_line, signal_line, _replace_last(old[2], macd_line[-1] - signal_line[-1])
+
+        return self._get('macd', (fast, slow, signal), compute, refresh)
+
+    def stochastic(self, k_period=14, d_period=3):
+        s = self.series
+
+        def refresh(old):
+            k_values, d_values = old
+            if len(d_values) < 2:
+                return None
+            lowest = s.low[-k_period:].min()
+            span = s.high[-k_period:].max() - lowest
+            k_values = _replace_last(k_values, 50.0 if span == 0 else 100 * (s.close[-1] - lowest) / span)
+            return k_values, _replace_last(d_values, k_values[-d_period:].sum() / d_period)
+
+        return self._get('stochastic', (k_period, d_period),
+                         lambda: indicators.stochastic(s.high, s.low, s.close, k_period, d_period),
+                         refresh)
+
+    def adx(self, period=14):
+        s = self.series
+        decay = (period - 1) / period
+
+        def refresh(old):
+            if not old or len(old['adx']) < 2:
+                return None
+            plus_dm, minus_dm = indicators.directional_movement(s.high[-2:], s.low[-2:])
+            state = {
+                'plus_sum': _extend_last(old['plus_sum'], plus_dm[0], decay, 1.0),
+                'minus_sum': _extend_last(old['minus_sum'], minus_dm[0], decay, 1.0),
+                'tr_sum': _extend_last(old['tr_sum'], self._last_true_range(), decay, 1.0),
+            }
+            plus_di, minus_di, dx = indicators.directional_index(
+                state['plus_sum'][-1:], state['minus_sum'][-1:], state['tr_sum'][-1:])
+            state['plus_di'] = _replace_last(old['plus_di'], plus_di[0])
+            state['minus_di'] = _replace_last(old['minus_di'], minus_di[0])
+            state['adx'] = _extend_last(old['adx'], dx[0], decay, 1.0 / period)
+            return state
+
+        return self._get('adx', (period,),
+                         lambda: indicators.adx_state(s.high, s.low, s.close, period), refresh)
+
+    def supertrend(self, period=10, multiplier=3.0):
+        s = self.series
+
+        def bands_at(i, atr_values):
+            hl2 = (s.high[i] + s.low[i]) / 2
+            return hl2 + multiplier * atr_values[i], hl2 - multiplier * atr_values[i]
+
+        def refresh(old):
+            st, direction = old
+            atr_values = self.atr(period)
+            if len(st) < 2:
+                return None
+            upper, lower = bands_at(-1, atr_values)
+            last_st, last_dir = indicators.supertrend_path(
+                [float(upper)], [float(lower)], [float(s.close[-2])], [float(s.close[-1])], prev=st[-2])
+            return st[:-1] + last_st, direction[:-1] + last_dir
+
+        return self._get('supertrend', (period, multiplier),
+                         lambda: indicators.supertrend(s.high, s.low, s.close, period, multiplier,
+                                                       atr_values=self.atr(period)),
+                         refresh)
+
+    # ==================== Volume ====================
+
+    def vwap(self):
+        s = self.series
+
+        def compute():
+            tp = (s.high + s.low + s.close) / 3
+            cum_vol = np.cumsum(s.volume)
+            cum_tp_vol = np.cumsum(tp * s.volume)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return cum_vol, cum_tp_vol, np.where(cum_vol > 0, cum_tp_vol / cum_vol, tp)
+
+        def refresh(old):
+            cum_vol, cum_tp_vol, vwap = old
+            tp = (s.high[-1] + s.low[-1] + s.close[-1]) / 3
+            cum_vol = _replace_last(cum_vol, cum_vol[-2] + s.volume[-1])
+            if cum_vol is None:
+                return None
+            cum_tp_vol = _replace_last(cum_tp_vol, cum_tp_vol[-2] + tp * s.volume[-1])
+            vwap_last = cum_tp_vol[-1] / cum_vol[-1] if cum_vol[-1] > 0 else tp
+            return cum_vol, cum_tp_vol, _replace_last(vwap, vwap_last)
+
+        return self._get('vwap', (), compute, refresh)[2]
+
+    def obv(self):
+        s = self.series
+        return self._get('obv', (),
+                         lambda: indicators.obv(s.close, s.volume),
+                         lambda old: _replace_last(old, old[-2] + np.sign(s.close[-1] - s.close[-2]) * s.volume[-1]))
+
+    def avg_volume(self, lookback=20):
+        volume = self.series.volume
+        return self._get('avg_volume', (lookback,),
+                         lambda: float(volume[-lookback:].mean()) if len(volume) else 0)
+
+    # ==================== Candle shape / structure ====================
+
+    def avg_body(self, lookback=10):
+        s = self.series
+        return self._get('avg_body', (lookback,),
+                         lambda: float(abs(s.close[-lookback:] - s.open[-lookback:]).mean()) if len(s) else 0)
+
+    def swing_points(self, lookback, kind='high', radius=2):
+        """
+        Swing indices (into the full series) within the last `lookback` candles.
+
+        Swings are found once over the whole series per (kind, radius) and every
+        lookback slices that result, so the trend structure and S/R passes share it.
+        A swing is inside the window when its whole [i - radius, i + radius] span is.
+        """
+        values = self.series.high if kind == 'high' else self.series.low
+        start = max(0, len(values) - lookback)
+        idx = self._get('swing_points', (kind, radius),
+                        lambda: indicators.swing_points(values, radius, kind))
+        return idx[np.searchsorted(idx, start + radius):]
+
+    def strict_swings(self, lookback, field='high', kind='high'):
+        """
+        (index, value) pairs over the last `lookback` values of `field` ('open', 'high',
+        'low', 'close', 'volume' or 'obv') strictly above (kind='high') or below
+        (kind='low') both neighbours. Indices are into the window; OBV is rebased to 0
+        at the window start.
+        """
+        def compute():
+            if field == 'obv':
+                obv = self.obv()[-lookback:]
+                values = obv - obv[0]
+            else:
+                values = getattr(self.series, field)[-lookback:]
+            idx = indicators.strict_swing_points(values, kind)
+            return list(zip(idx.tolist(), values[idx].tolist()))
+
+        return self._get('strict_swings', (lookback, field, kind), compute)
+
+    def pattern_hits(self, start=0, body_lookback=10):
+        """
+        pattern_scanner.scan_patterns over bars [start:], judged against the average
+        body of the last `body_lookback` candles. Bar indices are relative to start.
+        """
+        s = self.series
+        return self._get('pattern_hits', (start, body_lookback),
+                         lambda: pattern_scanner.scan_patterns(s.open[start:], s.high[start:], s.low[start:],
+                                                               s.close[start:], avg_body=self.avg_body(body_lookback)))
+
+    def support_resistance(self, lookback=50, scales=(2,), tolerance_pct=0.3):
+        """
+        S/R level dicts over the last `lookback` candles from multi-scale swing
+        points (see support_resistance.py); each level's scale is the largest
+        swing radius among its members.
+        """
+        s = self.series
+
+        def compute():
+            n = len(s)
+            lookback_ = min(lookback, n)
+            if lookback_ < 5:
+                return []
+            start = n - lookback_
+            levels = []
+            for kind, level_type, values in (('high', 'resistance', s.high), ('low', 'support', s.low)):
+                scale_of = {}
+                for radius in sorted(scales):
+                    for i in self.swing_points(lookback_, kind, radius).tolist():
+                        scale_of[i] = radius
+                pivots = sorted((float(values[i]), r) for i, r in scale_of.items())
+                levels.extend(support_resistance.levels_from_pivots(
+                    [p for p, _ in pivots], [r for _, r in pivots], np.sort(values[start:]),
+                    level_type, tolerance_pct))
+            levels.sort(key=lambda x: x['level'])
+            return levels
+
+        return self._get('support_resistance', (lookback, tuple(scales), tolerance_pct), compute)
@@ -0,0 +1,411 @@
+"""
+Vectorized Indicator Kernels for Nifty Direction Conviction Engine
+
+NumPy implementations of the indicators used by the analysis layers.
+Every function takes contiguous float arrays and returns arrays aligned the
+same way as the original list-based methods in technical_analysis.py
+(e.g. an EMA of period p over n values returns n - p + 1 values).
+
+Recursive smoothers (EMA, Wilder RSI/ATR/ADX) are evaluated in closed form
+over blocks instead of a per-element Python loop — see _recurrence().
+"""
+
+import math
+from functools import lru_cache
+
+import numpy as np
+
+
+def _recurrence(x, decay, gain, init):
+    """
+    Evaluate y[k] = decay * y[k-1] + gain * x[k] with y[-1] = init, vectorized.
+
+    Within a block, y[k] = decay^(k+1) * init + gain * decay^k * cumsum(x[i] * decay^-i).
+    The block length is chosen so decay^-i never overflows; for the usual
+    periods a whole 2,000-bar series is a single block.
+
+    Args:
+        x (np.ndarray): Input values
+        decay (float): Weight on the previous output (0 <= decay < 1)
+        gain (float): Weight on the current input
+        init (float): Output value before x[0]
+
+    Returns:
+        np.ndarray: Outputs, same length as x
+    """
+    x = np.asarray(x, dtype=np.float64)
+    n = len(x)
+    if n == 0:
+        return np.empty(0)
+    if decay == 0:
+        return gain * x
+
+    pow_fwd, pow_inv = _powers(decay, max(16, int(575 / -math.log(decay))), n)
+    block = len(pow_fwd)
+
+    out = np.empty(n)
+    prev = init
+    for start in range(0, n, block):
+        xb = x[start:start + block]
+        size = len(xb)
+        acc = np.cumsum(xb * pow_inv[:size]) * pow_fwd[:size]
+        yb = (decay * pow_fwd[:size]) * prev + gain * acc
+        out[start:start + size] = yb
+        prev = yb[-1]
+    return out
+
+
+@lru_cache(maxsize=64)
+def _block_powers(decay, block):
+    j = np.arange(block, dtype=np.float64)
+    return decay ** j, decay ** -j
+
+
+def _powers(decay, max_block, n):
+    """decay^j and decay^-j for j < block, cached per (decay, block size bucket)."""
+    block = min(max_block, 1 << max(4, (n - 1).bit_length()))
+    return _block_powers(decay, block)
+
+
+def _window_reduce(data, window, ufunc):
+    """Apply a binary ufunc across each trailing window (len - window + 1 outputs)."""
+    data = np.asarray(data, dtype=np.float64)
+    size = len(data) - window + 1
+    out = data[:size].copy()
+    for k in range(1, window):
+        ufunc(out, data[k:k + size], out=out)
+    return out
+
+
+def sma(data, period):
+    """Simple moving average. Returns len(data) - period + 1 values."""
+    data = np.asarray(data, dtype=np.float64)
+    if period <= 0 or period > len(data):
+        raise ValueError(f"Period {period} invalid for data length {len(data)}")
+    csum = np.concatenate(([0.0], np.cumsum(data)))
+    return (csum[period:] - csum[:-period]) / period
+
+
+def ema(data, period):
+    """
+    Exponential moving average seeded with the SMA of the first `period` values.
+    Returns len(data) - period + 1 values.
+    """
+    data = np.asarray(data, dtype=np.float64)
+    if period <= 0 or period > len(data):
+        raise ValueError(f"Period {period} invalid for data length {len(data)}")
+    alpha = 2.0 / (period + 1)
+    seed = data[:period].sum() / period
+    rest = _recurrence(data[period:], 1.0 - alpha, alpha, seed)
+    return np.concatenate(([seed], rest))
+
+
+def wilder(data, period):
+    """
+    Wilder smoothing (alpha = 1/period) seeded with the mean of the first `period` values.
+    Returns len(data) - period + 1 values, or an empty array if there is not enough data.
+    """
+    data = np.asarray(data, dtype=np.float64)
+    if len(data) < period:
+        return np.empty(0)
+    seed = data[:period].sum() / period
+    rest = _recurrence(data[period:], (period - 1) / period, 1.0 / period, seed)
+    return np.concatenate(([seed], rest))
+
+
+def rsi(close, period=14):
+    """Relative Strength Index with Wilder's smoothing. Returns len(close) - period values."""
+    close = np.asarray(close, dtype=np.float64)
+    if len(close) < period + 1:
+        return np.empty(0)
+    change = np.diff(close)
+    gains = np.where(change > 0, change, 0.0)
+    losses = np.where(change > 0, 0.0, -change)
+
+    return rsi_from_averages(wilder(gains, period), wilder(losses, period))
+
+
+def rsi_from_averages(avg_gain, avg_loss):
+    """RSI from smoothed average gain / loss arrays (100 or 0 where the average loss is zero)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        out = 100 - (100 / (1 + rs))
+    zero_loss = avg_loss == 0
+    out[zero_loss] = np.where(avg_gain[zero_loss] > 0, 100.0, 0.0)
+    return out
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """
+    MACD line, signal line and histogram.
+
+    Returns:
+        tuple: (macd_line, signal_line, histogram) arrays, each aligned to its own end
+    """
+    close = np.asarray(close, dtype=np.float64)
+    if len(close) < slow + signal:
+        return np.empty(0), np.empty(0), np.empty(0)
+    fast_ema = ema(close, fast)
+    slow_ema = ema(close, slow)
+    macd_line = fast_ema[len(fast_ema) - len(slow_ema):] - slow_ema
+    signal_line = ema(macd_line, signal)
+    histogram = macd_line[len(macd_line) - len(signal_line):] - signal_line
+    return macd_line, signal_line, histogram
+
+
+def true_range(high, low, close):
+    """True range; the first bar has no previous close so it is high - low."""
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    tr = high - low
+    if len(tr) > 1:
+        prev_close = close[:-1]
+        tr[1:] = np.maximum(tr[1:], np.maximum(np.abs(high[1:] - prev_close), np.abs(low[1:] - prev_close)))
+    return tr
+
+
+def atr(high, low, close, period=14):
+    """Average True Range with Wilder's smoothing. Returns len - period + 1 values."""
+    if len(high) < 2:
+        return np.empty(0)
+    return wilder(true_range(high, low, close), period)
+
+
+def vwap(high, low, close, volume):
+    """Cumulative VWAP on the typical price (falls back to TP while volume is zero)."""
+    tp = (np.asarray(high, dtype=np.float64) + low + close) / 3
+    cum_vol = np.cumsum(volume, dtype=np.float64)
+    cum_tp_vol = np.cumsum(tp * volume)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(cum_vol > 0, cum_tp_vol / cum_vol, tp)
+
+
+def bollinger(close, period=20, std_dev=2):
+    """
+    Bollinger Bands (population standard deviation, like the list version).
+
+    Returns:
+        tuple: (upper, middle, lower), each len(close) - period + 1 values
+    """
+    close = np.asarray(close, dtype=np.float64)
+    if len(close) < period:
+        return np.empty(0), np.empty(0), np.empty(0)
+    middle = sma(close, period)
+    size = len(middle)
+    variance = np.zeros(size)
+    for k in range(period):
+        variance += (close[k:k + size] - middle) ** 2
+    std = np.sqrt(variance / period)
+    return middle + std_dev * std, middle, middle - std_dev * std
+
+
+def rolling_max(data, window):
+    """Max over each trailing window. Returns len - window + 1 values."""
+    return _window_reduce(data, window, np.maximum)
+
+
+def rolling_min(data, window):
+    """Min over each trailing window. Returns len - window + 1 values."""
+    return _window_reduce(data, window, np.minimum)
+
+
+def stochastic(high, low, close, k_period=14, d_period=3):
+    """
+    Stochastic oscillator.
+
+    Returns:
+        tuple: (%K, %D) arrays; %K is 50 wherever the window range is zero
+    """
+    close = np.asarray(close, dtype=np.float64)
+    if len(close) < k_period:
+        return np.empty(0), np.empty(0)
+    highest = rolling_max(high, k_period)
+    lowest = rolling_min(low, k_period)
+    span = highest - lowest
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = np.where(span == 0, 50.0, 100 * (close[k_period - 1:] - lowest) / span)
+    d = sma(k, d_period) if len(k) >= d_period else np.empty(0)
+    return k, d
+
+
+def obv(close, volume, start=None):
+    """
+    On Balance Volume.
+
+    Args:
+        start: OBV value at the first bar (defaults to the first bar's volume)
+    """
+    close = np.asarray(close, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+    if len(close) == 0:
+        return np.empty(0)
+    signed = np.sign(np.diff(close)) * volume[1:]
+    first = volume[0] if start is None else start
+    return np.concatenate(([first], first + np.cumsum(signed)))
+
+
+def directional_movement(high, low):
+    """+DM and -DM for each bar after the first."""
+    high_diff = high[1:] - high[:-1]
+    low_diff = low[:-1] - low[1:]
+    plus_dm = np.where((high_diff > 0) & (high_diff > low_diff), high_diff, 0.0)
+    minus_dm = np.where((low_diff > 0) & (low_diff > high_diff), low_diff, 0.0)
+    return plus_dm, minus_dm
+
+
+def adx_state(high, low, close, period=14):
+    """
+    ADX together with the Wilder sums it is built from (so it can be extended bar by bar).
+
+    Returns:
+        dict of arrays: plus_sum, minus_sum, tr_sum, plus_di, minus_di, adx
+        (empty dict if there is not enough data)
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    if len(high) < period + 1:
+        return {}
+
+    plus_dm, minus_dm = directional_movement(high, low)
+    tr = true_range(high, low, close)[1:]
+
+    decay = (period - 1) / period
+
+    def smoothed_sum(x):
+        seed = x[:period].sum()
+        return np.concatenate(([seed], _recurrence(x[period:], decay, 1.0, seed)))
+
+    state = {
+        'plus_sum': smoothed_sum(plus_dm),
+        'minus_sum': smoothed_sum(minus_dm),
+        'tr_sum': smoothed_sum(tr),
+    }
+    plus_di, minus_di, dx = directional_index(state['plus_sum'], state['minus_sum'], state['tr_sum'])
+    state['plus_di'] = plus_di
+    state['minus_di'] = minus_di
+    state['adx'] = np.concatenate(([dx[0]], _recurrence(dx[1:], decay, 1.0 / period, dx[0])))
+    return state
+
+
+def directional_index(plus_sum, minus_sum, tr_sum):
+    """+DI, -DI and DX from smoothed directional movement and true range sums."""
+    plus_sum, minus_sum, tr_sum = (np.asarray(x, dtype=np.float64) for x in (plus_sum, minus_sum, tr_sum))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        plus_di = np.where(tr_sum > 0, 100 * plus_sum / tr_sum, 0.0)
+        minus_di = np.where(tr_sum > 0, 100 * minus_sum / tr_sum, 0.0)
+        di_sum = plus_di + minus_di
+        dx = np.where(di_sum > 0, 100 * np.abs(plus_di - minus_di) / di_sum, 0.0)
+    return plus_di, minus_di, dx
+
+
+def adx(high, low, close, period=14):
+    """
+    Average Directional Index with +DI / -DI (Wilder smoothing of sums).
+
+    Returns:
+        tuple: (adx, plus_di, minus_di) arrays
+    """
+    state = adx_state(high, low, close, period)
+    if not state:
+        return np.empty(0), np.empty(0), np.empty(0)
+    return state['adx'], state['plus_di'], state['minus_di']
+
+
+def supertrend(high, low, close, period=10, multiplier=3.0, atr_values=None):
+    """
+    Supertrend bands and direction, matching TechnicalAnalyzer.compute_supertrend.
+
+    Args:
+        atr_values: Precomputed ATR(period) over the same bars, if already available
+
+    Returns:
+        tuple: (supertrend, direction) lists
+    """
+    n = len(close)
+    if n < period + 1:
+        return [], []
+    if atr_values is None:
+        atr_values = atr(high, low, close, period)
+    if len(atr_values) == 0:
+        return [], []
+
+    offset = n - len(atr_values)
+    hl2 = (np.asarray(high[offset:], dtype=np.float64) + low[offset:]) / 2
+    upper = (hl2 + multiplier * atr_values).tolist()
+    lower = (hl2 - multiplier * atr_values).tolist()
+    closes = np.asarray(close, dtype=np.float64)[offset:].tolist()
+    prev_closes = np.asarray(close, dtype=np.float64)[offset - 1:n - 1].tolist() if offset else [closes[0]] + closes[:-1]
+    return supertrend_path(upper, lower, prev_closes, closes)
+
+
+def supertrend_path(upper, lower, prev_closes, closes, prev=None):
+    """
+    Walk the Supertrend band logic over basic upper/lower bands.
+
+    The band update depends on the previous output, so this is a single tight
+    loop over Python floats rather than a vectorized expression.
+
+    Args:
+        upper, lower: Basic bands (hl2 +/- multiplier * ATR) as lists
+        prev_closes, closes: Previous and current close for each bar
+        prev: Supertrend value before the first bar; None if upper[0] is the very first bar
+
+    Returns:
+        tuple: (supertrend, direction) lists
+    """
+    st = []
+    direction = []
+    st_append = st.append
+    dir_append = direction.append
+    start = 0
+
+    if prev is None:
+        # First bar: bearish unless the close is above the upper band
+        dir_val = -1 if closes[0] <= upper[0] else 1
+        prev = lower[0] if dir_val == -1 else upper[0]
+        st_append(prev)
+        dir_append(dir_val)
+        start = 1
+
+    # Later bars: a band only moves if it tightens or the previous close crossed it
+    for ub, lb, prev_close, c in zip(upper[start:], lower[start:], prev_closes[start:], closes[start:]):
+        if not (ub < prev or prev_close > prev):
+            ub = prev
+        if c >= ub:
+            prev = ub
+            dir_append(1)
+        else:
+            if not (lb > prev or prev_close < prev):
+                lb = prev
+            prev = lb
+            dir_append(-1)
+        st_append(prev)
+
+    return st, direction
+
+
+def strict_swing_points(values, kind="high"):
+    """Indices of values strictly above (kind='high') or below (kind='low') both neighbours."""
+    values = np.asarray(values, dtype=np.float64)
+    mid, left, right = values[1:-1], values[:-2], values[2:]
+    if kind == "low":
+        mask = (mid < left) & (mid < right)
+    else:
+        mask = (mid > left) & (mid > right)
+    return np.flatnonzero(mask) + 1
+
+
+def swing_points(values, radius=2, kind="high"):
+    """
+    Indices where a value equals the max (kind='high') or min (kind='low') of the
+    centred window [i - radius, i + radius]. Ties count as swings.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    width = 2 * radius + 1
+    if len(values) < width:
+        return np.empty(0, dtype=np.int64)
+    extreme = rolling_max(values, width) if kind == "high" else rolling_min(values, width)
+    centre = values[radius:len(values) - radius]
+    return np.flatnonzero(centre == extreme) + radius
@@ -0,0 +1,258 @@
+"""
+Vectorized Candlestick Pattern Scanner for Nifty Direction Conviction Engine
+
+Evaluates every CandlestickAnalyzer pattern over every bar of a series — or of
+a (symbols x bars) matrix — in one pass of NumPy comparisons, and returns the
+hits as a sparse pattern/confidence matrix (PatternHits).
+
+The rules and confidence formulas are exactly those of the
+CandlestickAnalyzer.detect_* methods, which now delegate here; the market
+scanner, backtests and chart markers read the same hits.
+
+"Small" / "big" body tests compare against the average body size. By default
+that is a rolling average of the last `body_lookback` bodies ending at each bar
+(so every bar is judged as it would have been live); pass a scalar avg_body to
+judge all bars against one value, as get_candlestick_score does.
+"""
+
+import numpy as np
+
+from .candle_series import CandleSeries
+
+
+# (key, display name, type, base score used by get_candlestick_score)
+PATTERNS = (
+    ("bullish_engulfing", "Bullish Engulfing", "bullish", 1.0),
+    ("bearish_engulfing", "Bearish Engulfing", "bearish", -1.0),
+    ("hammer", "Hammer", "bullish", 0.7),
+    ("inverted_hammer", "Inverted Hammer", "bullish", 0.5),
+    ("dragonfly_doji", "Dragonfly Doji", "bullish", 0.6),
+    ("gravestone_doji", "Gravestone Doji", "bearish", -0.6),
+    ("morning_star", "Morning Star", "bullish", 1.2),
+    ("evening_star", "Evening Star", "bearish", -1.2),
+    ("three_white_soldiers", "Three White Soldiers", "bullish", 1.5),
+    ("three_black_crows", "Three Black Crows", "bearish", -1.5),
+    ("piercing_pattern", "Piercing Pattern", "bullish", 0.6),
+    ("dark_cloud_cover", "Dark Cloud Cover", "bearish", -0.6),
+    ("shooting_star", "Shooting Star", "bearish", -0.7),
+    ("doji", "Doji", "neutral", 0.0),
+)
+
+PATTERN_KEYS = tuple(p[0] for p in PATTERNS)
+PATTERN_INDEX = {key: i for i, key in enumerate(PATTERN_KEYS)}
+
+# Candles a pattern spans (the pattern is reported on its last candle)
+PATTERN_SPAN = {key: 1 for key in PATTERN_KEYS}
+PATTERN_SPAN.update({
+    "bullish_engulfing": 2, "bearish_engulfing": 2, "piercing_pattern": 2, "dark_cloud_cover": 2,
+    "morning_star": 3, "evening_star": 3, "three_white_soldiers": 3, "three_black_crows": 3,
+})
+
+
+class PatternHits:
+    """
+    Sparse (row, bar, pattern) -> confidence matrix in coordinate form.
+
+    Attributes:
+        rows, bars, patterns (np.ndarray): int coordinates of each hit; patterns index PATTERNS
+        confidence (np.ndarray): float confidence (0-1) of each hit
+        shape (tuple): (n_rows, n_bars) of the scanned input; n_rows is 1 for a single series
+    """
+
+    def __init__(self, rows, bars, patterns, confidence, shape):
+        self.rows = rows
+        self.bars = bars
+        self.patterns = patterns
+        self.confidence = confidence
+        self.shape = shape
+
+    def __len__(self):
+        return len(self.bars)
+
+    def select(self, row=None, bars=None, pattern=None):
+        """
+        Subset of hits.
+
+        Args:
+            row: Keep only this row (symbol index)
+            bars: Keep only bars in this range (e.g. range(n - 3, n)) or one int bar
+            pattern: Keep only this pattern key
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if row is not None:
+            mask &= self.rows == row
+        if bars is not None:
+            if isinstance(bars, range):
+                mask &= (self.bars >= bars.start) & (self.bars < bars.stop)
+            else:
+                mask &= self.bars == bars
+        if pattern is not None:
+            mask &= self.patterns == PATTERN_INDEX[pattern]
+        return PatternHits(self.rows[mask], self.bars[mask], self.patterns[mask],
+                           self.confidence[mask], self.shape)
+
+    def keys(self):
+        """Pattern key of each hit."""
+        return [PATTERN_KEYS[p] for p in self.patterns.tolist()]
+
+    def to_records(self):
+        """List of {row, bar, pattern, name, type, confidence} dicts, ordered by row, bar, pattern."""
+        return [
+            {
+                "row": r, "bar": b, "pattern": PATTERNS[p][0], "name": PATTERNS[p][1],
+                "type": PATTERNS[p][2], "confidence": c,
+            }
+            for r, b, p, c in zip(self.rows.tolist(), self.bars.tolist(),
+                                  self.patterns.tolist(), self.confidence.tolist())
+        ]
+
+    def dense(self):
+        """Dense (n_rows, n_patterns, n_bars) confidence array (NaN where no pattern)."""
+        out = np.full((self.shape[0], len(PATTERNS), self.shape[1]), np.nan)
+        out[self.rows, self.patterns, self.bars] = self.confidence
+        return out
+
+    def counts(self):
+        """{pattern key: number of hits}."""
+        totals = np.bincount(self.patterns, minlength=len(PATTERNS))
+        return {key: int(n) for key, n in zip(PATTERN_KEYS, totals) if n}
+
+
+# ==================== Core ====================
+
+def _shift(x, k):
+    """x delayed by k bars along the last axis (first k bars NaN)."""
+    out = np.full_like(x, np.nan)
+    out[..., k:] = x[..., :-k]
+    return out
+
+
+def _rolling_mean(x, window):
+    """Mean of the last `window` values ending at each position (expanding at the start)."""
+    n = x.shape[-1]
+    csum = np.cumsum(x, axis=-1)
+    total = csum.copy()
+    total[..., window:] -= csum[..., :-window]
+    count = np.minimum(np.arange(1, n + 1), window)
+    return total / count
+
+
+def evaluate_patterns(open, high, low, close, avg_body=None, body_lookback=10):
+    """
+    Dense pattern evaluation.
+
+    Args:
+        open, high, low, close: Arrays of shape (n,) or (symbols, n)
+        avg_body: Scalar average body, or None for a rolling average of `body_lookback` bars
+        body_lookback: Window of the rolling average body
+
+    Returns:
+        dict of pattern key -> (hit mask, confidence), arrays shaped like the input
+    """
+    o = np.asarray(open, dtype=np.float64)
+    h = np.asarray(high, dtype=np.float64)
+    l = np.asarray(low, dtype=np.float64)
+    c = np.asarray(close, dtype=np.float64)
+
+    body = np.abs(c - o)
+    upper = h - np.maximum(o, c)
+    lower = np.minimum(o, c) - l
+    rng = h - l
+    bull = c > o
+    bear = c < o
+    avg = _rolling_mean(body, body_lookback) if avg_body is None else np.float64(avg_body)
+
+    # Previous candles (NaN before the start -> every comparison is False)
+    o1, c1, b1, r1 = _shift(o, 1), _shift(c, 1), _shift(body, 1), _shift(rng, 1)
+    o2, c2, b2, r2 = _shift(o, 2), _shift(c, 2), _shift(body, 2), _shift(rng, 2)
+    bull1, bear1 = c1 > o1, c1 < o1
+    bull2, bear2 = c2 > o2, c2 < o2
+    bar = np.arange(o.shape[-1])
+    has1, has2 = bar >= 1, bar >= 2
+
+    out = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Engulfing
+        hit = has1 & bear1 & bull & (c > o1) & (o < c1)
+        out["bullish_engulfing"] = hit, np.minimum(1.0, (c - o) / (o1 - c1) * 0.5 + 0.5)
+        hit = has1 & bull1 & bear & (o > c1) & (c < o1)
+        out["bearish_engulfing"] = hit, np.minimum(1.0, (c1 - o1) / (o - c) * 0.5 + 0.5)
+
+        # Hammer family: small body, one long shadow, the other short
+        small = ~((avg > 0) & (body > avg * 1.5))
+        long_lower = small & ~(lower < body * 2) & ~(upper > body * 0.5)
+        long_upper = small & ~(upper < body * 2) & ~(lower > body * 0.5)
+        out["hammer"] = long_lower, np.where(body > 0, np.minimum(1.0, (lower / body) / 5.0), 0.5)
+        upper_conf = np.where(body > 0, np.minimum(1.0, (upper / body) / 5.0), 0.5)
+        out["inverted_hammer"] = long_upper, upper_conf
+        prior_not_bull = has1 & (c1 <= o1)
+        out["shooting_star"] = long_upper, np.where(prior_not_bull, 0.6,
+                                                    np.where(body > 0, upper_conf, 0.7))
+
+        # Doji family
+        ratio = body / rng
+        doji = (rng != 0) & (ratio <= 0.1)
+        doji_conf = 1.0 - ratio * 10
+        out["doji"] = doji, doji_conf
+        out["dragonfly_doji"] = doji & (lower > body * 2) & (upper < body * 0.5), np.minimum(doji_conf, 0.9)
+        out["gravestone_doji"] = doji & (upper > body * 2) & (lower < body * 0.5), np.minimum(doji_conf, 0.9)
+
+        # Stars: big first candle, small middle, big third closing past the first's midpoint
+        middle = ~((avg > 0) & (b2 < avg)) & ~(b1 > avg) & ~(body < avg)
+        star_conf = np.minimum(1.0, body / (avg * 2))
+        mid2 = (o2 + c2) / 2
+        out["morning_star"] = has2 & bear2 & middle & bull & (c > mid2), star_conf
+        out["evening_star"] = has2 & bull2 & middle & bear & (c < mid2), star_conf
+
+        # Three soldiers / crows
+        gap_up = (np.where(r2 > 0, np.maximum(0, o1 - c2) / r2, 0) +
+                  np.where(r1 > 0, np.maximum(0, o - c1) / r1, 0))
+        hit = has2 & bull2 & bull1 & bull & (c1 > c2) & (c > c1)
+        out["three_white_soldiers"] = hit, np.minimum(1.0, 0.5 + gap_up / 2)
+        gap_down = (np.where(r2 > 0, np.maximum(0, c2 - o1) / r2, 0) +
+                    np.where(r1 > 0, np.maximum(0, c1 - o) / r1, 0))
+        hit = has2 & bear2 & bear1 & bear & (c1 < c2) & (c < c1)
+        out["three_black_crows"] = hit, np.minimum(1.0, 0.5 + gap_down / 2)
+
+        # Piercing / dark cloud
+        mid1 = (o1 + c1) / 2
+        hit = has1 & bear1 & bull & ~(o >= c1) & (c > mid1)
+        out["piercing_pattern"] = hit, np.minimum(1.0, (c - c1) / (o1 - c1))
+        hit = has1 & bull1 & bear & ~(o <= c1) & (c < mid1)
+        out["dark_cloud_cover"] = hit, np.minimum(1.0, (o1 - c) / (c1 - o1))
+
+    return out
+
+
+def scan_patterns(open, high, low, close, avg_body=None, body_lookback=10, patterns=None):
+    """
+    Every pattern over every bar, as a sparse PatternHits matrix.
+
+    Args:
+        open, high, low, close: Arrays of shape (n,) or (symbols, n)
+        avg_body: Scalar average body, or None for the rolling average
+        body_lookback: Window of the rolling average body
+        patterns: Optional subset of pattern keys
+
+    Returns:
+        PatternHits ordered by row, bar, then PATTERNS order
+    """
+    evaluated = evaluate_patterns(open, high, low, close, avg_body, body_lookback)
+    keys = [k for k in PATTERN_KEYS if patterns is None or k in patterns]
+
+    hits = np.stack([evaluated[k][0] for k in keys])
+    conf = np.stack([evaluated[k][1] for k in keys])
+    if hits.ndim == 2:
+        hits, conf = hits[:, None, :], conf[:, None, :]
+
+    # (pattern, row, bar) -> sort by (row, bar, pattern)
+    p, r, b = np.nonzero(hits)
+    order = np.lexsort((p, b, r))
+    pattern_ids = np.array([PATTERN_INDEX[k] for k in keys], dtype=np.intp)[p[order]]
+    return PatternHits(r[order], b[order], pattern_ids, conf[p, r, b][order], hits.shape[1:])
+
+
+def scan_series(candles, avg_body=None, body_lookback=10, patterns=None):
+    """scan_patterns over a CandleSeries or list of candle dicts."""
+    s = CandleSeries.from_candles(candles)
+    return scan_patterns(s.open, s.high, s.low, s.close, avg_body, body_lookback, patterns)
@@ -4,11 +4,16 @@ Price Action Analyzer - Layer 4 of Nifty Direction Conviction Engine
 This module analyzes price action patterns, volume behavior, trend structures, and support/resistance
 levels to generate conviction signals for trading direction.
 
-Pure Python implementation with no external dependencies.
+Swing detection, touch counting and volume statistics run on the NumPy columns
+of a CandleSeries (see candle_series.py).
 """
 
 from typing import List, Dict, Tuple, Optional, Union
-from statistics import mean, stdev
+
+import numpy as np
+
+from .candle_series import CandleSeries
+from .indicator_cache import SeriesIndicators
 
 
 class PriceActionAnalyzer:
@@ -23,10 +28,10 @@ class PriceActionAnalyzer:
     - Price-volume divergences
     - Pivot points
 
-    All methods operate on pure Python without external dependencies.
+    All methods read from one CandleSeries, which can be shared with the other analyzers.
     """
 
-    def __init__(self, candles: List[Dict[str, Union[float, str]]]):
+    def __init__(self, candles: Union[List[Dict[str, Union[float, str]]], CandleSeries], cache=None):
         """
         Initialize the analyzer with candle data.
 
@@ -34,6 +39,8 @@ class PriceActionAnalyzer:
             candles: List of candle dictionaries with keys:
                     'date' (str), 'open' (float), 'high' (float),
                     'low' (float), 'close' (float), 'volume' (float)
+                    or a CandleSeries shared with the other analyzers
+            cache: Optional IndicatorCache shared with the other layers
 
         Raises:
             ValueError: If candles list is empty or malformed
@@ -41,27 +48,28 @@ class PriceActionAnalyzer:
         if not candles:
             raise ValueError("Candles list cannot be empty")
 
-        required_keys = {'open', 'high', 'low', 'close', 'volume'}
-        if not all(required_keys.issubset(c.keys()) for c in candles):
-            raise ValueError(f"Each candle must contain keys: {required_keys}")
-
-        self.candles = candles
-        self.length = len(candles)
+        self.series = CandleSeries.from_candles(candles)
+        self.candles = self.series.candles
+        self.length = len(self.series)
+        self.ind = SeriesIndicators(self.series, cache)
 
     # ==================== Support & Resistance ====================
 
-    def identify_support_resistance(self, lookback: int = 50) -> List[Dict[str, Union[float, str, int]]]:
+    def identify_support_resistance(self, lookback: int = 50,
+                                    scales: Tuple[int, ...] = (2,)) -> List[Dict[str, Union[float, str, int]]]:
         """
         Identify key support and resistance levels from swing highs and lows.
 
         Algorithm:
         1. Find local maxima (swing highs) and local minima (swing lows) using 5-candle window
-        2. Group nearby levels (within 0.3% of each other)
-        3. Count touches at each level
+           (plus wider windows when more than one scale is given)
+        2. Group nearby levels (within 0.3% of each other) in one sweep over the sorted prices
+        3. Count touches at each level by binary search on the sorted highs / lows
         4. Assign strength based on number of touches
 
         Args:
             lookback: Number of recent candles to analyze (default: 50)
+            scales: Swing radii to detect pivots at (default: (2,), the 5-candle window)
 
         Returns:
             List of dicts with keys:
@@ -69,90 +77,10 @@ class PriceActionAnalyzer:
             - type: "support" or "resistance"
             - touches: int, number of times price touched this level
             - strength: "weak", "moderate", or "strong"
+            - scale: int, largest swing radius among the level's pivots
         """
-        lookback = min(lookback, self.length)
-        start_idx = max(0, self.length - lookback)
-        candles_slice = self.candles[start_idx:]
-
-        if len(candles_slice) < 5:
-            return []
-
-        swing_highs = []
-        swing_lows = []
-
-        # Find swing highs and lows using 5-candle window
-        for i in range(2, len(candles_slice) - 2):
-            high_prices = [candles_slice[j]['high'] for j in range(i - 2, i + 3)]
-            low_prices = [candles_slice[j]['low'] for j in range(i - 2, i + 3)]
-
-            current_high = candles_slice[i]['high']
-            current_low = candles_slice[i]['low']
-
-            # Check if current candle is swing high (highest in 5-candle window)
-            if current_high == max(high_prices):
-                swing_highs.append((start_idx + i, current_high))
-
-            # Check if current candle is swing low (lowest in 5-candle window)
-            if current_low == min(low_prices):
-                swing_lows.append((start_idx + i, current_low))
-
-        # Group levels within 0.3% tolerance
-        def group_levels(prices: List[float], tolerance_pct: float = 0.3) -> List[List[float]]:
-            if not prices:
-                return []
-
-            sorted_prices = sorted(prices)
-            groups = []
-            current_group = [sorted_prices[0]]
-
-            for price in sorted_prices[1:]:
-                tolerance = current_group[0] * (tolerance_pct / 100)
-                if price <= current_group[0] + tolerance:
-                    current_group.append(price)
-                else:
-                    groups.append(current_group)
-                    current_group = [price]
-
-            groups.append(current_group)
-            return groups
-
-        resistance_prices = [sh[1] for sh in swing_highs]
-        support_prices = [sl[1] for sl in swing_lows]
-
-        resistance_groups = group_levels(resistance_prices)
-        support_groups = group_levels(support_prices)
-
-        sr_levels = []
-
-        # Process resistance levels
-        for group in resistance_groups:
-            level = mean(group)
-            # Count touches (candles that reached this level)
-            touches = sum(1 for c in candles_slice if c['high'] >= level * 0.997 and c['high'] <= level * 1.003)
-            strength = self._get_strength(touches)
-            sr_levels.append({
-                'level': round(level, 2),
-                'type': 'resistance',
-                'touches': touches,
-                'strength': strength
-            })
-
-        # Process support levels
-        for group in support_groups:
-            level = mean(group)
-            # Count touches (candles that reached this level)
-            touches = sum(1 for c in candles_slice if c['low'] >= level * 0.997 and c['low'] <= level * 1.003)
-            strength = self._get_strength(touches)
-            sr_levels.append({
-                'level': round(level, 2),
-                'type': 'support',
-                'touches': touches,
-                'strength': strength
-            })
-
-        # Sort by level
-        sr_levels.sort(key=lambda x: x['level'])
-        return sr_levels
+        # Copies: the cached list is shared with later analyzers of the same series
+        return [dict(level) for level in self.ind.support_resistance(lookback, tuple(scales))]
 
     def _get_strength(self, touches: int) -> str:
         """Determine strength level based on number of touches."""
@@ -180,25 +108,14 @@ class PriceActionAnalyzer:
             - lower_lows: bool, true if recent lows are lower
         """
         lookback = min(lookback, self.length)
-        start_idx = max(0, self.length - lookback)
-        candles_slice = self.candles[start_idx:]
-
-        if len(candles_slice) < 5:
+        if lookback < 5:
             return self._default_trend_structure()
 
         # Find swing highs and lows
-        swing_highs = []
-        swing_lows = []
-
-        for i in range(2, len(candles_slice) - 2):
-            high_prices = [candles_slice[j]['high'] for j in range(i - 2, i + 3)]
-            low_prices = [candles_slice[j]['low'] for j in range(i - 2, i + 3)]
-
-            if candles_slice[i]['high'] == max(high_prices):
-                swing_highs.append((start_idx + i, candles_slice[i]['high']))
-
-            if candles_slice[i]['low'] == min(low_prices):
-                swing_lows.append((start_idx + i, candles_slice[i]['low']))
+        high_idx = self.ind.swing_points(lookback, 'high')
+        low_idx = self.ind.swing_points(lookback, 'low')
+        swing_highs = list(zip(high_idx.tolist(), self.series.high[high_idx].tolist()))
+        swing_lows = list(zip(low_idx.tolist(), self.series.low[low_idx].tolist()))
 
         if len(swing_highs) < 2 or len(swing_lows) < 2:
             return self._default_trend_structure()
@@ -268,15 +185,13 @@ class PriceActionAnalyzer:
                 'candles_above_below': 0
             }
 
-        current_close = self.candles[-1]['close']
-        current_high = self.candles[-1]['high']
-        current_low = self.candles[-1]['low']
-        current_volume = self.candles[-1]['volume']
+        closes = self.series.close
+        current_close = closes[-1]
+        current_volume = self.series.volume[-1]
 
         # Calculate average volume from last 20 candles
-        lookback_vol = min(20, self.length)
-        avg_volume = mean([c['volume'] for c in self.candles[-lookback_vol:]])
-        volume_confirmed = current_volume > (avg_volume * 1.5)
+        avg_volume = self.ind.avg_volume(20)
+        volume_confirmed = bool(current_volume > (avg_volume * 1.5))
 
         is_breakout = False
         breakout_type = None
@@ -294,7 +209,7 @@ class PriceActionAnalyzer:
                 breakout_type = 'bullish'
                 level_broken = level
                 # Count candles that closed above this level
-                candles_above_below = sum(1 for c in self.candles[-10:] if c['close'] > level)
+                candles_above_below = int(np.count_nonzero(closes[-10:] > level))
                 break
             elif level_type == 'support' and current_close < level:
                 # Bearish breakout
@@ -302,7 +217,7 @@ class PriceActionAnalyzer:
                 breakout_type = 'bearish'
                 level_broken = level
                 # Count candles that closed below this level
-                candles_above_below = sum(1 for c in self.candles[-10:] if c['close'] < level)
+                candles_above_below = int(np.count_nonzero(closes[-10:] < level))
                 break
 
         return {
@@ -338,16 +253,16 @@ class PriceActionAnalyzer:
                 'volume_confirms_price': False
             }
 
-        candles_slice = self.candles[-lookback:]
-        volumes = [c['volume'] for c in candles_slice]
+        volume = self.series.volume
+        second_len = lookback - lookback // 2
 
-        avg_volume = mean(volumes)
-        current_volume = candles_slice[-1]['volume']
+        avg_volume = self.ind.avg_volume(lookback)
+        current_volume = float(volume[-1])
         current_volume_ratio = current_volume / avg_volume if avg_volume > 0 else 0.0
 
         # Determine volume trend
-        first_half_avg = mean(volumes[:len(volumes)//2])
-        second_half_avg = mean(volumes[len(volumes)//2:])
+        first_half_avg = float(volume[-lookback:len(volume) - second_len].mean())
+        second_half_avg = self.ind.avg_volume(second_len)
 
         if second_half_avg > first_half_avg * 1.1:
             volume_trend = 'INCREASING'
@@ -357,12 +272,10 @@ class PriceActionAnalyzer:
             volume_trend = 'STABLE'
 
         # Check if volume confirms price direction
-        current_close = candles_slice[-1]['close']
-        current_open = candles_slice[-1]['open']
-        price_up = current_close > current_open
+        price_up = self.series.close[-1] > self.series.open[-1]
 
         # Calculate average volume of last 5 candles
-        recent_vol_avg = mean([c['volume'] for c in candles_slice[-5:]])
+        recent_vol_avg = self.ind.avg_volume(min(5, lookback))
 
         # Rising price + rising volume OR falling price + rising volume = confirmation
         volume_confirms_price = False
@@ -404,30 +317,11 @@ class PriceActionAnalyzer:
                 'description': 'Not enough data for divergence analysis'
             }
 
-        candles_slice = self.candles[-lookback:]
-
-        # Calculate OBV
-        obv = self._calculate_obv(candles_slice)
-
-        # Find swing lows in price and OBV
-        price_lows = []
-        obv_lows = []
-
-        for i in range(1, len(candles_slice) - 1):
-            if candles_slice[i]['low'] < candles_slice[i-1]['low'] and candles_slice[i]['low'] < candles_slice[i+1]['low']:
-                price_lows.append((i, candles_slice[i]['low']))
-            if obv[i] < obv[i-1] and obv[i] < obv[i+1]:
-                obv_lows.append((i, obv[i]))
-
-        # Find swing highs in price and OBV
-        price_highs = []
-        obv_highs = []
-
-        for i in range(1, len(candles_slice) - 1):
-            if candles_slice[i]['high'] > candles_slice[i-1]['high'] and candles_slice[i]['high'] > candles_slice[i+1]['high']:
-                price_highs.append((i, candles_slice[i]['high']))
-            if obv[i] > obv[i-1] and obv[i] > obv[i+1]:
-                obv_highs.append((i, obv[i]))
+        # Find strict swing lows and highs (beyond both neighbours) in price and OBV
+        price_lows = self.ind.strict_swings(lookback, 'low', 'low')
+        obv_lows = self.ind.strict_swings(lookback, 'obv', 'low')
+        price_highs = self.ind.strict_swings(lookback, 'high', 'high')
+        obv_highs = self.ind.strict_swings(lookback, 'obv', 'high')
 
         has_divergence = False
         divergence_type = None
@@ -453,25 +347,6 @@ class PriceActionAnalyzer:
             'description': description
         }
 
-    def _calculate_obv(self, candles: List[Dict]) -> List[float]:
-        """Calculate On-Balance Volume (OBV) for a series of candles."""
-        obv = []
-        obv_value = 0.0
-
-        for candle in candles:
-            close = candle['close']
-            prev_close = candles[max(0, candles.index(candle) - 1)]['close'] if candles.index(candle) > 0 else close
-            volume = candle['volume']
-
-            if close > prev_close:
-                obv_value += volume
-            elif close < prev_close:
-                obv_value -= volume
-
-            obv.append(obv_value)
-
-        return obv
-
     # ==================== Pivot Points ====================
 
     def compute_pivot_points(self) -> Dict[str, float]:
@@ -0,0 +1,388 @@
+"""
+Support / Resistance Engine for Nifty Direction Conviction Engine
+
+Sweep-line S/R detection on sorted arrays:
+
+- pivots: multi-scale swing highs / lows (a bar is a pivot at scale r when it is
+  the extreme of its [i - left, i + right] window)
+- clustering: one pass over the sorted pivot prices; each group boundary is found
+  by binary search (anchored tolerance) or from consecutive gaps (chained)
+- touches: candles whose high / low lies inside a level's band, counted with two
+  binary searches per level on the sorted window instead of a scan per level
+
+SupportResistanceTracker keeps one symbol's bars, confirmed pivots and sorted
+windows up to date as each bar arrives (or the forming bar is revised);
+LevelCache holds one tracker per symbol so repeated requests for the same
+symbol only process the bars that are new since the last call.
+"""
+
+import threading
+from bisect import bisect_left, bisect_right, insort
+from statistics import mean
+
+import numpy as np
+
+from . import indicators
+
+
+# ==================== Array kernels ====================
+
+def pivot_indices(values, left, right=None, kind="high"):
+    """
+    Indices i (left <= i < n - right) where values[i] equals the max (kind='high')
+    or min (kind='low') of values[i - left : i + right + 1]. Ties count; NaN never does.
+    """
+    right = left if right is None else right
+    values = np.asarray(values, dtype=np.float64)
+    width = left + right + 1
+    if len(values) < width:
+        return np.empty(0, dtype=np.int64)
+    extreme = indicators.rolling_max(values, width) if kind == "high" else indicators.rolling_min(values, width)
+    centre = values[left:len(values) - right]
+    return np.flatnonzero(centre == extreme) + left
+
+
+def multi_scale_pivots(values, scales=(2,), kind="high"):
+    """
+    Union of symmetric pivots over several radii.
+
+    Returns:
+        (indices, scale): sorted unique pivot indices and, for each, the largest
+        radius at which it is still a pivot
+    """
+    scale_of = {}
+    for radius in sorted(scales):
+        for i in pivot_indices(values, radius, radius, kind).tolist():
+            scale_of[i] = radius
+    idx = np.array(sorted(scale_of), dtype=np.int64)
+    return idx, np.array([scale_of[i] for i in idx.tolist()], dtype=np.int64)
+
+
+def anchored_group_starts(sorted_prices, tolerance_pct):
+    """
+    Group boundaries in sorted prices where a group holds every price within
+    tolerance_pct % above its first price. One binary search per group.
+    """
+    prices = sorted_prices.tolist() if isinstance(sorted_prices, np.ndarray) else list(sorted_prices)
+    starts = []
+    i, n = 0, len(prices)
+    while i < n:
+        starts.append(i)
+        anchor = prices[i]
+        i = max(i + 1, bisect_right(prices, anchor + anchor * (tolerance_pct / 100)))
+    return starts
+
+
+def chained_group_starts(sorted_prices, threshold):
+    """Group boundaries where the relative gap to the previous sorted price reaches threshold."""
+    prices = np.asarray(sorted_prices, dtype=np.float64)
+    if len(prices) == 0:
+        return []
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gaps = np.diff(prices) / prices[:-1]
+    return [0] + (np.flatnonzero(~(gaps < threshold)) + 1).tolist()
+
+
+def split_groups(sorted_prices, starts):
+    """Lists of prices per group, from group_starts output."""
+    prices = list(sorted_prices)
+    bounds = list(starts) + [len(prices)]
+    return [prices[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def count_touches(sorted_values, levels, lo_factor=0.997, hi_factor=1.003):
+    """Number of values within [level * lo_factor, level * hi_factor] for each level."""
+    sorted_values = np.asarray(sorted_values, dtype=np.float64)
+    levels = np.asarray(levels, dtype=np.float64)
+    lo = np.searchsorted(sorted_values, levels * lo_factor, side="left")
+    hi = np.searchsorted(sorted_values, levels * hi_factor, side="right")
+    return hi - lo
+
+
+# ==================== Incremental tracker ====================
+
+class SupportResistanceTracker:
+    """
+    Bar-by-bar S/R state for one symbol.
+
+    Bars get absolute indices from 0. A pivot at window (left, right) centred on
+    bar j is confirmed when bar j + right arrives, and never changes afterwards
+    unless that bar is revised (replace_last). Sorted copies of the last
+    `touch_window` highs and lows are kept for binary-search touch counts.
+
+    Args:
+        windows: Pivot windows as (left, right) pairs, e.g. ((2, 2), (5, 5))
+        touch_window: Trailing bars kept sorted for touch counting
+        max_bars: Oldest bars are dropped beyond this many
+    """
+
+    def __init__(self, windows=((2, 2),), touch_window=50, max_bars=5000):
+        self.windows = tuple(tuple(w) for w in windows)
+        self.touch_window = touch_window
+        self.max_bars = max_bars
+        self.base = 0                       # absolute index of _high[0]
+        self._high = np.empty(0)
+        self._low = np.empty(0)
+        self._keys = []
+        self._pivots = {(kind, w): [] for kind in ("high", "low") for w in self.windows}
+        self._sorted = {"high": [], "low": []}
+
+    # ── Bars ──
+
+    def __len__(self):
+        return self.base + len(self._high)
+
+    @property
+    def last_key(self):
+        return self._keys[-1] if self._keys else None
+
+    def bar(self, index):
+        """(high, low, key) of an absolute bar index."""
+        i = index - self.base
+        return float(self._high[i]), float(self._low[i]), self._keys[i]
+
+    def extend(self, highs, lows, keys=None):
+        """Append several bars; pivots for the new bars are found in one vectorized pass."""
+        highs = np.asarray(highs, dtype=np.float64)
+        lows = np.asarray(lows, dtype=np.float64)
+        if len(highs) == 0:
+            return
+        keys = list(keys) if keys is not None else [None] * len(highs)
+        old_n = len(self._high)
+
+        self._high = np.concatenate([self._high, highs])
+        self._low = np.concatenate([self._low, lows])
+        self._keys.extend(keys)
+
+        for (left, right) in self.windows:
+            # Centres confirmed by the new bars: old_n - right .. n - 1 - right (local indices)
+            first = max(left, old_n - right)
+            seg_start = first - left
+            for kind, values in (("high", self._high), ("low", self._low)):
+                found = pivot_indices(values[seg_start:], left, right, kind) + seg_start
+                self._pivots[(kind, (left, right))].extend((found + self.base).tolist())
+
+        for kind, values in (("high", self._high), ("low", self._low)):
+            self._resort(kind, values, old_n)
+        self._trim()
+
+    def append(self, high, low, key=None):
+        self.extend([high], [low], [key])
+
+    def replace_last(self, high, low, key=None):
+        """Revise the forming (last) bar and re-confirm the pivots that depend on it."""
+        if not len(self._high):
+            self.append(high, low, key)
+            return
+        last_abs = len(self) - 1
+        for (kind, (left, right)), pivots in self._pivots.items():
+            while pivots and pivots[-1] + right >= last_abs:
+                pivots.pop()
+        for kind, values in (("high", self._high), ("low", self._low)):
+            window = self._sorted[kind]
+            _window_remove(window, values[-1])
+            leaving = len(values) - 1 - self.touch_window
+            if leaving >= 0:
+                _window_add(window, values[leaving])
+        self._high = self._high[:-1]
+        self._low = self._low[:-1]
+        old_key = self._keys.pop()
+        self.extend([high], [low], [old_key if key is None else key])
+
+    def _resort(self, kind, values, old_n):
+        """Slide the sorted touch window forward over the bars added after old_n."""
+        window = self._sorted[kind]
+        n = len(values)
+        if n - old_n >= self.touch_window:
+            tail = values[n - self.touch_window:]
+            window[:] = np.sort(tail[~np.isnan(tail)]).tolist()
+            return
+        for i in range(old_n, n):
+            _window_add(window, values[i])
+            leaving = i - self.touch_window
+            if leaving >= 0:
+                _window_remove(window, values[leaving])
+
+    def _trim(self):
+        excess = len(self._high) - self.max_bars
+        if excess <= 0:
+            return
+        self._high = self._high[excess:]
+        self._low = self._low[excess:]
+        del self._keys[:excess]
+        self.base += excess
+        for pivots in self._pivots.values():
+            pivots[:bisect_left(pivots, self.base)] = []
+
+    # ── Queries ──
+
+    def pivots(self, kind="high", window=None, start=0, stop=None):
+        """Absolute indices of confirmed pivots with start <= index < stop."""
+        window = tuple(window) if window is not None else self.windows[0]
+        pivots = self._pivots[(kind, window)]
+        stop = len(self) if stop is None else stop
+        return pivots[bisect_left(pivots, start):bisect_left(pivots, stop)]
+
+    def pivot_prices(self, kind="high", window=None, start=0, stop=None):
+        values = self._high if kind == "high" else self._low
+        idx = np.asarray(self.pivots(kind, window, start, stop), dtype=np.int64) - self.base
+        return values[idx]
+
+    def sorted_window(self, kind="high", lookback=None):
+        """Sorted values of the last `lookback` bars (maintained incrementally for touch_window)."""
+        if lookback is None or lookback == min(self.touch_window, len(self._high)):
+            return self._sorted[kind]
+        values = self._high if kind == "high" else self._low
+        return np.sort(values[-lookback:])
+
+    def levels(self, lookback=50, scales=None, tolerance_pct=0.3, band=(0.997, 1.003)):
+        """
+        S/R levels over the last `lookback` bars, same format as
+        PriceActionAnalyzer.identify_support_resistance.
+        """
+        n = len(self)
+        lookback = min(lookback, len(self._high))
+        start = n - lookback
+        if lookback < 5:
+            return []
+        windows = [(r, r) for r in scales] if scales else list(self.windows)
+
+        sr_levels = []
+        for kind, level_type in (("high", "resistance"), ("low", "support")):
+            scale_of = {}
+            for left, right in sorted(windows):
+                for i in self.pivots(kind, (left, right), start + left):
+                    scale_of[i] = left
+            values = self._high if kind == "high" else self._low
+            prices = sorted((float(values[i - self.base]), scale_of[i]) for i in scale_of)
+            sr_levels.extend(levels_from_pivots(
+                [p for p, _ in prices], [s for _, s in prices], self.sorted_window(kind, lookback),
+                level_type, tolerance_pct, band))
+        sr_levels.sort(key=lambda x: x['level'])
+        return sr_levels
+
+
+def _window_add(window, value):
+    if value == value:          # NaN bars are never touches
+        insort(window, float(value))
+
+
+def _window_remove(window, value):
+    if value == value:
+        del window[bisect_left(window, value)]
+
+
+def levels_from_pivots(sorted_prices, scales, sorted_window, level_type,
+                       tolerance_pct=0.3, band=(0.997, 1.003)):
+    """
+    Anchored groups of sorted pivot prices -> level dicts
+    {level, type, touches, strength, scale} with binary-search touch counts.
+    """
+    if not sorted_prices:
+        return []
+    starts = anchored_group_starts(sorted_prices, tolerance_pct)
+    groups = split_groups(sorted_prices, starts)
+    group_scales = [max(s) for s in split_groups(scales, starts)]
+    # (a + b) / 2 is already the correctly rounded mean; statistics.mean for longer groups
+    levels = [g[0] if len(g) == 1 else (g[0] + g[1]) / 2 if len(g) == 2 else mean(g) for g in groups]
+    touches = count_touches(sorted_window, levels, *band).tolist()
+    return [
+        {
+            'level': round(level, 2),
+            'type': level_type,
+            'touches': t,
+            'strength': strength_label(t),
+            'scale': scale,
+        }
+        for level, t, scale in zip(levels, touches, group_scales)
+    ]
+
+
+def strength_label(touches):
+    if touches <= 1:
+        return 'weak'
+    elif touches <= 2:
+        return 'moderate'
+    return 'strong'
+
+
+# ==================== Per-symbol cache ====================
+
+class LevelCache:
+    """
+    One SupportResistanceTracker per symbol, synced with whatever bar history the
+    caller currently holds (e.g. a rolling 6-month yfinance frame).
+
+    sync() lines the incoming bars up with the tracker by bar key (date): bars
+    already seen are skipped, a revised last bar is replaced, and only genuinely
+    new bars are processed. Anything inconsistent rebuilds that symbol's tracker.
+    """
+
+    def __init__(self, windows=((2, 2),), touch_window=50, max_bars=5000):
+        self.windows = windows
+        self.touch_window = touch_window
+        self.max_bars = max_bars
+        self._trackers = {}
+        self._lock = threading.Lock()
+        self.stats = {'appended': 0, 'replaced': 0, 'rebuilt': 0, 'unchanged': 0}
+
+    def _new_tracker(self):
+        return SupportResistanceTracker(self.windows, self.touch_window, self.max_bars)
+
+    def sync(self, symbol, highs, lows, keys=None):
+        """
+        Bring the symbol's tracker up to date with these bars.
+
+        Returns:
+            (tracker, offset): absolute index of bar i in the input is offset + i
+        """
+        highs = np.asarray(highs, dtype=np.float64)
+        lows = np.asarray(lows, dtype=np.float64)
+        keys = list(keys) if keys is not None else list(range(len(highs)))
+        with self._lock:
+            tracker = self._trackers.get(symbol)
+            outcome, offset = self._align(tracker, highs, lows, keys)
+            if outcome == 'rebuilt':
+                tracker = self._new_tracker()
+                tracker.extend(highs, lows, keys)
+                self._trackers[symbol] = tracker
+                offset = 0
+            self.stats[outcome] += 1
+            return tracker, offset
+
+    def _align(self, tracker, highs, lows, keys):
+        if tracker is None or not len(tracker) or not keys:
+            return 'rebuilt', 0
+        n = len(keys)
+        last_abs = len(tracker) - 1
+        last_high, last_low, last_key = tracker.bar(last_abs)
+        try:
+            pos = n - 1 - keys[::-1].index(last_key)
+        except ValueError:
+            return 'rebuilt', 0
+        offset = last_abs - pos
+        if offset < tracker.base:
+            return 'rebuilt', 0     # caller holds bars older than the tracker kept
+
+        # The bar before the last seen one must match too (guards against re-keyed data)
+        if pos > 0:
+            h, l, k = tracker.bar(last_abs - 1)
+            if k != keys[pos - 1] or h != highs[pos - 1] or l != lows[pos - 1]:
+                return 'rebuilt', 0
+
+        if highs[pos] != last_high or lows[pos] != last_low:
+            tracker.replace_last(highs[pos], lows[pos], last_key)
+            outcome = 'replaced'
+        else:
+            outcome = 'unchanged'
+        if pos + 1 < n:
+            tracker.extend(highs[pos + 1:], lows[pos + 1:], keys[pos + 1:])
+            outcome = 'appended'
+        return outcome, offset
+
+    def get(self, symbol):
+        return self._trackers.get(symbol)
+
+    def clear(self):
+        with self._lock:
+            self._trackers.clear()
@@ -1,8 +1,9 @@
 """
 Layer 1: Technical Analysis Module for Nifty Direction Conviction Engine
 
-Pure Python implementation of technical indicators for OHLCV candle data.
-No external dependencies beyond standard library (math, statistics).
+Technical indicators for OHLCV candle data, computed on the NumPy columns of
+a CandleSeries (see candle_series.py and the kernels in indicators.py).
+Methods return plain lists so callers written against the list API keep working.
 
 Indicators included:
 - EMA (Exponential Moving Average)
@@ -19,8 +20,11 @@ Indicators included:
 - Trend Momentum Score (composite scoring method)
 """
 
-import math
-from statistics import mean
+import numpy as np
+
+from . import indicators
+from .candle_series import CandleSeries
+from .indicator_cache import SeriesIndicators
 
 
 class TechnicalAnalyzer:
@@ -28,6 +32,8 @@ class TechnicalAnalyzer:
     Computes technical indicators from OHLCV candle data.
 
     Attributes:
+        series (CandleSeries): Columnar OHLCV arrays all indicators are computed from
+        ind (SeriesIndicators): Memoized indicator arrays for the series
         candles (list): List of dicts with keys: date, open, high, low, close, volume
         closes (list): List of closing prices
         highs (list): List of high prices
@@ -36,19 +42,41 @@ class TechnicalAnalyzer:
         volumes (list): List of volumes
     """
 
-    def __init__(self, candles):
+    def __init__(self, candles, cache=None):
         """
         Initialize TechnicalAnalyzer with candle data.
 
         Args:
-            candles (list): List of dicts {date, open, high, low, close, volume}
+            candles (list | CandleSeries): List of dicts {date, open, high, low, close, volume},
+                or a CandleSeries shared with the other analyzers
+            cache (IndicatorCache, optional): Indicator cache shared with other layers / runs
         """
-        self.candles = candles
-        self.closes = [c['close'] for c in candles]
-        self.highs = [c['high'] for c in candles]
-        self.lows = [c['low'] for c in candles]
-        self.opens = [c['open'] for c in candles]
-        self.volumes = [c['volume'] for c in candles]
+        self.series = CandleSeries.from_candles(candles)
+        self.ind = SeriesIndicators(self.series, cache)
+
+    @property
+    def candles(self):
+        return self.series.candles
+
+    @property
+    def closes(self):
+        return self.series.tolist('close')
+
+    @property
+    def highs(self):
+        return self.series.tolist('high')
+
+    @property
+    def lows(self):
+        return self.series.tolist('low')
+
+    @property
+    def opens(self):
+        return self.series.tolist('open')
+
+    @property
+    def volumes(self):
+        return self.series.tolist('volume')
 
     def compute_ema(self, period, data=None):
         """
@@ -56,7 +84,7 @@ class TechnicalAnalyzer:
 
         Args:
             period (int): EMA period
-            data (list, optional): Data to compute EMA on. Defaults to self.closes
+            data (list, optional): Data to compute EMA on. Defaults to closing prices
 
         Returns:
             list: EMA values
@@ -65,27 +93,10 @@ class TechnicalAnalyzer:
             ValueError: If period is invalid or data is insufficient
         """
         if data is None:
-            data = self.closes
-
-        if period <= 0 or period > len(data):
-            raise ValueError(f"Period {period} invalid for data length {len(data)}")
-
-        if len(data) < period:
-            return []
-
-        ema = []
-        multiplier = 2.0 / (period + 1)
-
-        # Calculate SMA for first period
-        sma = sum(data[:period]) / period
-        ema.append(sma)
-
-        # Calculate EMA for remaining values
-        for i in range(period, len(data)):
-            ema_val = (data[i] - ema[-1]) * multiplier + ema[-1]
-            ema.append(ema_val)
-
-        return ema
+            if period <= 0 or period > len(self.series):
+                raise ValueError(f"Period {period} invalid for data length {len(self.series)}")
+            return self.ind.ema(period).tolist()
+        return indicators.ema(data, period).tolist()
 
     def compute_sma(self, period, data=None):
         """
@@ -93,7 +104,7 @@ class TechnicalAnalyzer:
 
         Args:
             period (int): SMA period
-            data (list, optional): Data to compute SMA on. Defaults to self.closes
+            data (list, optional): Data to compute SMA on. Defaults to closing prices
 
         Returns:
             list: SMA values
@@ -102,17 +113,10 @@ class TechnicalAnalyzer:
             ValueError: If period is invalid or data is insufficient
         """
         if data is None:
-            data = self.closes
-
-        if period <= 0 or period > len(data):
-            raise ValueError(f"Period {period} invalid for data length {len(data)}")
-
-        sma = []
-        for i in range(period - 1, len(data)):
-            avg = sum(data[i - period + 1:i + 1]) / period
-            sma.append(avg)
-
-        return sma
+            if period <= 0 or period > len(self.series):
+                raise ValueError(f"Period {period} invalid for data length {len(self.series)}")
+            return self.ind.sma(period).tolist()
+        return indicators.sma(data, period).tolist()
 
     def compute_rsi(self, period=14):
         """
@@ -128,46 +132,11 @@ class TechnicalAnalyzer:
             Returns empty list if insufficient data.
             Uses Wilder's method: first RS uses SMA, subsequent use EMA smoothing.
         """
-        if len(self.closes) < period + 1:
-            return []
-
-        rsi = []
-        gains = []
-        losses = []
-
-        # Calculate gains and losses
-        for i in range(1, len(self.closes)):
-            change = self.closes[i] - self.closes[i - 1]
-            if change > 0:
-                gains.append(change)
-                losses.append(0)
-            else:
-                gains.append(0)
-                losses.append(abs(change))
-
-        # Initialize with SMA
-        avg_gain = sum(gains[:period]) / period
-        avg_loss = sum(losses[:period]) / period
-
-        # Calculate RSI for first valid point
-        if avg_loss == 0:
-            rsi.append(100 if avg_gain > 0 else 0)
-        else:
-            rs = avg_gain / avg_loss
-            rsi.append(100 - (100 / (1 + rs)))
-
-        # Wilder's smoothing for subsequent values
-        for i in range(period, len(gains)):
-            avg_gain = (avg_gain * (period - 1) + gains[i]) / period
-            avg_loss = (avg_loss * (period - 1) + losses[i]) / period
-
-            if avg_loss == 0:
-                rsi.append(100 if avg_gain > 0 else 0)
-            else:
-                rs = avg_gain / avg_loss
-                rsi.append(100 - (100 / (1 + rs)))
+        return self.ind.rsi(period).tolist()
 
-        return rsi
+    def _macd(self, fast=12, slow=26, signal=9):
+        macd_line, signal_line, histogram = self.ind.macd(fast, slow, signal)
+        return {'macd_line': macd_line, 'signal_line': signal_line, 'histogram': histogram}
 
     def compute_macd(self, fast=12, slow=26, signal=9):
         """
@@ -188,31 +157,7 @@ class TechnicalAnalyzer:
         Note:
             Returns dict with empty lists if insufficient data.
         """
-        if len(self.closes) < slow + signal:
-            return {'macd_line': [], 'signal_line': [], 'histogram': []}
-
-        fast_ema = self.compute_ema(fast)
-        slow_ema = self.compute_ema(slow)
-
-        # MACD line is difference between fast and slow EMA
-        # Align to slow EMA length
-        macd_line = []
-        for i in range(len(slow_ema)):
-            macd_line.append(fast_ema[i + (len(fast_ema) - len(slow_ema))] - slow_ema[i])
-
-        # Signal line is EMA of MACD line
-        signal_line = self.compute_ema(signal, macd_line)
-
-        # Histogram is MACD - Signal
-        histogram = []
-        for i in range(len(signal_line)):
-            histogram.append(macd_line[i + (len(macd_line) - len(signal_line))] - signal_line[i])
-
-        return {
-            'macd_line': macd_line,
-            'signal_line': signal_line,
-            'histogram': histogram
-        }
+        return {key: values.tolist() for key, values in self._macd(fast, slow, signal).items()}
 
     def compute_atr(self, period=14):
         """
@@ -228,38 +173,7 @@ class TechnicalAnalyzer:
             True Range = max(high - low, abs(high - prev_close), abs(low - prev_close))
             Uses Wilder's smoothing method.
         """
-        if len(self.candles) < 2:
-            return []
-
-        tr_values = []
-
-        # Calculate True Range
-        for i in range(len(self.candles)):
-            high = self.highs[i]
-            low = self.lows[i]
-            tr = high - low
-
-            if i > 0:
-                prev_close = self.closes[i - 1]
-                tr = max(tr, abs(high - prev_close), abs(low - prev_close))
-
-            tr_values.append(tr)
-
-        if len(tr_values) < period:
-            return []
-
-        atr = []
-
-        # First ATR is simple average
-        atr_val = sum(tr_values[:period]) / period
-        atr.append(atr_val)
-
-        # Subsequent values use Wilder's smoothing
-        for i in range(period, len(tr_values)):
-            atr_val = (atr_val * (period - 1) + tr_values[i]) / period
-            atr.append(atr_val)
-
-        return atr
+        return self.ind.atr(period).tolist()
 
     def compute_supertrend(self, period=10, multiplier=3.0):
         """
@@ -280,55 +194,15 @@ class TechnicalAnalyzer:
             and Basic Lower Band (hl2 - atr*multiplier)
             Direction: 1 = price above supertrend (bullish), -1 = below (bearish)
         """
-        if len(self.candles) < period + 1:
-            return {'supertrend': [], 'direction': []}
-
-        atr = self.compute_atr(period)
-        if not atr:
-            return {'supertrend': [], 'direction': []}
-
-        supertrend = []
-        direction = []
-
-        # Start from where ATR is available
-        for i in range(len(atr)):
-            idx = i + (len(self.candles) - len(atr))
-            hl2 = (self.highs[idx] + self.lows[idx]) / 2
-
-            basic_ub = hl2 + multiplier * atr[i]
-            basic_lb = hl2 - multiplier * atr[i]
-
-            # Final upper and lower bands
-            if i == 0:
-                final_ub = basic_ub
-                final_lb = basic_lb
-            else:
-                final_ub = basic_ub if basic_ub < supertrend[i - 1] or self.closes[idx - 1] > supertrend[i - 1] else supertrend[i - 1]
-                final_lb = basic_lb if basic_lb > supertrend[i - 1] or self.closes[idx - 1] < supertrend[i - 1] else supertrend[i - 1]
-
-            # Supertrend is the upper or lower band
-            if i == 0:
-                st = final_lb if self.closes[idx] <= final_ub else final_ub
-                dir_val = -1 if self.closes[idx] <= final_ub else 1
-            else:
-                if supertrend[i - 1] == supertrend[i - 1]:  # Previous was upper band
-                    st = final_ub
-                    dir_val = 1 if self.closes[idx] >= final_ub else -1
-                else:
-                    st = final_lb
-                    dir_val = -1 if self.closes[idx] <= final_lb else 1
-
-            supertrend.append(final_lb if dir_val == -1 else final_ub)
-            direction.append(dir_val)
-
-        return {'supertrend': supertrend, 'direction': direction}
+        supertrend, direction = self.ind.supertrend(period, multiplier)
+        return {'supertrend': list(supertrend), 'direction': list(direction)}
 
     def compute_vwap(self):
         """
         Compute Volume Weighted Average Price.
 
         Args:
-            None (uses self.candles)
+            None (uses the candle series)
 
         Returns:
             list: VWAP values for each candle
@@ -337,24 +211,7 @@ class TechnicalAnalyzer:
             VWAP = Cumulative(TP * Volume) / Cumulative(Volume)
             where TP (Typical Price) = (High + Low + Close) / 3
         """
-        if not self.candles:
-            return []
-
-        vwap = []
-        cum_vol = 0
-        cum_tp_vol = 0
-
-        for i in range(len(self.candles)):
-            tp = (self.highs[i] + self.lows[i] + self.closes[i]) / 3
-            cum_tp_vol += tp * self.volumes[i]
-            cum_vol += self.volumes[i]
-
-            if cum_vol > 0:
-                vwap.append(cum_tp_vol / cum_vol)
-            else:
-                vwap.append(tp)
-
-        return vwap
+        return self.ind.vwap().tolist()
 
     def compute_bollinger_bands(self, period=20, std_dev=2):
         """
@@ -376,29 +233,17 @@ class TechnicalAnalyzer:
             Upper = Middle + std_dev * StdDev
             Lower = Middle - std_dev * StdDev
         """
-        if len(self.closes) < period:
-            return {'upper': [], 'middle': [], 'lower': []}
-
-        middle = self.compute_sma(period)
-        upper = []
-        lower = []
-
-        for i in range(period - 1, len(self.closes)):
-            subset = self.closes[i - period + 1:i + 1]
-            mean_val = sum(subset) / period
-            variance = sum((x - mean_val) ** 2 for x in subset) / period
-            std = math.sqrt(variance)
-
-            band_offset = std_dev * std
-            upper.append(middle[i - (period - 1)] + band_offset)
-            lower.append(middle[i - (period - 1)] - band_offset)
-
+        upper, middle, lower = self.ind.bollinger(period, std_dev)
         return {
-            'upper': upper,
-            'middle': middle,
-            'lower': lower
+            'upper': upper.tolist(),
+            'middle': middle.tolist(),
+            'lower': lower.tolist()
         }
 
+    def _stochastic(self, k_period=14, d_period=3):
+        k_values, d_values = self.ind.stochastic(k_period, d_period)
+        return {'k': k_values, 'd': d_values}
+
     def compute_stochastic(self, k_period=14, d_period=3):
         """
         Compute Stochastic Oscillator.
@@ -417,42 +262,14 @@ class TechnicalAnalyzer:
             %K = 100 * (Close - Lowest Low) / (Highest High - Lowest Low)
             %D = SMA of %K
         """
-        if len(self.closes) < k_period:
-            return {'k': [], 'd': []}
-
-        k_values = []
-
-        for i in range(k_period - 1, len(self.closes)):
-            subset_high = self.highs[i - k_period + 1:i + 1]
-            subset_low = self.lows[i - k_period + 1:i + 1]
-
-            highest = max(subset_high)
-            lowest = min(subset_low)
-
-            if highest - lowest == 0:
-                k_val = 50
-            else:
-                k_val = 100 * (self.closes[i] - lowest) / (highest - lowest)
-
-            k_values.append(k_val)
-
-        # Calculate %D as SMA of %K
-        d_values = []
-        for i in range(d_period - 1, len(k_values)):
-            d_val = sum(k_values[i - d_period + 1:i + 1]) / d_period
-            d_values.append(d_val)
-
-        return {
-            'k': k_values,
-            'd': d_values
-        }
+        return {key: values.tolist() for key, values in self._stochastic(k_period, d_period).items()}
 
     def compute_obv(self):
         """
         Compute On Balance Volume.
 
         Args:
-            None (uses self.candles)
+            None (uses the candle series)
 
         Returns:
             list: OBV values
@@ -462,20 +279,13 @@ class TechnicalAnalyzer:
             If Close < Previous Close: OBV = Previous OBV - Volume
             If Close = Previous Close: OBV = Previous OBV
         """
-        if not self.candles:
-            return []
-
-        obv = [self.volumes[0]]
-
-        for i in range(1, len(self.candles)):
-            if self.closes[i] > self.closes[i - 1]:
-                obv.append(obv[-1] + self.volumes[i])
-            elif self.closes[i] < self.closes[i - 1]:
-                obv.append(obv[-1] - self.volumes[i])
-            else:
-                obv.append(obv[-1])
+        return self.ind.obv().tolist()
 
-        return obv
+    def _adx(self, period=14):
+        state = self.ind.adx(period)
+        if not state:
+            return {'adx': np.empty(0), 'plus_di': np.empty(0), 'minus_di': np.empty(0)}
+        return {'adx': state['adx'], 'plus_di': state['plus_di'], 'minus_di': state['minus_di']}
 
     def compute_adx(self, period=14):
         """
@@ -496,100 +306,7 @@ class TechnicalAnalyzer:
             +DI and -DI measure directional movement.
             Uses Wilder's smoothing method.
         """
-        if len(self.candles) < period + 1:
-            return {'adx': [], 'plus_di': [], 'minus_di': []}
-
-        plus_dm = []
-        minus_dm = []
-        tr_values = []
-
-        # Calculate DM and TR
-        for i in range(1, len(self.candles)):
-            high_diff = self.highs[i] - self.highs[i - 1]
-            low_diff = self.lows[i - 1] - self.lows[i]
-
-            plus_d = 0
-            minus_d = 0
-
-            if high_diff > 0 and high_diff > low_diff:
-                plus_d = high_diff
-            if low_diff > 0 and low_diff > high_diff:
-                minus_d = low_diff
-
-            plus_dm.append(plus_d)
-            minus_dm.append(minus_d)
-
-            # True Range
-            high = self.highs[i]
-            low = self.lows[i]
-            prev_close = self.closes[i - 1]
-
-            tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
-            tr_values.append(tr)
-
-        if len(tr_values) < period:
-            return {'adx': [], 'plus_di': [], 'minus_di': []}
-
-        # Initialize with sums
-        plus_dm_sum = sum(plus_dm[:period])
-        minus_dm_sum = sum(minus_dm[:period])
-        tr_sum = sum(tr_values[:period])
-
-        adx_values = []
-        plus_di_values = []
-        minus_di_values = []
-
-        # Calculate DI values
-        if tr_sum > 0:
-            plus_di = 100 * plus_dm_sum / tr_sum
-            minus_di = 100 * minus_dm_sum / tr_sum
-        else:
-            plus_di = 0
-            minus_di = 0
-
-        plus_di_values.append(plus_di)
-        minus_di_values.append(minus_di)
-
-        # DX calculation
-        di_sum = plus_di + minus_di
-        if di_sum > 0:
-            dx = 100 * abs(plus_di - minus_di) / di_sum
-        else:
-            dx = 0
-
-        adx = dx
-        adx_values.append(adx)
-
-        # Subsequent values with Wilder's smoothing
-        for i in range(period, len(plus_dm)):
-            plus_dm_sum = plus_dm_sum * (period - 1) / period + plus_dm[i]
-            minus_dm_sum = minus_dm_sum * (period - 1) / period + minus_dm[i]
-            tr_sum = tr_sum * (period - 1) / period + tr_values[i]
-
-            if tr_sum > 0:
-                plus_di = 100 * plus_dm_sum / tr_sum
-                minus_di = 100 * minus_dm_sum / tr_sum
-            else:
-                plus_di = 0
-                minus_di = 0
-
-            plus_di_values.append(plus_di)
-            minus_di_values.append(minus_di)
-
-            di_sum = plus_di + minus_di
-            if di_sum > 0:
-                dx = 100 * abs(plus_di - minus_di) / di_sum
-            else:
-                dx = 0
-
-            adx = (adx * (period - 1) + dx) / period
-            adx_values.append(adx)
-
-        return {
-            'adx': adx_values,
-            'plus_di': plus_di_values,
-            'minus_di': minus_di_values
-        }
+        return {key: values.tolist() for key, values in self._adx(period).items()}
 
     def get_trend_momentum_score(self):
         """
@@ -622,11 +339,12 @@ class TechnicalAnalyzer:
             - Handles division by zero gracefully
         """
         # Check minimum data requirement
-        if len(self.candles) < 20:
+        n = len(self.series)
+        if n < 20:
             return {
                 'score': 0,
                 'direction': 'NEUTRAL',
-                'signals': [{'name': 'Data Insufficient', 'value': f'{len(self.candles)} candles', 'signal': 'NEUTRAL', 'weight': 0}],
+                'signals': [{'name': 'Data Insufficient', 'value': f'{n} candles', 'signal': 'NEUTRAL', 'weight': 0}],
                 'details': {}
             }
 
@@ -634,11 +352,12 @@ class TechnicalAnalyzer:
         score = 0
 
         # 1. EMA Alignment (9, 21, 50)
-        ema_9 = self.compute_ema(9)
-        ema_21 = self.compute_ema(21)
-        ema_50 = self.compute_ema(50)
+        close = self.series.close
+        ema_9 = self.ind.ema(9)
+        ema_21 = self.ind.ema(21)
+        ema_50 = self.ind.ema(50)
 
-        if ema_9 and ema_21 and ema_50:
+        if len(ema_9) and len(ema_21) and len(ema_50):
             ema_9_last = ema_9[-1]
             ema_21_last = ema_21[-1]
             ema_50_last = ema_50[-1]
@@ -687,8 +406,8 @@ class TechnicalAnalyzer:
                 score -= 0.5
 
         # 3. RSI Analysis
-        rsi = self.compute_rsi(14)
-        if rsi:
+        rsi = self.ind.rsi(14)
+        if len(rsi):
             rsi_last = rsi[-1]
 
             if rsi_last > 70:
@@ -725,8 +444,8 @@ class TechnicalAnalyzer:
                 score -= 0.5
 
         # 4. MACD Analysis
-        macd = self.compute_macd()
-        if macd['histogram']:
+        macd = self._macd()
+        if len(macd['histogram']):
             hist_last = macd['histogram'][-1]
 
             if len(macd['histogram']) > 1:
@@ -767,10 +486,10 @@ class TechnicalAnalyzer:
                         score -= 0.5
 
         # 5. ADX Analysis
-        adx_data = self.compute_adx()
+        adx_data = self._adx()
         adx_amplification = 1.0
 
-        if adx_data['adx']:
+        if len(adx_data['adx']):
             adx_last = adx_data['adx'][-1]
 
             if adx_last > 25:
@@ -813,9 +532,9 @@ class TechnicalAnalyzer:
                 score -= 1.0 * adx_amplification
 
         # 7. VWAP
-        vwap = self.compute_vwap()
-        if vwap:
-            current_price = self.closes[-1]
+        vwap = self.ind.vwap()
+        if len(vwap):
+            current_price = close[-1]
             vwap_last = vwap[-1]
 
             if current_price > vwap_last:
@@ -836,8 +555,8 @@ class TechnicalAnalyzer:
                 score -= 0.5
 
         # 8. Stochastic
-        stoch = self.compute_stochastic()
-        if stoch['k']:
+        stoch = self._stochastic()
+        if len(stoch['k']):
             k_last = stoch['k'][-1]
 
             if k_last < 20:
@@ -870,17 +589,17 @@ class TechnicalAnalyzer:
 
         # Build details dict
         details = {
-            'current_price': self.closes[-1] if self.closes else 0,
-            'ema_9': ema_9[-1] if ema_9 else 0,
-            'ema_21': ema_21[-1] if ema_21 else 0,
-            'ema_50': ema_50[-1] if ema_50 else 0,
-            'rsi': rsi[-1] if rsi else 0,
-            'macd_histogram': macd['histogram'][-1] if macd['histogram'] else 0,
-            'adx': adx_data['adx'][-1] if adx_data['adx'] else 0,
-            'plus_di': adx_data['plus_di'][-1] if adx_data['plus_di'] else 0,
-            'minus_di': adx_data['minus_di'][-1] if adx_data['minus_di'] else 0,
+            'current_price': float(close[-1]) if n else 0,
+            'ema_9': float(ema_9[-1]) if len(ema_9) else 0,
+            'ema_21': float(ema_21[-1]) if len(ema_21) else 0,
+            'ema_50': float(ema_50[-1]) if len(ema_50) else 0,
+            'rsi': float(rsi[-1]) if len(rsi) else 0,
+            'macd_histogram': float(macd['histogram'][-1]) if len(macd['histogram']) else 0,
+            'adx': float(adx_data['adx'][-1]) if len(adx_data['adx']) else 0,
+            'plus_di': float(adx_data['plus_di'][-1]) if len(adx_data['plus_di']) else 0,
+            'minus_di': float(adx_data['minus_di'][-1]) if len(adx_data['minus_di']) else 0,
             'supertrend_direction': supertrend['direction'][-1] if supertrend['direction'] else 0,
-            'vwap': vwap[-1] if vwap else 0
+            'vwap': float(vwap[-1]) if len(vwap) else 0
         }
 
         return {
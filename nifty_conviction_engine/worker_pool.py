@@ -0,0 +1,91 @@
+"""
+Warm Worker Pools — shared by the Conviction Engine and the trading system
+
+One process pool (CPU-bound indicator work) and one thread pool (network
+fetches) per interpreter, created on first use and kept alive so every
+ConvictionScorer, score_batch, scan and dashboard request reuses already
+started workers with their imports and indicator caches warm.
+
+execution/trading_system imports this module too, so a process running both
+the scanner and the conviction scorer holds a single set of workers.
+
+Results are always returned in submission order, so a batch evaluated in
+parallel merges to exactly the same output as the sequential loop.
+"""
+
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Iterable, List, Optional
+
+MAX_WORKERS = min(8, os.cpu_count() or 1)
+MAX_IO_WORKERS = 16
+
+_pools: Dict[str, Executor] = {}
+_lock = threading.Lock()
+
+
+def get_pool(kind: str = "process", max_workers: Optional[int] = None) -> Executor:
+    """
+    Shared executor of the given kind ('process' or 'thread').
+
+    Falls back to a thread pool if processes cannot be started here
+    (e.g. no semaphore support in a sandbox).
+    """
+    if kind not in ("process", "thread"):
+        raise ValueError(f"Unknown pool kind '{kind}'. Use 'process' or 'thread'")
+
+    with _lock:
+        pool = _pools.get(kind)
+        if pool is not None and not getattr(pool, "_broken", False):
+            return pool
+
+        if kind == "process":
+            try:
+                pool = ProcessPoolExecutor(max_workers=max_workers or MAX_WORKERS)
+            except (OSError, NotImplementedError, ImportError) as e:
+                print(f"[POOL] Process pool unavailable ({e}) — using threads")
+                pool = ThreadPoolExecutor(max_workers=max_workers or MAX_WORKERS,
+                                          thread_name_prefix="analysis")
+        else:
+            pool = ThreadPoolExecutor(max_workers=max_workers or MAX_IO_WORKERS,
+                                      thread_name_prefix="fetch")
+        _pools[kind] = pool
+        return pool
+
+
+def is_process_pool(executor) -> bool:
+    return isinstance(executor, ProcessPoolExecutor)
+
+
+def map_ordered(fn: Callable, *iterables: Iterable, kind: str = "process",
+                executor: Optional[Executor] = None) -> List:
+    """
+    executor.map over the shared pool, returning a list in input order.
+
+    If a process worker dies mid-batch the pool is discarded (the next call
+    starts a fresh one) and the batch is re-run in-process.
+    """
+    items = [list(it) for it in iterables]
+    if not items or not items[0]:
+        return []
+
+    pool = executor or get_pool(kind)
+    try:
+        return list(pool.map(fn, *items))
+    except BrokenProcessPool:
+        print("[POOL] Worker process died — re-running batch in-process")
+        with _lock:
+            if _pools.get(kind) is pool:
+                del _pools[kind]
+        return [fn(*args) for args in zip(*items)]
+
+
+def shutdown_pools(wait: bool = True):
+    """Stop all shared workers (called on app shutdown)."""
+    with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=wait)